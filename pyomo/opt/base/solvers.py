@@ -409,6 +409,13 @@ class OptSolver(Plugin):
         self._allow_callbacks = False
         self._callback = {}
 
+        #
+        # The directory in which the temporary files for the current
+        # solve are created (None indicates the TempfileManager
+        # default directory)
+        #
+        self._tempdir = None
+
         # We define no capabilities for the generic solver; base
         # classes must override this
         self._capabilities = pyutilib.misc.Options()
@@ -538,6 +545,10 @@ class OptSolver(Plugin):
     def solve(self, *args, **kwds):
         """ Solve the problem """
 
+        # check the temporary directory before the solver, so that a
+        # bad directory is reported whether or not the solver is
+        # available
+        self._check_tempdir(kwds.get('tempdir', None))
         self.available(exception_flag=True)
         #
         # If the inputs are models, then validate that they have been
@@ -591,8 +602,18 @@ class OptSolver(Plugin):
         self.options.update(kwds.pop('options', {}))
         self.options.update(
             self._options_string_to_dict(kwds.pop('options_string', '')))
+
         try:
 
+            #
+            # Temporary files (e.g., problem, log and solution files)
+            # for this solve are created in the 'tempdir' directory if
+            # it is specified. Pointing this at a memory-backed
+            # filesystem (e.g., /dev/shm) avoids the disk round trip
+            # through the problem and solution files.
+            #
+            self._set_tempdir(kwds.pop('tempdir', None))
+
             # we're good to go.
             initial_time = time.time()
 
@@ -670,9 +691,30 @@ class OptSolver(Plugin):
             # Reset the options dict
             #
             self.options = orig_options
+            self._tempdir = None
 
         return result
 
+    def _set_tempdir(self, tempdir):
+        """
+        Set the directory in which the temporary files for the
+        current solve are created. The directory is passed to the
+        TempfileManager by the solver plugin (and the problem
+        writer), so the global TempfileManager state is not modified.
+        """
+        self._check_tempdir(tempdir)
+        self._tempdir = tempdir
+
+    def _check_tempdir(self, tempdir):
+        """
+        Raise a ValueError if the temporary directory for a solve
+        does not exist.
+        """
+        if (tempdir is not None) and (not os.path.isdir(tempdir)):
+            raise ValueError(
+                "The temporary directory '%s' specified for solver "
+                "%s does not exist" % (tempdir, self.name))
+
     def _presolve(self, *args, **kwds):
 
         self._log_file                = kwds.pop("logfile", None)
@@ -689,6 +731,8 @@ class OptSolver(Plugin):
 
         if self._problem_format:
             write_start_time = time.time()
+            if self._tempdir is not None:
+                kwds['tempdir'] = self._tempdir
             (self._problem_files, self._problem_format, self._smap_id) = \
                 self._convert_problem(args,
                                       self._problem_format,
@@ -10,3 +10,6 @@
 
 from pyomo.opt.solver.shellcmd import *
 from pyomo.opt.solver.ilmcmd import *
+from pyomo.opt.solver.subprocess_pool import *
+from pyomo.opt.solver.executable_cache import *
+from pyomo.opt.solver.progress import *
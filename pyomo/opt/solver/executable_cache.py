@@ -0,0 +1,168 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+__all__ = ['SolverExecutableCache', 'solver_executable_cache']
+
+import os
+import json
+import logging
+import tempfile
+
+import appdirs
+
+logger = logging.getLogger('pyomo.opt')
+
+class SolverExecutableCache(object):
+    """
+    A persistent cache of information obtained by executing a solver
+    executable (e.g., its version), keyed by the absolute path of the
+    executable. Entries are invalidated when the modification time or
+    size of the executable changes.
+
+    The cache is stored as a JSON file. The location defaults to
+    'solver_executables.json' in the user cache directory for Pyomo
+    and can be changed using the PYOMO_SOLVER_CACHE environment
+    variable. Setting that variable to an empty string disables the
+    on-disk cache (results are then only cached for the lifetime of
+    the process).
+    """
+
+    def __init__(self, filename=None):
+        if filename is None:
+            filename = os.environ.get(
+                'PYOMO_SOLVER_CACHE',
+                os.path.join(appdirs.user_cache_dir('pyomo'),
+                             'solver_executables.json'))
+        if not filename:
+            filename = None
+        self.filename = filename
+        self._data = None
+
+    @staticmethod
+    def _stat(executable):
+        try:
+            st = os.stat(executable)
+        except OSError:
+            return None
+        return [st.st_mtime, st.st_size]
+
+    def _read(self):
+        if self.filename is None:
+            return {}
+        try:
+            with open(self.filename) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+        if type(data) is not dict:
+            return {}
+        return data
+
+    def _write(self, data):
+        if self.filename is None:
+            return
+        # write a private file and rename it so that concurrent
+        # processes never observe a partially written cache
+        try:
+            dirname = os.path.dirname(self.filename)
+            if dirname and not os.path.exists(dirname):
+                os.makedirs(dirname)
+            fd, tmpname = tempfile.mkstemp(dir=dirname or None,
+                                           prefix='.solver_executables')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            try:
+                os.rename(tmpname, self.filename)
+            except OSError:
+                # rename does not overwrite on Windows
+                os.remove(self.filename)
+                os.rename(tmpname, self.filename)
+        except (IOError, OSError):
+            logger.debug("Unable to update the solver executable "
+                         "cache file '%s'" % (self.filename))
+
+    def lookup(self, executable, key):
+        """
+        Return a tuple (found, value) for the information stored
+        under the given key for an executable. The entry is only
+        returned if the executable has not changed since it was
+        stored.
+        """
+        executable = os.path.abspath(executable)
+        if self._data is None:
+            self._data = self._read()
+        entry = self._data.get(executable, None)
+        if (entry is None) or (key not in entry.get('values', {})):
+            return False, None
+        if entry.get('stat', None) != self._stat(executable):
+            return False, None
+        return True, entry['values'][key]
+
+    def store(self, executable, key, value):
+        """
+        Store information under the given key for an executable.
+        """
+        executable = os.path.abspath(executable)
+        stat = self._stat(executable)
+        if stat is None:
+            return
+        # merge with the current contents of the cache file, which
+        # may have been updated by other processes
+        data = self._read()
+        if self._data is not None:
+            for name, entry in self._data.items():
+                data.setdefault(name, entry)
+        entry = data.get(executable, None)
+        if (entry is None) or (entry.get('stat', None) != stat):
+            entry = data[executable] = {'stat': stat, 'values': {}}
+        entry['values'][key] = value
+        self._data = data
+        self._write(data)
+
+    def get(self, executable, key, compute):
+        """
+        Return the information stored under the given key for an
+        executable, calling compute() to obtain (and then store) it
+        if the cache does not contain a valid entry.
+        """
+        found, value = self.lookup(executable, key)
+        if not found:
+            value = compute()
+            self.store(executable, key, value)
+        return value
+
+    def get_version(self, executable, key, compute):
+        """
+        Return the version tuple for an executable, calling compute()
+        to obtain it if the cache does not contain a valid entry.
+        Versions that could not be determined (None) are not stored,
+        since version queries are typically run with a short time
+        limit.
+        """
+        key = 'version:'+key
+        found, version = self.lookup(executable, key)
+        if found:
+            return tuple(version)
+        version = compute()
+        if version is not None:
+            self.store(executable, key, list(version))
+        return version
+
+    def clear(self):
+        """
+        Remove all entries from the cache.
+        """
+        self._data = {}
+        self._write({})
+
+#
+# The cache used by the solver plugins.
+#
+solver_executable_cache = SolverExecutableCache()
@@ -0,0 +1,150 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+__all__ = ['SolverProgressParser', 'run_streaming']
+
+import os
+import sys
+import time
+import signal
+import threading
+import subprocess
+
+from pyutilib.misc import Bunch, quote_split
+
+_mswindows = sys.platform.startswith('win')
+
+class SolverProgressParser(object):
+    """
+    Base class for parsers that extract progress information from a
+    solver log one line at a time while the solver runs.
+
+    Derived classes implement _parse_line, which returns a dictionary
+    with any of the keys 'incumbent', 'bound', 'gap' and 'nodes' (or
+    None if the line does not report progress). The values are merged
+    with the previously reported values, and parse_line returns a
+    progress event (a Bunch) with the following attributes:
+
+        incumbent: the objective of the best known solution
+        bound:     the best objective bound
+        gap:       the relative gap between incumbent and bound
+        nodes:     the number of branch-and-bound nodes processed
+        elapsed:   the wall-clock seconds since the solver was launched
+
+    Values that have not been reported by the solver are None.
+    Objective values are reported as they appear in the log.
+    """
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.incumbent = None
+        self.bound = None
+        self.gap = None
+        self.nodes = None
+
+    def parse_line(self, line):
+        """
+        Parse a line of solver output, returning a progress event
+        or None.
+        """
+        data = self._parse_line(line)
+        if not data:
+            return None
+        for name in ('incumbent', 'bound', 'gap', 'nodes'):
+            if data.get(name, None) is not None:
+                setattr(self, name, data[name])
+        if (data.get('gap', None) is None) and \
+           (self.incumbent is not None) and \
+           (self.bound is not None):
+            self.gap = abs(self.incumbent - self.bound) / \
+                       max(1e-10, abs(self.incumbent))
+        return Bunch(incumbent=self.incumbent,
+                     bound=self.bound,
+                     gap=self.gap,
+                     nodes=self.nodes,
+                     elapsed=time.time() - self.start_time)
+
+    def _parse_line(self, line):
+        raise NotImplementedError       #pragma:nocover
+
+def _signal_process(process, sig):
+    try:
+        if _mswindows:
+            process.terminate()
+        else:
+            # the process is the leader of its own process group
+            os.killpg(process.pid, sig)
+    except OSError:
+        pass
+
+def run_streaming(cmd,
+                  stdin=None,
+                  timelimit=None,
+                  env=None,
+                  tee=False,
+                  line_callback=None):
+    """
+    Execute a command, passing each line of its (combined) output to
+    line_callback as it is produced. If line_callback returns True,
+    the command is interrupted (as with Ctrl-C), which causes most
+    solvers to stop and report their best solution. The command is
+    killed if it runs longer than timelimit seconds.
+
+    Returns the list [rc, log], like pyutilib.subprocess.run.
+    """
+    if type(cmd) not in (list, tuple):
+        cmd = quote_split(cmd.strip())
+    kwds = {}
+    if not _mswindows:
+        # isolate the solver from signals sent to this process,
+        # as pyutilib.subprocess does
+        kwds['preexec_fn'] = os.setsid
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if (stdin is not None) else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        env=env,
+        universal_newlines=True,
+        **kwds)
+    if stdin is not None:
+        process.stdin.write(stdin)
+        process.stdin.close()
+
+    timer = None
+    if timelimit is not None:
+        timer = threading.Timer(timelimit,
+                                _signal_process,
+                                (process, getattr(signal, 'SIGKILL', None)))
+        timer.daemon = True
+        timer.start()
+
+    log = []
+    interrupted = False
+    try:
+        for line in iter(process.stdout.readline, ''):
+            log.append(line)
+            if tee:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+            if (line_callback is not None) and (not interrupted):
+                if line_callback(line):
+                    interrupted = True
+                    _signal_process(process, signal.SIGINT)
+        rc = process.wait()
+    finally:
+        if timer is not None:
+            timer.cancel()
+        if process.poll() is None:
+            # an exception was raised by the callback
+            _signal_process(process, getattr(signal, 'SIGKILL', None))
+            process.wait()
+        process.stdout.close()
+    return [rc, ''.join(log)]
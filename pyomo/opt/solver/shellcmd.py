@@ -24,6 +24,8 @@ from pyutilib.subprocess import run
 from pyomo.opt.base import *
 from pyomo.opt.base.solvers import *
 from pyomo.opt.results import SolverStatus, SolverResults
+from pyomo.opt.solver.executable_cache import solver_executable_cache
+from pyomo.opt.solver.progress import run_streaming
 
 logger = logging.getLogger('pyomo.opt')
 
@@ -44,6 +46,10 @@ class SystemCallSolver(OptSolver):
         # broadly useful for reporting, and in cases where
         # a solver plugin may not report execution time.
         self._last_solve_time = None
+        # signal handlers can only be installed from the main
+        # thread; None uses the pyutilib.subprocess default
+        self._define_signal_handlers = None
+        self._subprocess_pool = None
 
         if executable is not None:
             self.set_executable(name=executable, validate=validate)
@@ -109,6 +115,43 @@ class SystemCallSolver(OptSolver):
                     % (self.name, name))
             self._user_executable = exe
 
+    def set_subprocess_pool(self, pool):
+        """
+        Execute the solver through a (possibly shared)
+        SubprocessPool, which bounds the number of solver processes
+        that run concurrently. Passing None restores the default of
+        launching the solver directly.
+        """
+        self._subprocess_pool = pool
+
+    def set_callback(self, name, callback_fn=None):
+        """
+        Set the callback function for a named callback.
+
+        Shell solvers that can parse their log while they run (see
+        _progress_parser) support a single callback, named
+        'progress', which has the form:
+
+            def fn(solver, event):
+                pass
+
+        where 'event' is a Bunch with the attributes incumbent, bound,
+        gap, nodes and elapsed. If the callback returns True, the
+        solver is interrupted and reports its best solution.
+        """
+        if self._allow_callbacks and (name != 'progress'):
+            raise ApplicationError(
+                "Callback '%s' is not supported by solver %s. Only the "
+                "'progress' callback is available." % (name, self.name))
+        OptSolver.set_callback(self, name, callback_fn)
+
+    def _progress_parser(self):
+        """
+        Returns a new SolverProgressParser for the solver log, or
+        None if the log can not be parsed while the solver runs.
+        """
+        return None
+
     def available(self, exception_flag=False):
         """ True if the solver is available """
         if self._assert_available:
@@ -185,6 +228,22 @@ class SystemCallSolver(OptSolver):
         """
         raise NotImplementedError
 
+    def version(self):
+        """
+        Returns a 4-tuple describing the solver executable version.
+
+        The version is stored in the solver executable cache, so the
+        executable is only run again when it changes on disk.
+        """
+        if self._version is None:
+            executable = self.executable()
+            if executable is None:
+                self._version = self._get_version()
+            else:
+                self._version = solver_executable_cache.get_version(
+                    executable, type(self).__name__, self._get_version)
+        return self._version
+
     def _presolve(self, *args, **kwds):
         """
         Peform presolves.
@@ -292,18 +351,54 @@ class SystemCallSolver(OptSolver):
 
         start_time = time.time()
 
+        line_callback = None
+        progress_callback = self._callback.get('progress', None)
+        parser = None
+        if progress_callback is not None:
+            # the parser may be None (e.g., if the log for the current
+            # problem format is not informative), in which case the
+            # solver is run without progress reporting
+            parser = self._progress_parser()
+        if parser is not None:
+            def line_callback(line):
+                event = parser.parse_line(line)
+                if event is None:
+                    return False
+                return progress_callback(self, event)
+
         try:
             if 'script' in command:
                 _input = command.script
             else:
                 _input = None
-            [rc, log] = run(
-                command.cmd,
-                stdin = _input,
-                timelimit = self._timelimit,
-                env   = command.env,
-                tee   = self._tee
-             )
+            if self._subprocess_pool is not None:
+                [rc, log] = self._subprocess_pool.execute(
+                    command.cmd,
+                    name = self.name,
+                    stdin = _input,
+                    timelimit = self._timelimit,
+                    env   = command.env,
+                    tee   = self._tee,
+                    line_callback = line_callback
+                 )
+            elif line_callback is not None:
+                [rc, log] = run_streaming(
+                    command.cmd,
+                    stdin = _input,
+                    timelimit = self._timelimit,
+                    env   = command.env,
+                    tee   = self._tee,
+                    line_callback = line_callback
+                 )
+            else:
+                [rc, log] = run(
+                    command.cmd,
+                    stdin = _input,
+                    timelimit = self._timelimit,
+                    env   = command.env,
+                    tee   = self._tee,
+                    define_signal_handlers = self._define_signal_handlers
+                 )
         except WindowsError:
             err = sys.exc_info()[1]
             msg = 'Could not execute the command: %s\tError message: %s'
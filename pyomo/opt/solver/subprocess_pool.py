@@ -0,0 +1,243 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+__all__ = ['SubprocessPool', 'SubprocessJob']
+
+import os
+import sys
+import time
+import threading
+import multiprocessing
+
+from pyutilib.subprocess import run
+
+from pyomo.opt.solver.progress import run_streaming
+
+class SubprocessJob(object):
+    """
+    A handle for a command submitted to a SubprocessPool.
+    """
+
+    def __init__(self, id, name, cmd, stdin, timelimit, env, tee, logfile,
+                 line_callback=None):
+        self.id = id
+        self.name = name
+        self.cmd = cmd
+        self.stdin = stdin
+        self.timelimit = timelimit
+        self.env = env
+        self.tee = tee
+        self.logfile = logfile
+        self.line_callback = line_callback
+        self.rc = None
+        self.log = None
+        self.exception = None
+        self.submit_time = time.time()
+        self.start_time = None
+        self.end_time = None
+        self._event = threading.Event()
+
+    def done(self):
+        """ True if the command has finished executing """
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the command to finish executing and return the
+        list [rc, log]. Any exception raised while launching the
+        command is re-raised here.
+        """
+        self._event.wait(timeout)
+        if not self._event.is_set():
+            return None
+        if self.exception is not None:
+            raise self.exception
+        return [self.rc, self.log]
+
+class SubprocessPool(object):
+    """
+    A bounded pool of worker threads that executes solver
+    subprocesses. The pool can be shared by any number of
+    SystemCallSolver instances (see
+    SystemCallSolver.set_subprocess_pool). Commands are queued and
+    executed in submission order, subject to the total number of
+    concurrent jobs (max_jobs) and optional per-name limits, which can
+    be used to model the number of available license tokens for a
+    solver.
+
+    If log_directory is not None, the command line and output of every
+    job is written to a file named <name>.<id>.log in that directory.
+    """
+
+    def __init__(self, max_jobs=None, limits=None, log_directory=None):
+        if max_jobs is None:
+            max_jobs = multiprocessing.cpu_count()
+        if max_jobs < 1:
+            raise ValueError("The max_jobs argument must be a positive "
+                             "integer, got %s" % (max_jobs))
+        self.max_jobs = max_jobs
+        self.log_directory = log_directory
+        self._limits = {}
+        self._running = {}
+        self._pending = []
+        self._workers = []
+        self._job_counter = 0
+        self._shutdown = False
+        self._cv = threading.Condition()
+        if limits is not None:
+            for name, limit in limits.items():
+                self.set_limit(name, limit)
+
+    def set_limit(self, name, limit):
+        """
+        Limit the number of concurrently executing jobs submitted
+        under the given name (e.g., the number of license tokens
+        available for a solver). A limit of None removes the limit.
+        """
+        if (limit is not None) and (limit < 1):
+            raise ValueError("The limit for '%s' must be a positive "
+                             "integer or None, got %s" % (name, limit))
+        with self._cv:
+            if limit is None:
+                self._limits.pop(name, None)
+            else:
+                self._limits[name] = limit
+            self._cv.notify_all()
+
+    def get_limit(self, name):
+        """ Returns the concurrency limit for the given name """
+        return self._limits.get(name, None)
+
+    def num_pending(self):
+        """ Returns the number of jobs waiting to be executed """
+        with self._cv:
+            return len(self._pending)
+
+    def num_running(self, name=None):
+        """
+        Returns the number of jobs currently executing, optionally
+        restricted to those submitted under the given name.
+        """
+        with self._cv:
+            if name is None:
+                return sum(self._running.values())
+            return self._running.get(name, 0)
+
+    def submit(self,
+               cmd,
+               name=None,
+               stdin=None,
+               timelimit=None,
+               env=None,
+               tee=False,
+               logfile=None,
+               line_callback=None):
+        """
+        Queue a command for execution, returning a SubprocessJob. If
+        line_callback is not None, the output of the command is
+        streamed through it (see run_streaming).
+        """
+        with self._cv:
+            if self._shutdown:
+                raise RuntimeError("Can not submit a job to a SubprocessPool "
+                                   "that has been shut down")
+            id_ = self._job_counter
+            self._job_counter += 1
+            if (logfile is None) and (self.log_directory is not None):
+                logfile = os.path.join(self.log_directory,
+                                       "%s.%d.log" % (name, id_))
+            job = SubprocessJob(id_, name, cmd, stdin, timelimit,
+                                env, tee, logfile,
+                                line_callback=line_callback)
+            self._pending.append(job)
+            if len(self._workers) < self.max_jobs:
+                worker = threading.Thread(target=self._worker)
+                worker.daemon = True
+                self._workers.append(worker)
+                worker.start()
+            self._cv.notify_all()
+        return job
+
+    def execute(self, cmd, **kwds):
+        """
+        Submit a command and wait for it to finish, returning the
+        list [rc, log].
+        """
+        return self.submit(cmd, **kwds).wait()
+
+    def shutdown(self, wait=True):
+        """
+        Stop accepting new jobs. Jobs that have already been submitted
+        are still executed. If wait is True, this method blocks until
+        all worker threads have exited.
+        """
+        with self._cv:
+            self._shutdown = True
+            self._cv.notify_all()
+            workers = list(self._workers)
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def _next_job(self):
+        # return the oldest pending job whose name is below its limit
+        for i, job in enumerate(self._pending):
+            limit = self._limits.get(job.name, None)
+            if (limit is None) or \
+               (self._running.get(job.name, 0) < limit):
+                return self._pending.pop(i)
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cv:
+                job = self._next_job()
+                while job is None:
+                    if self._shutdown and (len(self._pending) == 0):
+                        self._workers.remove(threading.current_thread())
+                        return
+                    self._cv.wait()
+                    job = self._next_job()
+                self._running[job.name] = self._running.get(job.name, 0) + 1
+            try:
+                self._execute(job)
+            finally:
+                with self._cv:
+                    self._running[job.name] -= 1
+                    self._cv.notify_all()
+                job._event.set()
+
+    def _execute(self, job):
+        job.start_time = time.time()
+        try:
+            if job.line_callback is not None:
+                [job.rc, job.log] = run_streaming(
+                    job.cmd,
+                    stdin=job.stdin,
+                    timelimit=job.timelimit,
+                    env=job.env,
+                    tee=job.tee,
+                    line_callback=job.line_callback)
+            else:
+                # signal handlers can only be installed by the main thread
+                [job.rc, job.log] = run(job.cmd,
+                                        stdin=job.stdin,
+                                        timelimit=job.timelimit,
+                                        env=job.env,
+                                        tee=job.tee,
+                                        define_signal_handlers=False)
+            if job.logfile is not None:
+                with open(job.logfile, "w") as f:
+                    f.write("Solver command line: "+str(job.cmd)+'\n')
+                    f.write("\n")
+                    f.write(job.log+'\n')
+        except:
+            job.exception = sys.exc_info()[1]
+        job.end_time = time.time()
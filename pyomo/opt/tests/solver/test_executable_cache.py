@@ -0,0 +1,107 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+#
+# Unit Tests for pyomo.opt.solver.executable_cache
+#
+
+import os
+import shutil
+import tempfile
+
+import pyutilib.th as unittest
+
+from pyomo.opt.solver import SolverExecutableCache
+
+class TestSolverExecutableCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.exe = os.path.join(self.tmpdir, 'solver')
+        with open(self.exe, 'w') as f:
+            f.write('version 1\n')
+        self.cachefile = os.path.join(self.tmpdir, 'cache', 'solvers.json')
+        self.calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _version(self):
+        self.calls += 1
+        return (1, 2, 3, 0)
+
+    def test_persistent(self):
+        cache = SolverExecutableCache(self.cachefile)
+        self.assertEqual(cache.get_version(self.exe, 'test', self._version),
+                         (1, 2, 3, 0))
+        self.assertEqual(cache.get_version(self.exe, 'test', self._version),
+                         (1, 2, 3, 0))
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(os.path.exists(self.cachefile))
+        # a new cache object (e.g., in another process) reads the file
+        cache = SolverExecutableCache(self.cachefile)
+        self.assertEqual(cache.get_version(self.exe, 'test', self._version),
+                         (1, 2, 3, 0))
+        self.assertEqual(self.calls, 1)
+        # the key is part of the entry
+        cache.get_version(self.exe, 'other', self._version)
+        self.assertEqual(self.calls, 2)
+
+    def test_invalidate(self):
+        cache = SolverExecutableCache(self.cachefile)
+        cache.get_version(self.exe, 'test', self._version)
+        with open(self.exe, 'w') as f:
+            f.write('version 2 (a different size)\n')
+        cache.get_version(self.exe, 'test', self._version)
+        self.assertEqual(self.calls, 2)
+        os.utime(self.exe, (0, 0))
+        cache.get_version(self.exe, 'test', self._version)
+        self.assertEqual(self.calls, 3)
+
+    def test_unknown_version(self):
+        cache = SolverExecutableCache(self.cachefile)
+        self.assertIs(cache.get_version(self.exe, 'test', lambda: None),
+                      None)
+        self.assertEqual(cache.lookup(self.exe, 'version:test'),
+                         (False, None))
+
+    def test_get(self):
+        cache = SolverExecutableCache(self.cachefile)
+        self.assertIs(cache.get(self.exe, 'flag', lambda: True), True)
+        self.assertIs(cache.get(self.exe, 'flag', lambda: False), True)
+        cache.clear()
+        self.assertIs(cache.get(self.exe, 'flag', lambda: False), False)
+
+    def test_no_file(self):
+        cache = SolverExecutableCache('')
+        self.assertIs(cache.filename, None)
+        cache.get_version(self.exe, 'test', self._version)
+        cache.get_version(self.exe, 'test', self._version)
+        self.assertEqual(self.calls, 1)
+        self.assertFalse(os.path.exists(self.cachefile))
+
+    def test_corrupt_file(self):
+        os.makedirs(os.path.dirname(self.cachefile))
+        with open(self.cachefile, 'w') as f:
+            f.write('{not json')
+        cache = SolverExecutableCache(self.cachefile)
+        cache.get_version(self.exe, 'test', self._version)
+        cache = SolverExecutableCache(self.cachefile)
+        cache.get_version(self.exe, 'test', self._version)
+        self.assertEqual(self.calls, 1)
+
+    def test_missing_executable(self):
+        cache = SolverExecutableCache(self.cachefile)
+        exe = os.path.join(self.tmpdir, 'missing')
+        cache.get_version(exe, 'test', self._version)
+        cache.get_version(exe, 'test', self._version)
+        self.assertEqual(self.calls, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+#
+# Unit Tests for pyomo.opt.solver.progress
+#
+
+import sys
+import time
+
+import pyutilib.th as unittest
+
+from pyomo.opt.solver import run_streaming, SubprocessPool
+
+# prints a line every 0.1 seconds for 10 seconds, printing 'stopped'
+# if it is interrupted (as solvers report their best solution)
+_script = """
+import sys, time
+try:
+    for i in range(100):
+        print(i)
+        sys.stdout.flush()
+        time.sleep(0.1)
+except KeyboardInterrupt:
+    print('stopped')
+"""
+
+class TestRunStreaming(unittest.TestCase):
+
+    def test_lines(self):
+        lines = []
+        rc, log = run_streaming(
+            [sys.executable, '-c', 'print("a"); print("b")'],
+            line_callback=lambda line: lines.append(line))
+        self.assertEqual(rc, 0)
+        self.assertEqual(lines, ['a\n', 'b\n'])
+        self.assertEqual(log, 'a\nb\n')
+
+    def test_stdin(self):
+        rc, log = run_streaming([sys.executable],
+                                stdin='print(1+1)\n')
+        self.assertEqual(rc, 0)
+        self.assertEqual(log.strip(), '2')
+
+    def test_interrupt(self):
+        start = time.time()
+        rc, log = run_streaming(
+            [sys.executable, '-c', _script],
+            line_callback=lambda line: line.strip() == '3')
+        self.assertTrue(time.time() - start < 5)
+        self.assertEqual(rc, 0)
+        self.assertEqual(log.split()[-1], 'stopped')
+
+    def test_timelimit(self):
+        start = time.time()
+        rc, log = run_streaming(
+            [sys.executable, '-c', _script],
+            timelimit=0.5)
+        self.assertTrue(time.time() - start < 5)
+        self.assertNotEqual(rc, 0)
+        self.assertNotIn('stopped', log)
+
+    def test_subprocess_pool(self):
+        pool = SubprocessPool(max_jobs=1)
+        try:
+            lines = []
+            rc, log = pool.execute(
+                [sys.executable, '-c', 'print("a")'],
+                line_callback=lambda line: lines.append(line))
+        finally:
+            pool.shutdown()
+        self.assertEqual(rc, 0)
+        self.assertEqual(lines, ['a\n'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+#
+# Unit Tests for pyomo.opt.solver.subprocess_pool
+#
+
+import os
+import sys
+import shutil
+import tempfile
+
+import pyutilib.th as unittest
+
+from pyomo.opt.solver import SubprocessPool
+
+def _sleep_cmd(seconds, message=''):
+    return [sys.executable, '-c',
+            'import time; time.sleep(%s); print(%r)' % (seconds, message)]
+
+class TestSubprocessPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = None
+
+    def tearDown(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def test_bad_max_jobs(self):
+        with self.assertRaises(ValueError):
+            SubprocessPool(max_jobs=0)
+
+    def test_bad_limit(self):
+        self.pool = SubprocessPool(max_jobs=1)
+        with self.assertRaises(ValueError):
+            self.pool.set_limit('cplex', 0)
+        self.pool.set_limit('cplex', 2)
+        self.assertEqual(self.pool.get_limit('cplex'), 2)
+        self.pool.set_limit('cplex', None)
+        self.assertEqual(self.pool.get_limit('cplex'), None)
+
+    def test_execute(self):
+        self.pool = SubprocessPool(max_jobs=2)
+        rc, log = self.pool.execute(_sleep_cmd(0, 'hello'), name='test')
+        self.assertEqual(rc, 0)
+        self.assertEqual(log.strip(), 'hello')
+
+    def test_limit(self):
+        self.pool = SubprocessPool(max_jobs=4, limits={'licensed': 1})
+        limited = [self.pool.submit(_sleep_cmd(0.2), name='licensed')
+                   for i in range(3)]
+        free = [self.pool.submit(_sleep_cmd(0.2), name='free')
+                for i in range(2)]
+        for job in limited + free:
+            self.assertEqual(job.wait()[0], 0)
+            self.assertTrue(job.done())
+        # jobs submitted under a limited name never overlap
+        limited.sort(key=lambda job: job.start_time)
+        for prev, next_ in zip(limited, limited[1:]):
+            self.assertTrue(prev.end_time <= next_.start_time)
+        # other jobs are not held back by the limit
+        self.assertTrue(free[1].start_time < limited[2].start_time)
+        self.assertEqual(self.pool.num_running(), 0)
+        self.assertEqual(self.pool.num_pending(), 0)
+
+    def test_log_directory(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            self.pool = SubprocessPool(max_jobs=1, log_directory=tmpdir)
+            job = self.pool.submit(_sleep_cmd(0, 'logged'), name='test')
+            job.wait()
+            self.assertEqual(job.logfile,
+                             os.path.join(tmpdir, 'test.%d.log' % (job.id)))
+            with open(job.logfile) as f:
+                self.assertTrue('logged' in f.read())
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_shutdown(self):
+        self.pool = SubprocessPool(max_jobs=1)
+        job = self.pool.submit(_sleep_cmd(0.1), name='test')
+        self.pool.shutdown()
+        self.assertTrue(job.done())
+        with self.assertRaises(RuntimeError):
+            self.pool.submit(_sleep_cmd(0), name='test')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -26,6 +26,7 @@
 import os
 import logging
 import time
+import random
 import itertools
 
 try:
@@ -38,7 +39,7 @@ from pyomo.opt import (SolverFactory,
                        TerminationCondition,
                        undefined)
 from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
-from pyomo.core import (value, minimize, Set,
+from pyomo.core import (value, minimize, maximize, Set,
                         Objective, SOSConstraint,
                         Constraint, Var, RangeSet,
                         Expression, Suffix, Reals, Param)
@@ -53,6 +54,7 @@ from pyomo.pysp.util.config import (PySPConfigValue,
                                     safe_declare_unique_option,
                                     _domain_percent,
                                     _domain_nonnegative,
+                                    _domain_nonnegative_integer,
                                     _domain_positive_integer,
                                     _domain_must_be_str,
                                     _domain_unit_interval,
@@ -120,7 +122,13 @@ def EXTERNAL_deactivate_fix_constraints(manager,
     fix_constraint = scenario._instance.find_component(
         "PYSP_BENDERS_FIX_XHAT_CONSTRAINT")
     fix_constraint.deactivate()
-    # no need to flag the preprocessor
+    # a persistent solver plugin must be told to remove the
+    # constraints (this does no harm for other solvers)
+    if manager.preprocessor is not None:
+        preprocess_constraints_list = \
+            manager.preprocessor.constraints_updated_list[scenario.name]
+        for constraint_data in fix_constraint.values():
+            preprocess_constraints_list.append(constraint_data)
 
 def EXTERNAL_cleanup_from_benders(manager,
                                   scenario):
@@ -423,7 +431,62 @@ class BendersAlgorithm(PySPConfiguredObject):
                 "Default is 1. A number less than 1 indicates "
                 "that the maximum value should be used, which "
                 "is one cut group for each scenario not included "
-                "in the master problem."
+                "in the master problem (or for each scenario "
+                "bundle when bundles are used). A separate cut "
+                "is added to the master problem for each cut "
+                "group."
+            ),
+            doc=None,
+            visibility=0),
+        ap_group=_benders_group_label)
+    safe_declare_unique_option(
+        _declared_options,
+        "cut_pool_slack_iterations",
+        PySPConfigValue(
+            0,
+            domain=_domain_nonnegative_integer,
+            description=(
+                "The number of consecutive iterations that a cut "
+                "must be slack at the master solution before it is "
+                "deactivated. Deactivated cuts remain in the cut "
+                "pool and are reactivated (and the master problem "
+                "re-solved) when the master solution violates "
+                "them. Default is 0, which disables the deactivation "
+                "of cuts."
+            ),
+            doc=None,
+            visibility=0),
+        ap_group=_benders_group_label)
+    safe_declare_unique_option(
+        _declared_options,
+        "cut_sample_size",
+        PySPConfigValue(
+            0,
+            domain=_domain_nonnegative_integer,
+            description=(
+                "The number of cut groups (see the multicut_level "
+                "option) whose subproblems are solved at each "
+                "iteration after the first. Cuts are only added for "
+                "the sampled cut groups. When none of the sampled "
+                "cut groups improves on the master solution, the "
+                "subproblems for the remaining cut groups are solved "
+                "at the same first-stage solution, which updates the "
+                "incumbent objective. Default is 0, indicating that "
+                "all subproblems are solved at every iteration."
+            ),
+            doc=None,
+            visibility=0),
+        ap_group=_benders_group_label)
+    safe_declare_unique_option(
+        _declared_options,
+        "cut_sample_seed",
+        PySPConfigValue(
+            None,
+            domain=int,
+            description=(
+                "The seed for the random number generator used to "
+                "sample cut groups. Default is None, indicating the "
+                "generator is not seeded."
             ),
             doc=None,
             visibility=0),
@@ -607,9 +670,6 @@ class BendersAlgorithm(PySPConfiguredObject):
         self._master_solver = SolverFactory(
             self.get_option("master_solver"),
             solver_io=self.get_option("master_solver_io"))
-        if isinstance(self._master_solver, PersistentSolver):
-            raise TypeError("BendersAlgorithm does not support "
-                            "PersistenSolver types")
         if len(self.get_option("master_solver_options")):
             if type(self.get_option("master_solver_options")) is tuple:
                 self._master_solver.set_options(
@@ -648,6 +708,14 @@ class BendersAlgorithm(PySPConfiguredObject):
         self.master = None
         self.cut_pool = []
         self._num_first_stage_constraints = None
+        # the index in cut_pool of the cut that generated each
+        # cut constraint on the master, and the number of
+        # consecutive iterations the constraint has been slack
+        self._cut_pool_index = []
+        self._cut_slack_iterations = []
+        # the cut group of each cut constraint on the master (None
+        # for cuts on the single master alpha cut variable)
+        self._cut_group_index = []
 
     def deactivate_firststage_costs(self):
         self._manager.invoke_function(
@@ -677,19 +745,27 @@ class BendersAlgorithm(PySPConfiguredObject):
             invocation_type=InvocationType.PerScenario,
             oneway=True)
 
-    def update_fix_constraints(self, fix_values):
+    def update_fix_constraints(self, fix_values, scenarios=None):
+        if scenarios is None:
+            invocation_type = InvocationType.PerScenario
+        else:
+            invocation_type = InvocationType.OnScenarios(scenarios)
         self._manager.invoke_function(
             "EXTERNAL_update_fix_constraints",
             thisfile,
-            invocation_type=InvocationType.PerScenario,
+            invocation_type=invocation_type,
             function_args=(fix_values,),
             oneway=True)
 
-    def collect_cut_data(self, async=False):
+    def collect_cut_data(self, async=False, scenarios=None):
+        if scenarios is None:
+            invocation_type = InvocationType.PerScenario
+        else:
+            invocation_type = InvocationType.OnScenarios(scenarios)
         return self._manager.invoke_function(
             "EXTERNAL_collect_cut_data",
             thisfile,
-            invocation_type=InvocationType.PerScenario,
+            invocation_type=invocation_type,
             async=async)
 
     def initialize_subproblems(self):
@@ -709,7 +785,8 @@ class BendersAlgorithm(PySPConfiguredObject):
     def generate_cut(self,
                      xhat,
                      update_stages=(),
-                     return_solve_results=False):
+                     return_solve_results=False,
+                     subproblems=None):
         """
         Generate a cut for the first-stage solution xhat by
         solving the subproblems. By default, only the stage
@@ -717,13 +794,38 @@ class BendersAlgorithm(PySPConfiguredObject):
         scenario tree. Setting update_stages to a list of
         state names or None (indicating all stages) can be
         used to control how much solution information is
-        loaded for the variables on the scenario tree.
+        loaded for the variables on the scenario tree. The
+        optional subproblems keyword can be set to a list of
+        scenario (or bundle) names to solve, in which case the
+        cut only includes the scenarios in those subproblems.
         """
-        self.update_fix_constraints(xhat)
+        scenarios = None
+        if subproblems is not None:
+            scenario_tree = self._manager.scenario_tree
+            if scenario_tree.contains_bundles():
+                scenarios = []
+                for bundle_name in subproblems:
+                    scenarios.extend(
+                        scenario_tree.get_bundle(bundle_name).scenario_names)
+            else:
+                scenarios = list(subproblems)
+        self.update_fix_constraints(xhat, scenarios=scenarios)
         solve_results = \
-            self._manager.solve_subproblems(update_stages=update_stages)
-
-        cut_data = self.collect_cut_data()
+            self._manager.solve_subproblems(subproblems=subproblems,
+                                            update_stages=update_stages,
+                                            async=True)
+        if isinstance(self._manager, ScenarioTreeManagerSolverClientPyro):
+            # the scenario tree workers load their subproblem
+            # solutions and process requests in the order they are
+            # queued, so the cut data can be requested without
+            # waiting for all of the solves to complete
+            cut_data = self.collect_cut_data(async=True,
+                                             scenarios=scenarios)
+            solve_results = solve_results.complete()
+            cut_data = cut_data.complete()
+        else:
+            solve_results = solve_results.complete()
+            cut_data = self.collect_cut_data(scenarios=scenarios)
         benders_cut = BendersOptimalityCut(
             xhat,
             dict((name, cut_data[name]['SSC']) for name in cut_data),
@@ -844,20 +946,29 @@ class BendersAlgorithm(PySPConfiguredObject):
         find_active_objective(master, safety_checks=True).deactivate()
 
         # add cut variable(s)
-        if self.get_option("multicut_level") < 1:
-            print("Using maximum number of cut groups")
-            cut_bundles = [[] for scenario in scenario_tree.scenarios]
+        if (self.get_option("multicut_level") < 1) and \
+           scenario_tree.contains_bundles():
+            print("Using maximum number of cut groups "
+                  "(one for each scenario bundle)")
+            cut_bundles = [[scenario_name
+                            for scenario_name in bundle.scenario_names
+                            if scenario_name not in master._scenarios_included]
+                           for bundle in scenario_tree.bundles]
         else:
-            cut_bundles = [[] for i in xrange(self.get_option("multicut_level"))]
-
-        # TODO: Allow users some control over these cut_bundles
-        cnt = 0
-        len_cut_bundles = len(cut_bundles)
-        assert len_cut_bundles > 0
-        for scenario in scenario_tree.scenarios:
-            if scenario.name not in master._scenarios_included:
-                cut_bundles[cnt % len_cut_bundles].append(scenario.name)
-                cnt += 1
+            if self.get_option("multicut_level") < 1:
+                print("Using maximum number of cut groups")
+                cut_bundles = [[] for scenario in scenario_tree.scenarios]
+            else:
+                cut_bundles = [[] for i in xrange(self.get_option("multicut_level"))]
+
+            # TODO: Allow users some control over these cut_bundles
+            cnt = 0
+            len_cut_bundles = len(cut_bundles)
+            assert len_cut_bundles > 0
+            for scenario in scenario_tree.scenarios:
+                if scenario.name not in master._scenarios_included:
+                    cut_bundles[cnt % len_cut_bundles].append(scenario.name)
+                    cnt += 1
         nonempty_cut_bundles = []
         for bundle in cut_bundles:
             if len(bundle) > 0:
@@ -940,14 +1051,30 @@ class BendersAlgorithm(PySPConfiguredObject):
         cutlist_constraint_name = "PYSP_BENDERS_CUTS_SSC"
         assert not hasattr(master, cutlist_constraint_name)
         # I am using the XConstraintList prototype because
-        # it is zero-based, meaning the index within self.cut_pool
-        # (which stores the benders cuts objects) will correspond
-        # directly with the index within this constraint.
+        # it is zero-based, meaning the index within
+        # self._cut_pool_index and self._cut_slack_iterations
+        # will correspond directly with the index within this
+        # constraint. Note that
+        # each benders cut object stored in self.cut_pool
+        # adds one constraint for each cut group.
         master.add_component(cutlist_constraint_name,
                              XConstraintList())
 
         self.master = master
         self.cut_pool = []
+        self._cut_pool_index = []
+        self._cut_slack_iterations = []
+        self._cut_group_index = []
+
+        # compile the master problem into a persistent solver
+        # plugin, so that only the cuts need to be sent to
+        # the solver on later iterations
+        if isinstance(self._master_solver, PersistentSolver):
+            self._master_solver.set_instance(
+                master,
+                symbolic_solver_labels=\
+                    self.get_option("master_symbolic_solver_labels"),
+                output_fixed_variable_bounds=True)
 
     def add_cut(self, benders_cut, ignore_cut_bundles=False):
         """
@@ -955,7 +1082,10 @@ class BendersAlgorithm(PySPConfiguredObject):
         master problem. The optional keyword ignore_cut_bundles
         can be used generate the cut using the single master
         alpha cut variable rather than over the possibly many
-        bundle cut groups.
+        bundle cut groups. If the cut was generated from a
+        subset of the subproblems, constraints are only added
+        for the cut groups whose scenarios are all included in
+        the cut.
         """
 
         if self.master is None:
@@ -982,11 +1112,15 @@ class BendersAlgorithm(PySPConfiguredObject):
             "PYSP_BENDERS_BUNDLE_ALPHA_SSC")
 
         xhat = benders_cut.xhat
-        cut_expression = 0.0
+        cut_expressions = []
         if not ignore_cut_bundles:
             for i, cut_scenarios in enumerate(
                     getattr(master, "PYSP_BENDERS_CUT_BUNDLES_SSC")):
 
+                if any(scenario_name not in benders_cut.ssc
+                       for scenario_name in cut_scenarios):
+                    continue
+                cut_expression = 0.0
                 for scenario_name in cut_scenarios:
                     assert scenario_name not in master._scenarios_included
                     scenario_duals = benders_cut.duals[scenario_name]
@@ -1000,12 +1134,20 @@ class BendersAlgorithm(PySPConfiguredObject):
                              for variable_id in xhat))
 
                 cut_expression -= bundle_alpha[i]
+                cut_expressions.append((i, cut_expression))
 
         else:
+            cut_expression = 0.0
             for scenario in scenario_tree.scenarios:
                 if scenario.name in master._scenarios_included:
                     continue
                 scenario_name = scenario.name
+                if scenario_name not in benders_cut.ssc:
+                    raise ValueError(
+                        "A cut on the master alpha cut variable requires "
+                        "cut data for all scenarios not included in "
+                        "the master problem. Scenario %s is missing."
+                        % (scenario_name))
                 scenario_duals = benders_cut.duals[scenario_name]
                 scenario_ssc = benders_cut.ssc[scenario_name]
                 scenario = scenario_tree.get_scenario(scenario_name)
@@ -1017,13 +1159,85 @@ class BendersAlgorithm(PySPConfiguredObject):
                          for variable_id in xhat))
 
             cut_expression -= master_alpha
+            cut_expressions.append((None, cut_expression))
 
-        if objective_sense == minimize:
-            benders_cuts.append(
-                _GeneralConstraintData((None,cut_expression,0.0)))
-        else:
-            benders_cuts.append(
-                _GeneralConstraintData((0.0,cut_expression,None)))
+        for cut_group, cut_expression in cut_expressions:
+            if objective_sense == minimize:
+                benders_cuts.append(
+                    _GeneralConstraintData((None,cut_expression,0.0)))
+            else:
+                benders_cuts.append(
+                    _GeneralConstraintData((0.0,cut_expression,None)))
+            self._cut_pool_index.append(len(self.cut_pool)-1)
+            self._cut_slack_iterations.append(0)
+            self._cut_group_index.append(cut_group)
+            if isinstance(self._master_solver, PersistentSolver):
+                self._master_solver.add_constraint(benders_cuts[-1])
+
+    def update_cut_pool(self, tolerance=1e-6, count_slack=True):
+        """
+        Update the cut pool using the current master
+        solution. Inactive cuts that are violated by the
+        solution are reactivated. When count_slack is True,
+        active cuts that have been slack for
+        cut_pool_slack_iterations consecutive calls are
+        deactivated, except for those generated by the most
+        recent cut and the most recent constraint for each cut
+        group (which keep the master problem bounded). The
+        solve() method counts slack once per iteration, after
+        the master problem has been re-solved with any
+        reactivated cuts (count_slack=False).
+        Returns the number of cuts that were
+        reactivated (in which case the master problem should be
+        re-solved).
+        """
+
+        if self.master is None:
+            raise RuntimeError("The master problem has not been constructed."
+                               "Call the build_master_problem() method to "
+                               "construct it.")
+
+        max_slack_iterations = self.get_option("cut_pool_slack_iterations")
+        if max_slack_iterations == 0:
+            return 0
+
+        objective_sense = self._manager.objective_sense
+        benders_cuts = self.master.find_component(
+            "PYSP_BENDERS_CUTS_SSC")
+        persistent = isinstance(self._master_solver, PersistentSolver)
+        last_cut_index = len(self.cut_pool) - 1
+        # when cuts are generated from samples of the subproblems,
+        # the most recent cut may not include every cut group
+        last_group_constraint = {}
+        for i, cut_group in enumerate(self._cut_group_index):
+            last_group_constraint[cut_group] = i
+        reactivated = 0
+        for i, cut in enumerate(benders_cuts):
+            # the amount by which the cut is violated
+            violation = value(cut.body)
+            if objective_sense == maximize:
+                violation = -violation
+            if not cut.active:
+                if violation > tolerance:
+                    cut.activate()
+                    if persistent:
+                        self._master_solver.add_constraint(cut)
+                    self._cut_slack_iterations[i] = 0
+                    reactivated += 1
+            elif not count_slack:
+                continue
+            elif violation < -tolerance:
+                self._cut_slack_iterations[i] += 1
+                if (self._cut_slack_iterations[i] >= max_slack_iterations) and \
+                   (self._cut_pool_index[i] != last_cut_index) and \
+                   (last_group_constraint[self._cut_group_index[i]] != i):
+                    if persistent:
+                        self._master_solver.remove_constraint(cut)
+                    cut.deactivate()
+            else:
+                self._cut_slack_iterations[i] = 0
+
+        return reactivated
 
     def extract_master_xhat(self):
 
@@ -1039,6 +1253,16 @@ class BendersAlgorithm(PySPConfiguredObject):
                     for variable_id in rootnode._standard_variable_ids
                     if not master_variable[variable_id].stale)
 
+    def _update_master_alpha(self):
+        # send the fixed status of the master cut variables
+        # to a persistent solver plugin
+        if isinstance(self._master_solver, PersistentSolver):
+            self._master_solver.update_var(
+                self.master.find_component("PYSP_BENDERS_ALPHA_SSC"))
+            for var in self.master.find_component(
+                    "PYSP_BENDERS_BUNDLE_ALPHA_SSC").values():
+                self._master_solver.update_var(var)
+
     def solve_master(self):
 
         if self.master is None:
@@ -1049,20 +1273,115 @@ class BendersAlgorithm(PySPConfiguredObject):
         common_kwds = {
             'load_solutions':False,
             'tee':self.get_option("master_output_solver_log"),
-            'keepfiles':self.get_option("master_keep_solver_files"),
-            'symbolic_solver_labels':self.get_option("master_symbolic_solver_labels")}
+            'keepfiles':self.get_option("master_keep_solver_files")}
+
+        # a persistent solver plugin already holds the master
+        # problem (see build_master_problem and add_cut)
+        args = ()
+        if not isinstance(self._master_solver, PersistentSolver):
+            args = (self.master,)
+            common_kwds['symbolic_solver_labels'] = \
+                self.get_option("master_symbolic_solver_labels")
 
         if (not self.get_option("master_disable_warmstart")) and \
            (self._master_solver.warm_start_capable()):
-            results = self._master_solver.solve(self.master,
+            results = self._master_solver.solve(*args,
                                                 warmstart=True,
                                                 **common_kwds)
         else:
-            results = self._master_solver.solve(self.master,
+            results = self._master_solver.solve(*args,
                                                 **common_kwds)
 
         return results
 
+    def _get_cut_group_subproblems(self, cut_groups):
+        """
+        Returns the names of the subproblems (scenarios, or
+        bundles if they exist) that must be solved to generate
+        cuts for the cut groups with the given indices.
+        """
+        scenario_tree = self._manager.scenario_tree
+        cut_bundles = getattr(self.master, "PYSP_BENDERS_CUT_BUNDLES_SSC")
+        scenario_names = set(scenario_name
+                             for i in cut_groups
+                             for scenario_name in cut_bundles[i])
+        if scenario_tree.contains_bundles():
+            return [bundle.name for bundle in scenario_tree.bundles
+                    if any(scenario_name in scenario_names
+                           for scenario_name in bundle.scenario_names)]
+        else:
+            return [scenario.name for scenario in scenario_tree.scenarios
+                    if scenario.name in scenario_names]
+
+    def _create_cut_sample_generator(self):
+        """
+        Returns the random number generator used to sample cut
+        groups, seeded with the cut_sample_seed option.
+        """
+        return random.Random(self.get_option("cut_sample_seed"))
+
+    def _sample_cut_groups(self, sample_generator):
+        """
+        Returns the (sorted) indices of a random sample of
+        cut_sample_size cut groups.
+        """
+        cut_bundles = getattr(self.master, "PYSP_BENDERS_CUT_BUNDLES_SSC")
+        return sorted(sample_generator.sample(
+            range(len(cut_bundles)),
+            self.get_option("cut_sample_size")))
+
+    def _generate_sampled_cut(self, xhat, sample_generator, percent_gap):
+        """
+        Generate a cut for the first-stage solution xhat by
+        solving the subproblems for a random sample of the cut
+        groups. If the cut does not improve on the master
+        solution for any of the sampled cut groups (to within
+        the relative gap), the remaining subproblems are solved
+        so that the cut includes all scenarios. Returns the cut
+        and a list of the subproblem solve times.
+        """
+        objective_sense = self._manager.objective_sense
+        scenario_tree = self._manager.scenario_tree
+        cut_bundles = getattr(self.master, "PYSP_BENDERS_CUT_BUNDLES_SSC")
+        bundle_alpha = self.master.find_component(
+            "PYSP_BENDERS_BUNDLE_ALPHA_SSC")
+        epsilon = self.get_option("optimality_gap_epsilon")
+
+        sampled_groups = self._sample_cut_groups(sample_generator)
+        sampled_subproblems = self._get_cut_group_subproblems(sampled_groups)
+        benders_cut, solve_results = \
+            self.generate_cut(xhat,
+                              return_solve_results=True,
+                              subproblems=sampled_subproblems)
+        sub_times = list(solve_results.solve_time.values())
+
+        for i in sampled_groups:
+            group_cost = sum(
+                scenario_tree.get_scenario(scenario_name)._probability * \
+                benders_cut.ssc[scenario_name]
+                for scenario_name in cut_bundles[i])
+            improvement = group_cost - bundle_alpha[i].value
+            if objective_sense == maximize:
+                improvement = -improvement
+            if improvement * 100.0 > percent_gap * (epsilon + abs(group_cost)):
+                return benders_cut, sub_times
+
+        sampled_subproblems = set(sampled_subproblems)
+        remaining_subproblems = \
+            [name for name in self._get_cut_group_subproblems(
+                range(len(cut_bundles)))
+             if name not in sampled_subproblems]
+        if len(remaining_subproblems) > 0:
+            remaining_cut, solve_results = \
+                self.generate_cut(xhat,
+                                  return_solve_results=True,
+                                  subproblems=remaining_subproblems)
+            benders_cut.ssc.update(remaining_cut.ssc)
+            benders_cut.duals.update(remaining_cut.duals)
+            sub_times.extend(solve_results.solve_time.values())
+
+        return benders_cut, sub_times
+
     def solve(self, **kwds):
         """
         Run the algorithm. If one or both of the keywords max_iterations and
@@ -1160,6 +1479,9 @@ class BendersAlgorithm(PySPConfiguredObject):
         self.optimality_gap = float('inf')
         self.iterations = 0
         output_no_gap_warning = True
+        cut_sample_size = self.get_option("cut_sample_size")
+        num_cut_groups = len(getattr(master, "PYSP_BENDERS_CUT_BUNDLES_SSC"))
+        sample_generator = self._create_cut_sample_generator()
         for i in xrange(1, max_iterations + 1):
 
             if (i == 1) and (len(self.cut_pool) == 0):
@@ -1168,24 +1490,40 @@ class BendersAlgorithm(PySPConfiguredObject):
                 # use the master objective as a lower bound
                 master_alpha.fix(0.0)
                 master_bundles_alpha.fix(0.0)
+                self._update_master_alpha()
 
             start_time_master = time.time()
-            results_master = self.solve_master()
-            if len(results_master.solution) == 0:
-                raise RuntimeError("Solve failed for master; no solutions generated")
-            if results_master.solver.termination_condition != \
-               TerminationCondition.optimal:
-                logger.warning(
-                    "Master solve did not generate an optimal solution:\n"
-                    "Solver Status: %s\n"
-                    "Solver Termination Condition: %s\n"
-                    "Solution Status: %s\n"
-                    % (str(results_master.solver.status),
-                       str(results_master.solver.termination_condition),
-                       str(results_master.solution(0).status)))
-            master.solutions.load_from(results_master)
+            while (1):
+                results_master = self.solve_master()
+                if len(results_master.solution) == 0:
+                    raise RuntimeError("Solve failed for master; no solutions generated")
+                if results_master.solver.termination_condition != \
+                   TerminationCondition.optimal:
+                    logger.warning(
+                        "Master solve did not generate an optimal solution:\n"
+                        "Solver Status: %s\n"
+                        "Solver Termination Condition: %s\n"
+                        "Solution Status: %s\n"
+                        % (str(results_master.solver.status),
+                           str(results_master.solver.termination_condition),
+                           str(results_master.solution(0).status)))
+                master.solutions.load_from(results_master)
+                # re-solve if the master solution violates any
+                # inactive cuts in the pool
+                if self.update_cut_pool(count_slack=False) == 0:
+                    break
+            # deactivate cuts that have been slack for too many
+            # iterations (there are no violated cuts left to
+            # reactivate at this point)
+            self.update_cut_pool()
             stop_time_master = time.time()
 
+            # the first iteration solves all subproblems, so that
+            # there is an incumbent objective and (if the cut pool
+            # is empty) a cut for every cut group
+            sample_cut_groups = (cut_sample_size > 0) and \
+                                (cut_sample_size < num_cut_groups) and \
+                                (len(self.objective_history) > 0)
             if master_alpha.fixed:
                 assert i == 1
                 assert master_alpha.value == 0.0
@@ -1193,6 +1531,7 @@ class BendersAlgorithm(PySPConfiguredObject):
                     float('-inf') if (objective_sense is minimize) else float('inf')
                 master_alpha.free()
                 master_bundles_alpha.free()
+                self._update_master_alpha()
             else:
                 current_master_bound = value(master_objective)
                 # account for any optimality gap
@@ -1214,19 +1553,30 @@ class BendersAlgorithm(PySPConfiguredObject):
             self.master_bound_history[i] = current_master_bound
 
             new_xhat = self.extract_master_xhat()
-            new_cut_info, solve_results = \
-                self.generate_cut(new_xhat,
-                                  return_solve_results=True)
+            if sample_cut_groups:
+                new_cut_info, sub_times = \
+                    self._generate_sampled_cut(new_xhat,
+                                               sample_generator,
+                                               percent_gap)
+            else:
+                new_cut_info, solve_results = \
+                    self.generate_cut(new_xhat,
+                                      return_solve_results=True)
+                sub_times = list(solve_results.solve_time.values())
 
             # compute the true objective at xhat by
             # replacing the current value of the master cut
             # variable with the true second stage costs of
-            # any scenarios involved in the cuts
-            self.objective_history[i] = \
-                value(master_objective) - value(master_alpha) + \
-                sum(scenario._probability * new_cut_info.ssc[scenario.name] \
-                    for scenario in scenario_tree.scenarios
-                    if scenario.name not in self.master._scenarios_included)
+            # any scenarios involved in the cuts (this is only
+            # possible when all subproblems were solved)
+            if all(scenario.name in new_cut_info.ssc
+                   for scenario in scenario_tree.scenarios
+                   if scenario.name not in self.master._scenarios_included):
+                self.objective_history[i] = \
+                    value(master_objective) - value(master_alpha) + \
+                    sum(scenario._probability * new_cut_info.ssc[scenario.name] \
+                        for scenario in scenario_tree.scenarios
+                        if scenario.name not in self.master._scenarios_included)
 
             incumbent_objective_prev = self.incumbent_objective
             best_master_bound = max(self.master_bound_history.values()) if \
@@ -1247,8 +1597,8 @@ class BendersAlgorithm(PySPConfiguredObject):
                 (self.get_option("optimality_gap_epsilon") + \
                  abs(self.incumbent_objective))
 
-            min_time_sub = min(solve_results.solve_time.values())
-            max_time_sub = max(solve_results.solve_time.values())
+            min_time_sub = min(sub_times)
+            max_time_sub = max(sub_times)
             print("%6d %16.4f %16.4f %11.3f%% %10.2f %10.2f %10.2f %10.2f"
                   % (i, current_master_bound, self.incumbent_objective,
                      self.optimality_gap*100, stop_time_master - start_time_master,
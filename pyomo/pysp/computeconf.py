@@ -37,6 +37,7 @@ from pyomo.pysp.ef import (create_ef_instance,
                            solve_ef)
 from pyomo.pysp.ef_writer_script import ExtensiveFormAlgorithm
 from pyomo.pysp.phutils import _OLD_OUTPUT
+from pyomo.pysp.util.misc import _create_fork_pool
 import pyomo.pysp.phboundbase
 
 from six import iteritems, iterkeys, advance_iterator
@@ -165,6 +166,23 @@ def run(args=None):
                                        dest="risk_alpha",
                                        type=float,
                                        default=0.95)
+        conf_options_parser.add_argument("--sample-processes",
+                                       help="The number of worker processes used to compute the statistics for the confidence interval samples in parallel (requires a platform that supports fork). Default is 1.",
+                                       action="store",
+                                       dest="sample_processes",
+                                       type=int,
+                                       default=1)
+        conf_options_parser.add_argument("--stream-xhat-evaluation",
+                                       help="Evaluate xhat for each sample by solving the scenario subproblems with the first-stage variables fixed, rather than by re-solving the sample extensive form. Cannot be used with a weighted CVaR objective. Default is False.",
+                                       action="store_true",
+                                       dest="stream_xhat_evaluation",
+                                       default=False)
+        conf_options_parser.add_argument("--confidence-interval-tolerance",
+                                       help="Report the confidence interval width (computed using the confidence interval alpha) as each sample completes, and stop sampling once it is at most this value. Default is None, indicating all samples are used.",
+                                       action="store",
+                                       dest="confidence_interval_tolerance",
+                                       type=float,
+                                       default=None)
         conf_options_parser.add_argument("--MRP-directory-basename",
                                        help="The basename for the replicate directories. It will be appended by the number of the group (loop over n_g). Default is None",
                                        action="store",
@@ -210,6 +228,7 @@ def run(args=None):
                 bundles=options.scenario_bundle_specification,
                 random_bundles=options.create_random_bundles,
                 random_seed=options.scenario_tree_random_seed,
+                bundle_solve_times=options.bundle_solve_times,
                 verbose=options.verbose)
 
         #
@@ -272,6 +291,13 @@ def partition_scenario_space(full_scenario_tree,
             raise RuntimeError("Option --number-samples-for-"
                                "confidence-interval needs to be set.")
 
+    if options.stream_xhat_evaluation and options.generate_weighted_cvar:
+        raise RuntimeError("Option --stream-xhat-evaluation can not "
+                           "be used with --generate-weighted-cvar.")
+    if options.sample_processes < 1:
+        raise ValueError("Option --sample-processes must be a "
+                         "positive integer.")
+
     print("Starting confidence interval calculation...")
 
     # randomly permute the indices to extract a subset to compute
@@ -488,11 +514,6 @@ def run_conf(scenario_instance_factory,
              xhat_ph,
              options):
 
-    if options.MRP_directory_basename is None:
-        AllInOne = True
-
-    sense = xhat_ph._scenario_tree._scenarios[0]._objective_sense
-
     # in order to handle the case of scenarios that are not equally
     # likely, we will split the expectations for Gsupk
     # BUT we are going to assume that the groups themselves are
@@ -500,184 +521,42 @@ def run_conf(scenario_instance_factory,
 
     # really not always needed...
     # http://www.eecs.berkeley.edu/~mhoemmen/cs194/Tutorials/variance.pdf
-    g_supk_of_xhat = []
-    g_bar = 0
-    sum_xstar_obj_given_xhat = 0
     n_g = options.n_g
 
-    for k in range(1, n_g+1):
-
-        gk_ph = None
-        try:
-
-            if AllInOne:
-
-                start_index = num_scenarios_for_solution + \
-                              (k-1)*num_scenarios_per_sample
-                stop_index = start_index + num_scenarios_per_sample
-
-                print("")
-                print("Computing statistics for sample k="+str(k)+".")
-                if options.verbose:
-                    print("Bundle start index="+str(start_index)
-                          +", stop index="+str(stop_index)+".")
-
-                # compute this xstar solution for the EF associated with
-                # sample k.
-
-                print("Loading scenario instances and initializing "
-                      "scenario tree for xstar scenario bundle.")
-
-                gk_ph = ph_for_bundle(start_index,
-                                      stop_index,
-                                      scenario_instance_factory,
-                                      full_scenario_tree,
-                                      index_list,
-                                      options)
-
-            else:
-
-                options.instance_directory = \
-                    options.MRP_directory_basename+str(k)
-
-                gk_ph = PHFromScratch(options)
-
-            print("Creating the xstar extensive form.")
-            print("")
-            print("Composite scenarios:")
-            for scenario in gk_ph._scenario_tree._scenarios:
-                print (scenario._name)
-            print("")
-            gk_ef = ExtensiveFormAlgorithm(gk_ph,
-                                           options._ef_options,
-                                           prefix="ef_")
-            gk_ef.build_ef()
-            print("Solving the xstar extensive form.")
-            # Instance preprocessing is managed within the
-            # ph object automatically when required for a
-            # solve. Since we are solving the instances
-            # outside of the ph object, we will inform it
-            # that it should complete the instance
-            # preprocessing early
-            gk_ph._preprocess_scenario_instances()
-            gk_ef.solve(io_options=\
-                        {'output_fixed_variable_bounds':
-                         options.write_fixed_variables})
-            xstar_obj = gk_ef.objective
-            # assuming this is the absolute gap
-            xstar_obj_gap = gk_ef.gap
-
-            """
-            gk_ef = create_ef_instance(gk_ph._scenario_tree,
-                                       generate_weighted_cvar=options.generate_weighted_cvar,
-                                       cvar_weight=options.cvar_weight,
-                                       risk_alpha=options.risk_alpha)
-            print("Solving the xstar extensive form.")
-
-            # Instance preprocessing is managed within the ph object
-            # automatically when required for a solve. Since we are
-            # solving the instances outside of the ph object, we will
-            # inform it that it should complete the instance preprocessing
-            # early
-            gk_ph._preprocess_scenario_instances()
-
-            ef_results = solve_ef(gk_ef, options)
-
-            # as in the computation of xhat, the following is required to form a
-            # solution to the extensive form in the scenario tree itself.
-            gk_ph._scenario_tree.pullScenarioSolutionsFromInstances()
-            gk_ph._scenario_tree.snapshotSolutionFromScenarios()
-
-            # extract the objective function value corresponding to the
-            # xstar solution, along with any gap information.
-
-            xstar_obj = gk_ph._scenario_tree.findRootNode().computeExpectedNodeCost()
-            # assuming this is the absolute gap
-            xstar_obj_gap = gk_ef.solutions[0].gap# ef_results.solution(0).gap
-            """
-
-            print("Sample extensive form objective value="+str(xstar_obj))
-
-
-            # CVARHACK: if CPLEX barfed, keep trucking and bury our head
-            # in the sand.
-            if type(xstar_obj_gap) is UndefinedData:
-                xstar_obj_bound = xstar_obj
-                #EW#print("xstar_obj_bound= "+str(xstar_obj_bound))
-            else:
-                if sense == minimize:
-                    xstar_obj_bound = xstar_obj - xstar_obj_gap
-                else:
-                    xstar_obj_bound = xstar_obj + xstar_obj_gap
-                #EW#print("xstar_obj_bound= "+str(xstar_obj_bound))
-                #EW#print("xstar_obj = "+str(xstar_obj))
-                #EW#print("xstar_obj_gap = "+str(xstar_obj_gap))
-            # TBD: ADD VERBOSE OUTPUT HERE
-
-            # to get f(xhat) for this sample, fix the first-stage
-            # variables and re-solve the extensive form.  note that the
-            # fixing yields side-effects on the original gk_ef, but that
-            # is fine as it isn't used after this point.
-            print("Solving the extensive form given the xhat solution.")
-            #xhat = pyomo.pysp.phboundbase.ExtractInternalNodeSolutionsforInner(xhat_ph)
-            #
-            # fix the first stage variables
-            #
-            gk_root_node = gk_ph._scenario_tree.findRootNode()
-            #root_xhat = xhat[gk_root_node._name]
-            root_xhat = xhat_ph._scenario_tree.findRootNode()._solution
-            for variable_id in gk_root_node._standard_variable_ids:
-                gk_root_node.fix_variable(variable_id,
-                                          root_xhat[variable_id])
-
-            # Push fixed variable statuses on instances (or
-            # transmit to the phsolverservers), since we are not
-            # calling the solve method on the ph object, we
-            # need to do this manually
-            gk_ph._push_fix_queue_to_instances()
-            gk_ph._preprocess_scenario_instances()
-
-            gk_ef.solve(io_options=\
-                        {'output_fixed_variable_bounds':
-                         options.write_fixed_variables})
-            #ef_results = solve_ef(gk_ef, options)
-
-            # we don't need the solution - just the objective value.
-            #objective_name = "MASTER"
-            #objective = gk_ef.find_component(objective_name)
-            xstar_obj_given_xhat = gk_ef.objective
-
-            print("Sample extensive form objective value given xhat="
-                  +str(xstar_obj_given_xhat))
-
-            #g_supk_of_xhat.append(xstar_obj_given_xhat - xstar_obj_bound)
-            if sense == minimize:
-                g_supk_of_xhat.append(xstar_obj_given_xhat - xstar_obj_bound)
-            else:
-                g_supk_of_xhat.append(- xstar_obj_given_xhat + xstar_obj_bound)
-            g_bar += g_supk_of_xhat[k-1]
-            sum_xstar_obj_given_xhat += xstar_obj_given_xhat
-
-        finally:
+    if options.confidence_interval_tolerance is not None:
+        if options.confidence_interval_alpha not in t_table_values[1]:
+            raise ValueError(
+                "No built-in t-table entries for alpha=%s - cannot "
+                "calculate the running confidence interval width "
+                "(available values: %s)"
+                % (options.confidence_interval_alpha,
+                   ", ".join(str(key) for key
+                             in sorted(iterkeys(t_table_values[1])))))
+
+    root_xhat = dict(xhat_ph._scenario_tree.findRootNode()._solution)
+    sample_args = (scenario_instance_factory,
+                   index_list,
+                   num_scenarios_for_solution,
+                   num_scenarios_per_sample,
+                   full_scenario_tree,
+                   root_xhat,
+                   options)
 
-            if gk_ph is not None:
+    g_supk_of_xhat, xstar_obj_given_xhat = \
+        _compute_sample_gaps(n_g, sample_args, options)
 
-                # we are using the PHCleanup function for
-                # convenience, but we need to prevent it
-                # from shutting down the scenario_instance_factory
-                # as it is managed outside this function
-                if gk_ph._scenario_tree._scenario_instance_factory is \
-                   scenario_instance_factory:
-                    gk_ph._scenario_tree._scenario_instance_factory = None
-                PHCleanup(gk_ph)
+    n_g = len(g_supk_of_xhat)
+    g_bar = sum(g_supk_of_xhat[k] for k in sorted(g_supk_of_xhat))
+    sum_xstar_obj_given_xhat = sum(xstar_obj_given_xhat[k] for k
+                                   in sorted(xstar_obj_given_xhat))
 
     g_bar /= n_g
     # second pass for variance calculation (because we like storing
     # the g_supk)
     g_var = 0.0
-    for k in range(0, n_g):
+    for k in sorted(g_supk_of_xhat):
         print("g_supk_of_xhat[%d]=%12.6f"
-              % (k+1, g_supk_of_xhat[k]))
+              % (k, g_supk_of_xhat[k]))
         g_var = g_var + (g_supk_of_xhat[k] - g_bar) * \
                 (g_supk_of_xhat[k] - g_bar)
     if n_g != 1:
@@ -721,7 +600,7 @@ def run_conf(scenario_instance_factory,
                           +", seed, "+str(options.random_seed)
                           +", N, "+str(scenario_count)
                           +", hatn, "+str(num_scenarios_for_solution)
-                          +", n_g, "+str(options.n_g)
+                          +", n_g, "+str(n_g)
                           +", Eoffofxhat, "
                           +str(sum_xstar_obj_given_xhat / n_g)
                           +", gbar, "+str(g_bar)+", sg, "
@@ -756,6 +635,259 @@ def run_conf(scenario_instance_factory,
 
     xhat_ph.release_components()
 
+def compute_sample_gap(k,
+                       scenario_instance_factory,
+                       index_list,
+                       num_scenarios_for_solution,
+                       num_scenarios_per_sample,
+                       full_scenario_tree,
+                       root_xhat,
+                       options):
+    """Compute the gap estimator for sample k (numbered from 1) at
+    the first-stage solution root_xhat. Returns the estimator and
+    the objective value of the sample given xhat."""
+
+    gk_ph = None
+    try:
+
+        if options.MRP_directory_basename is None:
+
+            start_index = num_scenarios_for_solution + \
+                          (k-1)*num_scenarios_per_sample
+            stop_index = start_index + num_scenarios_per_sample
+
+            print("")
+            print("Computing statistics for sample k="+str(k)+".")
+            if options.verbose:
+                print("Bundle start index="+str(start_index)
+                      +", stop index="+str(stop_index)+".")
+
+            # compute this xstar solution for the EF associated with
+            # sample k.
+
+            print("Loading scenario instances and initializing "
+                  "scenario tree for xstar scenario bundle.")
+
+            gk_ph = ph_for_bundle(start_index,
+                                  stop_index,
+                                  scenario_instance_factory,
+                                  full_scenario_tree,
+                                  index_list,
+                                  options)
+
+        else:
+
+            options.instance_directory = \
+                options.MRP_directory_basename+str(k)
+
+            gk_ph = PHFromScratch(options)
+
+        sense = gk_ph._scenario_tree._scenarios[0]._objective_sense
+
+        print("Creating the xstar extensive form.")
+        print("")
+        print("Composite scenarios:")
+        for scenario in gk_ph._scenario_tree._scenarios:
+            print (scenario._name)
+        print("")
+        gk_ef = ExtensiveFormAlgorithm(gk_ph,
+                                       options._ef_options,
+                                       prefix="ef_")
+        gk_ef.build_ef()
+        print("Solving the xstar extensive form.")
+        # Instance preprocessing is managed within the
+        # ph object automatically when required for a
+        # solve. Since we are solving the instances
+        # outside of the ph object, we will inform it
+        # that it should complete the instance
+        # preprocessing early
+        gk_ph._preprocess_scenario_instances()
+        gk_ef.solve(io_options=\
+                    {'output_fixed_variable_bounds':
+                     options.write_fixed_variables})
+        xstar_obj = gk_ef.objective
+        # assuming this is the absolute gap
+        xstar_obj_gap = gk_ef.gap
+
+        print("Sample extensive form objective value="+str(xstar_obj))
+
+
+        # CVARHACK: if CPLEX barfed, keep trucking and bury our head
+        # in the sand.
+        if type(xstar_obj_gap) is UndefinedData:
+            xstar_obj_bound = xstar_obj
+            #EW#print("xstar_obj_bound= "+str(xstar_obj_bound))
+        else:
+            if sense == minimize:
+                xstar_obj_bound = xstar_obj - xstar_obj_gap
+            else:
+                xstar_obj_bound = xstar_obj + xstar_obj_gap
+            #EW#print("xstar_obj_bound= "+str(xstar_obj_bound))
+            #EW#print("xstar_obj = "+str(xstar_obj))
+            #EW#print("xstar_obj_gap = "+str(xstar_obj_gap))
+        # TBD: ADD VERBOSE OUTPUT HERE
+
+        # to get f(xhat) for this sample, fix the first-stage
+        # variables and re-solve the extensive form.  note that the
+        # fixing yields side-effects on the original gk_ef, but that
+        # is fine as it isn't used after this point.
+        print("Solving the extensive form given the xhat solution.")
+        #xhat = pyomo.pysp.phboundbase.ExtractInternalNodeSolutionsforInner(xhat_ph)
+        #
+        # fix the first stage variables
+        #
+        gk_root_node = gk_ph._scenario_tree.findRootNode()
+        #root_xhat = xhat[gk_root_node._name]
+        for variable_id in gk_root_node._standard_variable_ids:
+            gk_root_node.fix_variable(variable_id,
+                                      root_xhat[variable_id])
+
+        # Push fixed variable statuses on instances (or
+        # transmit to the phsolverservers), since we are not
+        # calling the solve method on the ph object, we
+        # need to do this manually
+        gk_ph._push_fix_queue_to_instances()
+
+        if options.stream_xhat_evaluation:
+            # with the first-stage variables fixed, the scenario
+            # subproblems are independent, so they are solved one
+            # at a time (or by the PH solver manager) rather than
+            # as a single extensive form
+            gk_ef.close()
+            # the scenario objectives were not active when the
+            # instances were last preprocessed
+            for scenario in gk_ph._scenario_tree._scenarios:
+                gk_ph._problem_states.objective_updated[scenario._name] = True
+            gk_ph.solve_subproblems(exception_on_failure=True)
+            xstar_obj_given_xhat = \
+                gk_root_node.computeExpectedNodeCost()
+        else:
+            gk_ph._preprocess_scenario_instances()
+
+            gk_ef.solve(io_options=\
+                        {'output_fixed_variable_bounds':
+                         options.write_fixed_variables})
+            #ef_results = solve_ef(gk_ef, options)
+
+            # we don't need the solution - just the objective value.
+            #objective_name = "MASTER"
+            #objective = gk_ef.find_component(objective_name)
+            xstar_obj_given_xhat = gk_ef.objective
+
+        print("Sample extensive form objective value given xhat="
+              +str(xstar_obj_given_xhat))
+
+        if sense == minimize:
+            g_supk_of_xhat = xstar_obj_given_xhat - xstar_obj_bound
+        else:
+            g_supk_of_xhat = - xstar_obj_given_xhat + xstar_obj_bound
+
+    finally:
+
+        if gk_ph is not None:
+
+            # we are using the PHCleanup function for
+            # convenience, but we need to prevent it
+            # from shutting down the scenario_instance_factory
+            # as it is managed outside this function
+            if gk_ph._scenario_tree._scenario_instance_factory is \
+               scenario_instance_factory:
+                gk_ph._scenario_tree._scenario_instance_factory = None
+            PHCleanup(gk_ph)
+
+    return g_supk_of_xhat, xstar_obj_given_xhat
+
+#
+# The scenario_instance_factory and scenario trees are inherited by
+# the worker processes when they are forked, rather than being sent
+# with each sample (the scenario_instance_factory can not be
+# pickled).
+#
+_sample_worker_function = None
+_sample_worker_args = None
+
+def _init_sample_worker(sample_gap_function, *args):
+    global _sample_worker_function
+    global _sample_worker_args
+    _sample_worker_function = sample_gap_function
+    _sample_worker_args = args
+
+def _sample_worker(k):
+    return k, _sample_worker_function(k, *_sample_worker_args)
+
+def _compute_sample_gaps(n_g,
+                         sample_args,
+                         options,
+                         sample_gap_function=compute_sample_gap):
+    """Compute the gap estimators for samples 1 through n_g by
+    calling sample_gap_function(k, *sample_args), using
+    options.sample_processes worker processes when that is greater
+    than one. The worker processes are forked, so that they inherit
+    sample_args (this requires a platform that supports fork). The
+    samples are computed concurrently, but their results are
+    processed in sample order, and the running confidence interval
+    is updated as each result is processed. Once it reaches the
+    tolerance, the remaining samples are abandoned, so the samples
+    used are always 1 through some k no matter how long each sample
+    takes to compute. Returns two dictionaries mapping the sample
+    number to the gap estimator and to the objective value given
+    xhat."""
+
+    g_supk_of_xhat = {}
+    xstar_obj_given_xhat = {}
+    pool = None
+    if options.sample_processes > 1:
+        print("")
+        print("Computing statistics for "+str(n_g)+" samples using "
+              +str(min(options.sample_processes, n_g))+" processes.")
+        pool = _create_fork_pool(
+            min(options.sample_processes, n_g),
+            initializer=_init_sample_worker,
+            initargs=(sample_gap_function,)+tuple(sample_args))
+        sample_results = pool.imap(_sample_worker,
+                                   range(1, n_g+1))
+    else:
+        sample_results = ((k, sample_gap_function(k, *sample_args))
+                          for k in range(1, n_g+1))
+
+    try:
+        for k, (g_k, f_k) in sample_results:
+            g_supk_of_xhat[k] = g_k
+            xstar_obj_given_xhat[k] = f_k
+            if _report_running_confidence_interval(
+                    list(g_supk_of_xhat.values()),
+                    options):
+                print("")
+                print("Confidence interval tolerance reached after "
+                      +str(len(g_supk_of_xhat))+" samples.")
+                break
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    return g_supk_of_xhat, xstar_obj_given_xhat
+
+def _report_running_confidence_interval(g_supk_of_xhat, options):
+    """Print the confidence interval on the optimality gap computed
+    from the samples completed so far (if a confidence interval
+    tolerance is being used). Returns True if the tolerance has been
+    reached."""
+    n = len(g_supk_of_xhat)
+    if (options.confidence_interval_tolerance is None) or \
+       (n < 2) or (n not in t_table_values):
+        return False
+    g_bar = sum(g_supk_of_xhat) / n
+    g_var = sum((g - g_bar) * (g - g_bar) for g in g_supk_of_xhat) / (n - 1)
+    alpha = options.confidence_interval_alpha
+    width = g_bar + (t_table_values[n][alpha] * \
+                     math.sqrt(g_var) / \
+                     math.sqrt(n))
+    print("Running confidence interval width for alpha="+str(alpha)
+          +" after "+str(n)+" samples is "+str(width))
+    return width <= options.confidence_interval_tolerance
+
+
 #
 # routine to create a down-sampled (bundled) scenario tree and the associated PH object.
 #
@@ -8,7 +8,6 @@
 #  This software is distributed under the 3-clause BSD License.
 #  ___________________________________________________________________________
 
-import copy
 from math import fabs
 
 from pyomo.pysp.generators import \
@@ -16,6 +15,12 @@ from pyomo.pysp.generators import \
 
 from six import iteritems, iterkeys
 
+try:
+    import numpy
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
 #
 # This module contains a hierarchy of convergence "computers" for PH
 # (or any other scenario-based decomposition strategy). Their basic
@@ -24,6 +29,105 @@ from six import iteritems, iterkeys
 # metric. the sole inputs are a scenario tree and a (time-varying) set
 # of instances (with solutions).
 #
+# when numpy is available, the metrics are computed from per-node
+# (scenarios x variables) solution arrays. convergers constructed with
+# incremental=True keep these arrays between updates and only refresh
+# the rows of the scenarios named in the call to update(), which is
+# useful when only some of the scenarios are re-solved between
+# metric updates (e.g., asynchronous PH).
+#
+
+class ScenarioSolutionArrays(object):
+
+    """ Maintains a (scenarios x variables) array of the scenario
+        solutions at each non-leaf node of a scenario tree, with
+        columns in the order given by the
+        get_standard_variable_id_order() method of the tree node.
+    """
+    def __init__(self):
+
+        # maps tree node name -> (variable ids, array)
+        self._arrays = {}
+
+    def clear(self):
+
+        self._arrays.clear()
+
+    def update(self, scenario_tree, scenario_names=None):
+        """ Refresh the rows for the named scenarios, or all rows if
+            scenario_names is None.
+        """
+        if scenario_names is not None:
+            scenario_names = set(scenario_names)
+        for stage in scenario_tree._stages[:-1]:
+            for tree_node in stage._tree_nodes:
+                variable_ids = tree_node.get_standard_variable_id_order()
+                data = self._arrays.get(tree_node._name, None)
+                if (scenario_names is None) or \
+                   (data is None) or \
+                   (data[0] is not variable_ids):
+                    self._arrays[tree_node._name] = \
+                        (variable_ids,
+                         tree_node.get_scenario_array("_x", variable_ids))
+                    continue
+                values = data[1]
+                for i, scenario in enumerate(tree_node._scenarios):
+                    if scenario._name in scenario_names:
+                        values[i,:] = numpy.array(
+                            list(map(scenario._x[tree_node._name].__getitem__,
+                                     variable_ids)),
+                            dtype=float)
+
+    def get(self, tree_node):
+        """ Returns the tuple (variable ids, array) for a tree node.
+        """
+        return self._arrays[tree_node._name]
+
+def _fresh_solution_arrays(scenario_tree):
+    solution_arrays = ScenarioSolutionArrays()
+    solution_arrays.update(scenario_tree)
+    return solution_arrays
+
+#
+# returns a boolean array indicating which of the given variables
+# at a tree node are included in the term-diff metrics (those that
+# are not stale in any scenario, or that are fixed at the node). this
+# mirrors the checks in scenario_tree_node_variables_generator_noinstances.
+#
+
+def _node_variable_mask(tree_node, variable_ids):
+
+    scenario_fixed = [scenario._fixed[tree_node._name]
+                      for scenario in tree_node._scenarios]
+    partially_fixed = set().union(*scenario_fixed) - \
+                      set.intersection(*[set(fixed) for fixed in scenario_fixed])
+    partially_fixed.intersection_update(variable_ids)
+    if len(partially_fixed) > 0:
+        variable_id = sorted(partially_fixed)[0]
+        instance_fixed_count = sum(1 for fixed in scenario_fixed
+                                   if variable_id in fixed)
+        variable_name, index = tree_node._variable_ids[variable_id]
+        raise RuntimeError("Variable="+variable_name+str(index)+" is "
+                           "fixed in "+str(instance_fixed_count)+" "
+                           "scenarios, which is less than the number "
+                           "of scenarios at tree node="+tree_node._name)
+
+    excluded = set().union(*[scenario._stale[tree_node._name]
+                             for scenario in tree_node._scenarios])
+    excluded.difference_update(tree_node._fixed)
+    if len(excluded) == 0:
+        return numpy.ones(len(variable_ids), dtype=bool)
+    return numpy.array([variable_id not in excluded
+                        for variable_id in variable_ids],
+                       dtype=bool)
+
+def _node_values(values, variable_ids):
+    return numpy.array(list(map(values.__getitem__, variable_ids)),
+                       dtype=float)
+
+def _node_probabilities(tree_node):
+    return numpy.array([scenario._probability
+                        for scenario in tree_node._scenarios])
 
 class ConvergenceBase(object):
 
@@ -53,9 +157,16 @@ class ConvergenceBase(object):
         # test for <= or >= the convergence threshold?
         self._test_for_le_threshold = True
 
+        # keep the scenario solution arrays between updates, only
+        # refreshing the rows of re-solved scenarios?
+        self._incremental = False
+        self._solution_arrays = None
+
         for key in kwds:
             if key == "convergence_threshold":
                 self._convergence_threshold = kwds[key]
+            elif key == "incremental":
+                self._incremental = bool(kwds[key])
             elif key == "convergence_threshold_sense":
                 if kwds[key] == True:
                     self._test_for_le_threshold = True
@@ -68,6 +179,8 @@ class ConvergenceBase(object):
     def reset(self):
 
         self._metric_history.clear()
+        if self._solution_arrays is not None:
+            self._solution_arrays.clear()
 
     def lastMetric(self):
 
@@ -79,8 +192,26 @@ class ConvergenceBase(object):
             self._largest_iteration_key
         return self._metric_history[self._largest_iteration_key]
 
-    def update(self, iteration_id, ph, scenario_tree, instances):
-
+    #
+    # updated_scenarios is an optional list of the names of the
+    # scenarios whose solutions changed since the previous update. it
+    # is only used by incremental convergers - all scenarios are
+    # assumed to have changed when it is None.
+    #
+
+    def update(self,
+               iteration_id,
+               ph,
+               scenario_tree,
+               instances,
+               updated_scenarios=None):
+
+        if self._incremental and numpy_available:
+            if self._solution_arrays is None:
+                self._solution_arrays = ScenarioSolutionArrays()
+                updated_scenarios = None
+            self._solution_arrays.update(scenario_tree,
+                                         scenario_names=updated_scenarios)
         current_value = self.computeMetric(ph, scenario_tree, instances)
         self._metric_history[iteration_id] = current_value
         self._largest_iteration_key = \
@@ -91,6 +222,18 @@ class ConvergenceBase(object):
         raise NotImplementedError("ConvergenceBase::computeMetric() is "
                                   "an abstract method")
 
+    #
+    # returns the scenario solution arrays to use when computing the
+    # metric: the incrementally maintained arrays if they exist, and
+    # freshly built arrays otherwise.
+    #
+
+    def _get_solution_arrays(self, scenario_tree):
+
+        if self._solution_arrays is not None:
+            return self._solution_arrays
+        return _fresh_solution_arrays(scenario_tree)
+
     def isConverged(self, ph):
 
         if self.lastMetric() == None:
@@ -139,12 +282,45 @@ class PrimalDualResidualConvergence(ConvergenceBase):
         previous_average = {}
         for stage in ph.scenario_tree.stages[:-1]:
             for tree_node in stage.nodes:
+                # the averages are floats, so a shallow copy suffices
                 previous_average[tree_node.name] = \
-                    copy.deepcopy(tree_node._averages)
+                    dict(tree_node._averages)
         return previous_average
 
+    #
+    # the array-based implementation of the squared norm of the
+    # probability-weighted deviations of the scenario solutions from
+    # the given node averages (a dict mapping tree node name to the
+    # averages at that node).
+    #
+
+    @staticmethod
+    def _compute_deviation_squared_norm(ph, node_averages, solution_arrays):
+        if solution_arrays is None:
+            solution_arrays = _fresh_solution_arrays(ph.scenario_tree)
+        squared_norm = 0.0
+        for stage in ph.scenario_tree.stages[:-1]:
+            for tree_node in stage.nodes:
+                variable_ids, values = solution_arrays.get(tree_node)
+                if len(variable_ids) == 0:
+                    continue
+                averages = _node_values(node_averages[tree_node.name],
+                                        variable_ids)
+                squared_norm += \
+                    tree_node.conditional_probability * \
+                    float(_node_probabilities(tree_node).dot(
+                        ((values - averages)**2).sum(axis=1)))
+        return squared_norm
+
     @staticmethod
-    def compute_residual_squared_norm(ph, previous_average):
+    def compute_residual_squared_norm(ph,
+                                      previous_average,
+                                      solution_arrays=None):
+        if numpy_available:
+            return PrimalDualResidualConvergence.\
+                _compute_deviation_squared_norm(ph,
+                                                previous_average,
+                                                solution_arrays)
         residual_squared_norm = 0.0
         for stage in ph.scenario_tree.stages[:-1]:
             for tree_node in stage.nodes:
@@ -166,7 +342,15 @@ class PrimalDualResidualConvergence(ConvergenceBase):
         return residual_squared_norm
 
     @staticmethod
-    def compute_primal_residual_squared_norm(ph):
+    def compute_primal_residual_squared_norm(ph, solution_arrays=None):
+        if numpy_available:
+            return PrimalDualResidualConvergence.\
+                _compute_deviation_squared_norm(
+                    ph,
+                    dict((tree_node.name, tree_node._averages)
+                         for stage in ph.scenario_tree.stages[:-1]
+                         for tree_node in stage.nodes),
+                    solution_arrays)
         primal_residual_squared_norm = 0.0
         for stage in ph.scenario_tree.stages[:-1]:
             for tree_node in stage.nodes:
@@ -192,6 +376,20 @@ class PrimalDualResidualConvergence(ConvergenceBase):
         dual_residual_squared_norm = 0.0
         for stage in ph.scenario_tree.stages[:-1]:
             for tree_node in stage.nodes:
+                if numpy_available:
+                    variable_ids = tree_node.get_standard_variable_id_order()
+                    differences = \
+                        _node_values(tree_node._averages, variable_ids) - \
+                        _node_values(previous_average[tree_node.name],
+                                     variable_ids)
+                    if rho_scaled:
+                        differences *= _node_values(
+                            tree_node._scenarios[0]._rho[tree_node.name],
+                            variable_ids)
+                    dual_residual_squared_norm += \
+                        tree_node.conditional_probability * \
+                        float((differences**2).sum())
+                    continue
                 node_dual_residual_squared_norm = 0.0
                 node_previous_average = previous_average[tree_node.name]
                 node_average = tree_node._averages
@@ -217,7 +415,11 @@ class PrimalDualResidualConvergence(ConvergenceBase):
         if previous_average is None:
             return None
 
-        prsqn = self.compute_primal_residual_squared_norm(ph)
+        if numpy_available:
+            prsqn = self.compute_primal_residual_squared_norm(
+                ph, solution_arrays=self._get_solution_arrays(scenario_tree))
+        else:
+            prsqn = self.compute_primal_residual_squared_norm(ph)
         drsqn = self.compute_dual_residual_squared_norm(ph,
                                                         previous_average)
 
@@ -242,6 +444,9 @@ class TermDiffConvergence(ConvergenceBase):
 
     def computeMetric(self, ph, scenario_tree, instances):
 
+        if numpy_available:
+            return self._computeMetricFromArrays(scenario_tree)
+
         term_diff = 0.0
 
         for stage, tree_node, variable_id, variable_values, is_fixed, is_stale \
@@ -260,6 +465,23 @@ class TermDiffConvergence(ConvergenceBase):
 
         return term_diff
 
+    def _computeMetricFromArrays(self, scenario_tree):
+
+        term_diff = 0.0
+
+        solution_arrays = self._get_solution_arrays(scenario_tree)
+        for stage in scenario_tree._stages[:-1]:
+            for tree_node in stage._tree_nodes:
+                variable_ids, values = solution_arrays.get(tree_node)
+                if len(variable_ids) == 0:
+                    continue
+                mask = _node_variable_mask(tree_node, variable_ids)
+                averages = _node_values(tree_node._averages, variable_ids)
+                term_diff += float(_node_probabilities(tree_node).dot(
+                    numpy.abs(values[:,mask] - averages[mask])).sum())
+
+        return term_diff
+
 
 #
 # Implements the normalized "term-diff" metric from our submitted CMS
@@ -283,6 +505,9 @@ class NormalizedTermDiffConvergence(ConvergenceBase):
 
     def computeMetric(self, ph, scenario_tree, instances):
 
+        if numpy_available:
+            return self._computeMetricFromArrays(ph, scenario_tree)
+
         normalized_term_diff = 0.0
 
         for stage, tree_node, variable_id, variable_values, is_fixed, is_stale \
@@ -310,6 +535,30 @@ class NormalizedTermDiffConvergence(ConvergenceBase):
 
         return normalized_term_diff
 
+    def _computeMetricFromArrays(self, ph, scenario_tree):
+
+        normalized_term_diff = 0.0
+
+        solution_arrays = self._get_solution_arrays(scenario_tree)
+        for stage in scenario_tree._stages[:-1]:
+            for tree_node in stage._tree_nodes:
+                variable_ids, values = solution_arrays.get(tree_node)
+                if len(variable_ids) == 0:
+                    continue
+                averages = _node_values(tree_node._averages, variable_ids)
+                mask = _node_variable_mask(tree_node, variable_ids) & \
+                       (numpy.abs(averages) > 0.0001)
+                normalized_term_diff += float(
+                    _node_probabilities(tree_node).dot(
+                        numpy.abs((values[:,mask] - averages[mask]) /
+                                  averages[mask])).sum())
+
+        normalized_term_diff = \
+            normalized_term_diff / \
+            (ph._total_discrete_vars + ph._total_continuous_vars)
+
+        return normalized_term_diff
+
 #
 # Implements a super-simple convergence criterion based on when a
 # particular number of discrete variables are free (e.g., 20 or
@@ -8,6 +8,11 @@
 #  This software is distributed under the 3-clause BSD License.
 #  ___________________________________________________________________________
 
+import os
+import gc
+import shutil
+import tempfile
+
 from pyomo.core.base import *
 from pyomo.opt import (ProblemFormat,
                        SolverFactory,
@@ -15,7 +20,8 @@ from pyomo.opt import (ProblemFormat,
                        SolverStatus,
                        TerminationCondition,
                        SolutionStatus)
-from pyomo.pysp.phutils import (isVariableNameIndexed,
+from pyomo.pysp.phutils import (indexToString,
+                                isVariableNameIndexed,
                                 extractVariableNameAndIndex,
                                 extractComponentIndices)
 
@@ -348,6 +354,403 @@ def write_ef(binding_instance,
 
     return smap_id
 
+#
+# write the extensive form one scenario at a time. each scenario
+# instance is constructed, placed on a small model together with
+# its share of the EF objective and its non-anticipativity
+# constraints, written with symbolic labels (so that the shared
+# master variables receive the same name in every piece), and
+# released before the next scenario is constructed. the sections
+# of each piece are appended to temporary files that are joined
+# into the output file at the end, so memory use is bounded by the
+# largest scenario rather than by the size of the EF.
+#
+
+_master_blend_variable_prefix = "MASTER_BLEND_VAR_"
+_master_blend_constraint_prefix = "MASTER_BLEND_CONSTRAINT_"
+
+class _SectionFiles(object):
+    """A set of temporary files, one per output file section."""
+
+    def __init__(self, names):
+        self._files = dict((name, tempfile.TemporaryFile(mode='w+'))
+                           for name in names)
+
+    def __getitem__(self, name):
+        return self._files[name]
+
+    def empty(self, name):
+        return self._files[name].tell() == 0
+
+    def copy(self, name, output_file):
+        f = self._files[name]
+        f.seek(0)
+        shutil.copyfileobj(f, output_file)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+def _is_shared_variable(label):
+    return (label == "ONE_VAR_CONSTANT") or \
+        label.startswith(_master_blend_variable_prefix)
+
+class _StreamingLPWriter(object):
+
+    def __init__(self):
+        self._sections = _SectionFiles(("objective",
+                                        "quadratic_objective",
+                                        "constraints",
+                                        "bounds",
+                                        "general",
+                                        "binary",
+                                        "sos"))
+        self._sense = None
+        self._constant = 0.0
+        self._shared_bounds = set()
+
+    def add(self, filename):
+        sections = self._sections
+        state = "header"
+        with open(filename) as f:
+            for line in f:
+                token = line.strip()
+                if state == "header":
+                    if token in ("min", "max"):
+                        if (self._sense is not None) and \
+                           (self._sense != token):
+                            raise ValueError(
+                                "Scenario objectives must have the "
+                                "same sense")
+                        self._sense = token
+                        # skip the objective label
+                        next(f)
+                        state = "objective"
+                elif state == "objective":
+                    if token == "":
+                        state = None
+                    elif token == "+ [":
+                        state = "quadratic_objective"
+                    elif token.endswith(" ONE_VAR_CONSTANT"):
+                        self._constant += float(token.split()[0])
+                    else:
+                        sections["objective"].write(line)
+                elif state == "quadratic_objective":
+                    if token.startswith("]"):
+                        state = "objective"
+                    else:
+                        sections["quadratic_objective"].write(line)
+                elif token == "s.t.":
+                    state = "constraints"
+                    # skip the blank line that follows
+                    next(f)
+                elif token == "bounds":
+                    state = "bounds"
+                elif token == "general":
+                    state = "general"
+                elif token == "binary":
+                    state = "binary"
+                elif token == "SOS":
+                    state = "sos"
+                elif token == "end":
+                    state = None
+                elif state == "constraints":
+                    if token == "c_e_ONE_VAR_CONSTANT:":
+                        # this row is written once at the end
+                        next(f)
+                        next(f)
+                    else:
+                        sections["constraints"].write(line)
+                elif state == "bounds":
+                    label = token.split("<=")[1].strip()
+                    if _is_shared_variable(label):
+                        if label in self._shared_bounds:
+                            continue
+                        self._shared_bounds.add(label)
+                    sections["bounds"].write(line)
+                elif state is not None:
+                    sections[state].write(line)
+
+    def write(self, output_file, name):
+        sections = self._sections
+        output_file.write("\\* Source Pyomo model name=%s *\\\n\n"
+                          % (name))
+        output_file.write("%s \n" % (self._sense))
+        output_file.write("%s:\n" % (name))
+        sections.copy("objective", output_file)
+        if not sections.empty("quadratic_objective"):
+            output_file.write("+ [\n")
+            sections.copy("quadratic_objective", output_file)
+            output_file.write("] / 2\n")
+        if (self._constant != 0.0) or sections.empty("objective"):
+            output_file.write("%+.17g ONE_VAR_CONSTANT\n"
+                              % (self._constant))
+        output_file.write("\ns.t.\n\n")
+        sections.copy("constraints", output_file)
+        output_file.write("c_e_ONE_VAR_CONSTANT: \n")
+        output_file.write("ONE_VAR_CONSTANT = 1.0\n\n")
+        output_file.write("bounds\n")
+        sections.copy("bounds", output_file)
+        for section in ("general", "binary"):
+            if not sections.empty(section):
+                output_file.write(section+"\n")
+                sections.copy(section, output_file)
+        if not sections.empty("sos"):
+            output_file.write("SOS\n")
+            sections.copy("sos", output_file)
+        output_file.write("end\n")
+
+    def close(self):
+        self._sections.close()
+
+class _StreamingMPSWriter(object):
+
+    def __init__(self):
+        self._sections = _SectionFiles(("rows",
+                                        "columns",
+                                        "rhs",
+                                        "ranges",
+                                        "bounds",
+                                        "sos",
+                                        "quadobj",
+                                        "qcmatrix"))
+        self._sense = None
+        self._constant = 0.0
+        # the column entries for variables shared by
+        # more than one scenario are kept in memory
+        # (there is one entry per non-anticipativity
+        # constraint) so that they are written contiguously
+        self._shared_columns = {}
+        self._shared_bounds = set()
+
+    def add(self, filename):
+        sections = self._sections
+        state = None
+        objective_label = None
+        with open(filename) as f:
+            for line in f:
+                if line.startswith("*"):
+                    continue
+                if not line.startswith(" "):
+                    items = line.split()
+                    state = items[0]
+                    if state == "QCMATRIX":
+                        sections["qcmatrix"].write(line)
+                    elif state == "SOS":
+                        sections["sos"].write(line)
+                    continue
+                items = line.split()
+                if state == "OBJSENSE":
+                    if (self._sense is not None) and \
+                       (self._sense != items[0]):
+                        raise ValueError(
+                            "Scenario objectives must have the "
+                            "same sense")
+                    self._sense = items[0]
+                elif state == "ROWS":
+                    if items[0] == "N":
+                        objective_label = items[1]
+                    elif items[1] != "c_e_ONE_VAR_CONSTANT":
+                        sections["rows"].write(line)
+                elif state == "COLUMNS":
+                    label = items[0]
+                    if label == "ONE_VAR_CONSTANT":
+                        if items[1] == objective_label:
+                            self._constant += float(items[2])
+                        elif items[1] != "c_e_ONE_VAR_CONSTANT":
+                            self._shared_columns.setdefault(
+                                label, []).append(line)
+                    elif _is_shared_variable(label):
+                        self._shared_columns.setdefault(
+                            label, []).append(line)
+                    else:
+                        sections["columns"].write(line)
+                elif state == "RHS":
+                    if items[1] != "c_e_ONE_VAR_CONSTANT":
+                        sections["rhs"].write(line)
+                elif state == "RANGES":
+                    sections["ranges"].write(line)
+                elif state == "BOUNDS":
+                    if _is_shared_variable(items[2]):
+                        if line in self._shared_bounds:
+                            continue
+                        self._shared_bounds.add(line)
+                    sections["bounds"].write(line)
+                elif state == "SOS":
+                    sections["sos"].write(line)
+                elif state == "QUADOBJ":
+                    sections["quadobj"].write(line)
+                elif state == "QCMATRIX":
+                    sections["qcmatrix"].write(line)
+
+    def write(self, output_file, name):
+        sections = self._sections
+        output_file.write("* Source:     Pyomo MPS Writer\n")
+        output_file.write("* Format:     Free MPS\n")
+        output_file.write("*\n")
+        output_file.write("NAME %s\n" % (name))
+        output_file.write("OBJSENSE\n")
+        output_file.write(" %s\n" % (self._sense))
+        output_file.write("ROWS\n")
+        output_file.write(" N  %s\n" % (name))
+        sections.copy("rows", output_file)
+        output_file.write(" E  c_e_ONE_VAR_CONSTANT\n")
+        output_file.write("COLUMNS\n")
+        sections.copy("columns", output_file)
+        for label in sorted(self._shared_columns):
+            for line in self._shared_columns[label]:
+                output_file.write(line)
+        output_file.write("     ONE_VAR_CONSTANT %s %.17g\n"
+                          % (name, self._constant))
+        output_file.write("     ONE_VAR_CONSTANT c_e_ONE_VAR_CONSTANT 1\n")
+        output_file.write("RHS\n")
+        sections.copy("rhs", output_file)
+        output_file.write("     RHS c_e_ONE_VAR_CONSTANT 1\n")
+        if not sections.empty("ranges"):
+            output_file.write("RANGES\n")
+            sections.copy("ranges", output_file)
+        output_file.write("BOUNDS\n")
+        sections.copy("bounds", output_file)
+        sections.copy("sos", output_file)
+        if not sections.empty("quadobj"):
+            output_file.write("QUADOBJ\n")
+            sections.copy("quadobj", output_file)
+        sections.copy("qcmatrix", output_file)
+        output_file.write("ENDATA\n")
+
+    def close(self):
+        self._sections.close()
+
+def _create_ef_scenario_piece(scenario_tree,
+                              scenario_name,
+                              scenario_instance,
+                              ef_instance_name,
+                              objective_sense=None):
+    """Returns a model containing a scenario instance, its
+    probability-weighted cost as the objective, and the
+    non-anticipativity constraints linking its variables to the
+    master variables of each non-leaf node on its path through the
+    scenario tree."""
+    tree = scenario_tree.make_compressed([scenario_name],
+                                         normalize=False)
+    tree.linkInInstances({scenario_name: scenario_instance},
+                         objective_sense=objective_sense,
+                         create_variable_ids=True)
+    scenario = tree.get_scenario(scenario_name)
+
+    piece = ConcreteModel(name=ef_instance_name)
+    piece.add_component(str(scenario_name), scenario_instance)
+    scenario._instance_objective.deactivate()
+
+    for tree_node in scenario._node_list[:-1]:
+        keys = []
+        vardatas = []
+        for variable_id in sorted(tree_node._standard_variable_ids):
+            # Don't blend fixed variables
+            if tree_node.is_variable_fixed(variable_id):
+                continue
+            variable_name, index = tree_node._variable_ids[variable_id]
+            keys.append(variable_name+indexToString(index))
+            vardatas.append(tree_node._variable_datas[variable_id][0][0])
+        master_variable = Var(keys)
+        piece.add_component(
+            _master_blend_variable_prefix+str(tree_node._name),
+            master_variable)
+        # the constraints are indexed by scenario name so that
+        # their labels are unique in the output file
+        master_constraint = Constraint(
+            [(str(scenario_name), key) for key in keys],
+            noruleinit=True)
+        piece.add_component(
+            _master_blend_constraint_prefix+str(tree_node._name),
+            master_constraint)
+        for key, vardata in zip(keys, vardatas):
+            master_constraint.add((str(scenario_name), key),
+                                  (master_variable[key] - vardata, 0.0))
+
+    opt_sense = minimize \
+                if scenario._instance_objective.is_minimizing() \
+                   else maximize
+    piece.MASTER = Objective(
+        sense=opt_sense,
+        expr=scenario._probability * scenario._instance_cost_expression)
+
+    return piece
+
+def write_ef_streaming(scenario_tree,
+                       output_filename,
+                       ef_instance_name="MASTER",
+                       objective_sense=None,
+                       output_fixed_variable_bounds=False,
+                       instance_cache_directory=None,
+                       template_scenario_instances=False,
+                       verbose=False):
+    """Write the extensive form for a scenario tree to an LP or MPS
+    file without constructing more than one scenario instance at a
+    time. The scenario instances are constructed by the instance
+    factory associated with the scenario tree (the scenario tree
+    must not be linked to instances). Symbolic labels are always
+    used, with the variables and constraints of each scenario
+    prefixed by the scenario name. Weighted CVaR terms and chance
+    constraints are not supported."""
+
+    pieces = output_filename.rsplit(".",1)
+    if len(pieces) != 2:
+        raise RuntimeError("Could not determine suffix from "
+                           "output filename="+output_filename)
+    ef_output_file_suffix = pieces[1]
+    if ef_output_file_suffix == "lp":
+        writer = _StreamingLPWriter()
+        output_format = ProblemFormat.cpxlp
+    elif ef_output_file_suffix == "mps":
+        writer = _StreamingMPSWriter()
+        output_format = ProblemFormat.mps
+    else:
+        raise RuntimeError("Unknown file suffix="+ef_output_file_suffix+
+                           " specified when writing extensive form "
+                           "(streaming output supports .lp and .mps)")
+
+    scenario_instance_factory = scenario_tree._scenario_instance_factory
+    io_options = {'symbolic_solver_labels': True}
+    if output_fixed_variable_bounds:
+        io_options['output_fixed_variable_bounds'] = True
+
+    fd, piece_filename = tempfile.mkstemp(suffix="."+ef_output_file_suffix)
+    os.close(fd)
+    try:
+        for scenario in scenario_tree._scenarios:
+            if verbose:
+                print("Writing extensive form rows for scenario=%s"
+                      % (scenario._name))
+            scenario_instance = \
+                scenario_instance_factory.construct_scenario_instance(
+                    scenario._name,
+                    scenario_tree,
+                    instance_cache_directory=instance_cache_directory,
+                    use_template=template_scenario_instances,
+                    verbose=verbose)
+            piece = _create_ef_scenario_piece(
+                scenario_tree,
+                scenario._name,
+                scenario_instance,
+                ef_instance_name,
+                objective_sense=objective_sense)
+            piece.write(filename=piece_filename,
+                        format=output_format,
+                        solver_capability=lambda x: True,
+                        io_options=io_options)
+            writer.add(piece_filename)
+            del piece
+            del scenario_instance
+            gc.collect()
+        with open(output_filename, 'w') as output_file:
+            writer.write(output_file, ef_instance_name)
+    finally:
+        writer.close()
+        if os.path.exists(piece_filename):
+            os.remove(piece_filename)
+
 #
 # solve the EF binding instance and load the solution
 #
@@ -63,7 +63,9 @@ from pyomo.pysp.solutionioextensions import \
     (IPySPSolutionSaverExtension,
      IPySPSolutionLoaderExtension)
 from pyomo.pysp.solutionwriter import ISolutionWriterExtension
-from pyomo.pysp.ef import write_ef, create_ef_instance
+from pyomo.pysp.ef import (write_ef,
+                           write_ef_streaming,
+                           create_ef_instance)
 
 logger = logging.getLogger('pyomo.pysp')
 
@@ -725,6 +727,26 @@ def runef_register_options(options=None):
             ),
             doc=None,
             visibility=0))
+    safe_register_unique_option(
+        options,
+        "stream_output",
+        PySPConfigValue(
+            False,
+            domain=bool,
+            description=(
+                "Write the extensive form to the output file one "
+                "scenario at a time, without constructing the "
+                "extensive form instance. At most one scenario "
+                "instance is kept in memory. Only the LP and MPS "
+                "file formats are supported (LP is used when the "
+                "output file name does not end in '.lp' or '.mps'), "
+                "symbolic labels are always used, and this option "
+                "can not be combined with --solve, "
+                "--generate-weighted-cvar, or --cc-indicator-var. "
+                "Default is False."
+            ),
+            doc=None,
+            visibility=0))
     ScenarioTreeManagerClientSerial.register_options(options)
     ExtensiveFormAlgorithm.register_options(options)
 
@@ -790,6 +812,46 @@ def runef_register_options(options=None):
 
     return options
 
+#
+# Write the extensive form for an uninitialized scenario tree
+# manager without constructing the scenario instances up front.
+#
+
+def _runef_stream_output(manager, options):
+
+    if options.solve:
+        raise ValueError("The stream_output option can not be "
+                         "used with the solve option")
+    if options.generate_weighted_cvar or \
+       (options.cc_indicator_var is not None):
+        raise ValueError("The stream_output option does not support "
+                         "weighted CVaR terms or chance constraints")
+
+    filename = options.output_file
+    suf = os.path.splitext(filename)[1]
+    if suf == '.nl':
+        raise ValueError("The stream_output option does not support "
+                         "the NL file format")
+    elif suf not in ['.lp','.mps']:
+        filename += '.lp'
+
+    start_time = time.time()
+    print("")
+    print("Writing extensive form one scenario at a time")
+    write_ef_streaming(
+        manager.scenario_tree,
+        filename,
+        objective_sense=options.objective_sense_stage_based,
+        instance_cache_directory=\
+            options.scenario_instance_cache_directory,
+        template_scenario_instances=options.template_scenario_instances,
+        verbose=options.verbose)
+
+    print("Extensive form written to file="+filename)
+    if options.verbose or options.output_times:
+        print("Time to write output file=%.2f seconds"
+              % (time.time() - start_time))
+
 #
 # Construct a scenario tree manager and an
 # ExtensiveFormAlgorithm to solve it.
@@ -810,6 +872,15 @@ def runef(options,
 
     with ScenarioTreeManagerClientSerial(options) \
          as manager:
+
+        if options.stream_output:
+            _runef_stream_output(manager, options)
+            print("")
+            print("Total EF execution time=%.2f seconds"
+                  % (time.time() - start_time))
+            print("")
+            return 0
+
         manager.initialize()
 
         loaded = False
@@ -13,22 +13,37 @@ import time
 import copy
 
 from pyomo.util import pyomo_command
-from pyomo.core import minimize
+from pyomo.core import minimize, value, Constraint
+from pyomo.core.base.numvalue import native_types
+from pyomo.opt import (SolverFactory,
+                       TerminationCondition,
+                       UnknownSolver)
+from pyomo.opt.base.solvers import OptSolver
+from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
 from pyomo.pysp.util.config import (PySPConfigValue,
                                     PySPConfigBlock,
                                     safe_register_common_option,
                                     safe_register_unique_option,
                                     _extension_options_group_title,
-                                    _domain_must_be_str)
+                                    _domain_must_be_str,
+                                    _domain_positive_integer)
 from pyomo.pysp.util.misc import (parse_command_line,
                                   launch_command,
-                                  sort_extensions_by_precedence)
+                                  sort_extensions_by_precedence,
+                                  _create_fork_pool)
+from pyomo.pysp.scenariotree.scenario_data_store import \
+    ScenarioDataStore
 from pyomo.pysp.scenariotree.manager_solver import \
     (ScenarioTreeManagerSolverClientSerial,
-     ScenarioTreeManagerSolverClientPyro)
+     ScenarioTreeManagerSolverClientPyro,
+     ScenarioTreeManagerSolverClientMultiprocess)
 from pyomo.pysp.solutionioextensions import \
     (IPySPSolutionSaverExtension,
      IPySPSolutionLoaderExtension)
+from pyomo.pysp.phutils import (indexToString,
+                                find_active_objective)
+
+import six
 
 #
 # Fix all non-anticiptative variables to their current solution,
@@ -91,6 +106,326 @@ def evaluate_current_node_solution(manager, **solve_kwds):
 
     return failures
 
+#
+# Batched evaluation of a non-anticipative solution over scenarios
+# stored in a columnar data file. Rather than constructing an
+# instance for every scenario, each worker constructs a single
+# instance, fixes the first-stage variables to xhat once, and then
+# loops over scenarios by assigning the values of the stochastic
+# parameters. When a persistent solver is used, only the constraints
+# (and the objective) that reference those parameters are updated
+# in the solver between scenarios.
+#
+
+_expression_attributes = ('_args',
+                          '_numerator',
+                          '_denominator',
+                          '_if',
+                          '_then',
+                          '_else',
+                          '_coef',
+                          '_const')
+
+def _expression_references(expr, object_ids):
+    """Returns True if the expression (or any of its
+    subexpressions) contains an object whose id is in the input
+    set."""
+    stack = [expr]
+    while stack:
+        obj = stack.pop()
+        if (obj is None) or (type(obj) in native_types):
+            continue
+        if id(obj) in object_ids:
+            return True
+        if type(obj) in (list, tuple):
+            stack.extend(obj)
+        elif type(obj) is dict:
+            stack.extend(obj.values())
+        elif hasattr(obj, 'is_expression') and obj.is_expression():
+            for attr in _expression_attributes:
+                stack.append(getattr(obj, attr, None))
+    return False
+
+def _scenario_data_store_batches(store, batch_size):
+    """Generates the scenario names in a ScenarioDataStore in lists
+    of length at most batch_size."""
+    scenario_names = store.scenario_names
+    for i in six.moves.xrange(0, len(scenario_names), batch_size):
+        yield list(scenario_names[i:i+batch_size])
+
+def _scenario_data_store_values(store, scenario_name):
+    """Returns the values of the stochastic parameters of a scenario
+    in a ScenarioDataStore as a flat list (in the order of the
+    parameters and their indices in the store)."""
+    return [val for _, _, values in store.scenario_values(scenario_name)
+            for val in values.tolist()]
+
+class BatchedXhatEvaluator(object):
+    """Solves a single scenario instance repeatedly for different
+    values of its stochastic parameters, with the first-stage
+    variables fixed to xhat."""
+
+    def __init__(self,
+                 instance,
+                 xhat,
+                 parameters,
+                 solver,
+                 solver_io=None,
+                 solver_options=None):
+        self._instance = instance
+        for name, index, val in xhat:
+            instance.find_component(name)[index].fix(val)
+        # the parameters are a list of (name, indices) tuples (as
+        # stored in a ScenarioDataStore)
+        self._params = []
+        for name, indices in parameters:
+            param = instance.find_component(name)
+            if (param is None) or \
+               (not getattr(param, "_mutable", False)):
+                raise ValueError(
+                    "The scenario data for parameter %s does not name "
+                    "a mutable parameter on the scenario instance"
+                    % (name))
+            for index in indices:
+                self._params.append(param[index])
+        param_ids = set(id(paramdata) for paramdata in self._params)
+        self._objective = find_active_objective(instance,
+                                                safety_checks=True)
+        if self._objective is None:
+            raise RuntimeError(
+                "An active Objective could not be found on the "
+                "scenario instance")
+        self._updated_constraints = []
+        for con in instance.component_data_objects(Constraint,
+                                                   active=True,
+                                                   descend_into=True):
+            if _expression_references(con.body, param_ids) or \
+               _expression_references(con.lower, param_ids) or \
+               _expression_references(con.upper, param_ids):
+                self._updated_constraints.append(con)
+        self._objective_updated = \
+            _expression_references(self._objective.expr, param_ids)
+        self._solver = SolverFactory(solver, solver_io=solver_io)
+        if isinstance(self._solver, UnknownSolver):
+            raise ValueError("Failed to create solver of type=%s "
+                             "for use in batched xhat evaluation"
+                             % (solver))
+        if solver_options is not None:
+            self._solver.options.update(solver_options)
+        self._persistent = isinstance(self._solver, PersistentSolver)
+        if self._persistent:
+            self._solver.set_instance(instance)
+
+    def close(self):
+        if self._solver is not None:
+            self._solver.deactivate()
+            self._solver = None
+
+    def evaluate(self, values):
+        """Solve the instance for the given parameter values (a flat
+        list, in the order of the parameters and their indices) and
+        return the objective value, or None if the solve failed."""
+        for paramdata, val in zip(self._params, values):
+            paramdata.value = val
+        if self._persistent:
+            for con in self._updated_constraints:
+                try:
+                    self._solver.remove_constraint(con)
+                except KeyError:
+                    pass
+                self._solver.add_constraint(con)
+            if self._objective_updated:
+                self._solver.set_objective(self._objective)
+            results = self._solver.solve(load_solutions=False)
+        else:
+            results = self._solver.solve(self._instance,
+                                         load_solutions=False)
+        if (results.solver.termination_condition not in
+            (TerminationCondition.optimal,
+             TerminationCondition.locallyOptimal)) or \
+           (len(results.solution) == 0):
+            return None
+        self._instance.solutions.load_from(results)
+        return value(self._objective)
+
+    def evaluate_batch(self, batch):
+        return [(scenario_name, self.evaluate(values))
+                for scenario_name, values in batch]
+
+class _RunningStatistics(object):
+    """The running sample mean and variance of a sequence of values
+    (computed with Welford's method)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, val):
+        self.count += 1
+        delta = val - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (val - self.mean)
+
+    @property
+    def variance(self):
+        if self.count > 1:
+            return self._m2 / (self.count - 1)
+        return 0.0
+
+def _aggregate_batch_results(results, output_file=None):
+    """Accumulate the running statistics of the scenario costs in an
+    iterable of batch results (lists of (scenario_name, cost)
+    tuples, where the cost is None for a failed solve). If
+    output_file is not None, a CSV file with one row of the form
+    scenario,cost,mean,variance is written as each result is
+    processed. Returns a tuple (count, mean, variance, failures)."""
+    statistics = _RunningStatistics()
+    failures = []
+    f = None
+    try:
+        if output_file is not None:
+            f = open(output_file, 'w')
+            f.write("scenario,cost,mean,variance\n")
+        for batch_results in results:
+            for scenario_name, cost in batch_results:
+                if cost is None:
+                    failures.append(scenario_name)
+                    continue
+                statistics.add(cost)
+                if f is not None:
+                    f.write("%s,%r,%r,%r\n"
+                            % (scenario_name,
+                               cost,
+                               statistics.mean,
+                               statistics.variance))
+    finally:
+        if f is not None:
+            f.close()
+    return (statistics.count,
+            statistics.mean,
+            statistics.variance,
+            failures)
+
+#
+# The scenario instance factory and scenario tree are inherited by
+# the worker processes when they are forked (the factory can not be
+# pickled). Each worker opens the scenario data store itself, so
+# only the names of the scenarios in each batch are sent to it.
+#
+_batch_evaluator = None
+_batch_evaluator_store = None
+_batch_evaluator_args = None
+
+def _init_batch_worker(*args):
+    global _batch_evaluator_args
+    _batch_evaluator_args = args
+
+def _evaluate_batch(scenario_names):
+    global _batch_evaluator
+    global _batch_evaluator_store
+    if _batch_evaluator is None:
+        scenario_instance_factory, scenario_tree, scenario_name, \
+            store_directory, evaluator_args, evaluator_kwds = \
+                _batch_evaluator_args
+        _batch_evaluator_store = ScenarioDataStore(store_directory)
+        instance = scenario_instance_factory.construct_scenario_instance(
+            scenario_name,
+            scenario_tree)
+        _batch_evaluator = BatchedXhatEvaluator(
+            instance,
+            evaluator_args[0],
+            [(name, indices) for name, indices, _ in
+             _batch_evaluator_store.scenario_values(
+                 _batch_evaluator_store.scenario_names[0])],
+            *evaluator_args[1:],
+            **evaluator_kwds)
+    return _batch_evaluator.evaluate_batch(
+        [(name, _scenario_data_store_values(_batch_evaluator_store, name))
+         for name in scenario_names])
+
+def evaluate_xhat_batched(manager,
+                          scenario_data_store,
+                          processes=1,
+                          batch_size=100,
+                          output_file=None):
+    """Evaluate the first-stage solution stored on the root node of
+    the manager's scenario tree over the scenarios in the
+    ScenarioDataStore in the directory scenario_data_store (see
+    ScenarioTreeInstanceFactory.write_scenario_data_store). The
+    scenarios are evaluated in batches by the given number of
+    worker processes, each holding a single scenario instance built
+    from the reference model. The worker processes are forked, so
+    that they inherit the scenario instance factory (this requires a
+    platform that supports fork). If output_file is not None, one
+    row of the form
+    scenario,cost,mean,variance is written to it as each scenario is
+    evaluated, where mean and variance are the running (sample)
+    statistics of the costs. Returns a tuple (count, mean, variance,
+    failures), where failures is the list of scenarios whose solve
+    did not succeed."""
+
+    scenario_tree = manager.scenario_tree
+    if len(scenario_tree.stages) != 2:
+        raise ValueError("Batched xhat evaluation is only supported "
+                         "for two-stage scenario trees")
+    root_node = scenario_tree.findRootNode()
+    xhat = []
+    for variable_id in root_node._standard_variable_ids:
+        name, index = root_node._variable_ids[variable_id]
+        if variable_id not in root_node._solution:
+            raise ValueError(
+                "Scenario tree variable with name %s (scenario_tree_id=%s) "
+                "does not have a solution stored on scenario tree node %s. "
+                "Unable to evaluate solution." % (name+indexToString(index),
+                                                  variable_id,
+                                                  root_node.name))
+        xhat.append((name, index, root_node._solution[variable_id]))
+
+    solver_options = {}
+    if type(manager.get_option("solver_options")) is tuple:
+        solver_options.update(
+            OptSolver._options_string_to_dict(
+                "".join(manager.get_option("solver_options"))))
+    else:
+        solver_options.update(manager.get_option("solver_options"))
+    if manager.get_option("mipgap") is not None:
+        solver_options['mipgap'] = manager.get_option("mipgap")
+
+    store = ScenarioDataStore(scenario_data_store)
+    batches = _scenario_data_store_batches(store, batch_size)
+    worker_args = (scenario_tree._scenario_instance_factory,
+                   scenario_tree,
+                   scenario_tree.scenarios[0].name,
+                   scenario_data_store,
+                   (xhat, manager.get_option("solver")),
+                   {'solver_io': manager.get_option("solver_io"),
+                    'solver_options': solver_options})
+
+    pool = None
+    try:
+        if processes > 1:
+            pool = _create_fork_pool(processes,
+                                     initializer=_init_batch_worker,
+                                     initargs=worker_args)
+            results = pool.imap(_evaluate_batch, batches)
+        else:
+            _init_batch_worker(*worker_args)
+            results = (_evaluate_batch(batch) for batch in batches)
+        return _aggregate_batch_results(results,
+                                        output_file=output_file)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        else:
+            global _batch_evaluator
+            global _batch_evaluator_store
+            if _batch_evaluator is not None:
+                _batch_evaluator.close()
+            _batch_evaluator = None
+            _batch_evaluator_store = None
+
 def run_evaluate_xhat_register_options(options=None):
     if options is None:
         options = PySPConfigBlock()
@@ -135,8 +470,69 @@ def run_evaluate_xhat_register_options(options=None):
             ),
             doc=None,
             visibility=0))
+    safe_register_unique_option(
+        options,
+        "scenario_data_store",
+        PySPConfigValue(
+            None,
+            domain=_domain_must_be_str,
+            description=(
+                "Evaluate the solution over the scenarios in the "
+                "scenario data store in the given directory rather "
+                "than over the scenario tree. The stored parameters "
+                "must be mutable parameters on the reference model. A "
+                "single instance is constructed by each worker and "
+                "solved once per scenario with the first-stage "
+                "variables fixed; when a persistent solver is used, "
+                "only the constraints that reference the parameters "
+                "are updated between scenarios. Only two-stage "
+                "scenario trees are supported."
+            ),
+            doc=None,
+            visibility=0))
+    safe_register_unique_option(
+        options,
+        "evaluation_processes",
+        PySPConfigValue(
+            1,
+            domain=_domain_positive_integer,
+            description=(
+                "The number of worker processes used to evaluate the "
+                "scenarios in the scenario data store (requires a "
+                "platform that supports fork). Default is 1."
+            ),
+            doc=None,
+            visibility=0))
+    safe_register_unique_option(
+        options,
+        "evaluation_batch_size",
+        PySPConfigValue(
+            100,
+            domain=_domain_positive_integer,
+            description=(
+                "The number of scenarios from the scenario data store "
+                "evaluated by a worker process at a time. Default is 100."
+            ),
+            doc=None,
+            visibility=0))
+    safe_register_unique_option(
+        options,
+        "output_evaluation_file",
+        PySPConfigValue(
+            None,
+            domain=_domain_must_be_str,
+            description=(
+                "A CSV file where the cost of each scenario in the "
+                "scenario data store is written as it is evaluated, "
+                "along with the running mean and variance of the "
+                "costs. Each row has the form "
+                "scenario,cost,mean,variance."
+            ),
+            doc=None,
+            visibility=0))
     ScenarioTreeManagerSolverClientSerial.register_options(options)
     ScenarioTreeManagerSolverClientPyro.register_options(options)
+    ScenarioTreeManagerSolverClientMultiprocess.register_options(options)
 
     return options
 
@@ -160,6 +556,8 @@ def run_evaluate_xhat(options,
         manager_class = ScenarioTreeManagerSolverClientSerial
     elif options.scenario_tree_manager == 'pyro':
         manager_class = ScenarioTreeManagerSolverClientPyro
+    elif options.scenario_tree_manager == 'multiprocess':
+        manager_class = ScenarioTreeManagerSolverClientMultiprocess
 
     with manager_class(options) \
          as manager:
@@ -181,6 +579,42 @@ def run_evaluate_xhat(options,
                 "To disable this check use the disable_solution_loader_check "
                 "option flag.")
 
+        if options.scenario_data_store is not None:
+            count, mean, variance, failures = \
+                evaluate_xhat_batched(
+                    manager,
+                    options.scenario_data_store,
+                    processes=options.evaluation_processes,
+                    batch_size=options.evaluation_batch_size,
+                    output_file=options.output_evaluation_file)
+            print("")
+            print("Evaluated %s scenarios from scenario data store %s"
+                  % (count + len(failures), options.scenario_data_store))
+            if len(failures):
+                print("WARNING: Solves failed for %s scenarios: %s"
+                      % (len(failures), ", ".join(failures)))
+            print("")
+            print("***********************************************"
+                  "************************************************")
+            print(">>>THE SAMPLE MEAN OF THE SCENARIO COSTS="
+                  +str(mean)+"<<<")
+            print(">>>THE SAMPLE VARIANCE OF THE SCENARIO COSTS="
+                  +str(variance)+"<<<")
+            print("***********************************************"
+                  "************************************************")
+
+            for plugin in solution_savers:
+                if not plugin.save(manager):
+                    print("WARNING: Saver extension %s call did not return "
+                          "True. This might indicate failure to save data."
+                          % (plugin))
+
+            print("")
+            print("Total execution time=%.2f seconds"
+                  % (time.time() - start_time))
+
+            return 0
+
         evaluate_current_node_solution(manager)
 
         objective = sum(scenario.probability * \
@@ -24,6 +24,12 @@ try:
 except ImportError:
     guppy_available = False
 
+try:
+    import numpy
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
 import pyutilib.common
 
 from pyomo.core import *
@@ -35,6 +41,7 @@ from pyomo.opt import (UndefinedData,
                        TerminationCondition,
                        SolutionStatus,
                        SolverStatus)
+from pyomo.opt.parallel.local import SolverManager_Serial
 from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
 
 import pyomo.pysp.convergence
@@ -57,13 +64,17 @@ from pyomo.pysp.phutils import (create_block_symbol_maps,
                                 preprocess_scenario_instance,
                                 find_active_objective,
                                 canonical_preprocess_block_objectives,
+                                canonical_update_block_objectives,
                                 canonical_preprocess_block_constraints,
                                 ampl_preprocess_block_objectives,
                                 ampl_preprocess_block_constraints,
                                 _OLD_OUTPUT)
 from pyomo.pysp.util.misc import load_external_module
+from pyomo.pysp.scenariotree.bundling import load_scenario_solve_times
 from pyomo.pysp import phsolverserverutils
+from pyomo.pysp import phtimeline
 
+import six
 from six import iterkeys, itervalues, iteritems
 from six.moves import xrange
 
@@ -110,19 +121,25 @@ class ProblemStates(object):
         self.fixed_variables = dict((inst_name,[]) for inst_name in instances)
         self.freed_variables = dict((inst_name,[]) for inst_name in instances)
 
-        # just coefficients modified
+        # objective expression modified
         self.objective_updated = dict.fromkeys(instances, False)
+        # just coefficients modified (i.e., the values of the PH
+        # parameters in the objective)
+        self.objective_coefficients_updated = dict.fromkeys(instances, False)
         self.ph_constraints_updated = dict.fromkeys(instances, False)
         self.user_constraints_updated = dict.fromkeys(instances, False)
 
     def clear_update_flags(self,name=None):
         if name is not None:
             self.objective_updated[name] = False
+            self.objective_coefficients_updated[name] = False
             self.ph_constraints_updated[name] = False
             self.user_constraints_updated[name] = False
         else:
             for key in iterkeys(self.objective_updated):
                 self.objective_updated[key] = False
+            for key in iterkeys(self.objective_coefficients_updated):
+                self.objective_coefficients_updated[key] = False
             for key in iterkeys(self.ph_constraints_updated):
                 self.ph_constraints_updated[key] = False
             for key in iterkeys(self.user_constraints_updated):
@@ -352,6 +369,10 @@ class _PHBase(object):
         # they are forcing an approximation.
         self._linearize_nonbinary_penalty_terms = 0
 
+        # store the scenario tree solution data (xbars, weights, rhos,
+        # etc.) in dense arrays rather than dictionaries?
+        self._compact_scenario_tree_storage = False
+
         # the breakpoint distribution strategy employed when
         # linearizing. 0 implies uniform distribution between the
         # variable lower and upper bounds.
@@ -811,7 +832,8 @@ class _PHBase(object):
             # and weight terms exist
             if self._problem_states.has_ph_objective_weight_terms[scenario._name]:
                 # Flag the preprocessor
-                self._problem_states.objective_updated[scenario._name] = True
+                self._problem_states.\
+                    objective_coefficients_updated[scenario._name] = True
 
     def _push_rho_to_instances(self):
 
@@ -821,7 +843,8 @@ class _PHBase(object):
             # and the proximal terms exist
             if self._problem_states.has_ph_objective_proximal_terms[scenario._name]:
                 # Flag the preprocessor
-                self._problem_states.objective_updated[scenario._name] = True
+                self._problem_states.\
+                    objective_coefficients_updated[scenario._name] = True
 
     def _push_xbar_to_instances(self):
 
@@ -833,7 +856,8 @@ class _PHBase(object):
             # and proximal terms exist
             if self._problem_states.has_ph_objective_proximal_terms[scenario._name]:
                 # Flag the preprocessor
-                self._problem_states.objective_updated[scenario._name] = True
+                self._problem_states.\
+                    objective_coefficients_updated[scenario._name] = True
 
     def _push_fix_queue_to_instances(self):
 
@@ -940,6 +964,8 @@ class _PHBase(object):
                 if subproblems != None and scenario_name not in subproblems:
                     continue
 
+                subproblem_start_time = time.time()
+
                 preprocess_scenario_instance(
                     scenario_instance,
                     self._problem_states.fixed_variables[scenario_name],
@@ -949,13 +975,21 @@ class _PHBase(object):
                     self._problem_states.ph_constraints[scenario_name],
                     self._problem_states.objective_updated[scenario_name],
                     not self._write_fixed_variables,
-                    self._solver)
+                    self._solver,
+                    self._problem_states.\
+                        objective_coefficients_updated[scenario_name])
 
                 # We've preprocessed the instance, reset the relevant flags
                 self._problem_states.clear_update_flags(scenario_name)
                 self._problem_states.clear_fixed_variables(scenario_name)
                 self._problem_states.clear_freed_variables(scenario_name)
 
+                self._record_timeline_event(phtimeline.MODEL_UPDATE,
+                                            "preprocess",
+                                            subproblem_start_time,
+                                            time.time(),
+                                            subproblem=scenario_name)
+
         else:
 
             for scenario_bundle_name, bundle_ef_instance in iteritems(
@@ -964,8 +998,11 @@ class _PHBase(object):
                 if subproblems != None and scenario_bundle_name not in subproblems:
                     continue
 
+                subproblem_start_time = time.time()
+
                 # Until proven otherwise
                 preprocess_bundle_objective = False
+                update_bundle_objective = False
                 preprocess_bundle_constraints = False
 
                 for scenario_name in \
@@ -976,9 +1013,14 @@ class _PHBase(object):
                     freed_vars = self._problem_states.freed_variables[scenario_name]
                     objective_updated = \
                         self._problem_states.objective_updated[scenario_name]
+                    objective_coefficients_updated = \
+                        self._problem_states.\
+                        objective_coefficients_updated[scenario_name]
 
                     if objective_updated:
                         preprocess_bundle_objective = True
+                    if objective_coefficients_updated:
+                        update_bundle_objective = True
                     # TODO
                     """
                     if (fixed_vars or freed_vars) and \
@@ -988,6 +1030,14 @@ class _PHBase(object):
                        (not self._write_fixed_variables):
                         preprocess_bundle_objective = True
                         preprocess_bundle_constraints = True
+                    elif (len(fixed_vars) > 0 or len(freed_vars) > 0) and \
+                         hasattr(bundle_ef_instance,
+                                 "_parameterized_canonical_repn"):
+                        # the terms of the parameterized representation
+                        # of the bundle objective depend on which
+                        # variables are fixed
+                        bundle_ef_instance.\
+                            _parameterized_canonical_repn.clear()
 
                     preprocess_scenario_instance(
                         scenario_instance,
@@ -999,7 +1049,8 @@ class _PHBase(object):
                         self._problem_states.ph_constraints[scenario_name],
                         objective_updated,
                         not self._write_fixed_variables,
-                        self._solver)
+                        self._solver,
+                        objective_coefficients_updated)
 
                     # We've preprocessed the instance, reset the relevant flags
                     self._problem_states.clear_update_flags(scenario_name)
@@ -1008,7 +1059,7 @@ class _PHBase(object):
 
                 if self._solver.problem_format == ProblemFormat.nl:
                     var_id_map = {}
-                    if preprocess_bundle_objective:
+                    if preprocess_bundle_objective or update_bundle_objective:
                         ampl_preprocess_block_objectives(bundle_ef_instance,
                                                          var_id_map)
                     if preprocess_bundle_constraints:
@@ -1019,9 +1070,20 @@ class _PHBase(object):
                     if preprocess_bundle_objective:
                         canonical_preprocess_block_objectives(bundle_ef_instance,
                                                               var_id_map)
+                    elif update_bundle_objective:
+                        # only the values of the PH parameters changed
+                        canonical_update_block_objectives(bundle_ef_instance,
+                                                          var_id_map)
                     if preprocess_bundle_constraints:
                         canonical_preprocess_block_constraints(bundle_ef_instance,
                                                                var_id_map)
+
+                self._record_timeline_event(phtimeline.MODEL_UPDATE,
+                                            "preprocess",
+                                            subproblem_start_time,
+                                            time.time(),
+                                            subproblem=scenario_bundle_name)
+
         end_time = time.time()
 
         if self._output_times:
@@ -1433,7 +1495,10 @@ class ProgressiveHedging(_PHBase):
                       pyomo.solvers.plugins.smanager.\
                       phpyro.SolverManager_PHPyro):
 
-            phsolverserverutils.transmit_weights(self)
+            if self._phpyro_batch_updates:
+                phsolverserverutils.defer_update(self, "load_weights")
+            else:
+                phsolverserverutils.transmit_weights(self)
 
         else:
 
@@ -1445,7 +1510,10 @@ class ProgressiveHedging(_PHBase):
                       pyomo.solvers.plugins.smanager.\
                       phpyro.SolverManager_PHPyro):
 
-            phsolverserverutils.transmit_rhos(self)
+            if self._phpyro_batch_updates:
+                phsolverserverutils.defer_update(self, "load_rhos")
+            else:
+                phsolverserverutils.transmit_rhos(self)
 
         else:
 
@@ -1457,7 +1525,10 @@ class ProgressiveHedging(_PHBase):
                       pyomo.solvers.plugins.smanager.\
                       phpyro.SolverManager_PHPyro):
 
-            phsolverserverutils.transmit_xbars(self)
+            if self._phpyro_batch_updates:
+                phsolverserverutils.defer_update(self, "load_xbars")
+            else:
+                phsolverserverutils.transmit_xbars(self)
 
         else:
 
@@ -1469,7 +1540,11 @@ class ProgressiveHedging(_PHBase):
                       pyomo.solvers.plugins.smanager.\
                       phpyro.SolverManager_PHPyro):
 
-            phsolverserverutils.transmit_fixed_variables(self)
+            if self._phpyro_batch_updates:
+                phsolverserverutils.defer_update(self,
+                                                 "update_fixed_variables")
+            else:
+                phsolverserverutils.transmit_fixed_variables(self)
             for tree_node in self._scenario_tree._tree_nodes:
                 # Note: If the scenario tree doesn't not have
                 #       instances linked in this method will simply
@@ -1708,7 +1783,8 @@ class ProgressiveHedging(_PHBase):
                     phsolverserverutils.TransmitType.all_stages | \
                     phsolverserverutils.TransmitType.blended | \
                     phsolverserverutils.TransmitType.derived | \
-                    phsolverserverutils.TransmitType.fixed)
+                    phsolverserverutils.TransmitType.fixed | \
+                    self._phpyro_result_encoding_flags)
 
             # unfix
             assert ph_bound_base._stack[-1][0] == \
@@ -1766,6 +1842,10 @@ class ProgressiveHedging(_PHBase):
 
         self._phpyro_worker_jobs_map = {}
         self._phpyro_job_worker_map = {}
+        # Maps bundle (or scenario) names to the updates that have
+        # not yet been sent to the corresponding PH solver server
+        # (only used when batching updates).
+        self._phpyro_deferred_updates = {}
         # Helps to gracefully exit PH when a system exit is caught.
         # Holds the set of queued solve action handles that have not
         # been collected yet.
@@ -1811,7 +1891,13 @@ class ProgressiveHedging(_PHBase):
         self._phpyro_variable_transmission_flags = \
             phsolverserverutils.TransmitType.nonleaf_stages | \
             phsolverserverutils.TransmitType.derived | \
-            phsolverserverutils.TransmitType.blended
+            phsolverserverutils.TransmitType.blended | \
+            phsolverserverutils.TransmitType.packed
+        # Defines how phsolverserver results are encoded. Variable
+        # values are always packed into binary arrays, and the
+        # results can additionally be compressed with zlib.
+        self._phpyro_result_encoding_flags = \
+            phsolverserverutils.TransmitType.packed
 
         self._ph_warmstart_file = None
         self._ph_warmstart_index = None
@@ -1836,6 +1922,7 @@ class ProgressiveHedging(_PHBase):
         self._max_iterations = 0
         self._async = False
         self._async_buffer_length = 1
+        self._async_staleness_bound = None
 
         # it may be the case that some plugins think they can do a
         # better job of weight updates than PH - and it might even be
@@ -1887,6 +1974,7 @@ class ProgressiveHedging(_PHBase):
 
         # options for writing solver files / logging / etc.
         self._keep_solver_files = False
+        self._solver_tempdir = None
         self._symbolic_solver_labels = False
         self._output_solver_log = False
 
@@ -1910,6 +1998,14 @@ class ProgressiveHedging(_PHBase):
         self._cumulative_xbar_time = 0.0
         # seconds, over course of update_weights()
         self._cumulative_weight_time = 0.0
+        # the name of the file to which a timeline of the solve is
+        # written (in the Chrome trace event format), and the
+        # PHTimeline collecting the events. None indicates disabled.
+        self._timeline_file = None
+        self._timeline = None
+        # maps the name of each sub-problem queued while the timeline
+        # is enabled -> (queue start time, dispatch time)
+        self._subproblem_dispatch_times = {}
 
         # do I disable warm-start for scenario sub-problem solves
         # during PH iterations >= 1?
@@ -1933,6 +2029,7 @@ class ProgressiveHedging(_PHBase):
         self._nu                                  = options.nu
         self._async                               = options.async
         self._async_buffer_length                 = options.async_buffer_length
+        self._async_staleness_bound               = options.async_staleness_bound
         self._rho                                 = options.default_rho
         self._rho_setter_file                     = options.rho_cfgfile
         self._xhat_method                         = options.xhat_method
@@ -1946,6 +2043,7 @@ class ProgressiveHedging(_PHBase):
         self._mipgap                              = options.scenario_mipgap
         self._write_fixed_variables               = options.write_fixed_variables
         self._keep_solver_files                   = options.keep_solver_files
+        self._solver_tempdir                      = options.solver_tempdir
         self._symbolic_solver_labels              = options.symbolic_solver_labels
         self._output_solver_results               = options.output_solver_results
         self._output_solver_log                   = options.output_solver_log
@@ -1965,6 +2063,8 @@ class ProgressiveHedging(_PHBase):
         self._breakpoint_strategy                 = options.breakpoint_strategy
         self._output_scenario_tree_solution       = options.output_scenario_tree_solution
         self._phpyro_transmit_leaf_stage_solution = options.phpyro_transmit_leaf_stage_solution
+        self._phpyro_batch_updates                = options.phpyro_batch_updates
+        self._phpyro_compress_results             = options.phpyro_compress_results
 
         self._termdiff_threshold                     = options.termdiff_threshold
         self._enable_free_discrete_count_convergence = options.enable_free_discrete_count_convergence
@@ -1991,6 +2091,11 @@ class ProgressiveHedging(_PHBase):
         if self._phpyro_transmit_leaf_stage_solution:
             self._phpyro_variable_transmission_flags |= \
                 phsolverserverutils.TransmitType.all_stages
+        if self._phpyro_compress_results:
+            self._phpyro_result_encoding_flags |= \
+                phsolverserverutils.TransmitType.compressed
+            self._phpyro_variable_transmission_flags |= \
+                phsolverserverutils.TransmitType.compressed
 
         # Note: Default rho has become a required ph input. At this
         #       point it seems more natural to make the "-r" or
@@ -2031,6 +2136,16 @@ class ProgressiveHedging(_PHBase):
         self._scenario_bundle_specification = options.scenario_bundle_specification
         self._create_random_bundles = options.create_random_bundles
         self._scenario_tree_random_seed = options.scenario_tree_random_seed
+        # the solve times are sent to the ph solver servers rather
+        # than the file name, so they form the same bundles even if
+        # the file changes (e.g., a history file written by this run)
+        self._bundle_solve_times = getattr(options, "bundle_solve_times", None)
+        if isinstance(self._bundle_solve_times, six.string_types):
+            self._bundle_solve_times = \
+                load_scenario_solve_times(self._bundle_solve_times)
+        self._compact_scenario_tree_storage = \
+            getattr(options, "compact_scenario_tree_storage", False)
+        self._timeline_file = getattr(options, "output_timeline", None)
 
         # validate all "atomic" options (those that can be validated independently)
         if self._max_iterations < 0:
@@ -2139,6 +2254,7 @@ class ProgressiveHedging(_PHBase):
             print("   Max iterations="+str(self._max_iterations))
             print("   Async mode=" + str(self._async))
             print("   Async buffer length=" + str(self._async_buffer_length))
+            print("   Async staleness bound=" + str(self._async_staleness_bound))
             print("   Default global rho=" + str(self._rho))
             print("   Over-relaxation enabled="+str(self._overrelax))
             if self._overrelax:
@@ -2555,6 +2671,12 @@ class ProgressiveHedging(_PHBase):
             if self._verbose:
                 print("Scenario tree ids successfully sent")
 
+        if self._compact_scenario_tree_storage:
+            num_compacted = self._scenario_tree.compact_solution_data()
+            if self._verbose:
+                print("Stored the solution data for %d scenario tree "
+                      "nodes in compact arrays" % (num_compacted))
+
         self._objective_sense = \
             self._scenario_tree._scenarios[0]._objective_sense
 
@@ -2592,13 +2714,15 @@ class ProgressiveHedging(_PHBase):
                       "term diff criterion, as opposed to the normalized variant")
             converger = \
                 (pyomo.pysp.convergence.TermDiffConvergence(
-                    convergence_threshold=self._termdiff_threshold))
+                    convergence_threshold=self._termdiff_threshold,
+                    incremental=self._async))
             self._convergers.append(converger)
 
         if self._enable_normalized_termdiff_convergence and not self._enable_termdiff_convergence:
             converger = \
                 (pyomo.pysp.convergence.NormalizedTermDiffConvergence(
-                    convergence_threshold=self._termdiff_threshold))
+                    convergence_threshold=self._termdiff_threshold,
+                    incremental=self._async))
             self._convergers.append(converger)
 
         if self._enable_primal_dual_residual_convergence:
@@ -2606,7 +2730,8 @@ class ProgressiveHedging(_PHBase):
                 print("Enabling convergence based on primal-dual residual criterion")
             self._convergers.append(
                 pyomo.pysp.convergence.PrimalDualResidualConvergence(
-                    convergence_threshold=self._primal_dual_residual_convergence_threshold))
+                    convergence_threshold=self._primal_dual_residual_convergence_threshold,
+                    incremental=self._async))
 
         # indicate that we're ready to run.
         self._initialized = True
@@ -2735,6 +2860,8 @@ class ProgressiveHedging(_PHBase):
             common_kwds['variable_transmission'] = \
                 self._phpyro_variable_transmission_flags
             common_kwds['load_solutions'] = False
+        elif self._solver_tempdir is not None:
+            common_kwds['tempdir'] = self._solver_tempdir
 
         # we always rely on ourselves to load solutions - we control
         # the error checking and such.
@@ -2754,18 +2881,33 @@ class ProgressiveHedging(_PHBase):
                     print("Queuing solve for scenario bundle=%s"
                           % (scenario_bundle._name))
 
+                queue_start_time = time.time()
+
                 # and queue it up for solution - have to worry about
                 # warm-starting here.
                 new_action_handle = None
                 if isinstance(self._solver_manager,
                               pyomo.solvers.plugins.smanager.\
                               phpyro.SolverManager_PHPyro):
-                    new_action_handle = \
-                        self._solver_manager.queue(
-                            action="solve",
-                            queue_name=self._phpyro_job_worker_map[scenario_bundle._name],
-                            name=scenario_bundle._name,
-                            **common_kwds)
+                    # send any deferred updates along with the
+                    # solve request
+                    tasks = phsolverserverutils.collect_deferred_updates(
+                        self, scenario_bundle._name)
+                    if len(tasks):
+                        tasks.append(dict(action="solve", **common_kwds))
+                        new_action_handle = \
+                            self._solver_manager.queue(
+                                action="batch",
+                                queue_name=self._phpyro_job_worker_map[scenario_bundle._name],
+                                name=scenario_bundle._name,
+                                tasks=tasks)
+                    else:
+                        new_action_handle = \
+                            self._solver_manager.queue(
+                                action="solve",
+                                queue_name=self._phpyro_job_worker_map[scenario_bundle._name],
+                                name=scenario_bundle._name,
+                                **common_kwds)
                 else:
 
                     if (self._output_times is True) and (self._verbose is False):
@@ -2792,6 +2934,9 @@ class ProgressiveHedging(_PHBase):
                 action_handle_bundle_map[new_action_handle] = scenario_bundle._name
                 self._queued_solve_action_handles.add(new_action_handle)
 
+                self._record_subproblem_queued(scenario_bundle._name,
+                                               queue_start_time)
+
         else:
 
             for scenario in self._scenario_tree._scenarios:
@@ -2801,6 +2946,8 @@ class ProgressiveHedging(_PHBase):
                 if self._verbose:
                     print("Queuing solve for scenario=%s" % (scenario._name))
 
+                queue_start_time = time.time()
+
                 # once past iteration 0, there is always a feasible
                 # solution from which to warm-start.  however, you
                 # might want to disable warm-start when the solver is
@@ -2810,12 +2957,25 @@ class ProgressiveHedging(_PHBase):
                               pyomo.solvers.plugins.smanager.\
                               phpyro.SolverManager_PHPyro):
 
-                    new_action_handle = \
-                        self._solver_manager.queue(
-                            action="solve",
-                            queue_name=self._phpyro_job_worker_map[scenario._name],
-                            name=scenario._name,
-                            **common_kwds)
+                    # send any deferred updates along with the
+                    # solve request
+                    tasks = phsolverserverutils.collect_deferred_updates(
+                        self, scenario._name)
+                    if len(tasks):
+                        tasks.append(dict(action="solve", **common_kwds))
+                        new_action_handle = \
+                            self._solver_manager.queue(
+                                action="batch",
+                                queue_name=self._phpyro_job_worker_map[scenario._name],
+                                name=scenario._name,
+                                tasks=tasks)
+                    else:
+                        new_action_handle = \
+                            self._solver_manager.queue(
+                                action="solve",
+                                queue_name=self._phpyro_job_worker_map[scenario._name],
+                                name=scenario._name,
+                                **common_kwds)
 
                 else:
 
@@ -2860,10 +3020,22 @@ class ProgressiveHedging(_PHBase):
                 action_handle_scenario_map[new_action_handle] = scenario._name
                 self._queued_solve_action_handles.add(new_action_handle)
 
+                self._record_subproblem_queued(scenario._name,
+                                               queue_start_time)
+
         if isinstance(self._solver_manager,
                       pyomo.solvers.plugins.smanager.\
                       phpyro.SolverManager_PHPyro):
             self._solver_manager.end_bulk()
+            # the requests are not sent to the workers until the end
+            # of the bulk dispatch
+            dispatch_time = time.time()
+            for name in subproblems:
+                if name in self._subproblem_dispatch_times:
+                    queue_start_time, _ = \
+                        self._subproblem_dispatch_times[name]
+                    self._subproblem_dispatch_times[name] = \
+                        (queue_start_time, dispatch_time)
 
         return action_handle_scenario_map, \
                scenario_action_handle_map, \
@@ -2898,6 +3070,8 @@ class ProgressiveHedging(_PHBase):
                 action_handle = self._solver_manager.wait_any()
                 bundle_results = \
                     self._solver_manager.get_results(action_handle)
+                result_time = time.time()
+                worker_model_update_time = None
 
                 # there are cases, if the dispatchers and name servers are not
                 # correctly configured, in which you may get an action handle
@@ -2929,6 +3103,9 @@ class ProgressiveHedging(_PHBase):
                               pyomo.solvers.plugins.smanager.phpyro.\
                               SolverManager_PHPyro):
 
+                    bundle_results = \
+                        phsolverserverutils.decompress_result(bundle_results)
+
                     if len(bundle_results) == 0:
                         failures.append(bundle_name)
                         continue
@@ -2938,11 +3115,15 @@ class ProgressiveHedging(_PHBase):
                     for scenario_name, scenario_solution in \
                                       iteritems(bundle_results[0]):
                         scenario = self._scenario_tree._scenario_map[scenario_name]
-                        scenario.set_solution(scenario_solution)
+                        scenario.set_solution(
+                            phsolverserverutils.unpack_solution(
+                                scenario_solution))
 
                     auxilliary_values = bundle_results[2]
                     if "gap" in auxilliary_values:
                         self._gaps[bundle_name] = auxilliary_values["gap"]
+                    worker_model_update_time = \
+                        auxilliary_values.get("preprocess_time")
 
                     self._solution_status[bundle_name] = \
                         getattr(SolutionStatus, auxilliary_values["solution_status"])
@@ -3046,6 +3227,12 @@ class ProgressiveHedging(_PHBase):
                         print("Time loading results for bundle %s=%0.2f seconds"
                               % (bundle_name, end_time-start_time))
 
+                self._record_subproblem_solved(bundle_name,
+                                               result_time,
+                                               start_time,
+                                               end_time,
+                                               worker_model_update_time)
+
                 if self._verbose:
                     print("Successfully loaded solution for bundle=%s"
                           % (bundle_name))
@@ -3061,6 +3248,8 @@ class ProgressiveHedging(_PHBase):
 
                 action_handle = self._solver_manager.wait_any()
                 results = self._solver_manager.get_results(action_handle)
+                result_time = time.time()
+                worker_model_update_time = None
                 # there are cases, if the dispatchers and name servers are not
                 # correctly configured, in which you may get an action handle
                 # that you didn't expect. in this case, punt with a sane
@@ -3093,6 +3282,9 @@ class ProgressiveHedging(_PHBase):
                               pyomo.solvers.plugins.smanager.\
                               phpyro.SolverManager_PHPyro):
 
+                    results = \
+                        phsolverserverutils.decompress_result(results)
+
                     if len(results) == 0:
                         failures.append(scenario_name)
                         continue
@@ -3109,11 +3301,14 @@ class ProgressiveHedging(_PHBase):
                     # results[0] are variable values
                     # results[1] are suffix values
                     # results[2] are auxilliary values
-                    scenario.set_solution(results[0])
+                    scenario.set_solution(
+                        phsolverserverutils.unpack_solution(results[0]))
 
                     auxilliary_values = results[2]
                     if "gap" in auxilliary_values:
                         self._gaps[scenario_name] = auxilliary_values["gap"]
+                    worker_model_update_time = \
+                        auxilliary_values.get("preprocess_time")
 
                     self._solution_status[scenario_name] = \
                         getattr(SolutionStatus, auxilliary_values["solution_status"])
@@ -3217,6 +3412,12 @@ class ProgressiveHedging(_PHBase):
                         print("Time loading results into instance %s=%0.2f seconds"
                               % (scenario_name, end_time-start_time))
 
+                self._record_subproblem_solved(scenario_name,
+                                               result_time,
+                                               start_time,
+                                               end_time,
+                                               worker_model_update_time)
+
                 if self._verbose:
                     print("Successfully loaded solution for scenario=%s "
                           "- waiting on %d more"
@@ -3225,6 +3426,79 @@ class ProgressiveHedging(_PHBase):
 
         return subproblems, failures
 
+    #
+    # utilities for recording timeline events (no-ops unless the
+    # timeline is enabled).
+    #
+
+    def _record_timeline_event(self, name, category, start_time, end_time, **kwds):
+        if self._timeline is not None:
+            self._timeline.add_event(name,
+                                     category,
+                                     start_time,
+                                     end_time,
+                                     iteration=self._current_iteration,
+                                     **kwds)
+
+    def _record_subproblem_queued(self, name, queue_start_time):
+        if self._timeline is None:
+            return
+        queue_end_time = time.time()
+        self._record_timeline_event(phtimeline.QUEUE,
+                                    "queue",
+                                    queue_start_time,
+                                    queue_end_time,
+                                    subproblem=name)
+        self._subproblem_dispatch_times[name] = \
+            (queue_start_time, queue_end_time)
+
+    def _record_subproblem_solved(self,
+                                  name,
+                                  result_time,
+                                  load_start_time,
+                                  load_end_time,
+                                  worker_model_update_time):
+        if self._timeline is None:
+            return
+        queue_start_time, dispatch_time = \
+            self._subproblem_dispatch_times.pop(name)
+        serial = isinstance(self._solver_manager, SolverManager_Serial)
+        if serial:
+            # the serial solver manager solves the sub-problem
+            # when it is queued
+            worker = "serial"
+            queue_time = queue_start_time
+            result_time = dispatch_time
+        elif isinstance(self._solver_manager,
+                        pyomo.solvers.plugins.smanager.\
+                        phpyro.SolverManager_PHPyro):
+            worker = self._phpyro_job_worker_map[name]
+            queue_time = dispatch_time
+        else:
+            worker = None
+            queue_time = dispatch_time
+        solver_time = self._solve_times.get(name)
+        if isinstance(solver_time, UndefinedData):
+            solver_time = None
+        pyomo_solve_time = self._pyomo_solve_times.get(name)
+        if isinstance(pyomo_solve_time, UndefinedData):
+            pyomo_solve_time = None
+        self._timeline.add_subproblem_event(
+            self._current_iteration,
+            name,
+            worker,
+            queue_time,
+            result_time,
+            solver_time=solver_time,
+            pyomo_solve_time=pyomo_solve_time,
+            model_update_time=worker_model_update_time,
+            serial=serial)
+        self._record_timeline_event(phtimeline.LOAD_RESULTS,
+                                    "load",
+                                    load_start_time,
+                                    load_end_time,
+                                    subproblem=name)
+
     #
     # Transmits Solver Options, Queues Solves, and Collects/Loads
     # Results... nothing more. All subproblems are expected to be
@@ -3397,6 +3671,10 @@ class ProgressiveHedging(_PHBase):
 
             for tree_node in stage._tree_nodes:
 
+                if numpy_available:
+                    self._update_node_variable_statistics(tree_node)
+                    continue
+
                 xbars = tree_node._xbars
 
                 scenario_solutions = \
@@ -3432,10 +3710,61 @@ class ProgressiveHedging(_PHBase):
 
         end_time = time.time()
         self._cumulative_xbar_time += (end_time - start_time)
+        self._record_timeline_event(phtimeline.UPDATE_STATISTICS,
+                                    "ph",
+                                    start_time,
+                                    end_time)
 
         if self._output_times:
             print("Variable statistics compute time=%.2f seconds" % (end_time - start_time))
 
+    #
+    # the array-based equivalent of the update_variable_statistics
+    # loop body for a single tree node. the scenario solutions are
+    # gathered into a (scenarios x variables) array, using the fixed
+    # variable ordering of the tree node, and the statistics are
+    # written back into the node dictionaries in bulk.
+    #
+
+    def _update_node_variable_statistics(self, tree_node):
+
+        variable_ids = tree_node.get_standard_variable_id_order()
+        if len(variable_ids) == 0:
+            return
+        probabilities = numpy.array([scenario._probability
+                                     for scenario in tree_node._scenarios])
+        values = tree_node.get_scenario_array("_x", variable_ids)
+
+        # a variable is only updated if every scenario reported a value
+        # for it
+        current = ~numpy.isnan(values).any(axis=0)
+        if not current.all():
+            variable_ids = [variable_id for variable_id, flag
+                            in zip(variable_ids, current) if flag]
+            values = values[:, current]
+            if len(variable_ids) == 0:
+                return
+
+        # accumulate over the scenarios in order, as the loop does
+        averages = (probabilities[:, None] * values).sum(axis=0) / \
+                   tree_node._probability
+        tree_node._minimums.update(zip(variable_ids,
+                                       values.min(axis=0).tolist()))
+        tree_node._maximums.update(zip(variable_ids,
+                                       values.max(axis=0).tolist()))
+
+        if self._ph_xbar_updates_enabled:
+            if (self._overrelax) and (self._current_iteration >= 1):
+                previous_averages = numpy.array(
+                    list(map(tree_node._averages.__getitem__, variable_ids)),
+                    dtype=float)
+                xbars = self._nu*averages + (1-self._nu)*previous_averages
+            else:
+                xbars = averages
+            tree_node._xbars.update(zip(variable_ids, xbars.tolist()))
+
+        tree_node._averages.update(zip(variable_ids, averages.tolist()))
+
     def update_weights(self):
 
         start_time = time.time()
@@ -3474,8 +3803,16 @@ class ProgressiveHedging(_PHBase):
                 blend_values = tree_node._blend
 
                 # These will be updated inside this loop
-                tree_node_wbars = tree_node._wbars = \
-                    dict((var_id,0) for var_id in tree_node._variable_ids)
+                # (reset in place, as the dictionary may be a view
+                # onto compact storage)
+                tree_node_wbars = tree_node._wbars
+                tree_node_wbars.clear()
+                tree_node_wbars.update((var_id,0) for var_id
+                                       in tree_node._variable_ids)
+
+                if numpy_available:
+                    self._update_node_weights(tree_node, tree_node_xbars)
+                    continue
 
                 for scenario in tree_node._scenarios:
 
@@ -3540,10 +3877,73 @@ class ProgressiveHedging(_PHBase):
 
         end_time = time.time()
         self._cumulative_weight_time += (end_time - start_time)
+        self._record_timeline_event(phtimeline.UPDATE_WEIGHTS,
+                                    "ph",
+                                    start_time,
+                                    end_time)
 
         if self._output_times:
             print("Weight update time=%.2f seconds" % (end_time - start_time))
 
+    #
+    # the array-based equivalent of the update_weights loop body for a
+    # single tree node. weights are only updated for the scenario
+    # variables with a current value, and the wbars are accumulated
+    # over those entries.
+    #
+
+    def _update_node_weights(self, tree_node, tree_node_xbars):
+
+        variable_ids = tree_node.get_standard_variable_id_order()
+        if len(variable_ids) == 0:
+            return
+        scenarios = tree_node._scenarios
+        probabilities = numpy.array([scenario._probability
+                                     for scenario in scenarios])
+
+        values = tree_node.get_scenario_array("_x", variable_ids)
+        rhos = tree_node.get_scenario_array("_rho", variable_ids)
+        weights = tree_node.get_scenario_array("_w", variable_ids)
+        xbars = numpy.array(list(map(tree_node_xbars.__getitem__,
+                                     variable_ids)),
+                            dtype=float)
+        blends = numpy.array(list(map(tree_node._blend.__getitem__,
+                                      variable_ids)),
+                             dtype=float)
+        current = ~numpy.isnan(values)
+
+        nu_value = 1.0
+        if self._overrelax:
+            nu_value = self._nu
+
+        updates = blends * rhos * nu_value * (values - xbars)
+        if not self._dual_mode:
+            if self._objective_sense == minimize:
+                weights = numpy.where(current, weights + updates, weights)
+            else:
+                weights = numpy.where(current, weights - updates, weights)
+        else:
+            # **Adding these asserts simply because we haven't thought
+            # **about what this means for other steps in the code
+            assert (blends[current.any(axis=0)] == 1.0).all()
+            assert nu_value == 1.0
+            assert self._objective_sense == minimize
+            weights = numpy.where(current, updates, weights)
+
+        for i, scenario in enumerate(scenarios):
+            weight_values = scenario._w[tree_node._name]
+            row = weights[i].tolist()
+            if current[i].all():
+                weight_values.update(zip(variable_ids, row))
+            else:
+                weight_values.update((variable_ids[j], row[j])
+                                     for j in numpy.flatnonzero(current[i]))
+
+        wbars = (probabilities[:, None] *
+                 numpy.where(current, weights, 0.0) /
+                 tree_node._probability).sum(axis=0)
+        tree_node._wbars.update(zip(variable_ids, wbars.tolist()))
+
     def update_weights_for_scenario(self, scenario):
 
         start_time = time.time()
@@ -3615,6 +4015,11 @@ class ProgressiveHedging(_PHBase):
 
         end_time = time.time()
         self._cumulative_weight_time += (end_time - start_time)
+        self._record_timeline_event(phtimeline.UPDATE_WEIGHTS,
+                                    "ph",
+                                    start_time,
+                                    end_time,
+                                    subproblem=scenario._name)
 
     def iteration_k_solves(self):
 
@@ -3648,7 +4053,11 @@ class ProgressiveHedging(_PHBase):
             # servers, so don't want the time.
             if (self._linearize_nonbinary_penalty_terms > 0) or \
                (self._scenario_tree.contains_bundles()):
-                phsolverserverutils.transmit_tree_node_statistics(self)
+                if self._phpyro_batch_updates:
+                    phsolverserverutils.defer_update(self,
+                                                     "load_tree_node_stats")
+                else:
+                    phsolverserverutils.transmit_tree_node_statistics(self)
 
         else:
 
@@ -3687,8 +4096,514 @@ class ProgressiveHedging(_PHBase):
 
         return failures
 
+    #
+    # the node averages (and xbars) are maintained incrementally
+    # during asynchronous PH. the scenario solution values most
+    # recently included in the averages are retained, so that the
+    # averages can be updated by the difference between the new and
+    # the previous solution of a scenario when it is solved. when
+    # over-relaxing, the xbars are relaxed toward the averages of the
+    # last reportable iteration (as update_variable_statistics relaxes
+    # them toward the averages of the previous iteration), so those
+    # averages are retained as well.
+    #
+
+    def _initialize_incremental_variable_statistics(self):
+
+        self._async_node_contributions = {}
+        self._async_previous_averages = {}
+        for stage in self._scenario_tree._stages[:-1]:
+            for tree_node in stage._tree_nodes:
+                self._async_previous_averages[tree_node._name] = \
+                    dict(tree_node._averages)
+                variable_ids = tree_node._standard_variable_ids
+                self._async_node_contributions[tree_node._name] = \
+                    dict((scenario._name,
+                          dict((variable_id,
+                                scenario._x[tree_node._name][variable_id])
+                               for variable_id in variable_ids))
+                         for scenario in tree_node._scenarios)
+
+    def _update_variable_statistics_for_scenario(self, scenario):
+
+        start_time = time.time()
+
+        for tree_node in scenario._node_list[:-1]:
+
+            contributions = self._async_node_contributions[tree_node._name]
+            previous_averages = \
+                self._async_previous_averages[tree_node._name]
+            previous_values = contributions[scenario._name]
+            var_values = scenario._x[tree_node._name]
+            averages = tree_node._averages
+            xbars = tree_node._xbars
+            relative_probability = \
+                scenario._probability / tree_node._probability
+
+            for variable_id in tree_node._standard_variable_ids:
+
+                varval = var_values[variable_id]
+                previous_varval = previous_values[variable_id]
+                previous_values[variable_id] = varval
+                previous_avg_value = averages.get(variable_id)
+
+                if (varval is not None) and \
+                   (previous_varval is not None) and \
+                   (previous_avg_value is not None):
+                    avg_value = previous_avg_value + \
+                                relative_probability * \
+                                (varval - previous_varval)
+                else:
+                    # as in update_variable_statistics, the average is
+                    # not updated unless every scenario has a value
+                    avg_value = 0.0
+                    for node_scenario in tree_node._scenarios:
+                        val = contributions[node_scenario._name][variable_id]
+                        if val is None:
+                            avg_value = None
+                            break
+                        avg_value += node_scenario._probability * val
+                    if avg_value is None:
+                        continue
+                    avg_value /= tree_node._probability
+
+                if self._ph_xbar_updates_enabled:
+                    xbars[variable_id] = self._relax_incremental_average(
+                        avg_value,
+                        previous_averages.get(variable_id))
+
+                averages[variable_id] = avg_value
+
+        end_time = time.time()
+        self._cumulative_xbar_time += (end_time - start_time)
+        self._record_timeline_event(phtimeline.UPDATE_STATISTICS,
+                                    "ph",
+                                    start_time,
+                                    end_time)
+
+    #
+    # recomputes the node averages from the retained scenario
+    # solutions (removing any accumulated round-off from the
+    # incremental updates), along with the node minimums and
+    # maximums, which are not maintained incrementally. this is
+    # called once per reportable iteration, so the averages computed
+    # here become the ones that later xbars are relaxed toward.
+    #
+
+    def _refresh_incremental_variable_statistics(self):
+
+        start_time = time.time()
+
+        for node_name, contributions in iteritems(self._async_node_contributions):
+
+            tree_node = self._scenario_tree._tree_node_map[node_name]
+            previous_averages = self._async_previous_averages[node_name]
+            scenario_solutions = \
+                [(scenario._probability, contributions[scenario._name]) \
+                 for scenario in tree_node._scenarios]
+
+            for variable_id in tree_node._standard_variable_ids:
+
+                values = [var_values[variable_id]
+                          for probability, var_values in scenario_solutions]
+                if any(val is None for val in values):
+                    continue
+
+                avg_value = sum(probability * var_values[variable_id]
+                                for probability, var_values
+                                in scenario_solutions)
+                avg_value /= tree_node._probability
+                tree_node._minimums[variable_id] = min(values)
+                tree_node._maximums[variable_id] = max(values)
+                if self._ph_xbar_updates_enabled:
+                    tree_node._xbars[variable_id] = \
+                        self._relax_incremental_average(
+                            avg_value,
+                            previous_averages.get(variable_id))
+                tree_node._averages[variable_id] = avg_value
+                previous_averages[variable_id] = avg_value
+
+        end_time = time.time()
+        self._cumulative_xbar_time += (end_time - start_time)
+        self._record_timeline_event(phtimeline.UPDATE_STATISTICS,
+                                    "ph",
+                                    start_time,
+                                    end_time)
+
+    def _relax_incremental_average(self, avg_value, previous_avg_value):
+
+        # the previous averages are those of iteration 0 (or later)
+        # once async PH has started, so - unlike in
+        # update_variable_statistics - the iteration count need not
+        # be checked
+        if self._overrelax and (previous_avg_value is not None):
+            return self._nu*avg_value + (1-self._nu)*previous_avg_value
+        return avg_value
+
+    #
+    # updates the xbar and weight parameters for the named scenarios,
+    # ahead of queuing new solves for them. the other scenarios are
+    # left alone, as they may have solves in progress.
+    #
+
+    def _push_async_parameters_to_instances(self, scenario_names):
+
+        if isinstance(self._solver_manager,
+                      pyomo.solvers.plugins.smanager.\
+                      phpyro.SolverManager_PHPyro):
+
+            # these are sent along with the solve requests
+            phsolverserverutils.defer_update(self,
+                                             "load_xbars",
+                                             object_names=scenario_names)
+            phsolverserverutils.defer_update(self,
+                                             "load_weights",
+                                             object_names=scenario_names)
+            if self._linearize_nonbinary_penalty_terms > 0:
+                phsolverserverutils.defer_update(self,
+                                                 "load_tree_node_stats",
+                                                 object_names=scenario_names)
+
+        else:
+
+            tree_nodes_pushed = set()
+            for scenario_name in scenario_names:
+                scenario = self._scenario_tree._scenario_map[scenario_name]
+                for tree_node in scenario._node_list[:-1]:
+                    if tree_node._name not in tree_nodes_pushed:
+                        tree_node.push_xbar_to_instances()
+                        tree_nodes_pushed.add(tree_node._name)
+                scenario.push_w_to_instance()
+                # the linearized proximal terms depend on the xbars
+                if self._linearize_nonbinary_penalty_terms > 0:
+                    instance = scenario._instance
+                    if self._problem_states.has_ph_variables(scenario_name):
+                        reset_linearization_variables(instance)
+                    if self._problem_states.\
+                           has_ph_objective_proximal_terms[scenario_name]:
+                        new_attrs = form_linearized_objective_constraints(
+                            scenario_name,
+                            instance,
+                            self._scenario_tree,
+                            self._linearize_nonbinary_penalty_terms,
+                            self._breakpoint_strategy,
+                            self._integer_tolerance)
+                        self._problem_states.ph_constraints[scenario_name].\
+                            extend(new_attrs)
+                        # Flag the preprocessor
+                        self._problem_states.\
+                            ph_constraints_updated[scenario_name] = True
+                # The objectives are always updated when the weight or
+                # xbar params are updated and the corresponding terms
+                # exist
+                if self._problem_states.\
+                       has_ph_objective_weight_terms[scenario_name] or \
+                   self._problem_states.\
+                       has_ph_objective_proximal_terms[scenario_name]:
+                    # Flag the preprocessor
+                    self._problem_states.\
+                        objective_coefficients_updated[scenario_name] = True
+
+    def _queue_async_subproblems(self,
+                                 scenario_names,
+                                 action_handle_scenario_map,
+                                 scenario_action_handle_map):
+
+        # let plugins know if they care.
+        for plugin in self._ph_plugins:
+            for scenario_name in scenario_names:
+                plugin.asynchronous_pre_scenario_queue(self, scenario_name)
+
+        warmstart = (not self._disable_warmstarts) and \
+                    self._solver.warm_start_capable()
+        action_handle_scenario_map_updates, \
+            scenario_action_handle_map_updates, \
+            _, _ = self.queue_subproblems(subproblems=scenario_names,
+                                          warmstart=warmstart)
+        action_handle_scenario_map.update(action_handle_scenario_map_updates)
+        scenario_action_handle_map.update(scenario_action_handle_map_updates)
+
+        if self._verbose:
+            print("Queued solves for scenarios=%s"
+                  % (", ".join(scenario_names)))
+
     def async_iteration_k_plus_solves(self):
 
+        # plugins that implement asynchronous_subproblems_to_queue
+        # decide which sub-problems are solved after each buffer of
+        # results is processed.
+        if any(hasattr(plugin, "asynchronous_subproblems_to_queue")
+               for plugin in self._ph_plugins):
+            return self._plugin_async_iteration_k_plus_solves()
+
+        # note: this routine retains control until a termination
+        # criterion is met. each completed scenario solve immediately
+        # updates the statistics of its tree nodes and its weights
+        # (once the async buffer is full), and the scenario is queued
+        # for its next solve - unless it has gotten too far ahead of
+        # the slowest scenario, as defined by the staleness bound.
+
+        if self._scenario_tree.contains_bundles():
+            raise RuntimeError("Async PH does not currently support bundling")
+
+        scenario_names = [scenario._name
+                          for scenario in self._scenario_tree._scenarios]
+        num_scenarios = len(scenario_names)
+
+        if (self._async_buffer_length <= 0) or \
+           (self._async_buffer_length > num_scenarios):
+            raise RuntimeError("Async buffer length parameter is bad: %s"
+                               % (self._async_buffer_length))
+        staleness_bound = self._async_staleness_bound
+        if (staleness_bound is not None) and (staleness_bound < 0):
+            raise RuntimeError("Async staleness bound parameter is bad: %s"
+                               % (staleness_bound))
+        if self._verbose:
+            print("Starting PH iteration k+ solves - running async "
+                  "with buffer length=%s and staleness bound=%s"
+                  % (self._async_buffer_length, staleness_bound))
+
+        # the scenarios solved since the convergers were last updated
+        # (incremental convergers only refresh these solutions).
+        scenarios_solved_since_update = set()
+
+        # things progress at different rates - keep track of what's going on.
+        total_scenario_solve_count = 0
+        # a map of scenario name to the number of sub-problems solved thus far.
+        scenario_solve_counts = dict((scenario_name, 0)
+                                     for scenario_name in scenario_names)
+
+        # keep track of action handles mapping to scenarios.
+        action_handle_scenario_map = {}
+        scenario_action_handle_map = {}
+
+        # the scenarios with a solve in progress
+        queued_scenarios = set()
+        # the solved scenarios whose results have not been processed
+        scenario_buffer = []
+        # the processed scenarios that have not been queued again,
+        # because they are too far ahead of the slowest scenario
+        waiting_scenarios = []
+        # set once no further solves should be queued
+        terminating = False
+
+        # scan any variables fixed/freed, set up the appropriate flags
+        # for pre-processing, and - if appropriate - transmit the
+        # information to the PH solver servers.
+        self._push_fix_queue_to_instances()
+
+        # update parameters on instances (transmitting to ph solver
+        # servers when appropriate)
+        self._push_xbar_to_instances()
+        self._push_w_to_instances()
+        self._push_rho_to_instances()
+
+        if self._verbose or self._report_rhos_first_iteration or self._report_rhos_each_iteration:
+            print("Async starting rhos:")
+            self.pprint(False, False, False, False, True,
+                        output_only_statistics=\
+                        self._report_only_statistics,
+                        output_only_nonconverged=\
+                        self._report_only_nonconverged_variables,
+                        report_stage_costs=False)
+
+        self._initialize_incremental_variable_statistics()
+
+        self._queue_async_subproblems(scenario_names,
+                                      action_handle_scenario_map,
+                                      scenario_action_handle_map)
+        queued_scenarios.update(scenario_names)
+
+        print("Entering PH asynchronous processing loop")
+
+        while len(queued_scenarios):
+
+            solved_subproblems, failures = \
+                self.wait_for_and_process_subproblems(
+                    1,
+                    action_handle_scenario_map,
+                    {},
+                    {},
+                    {})
+
+            assert len(solved_subproblems) == 1
+            solved_scenario_name = solved_subproblems[0]
+            action_handle = scenario_action_handle_map.pop(solved_scenario_name)
+            del action_handle_scenario_map[action_handle]
+            self._queued_solve_action_handles.discard(action_handle)
+            queued_scenarios.remove(solved_scenario_name)
+
+            if len(failures):
+                raise RuntimeError("Failed to obtain a solution for "
+                                   "the following sub-problems: "
+                                   +str(failures))
+
+            scenario_solve_counts[solved_scenario_name] += 1
+            total_scenario_solve_count += 1
+            scenarios_solved_since_update.add(solved_scenario_name)
+            scenario_buffer.append(solved_scenario_name)
+
+            if self._verbose:
+                print("Solve for scenario=%s completed - new solve count for "
+                      "this scenario=%s"
+                      % (solved_scenario_name,
+                         scenario_solve_counts[solved_scenario_name]))
+
+            # wait for the buffer to fill - unless there is nothing
+            # left to wait for
+            if (len(scenario_buffer) < self._async_buffer_length) and \
+               (len(queued_scenarios) > 0):
+                continue
+
+            if self._verbose:
+                print("Processing async buffer")
+
+            # update variable statistics and compute new weights
+            for scenario_name in scenario_buffer:
+                self._update_variable_statistics_for_scenario(
+                    self._scenario_tree._scenario_map[scenario_name])
+            if self._ph_weight_updates_enabled:
+                for scenario_name in scenario_buffer:
+                    self.update_weights_for_scenario(
+                        self._scenario_tree._scenario_map[scenario_name])
+
+            # give a user a chance to react if they want to change something.
+            for plugin in self._ph_plugins:
+                plugin.post_asynchronous_var_w_update(self,
+                                                      scenario_buffer,
+                                                      scenario_solve_counts)
+
+            waiting_scenarios.extend(scenario_buffer)
+            scenario_buffer = []
+
+            # we don't want to report stuff and invoke callbacks
+            # after each scenario solve - wait for when each
+            # scenario (on average) has reported back a solution.
+            if int(total_scenario_solve_count / num_scenarios) > \
+               self._current_iteration:
+
+                self._current_iteration += 1
+
+                self._refresh_incremental_variable_statistics()
+
+                # let plugins know if they care.
+                for plugin in self._ph_plugins:
+                    plugin.post_iteration_k_solves(self)
+
+                # update the fixed variable statistics.
+                self._total_fixed_discrete_vars,\
+                    self._total_fixed_continuous_vars = \
+                        self.compute_fixed_variable_counts()
+
+                if self._report_rhos_each_iteration:
+                    print("Async Reportable Iteration Current rhos:")
+                    self.pprint(False, False, False, False, True,
+                                output_only_statistics=\
+                                self._report_only_statistics,
+                                output_only_nonconverged=\
+                                self._report_only_nonconverged_variables,
+                                report_stage_costs=False)
+
+                if self._verbose or self._report_weights:
+                    print("Async Reportable Iteration Current variable "
+                          "averages and weights:")
+                    self.pprint(True, True, False, False, False,
+                                output_only_statistics=\
+                                self._report_only_statistics,
+                                output_only_nonconverged=\
+                                self._report_only_nonconverged_variables)
+
+                first_stage_min, first_stage_avg, first_stage_max = \
+                    self._extract_first_stage_cost_statistics()
+                print("First stage cost avg=%12.4f Max-Min=%8.2f"
+                      % (first_stage_avg, first_stage_max-first_stage_min))
+
+                # check for early termination.
+                for converger in self._convergers:
+                    converger.update(self._current_iteration,
+                                     self,
+                                     self._scenario_tree,
+                                     self._instances,
+                                     updated_scenarios=\
+                                     scenarios_solved_since_update)
+                scenarios_solved_since_update.clear()
+
+                self.printConvergerStatus()
+
+                expected_cost = self._scenario_tree.findRootNode().computeExpectedNodeCost()
+                if not _OLD_OUTPUT: print("Expected Cost=%14.4f" % (expected_cost))
+                self._cost_history[self._current_iteration] = expected_cost
+                if (not terminating) and \
+                   all(converger.isConverged(self)
+                       for converger in self._convergers):
+
+                    if (len(self._incumbent_cost_history) == 0) or \
+                       ((self._objective_sense == minimize) and \
+                        (expected_cost < min(self._incumbent_cost_history))) or \
+                       ((self._objective_sense == maximize) and \
+                        (expected_cost > max(self._incumbent_cost_history))):
+                        if not _OLD_OUTPUT: print("Caching results for new incumbent solution")
+                        self.cacheSolutions(self._incumbent_cache_id)
+                        self._best_incumbent_key = self._current_iteration
+                    self._incumbent_cost_history[self._current_iteration] = expected_cost
+
+                    plugin_convergence = True
+                    for plugin in self._ph_plugins:
+                        if hasattr(plugin,"ph_convergence_check"):
+                            if not plugin.ph_convergence_check(self):
+                                plugin_convergence = False
+
+                    if plugin_convergence:
+                        terminating = True
+
+                # plugins may have fixed (or freed) variables
+                if not terminating:
+                    self._push_fix_queue_to_instances()
+
+            # see if we've exceeded our patience with the
+            # iteration limit (based on the average number of
+            # solves over the scenarios).
+            if total_scenario_solve_count / num_scenarios >= \
+               self._max_iterations:
+                terminating = True
+
+            if terminating:
+                # collect (and process) the solves in progress, but
+                # don't queue any more.
+                continue
+
+            # queue new solves for the scenarios that are not too far
+            # ahead of the slowest scenario.
+            min_solve_count = min(itervalues(scenario_solve_counts))
+            scenarios_to_queue = []
+            still_waiting_scenarios = []
+            for scenario_name in waiting_scenarios:
+                if (staleness_bound is None) or \
+                   (scenario_solve_counts[scenario_name] - min_solve_count <= \
+                    staleness_bound):
+                    scenarios_to_queue.append(scenario_name)
+                else:
+                    still_waiting_scenarios.append(scenario_name)
+            waiting_scenarios = still_waiting_scenarios
+
+            if len(scenarios_to_queue):
+                self._push_async_parameters_to_instances(scenarios_to_queue)
+                self._queue_async_subproblems(scenarios_to_queue,
+                                              action_handle_scenario_map,
+                                              scenario_action_handle_map)
+                queued_scenarios.update(scenarios_to_queue)
+
+            if self._verbose:
+                for sname, scenario_count in iteritems(scenario_solve_counts):
+                    print("Scenario=%s was solved %s times"
+                          % (sname, scenario_count))
+                print("Cumulative number of scenario solves=%s"
+                      % (total_scenario_solve_count))
+                print("PH Iteration Count (computed)=%s"
+                      % (self._current_iteration))
+
+    def _plugin_async_iteration_k_plus_solves(self):
+
         # note: this routine retains control until a termination
         # criterion is met modified nov 2011 by dlw to do async
         # with a window-like paramater
@@ -3707,6 +4622,10 @@ class ProgressiveHedging(_PHBase):
         # we are going to buffer the scenario names
         ScenarioBuffer = []
 
+        # the scenarios solved since the convergers were last updated
+        # (incremental convergers only refresh these solutions).
+        scenarios_solved_since_update = set()
+
         # things progress at different rates - keep track of what's going on.
         total_scenario_solve_count = 0
         # a map of scenario name to the number of sub-problems solved thus far.
@@ -3782,6 +4701,7 @@ class ProgressiveHedging(_PHBase):
 
             scenario_solve_counts[solved_scenario_name] += 1
             total_scenario_solve_count += 1
+            scenarios_solved_since_update.add(solved_scenario_name)
 
             if int(total_scenario_solve_count / len(scenario_solve_counts)) > \
                self._current_iteration:
@@ -3862,7 +4782,10 @@ class ProgressiveHedging(_PHBase):
                         converger.update(self._current_iteration,
                                          self,
                                          self._scenario_tree,
-                                         self._instances)
+                                         self._instances,
+                                         updated_scenarios=\
+                                         scenarios_solved_since_update)
+                    scenarios_solved_since_update.clear()
 
                     self.printConvergerStatus()
 
@@ -3981,6 +4904,9 @@ class ProgressiveHedging(_PHBase):
         self._cumulative_xbar_time = 0.0
         self._cumulative_weight_time = 0.0
         self._current_iteration = 0;
+        if self._timeline_file is not None:
+            self._timeline = phtimeline.PHTimeline()
+            self._subproblem_dispatch_times = {}
 
         # garbage collection noticeably slows down PH when dealing with
         # large numbers of scenarios. fortunately, there are well-defined
@@ -4426,7 +5352,8 @@ class ProgressiveHedging(_PHBase):
                 phsolverserverutils.TransmitType.all_stages | \
                 phsolverserverutils.TransmitType.blended | \
                 phsolverserverutils.TransmitType.derived | \
-                phsolverserverutils.TransmitType.fixed)
+                phsolverserverutils.TransmitType.fixed | \
+                self._phpyro_result_encoding_flags)
 
         # let plugins know if they care. do this before
         # the final solution / statistics output, as the plugins
@@ -4444,6 +5371,10 @@ class ProgressiveHedging(_PHBase):
 
         print("PH complete")
 
+        if self._timeline is not None:
+            self._timeline.write(self._timeline_file)
+            print("PH timeline written to file="+self._timeline_file)
+
         if _OLD_OUTPUT:
             print("")
             print("Convergence history:")
@@ -4575,6 +5506,18 @@ class ProgressiveHedging(_PHBase):
         print("Average update time=  %.2f seconds" % self._cumulative_xbar_time)
         print("Weight update time=   %.2f seconds" % self._cumulative_weight_time)
 
+        if self._timeline is not None:
+            print("Sub-problem round trip times (queue to results):")
+            for summary in self._timeline.iteration_summary():
+                if "slowest_subproblem" not in summary:
+                    continue
+                print("  Iteration %s: Median=%.2f seconds, "
+                      "Max=%.2f seconds (sub-problem=%s)"
+                      % (summary["iteration"],
+                         summary["median_round_trip"],
+                         summary["max_round_trip"],
+                         summary["slowest_subproblem"]))
+
     #
     # a utility to determine whether to output weight / average / etc. information for
     # a variable/node combination. when the printing is moved into a callback/plugin,
@@ -337,7 +337,13 @@ class _PHBoundBase(object):
                 weights = op_data
                 for scenario in ph._scenario_tree._scenarios:
                     cached_weights = weights[scenario._name]
-                    scenario._w = copy.deepcopy(cached_weights)
+                    # update in place, as the node dictionaries may
+                    # be views onto compact storage
+                    for tree_node_name, tree_node_weights in \
+                            iteritems(cached_weights):
+                        scenario_weights = scenario._w[tree_node_name]
+                        scenario_weights.clear()
+                        scenario_weights.update(tree_node_weights)
 
             else:
 
@@ -148,6 +148,17 @@ def construct_ph_options_parser(usage_string):
       dest="create_random_bundles",
       type=int,
       default=None)
+    scenarioTreeOpts.add_argument('--bundle-solve-times',
+      help="The name of a file with scenario solve times (a history file written by the phhistoryextension plugin, or a JSON file mapping scenario names to solve times). When specified, the bundles requested with --create-random-bundles are formed so that their total solve times are balanced, rather than at random. Default is None.",
+      action="store",
+      dest="bundle_solve_times",
+      type=str,
+      default=None)
+    scenarioTreeOpts.add_argument('--compact-scenario-tree-storage',
+      help="Store the solution data of the non-leaf scenario tree nodes (the node statistics and the scenario values, weights, and rhos) in dense arrays rather than in dictionaries keyed by variable id. This reduces memory use for scenario trees with many scenarios. Requires numpy. Default is False.",
+      action="store_true",
+      dest="compact_scenario_tree_storage",
+      default=False)
 
     phOpts.add_argument('-r','--default-rho',
       help="The default (global) rho for all blended variables. *** Required ***",
@@ -187,6 +198,12 @@ def construct_ph_options_parser(usage_string):
       dest="async_buffer_length",
       type=int,
       default=1)
+    phOpts.add_argument("--async-staleness-bound",
+      help="The maximum number of solves that any scenario may complete, if in async mode, beyond the scenario with the fewest completed solves. A scenario that reaches this bound is not queued for another solve until the slower scenarios catch up, which limits how out-of-date the contributions to the xbars used in its solves can become. A value of 0 results in lock-step updates. Default is None (no bound).",
+      action="store",
+      dest="async_staleness_bound",
+      type=int,
+      default=None)
     phOpts.add_argument('--rho-cfgfile',
       help="The name of python script containing a ph_rhosetter_callback function to compute and update PH rho values. Default is None.",
       action="store",
@@ -372,6 +389,16 @@ def construct_ph_options_parser(usage_string):
       action="store_true",
       dest="phpyro_transmit_leaf_stage_solution",
       default=False)
+    solverOpts.add_argument('--phpyro-batch-updates',
+      help="When using the PHPyro solver manager, defer the transmission of weights, xbars, rhos, tree node statistics, and fixed variable status to PH solver servers until the next sub-problem solve, and send them along with the solve request as a single task. This reduces the number of round trips through the dispatcher in each PH iteration. Default is False.",
+      action="store_true",
+      dest="phpyro_batch_updates",
+      default=False)
+    solverOpts.add_argument('--phpyro-compress-results',
+      help="When using the PHPyro solver manager, compress (with zlib) the solutions returned by PH solver servers. This reduces network traffic at the expense of some additional computation. Default is False.",
+      action="store_true",
+      dest="phpyro_compress_results",
+      default=False)
     solverOpts.add_argument('--disable-warmstarts',
       help="Disable warm-start of scenario sub-problem solves in PH iterations >= 1. Default is False.",
       action="store_true",
@@ -447,6 +474,12 @@ def construct_ph_options_parser(usage_string):
       action="store_true",
       dest="output_times",
       default=False)
+    outputOpts.add_argument('--output-timeline',
+      help="The name of a file to which a timeline of the PH solve is written, in the Chrome trace event format (viewable with chrome://tracing). The timeline records the model update, queue, round trip (broken down into queue wait, model update, file I/O, solver, and network transfer times, when available), and result load times for each sub-problem in each iteration, with one track per worker. Default is None, indicating no timeline is written.",
+      action="store",
+      dest="output_timeline",
+      type=str,
+      default=None)
     outputOpts.add_argument('--output-instance-construction-time',
       help="Output timing statistics for instance construction (client-side only when using PHPyro",
       action="store_true",
@@ -521,6 +554,12 @@ def construct_ph_options_parser(usage_string):
       action="store_true",
       dest="keep_solver_files",
       default=False)
+    otherOpts.add_argument('--solver-tempdir',
+      help="The directory in which temporary input and output files for scenario sub-problem solves are created. Specifying a memory-backed filesystem (e.g., /dev/shm) avoids disk I/O for many small solves. Default is the system temporary directory.",
+      action="store",
+      dest="solver_tempdir",
+      type=str,
+      default=None)
     otherOpts.add_argument('--profile',
       help="Enable profiling of Python code.  The value of this option is the number of functions that are summarized.",
       action="store",
@@ -537,6 +576,17 @@ def construct_ph_options_parser(usage_string):
       action="store_true",
       dest="compile_scenario_instances",
       default=False)
+    otherOpts.add_argument('--scenario-instance-cache-directory',
+      help="A directory in which constructed scenario instances are cached (pickled). A cached instance is reused when the reference model file, the scenario data files, and the data layout are unchanged, and it is rebuilt otherwise. Instances created by a callback are never cached. Default is None.",
+      action="store",
+      dest="scenario_instance_cache_directory",
+      type=str,
+      default=None)
+    otherOpts.add_argument('--template-scenario-instances',
+      help="Construct the reference model only once and create each scenario instance by copying it and loading the values of the parameters declared in the model's StochasticDataAnnotation from the scenario .dat files. Those parameters must be mutable, and all other data must be the same for every scenario. Default is False.",
+      action="store_true",
+      dest="template_scenario_instances",
+      default=False)
 
     #
     # Hacks to register plugin options until things move over to the
@@ -590,6 +640,7 @@ def GenerateScenarioTreeForPH(options,
         bundles=options.scenario_bundle_specification,
         random_bundles=options.create_random_bundles,
         random_seed=options.scenario_tree_random_seed,
+        bundle_solve_times=options.bundle_solve_times,
         verbose=options.verbose)
 
     #
@@ -618,6 +669,10 @@ def GenerateScenarioTreeForPH(options,
                 scenario_tree,
                 output_instance_construction_time=options.output_instance_construction_time,
                 compile_scenario_instances=options.compile_scenario_instances,
+                instance_cache_directory=\
+                    options.scenario_instance_cache_directory,
+                template_scenario_instances=\
+                    options.template_scenario_instances,
                 verbose=options.verbose)
 
         if options.verbose or options.output_times:
@@ -1049,6 +1104,10 @@ def run_ph(options, ph):
                             ph._scenario_tree,
                             output_instance_construction_time=\
                               ph._output_instance_construction_time,
+                            instance_cache_directory=\
+                              options.scenario_instance_cache_directory,
+                            template_scenario_instances=\
+                              options.template_scenario_instances,
                             verbose=options.verbose)
 
             ph._scenario_tree.linkInInstances(
@@ -35,7 +35,9 @@ from pyomo.pysp.phextension import IPHSolverServerExtension
 from pyomo.pysp.scenariotree.instance_factory import \
     ScenarioTreeInstanceFactory
 from pyomo.pysp.phsolverserverutils import (TransmitType,
-                                           InvocationType)
+                                           InvocationType,
+                                           pack_solution,
+                                           compress_result)
 from pyomo.pysp.ph import _PHBase
 from pyomo.pysp.phutils import (reset_nonconverged_variables,
                                 reset_stage_cost_variables)
@@ -249,7 +251,10 @@ class _PHSolverServer(_PHBase):
                    integer_tolerance,
                    output_solver_results,
                    verbose,
-                   compile_scenario_instances):
+                   compile_scenario_instances,
+                   scenario_instance_cache_directory=None,
+                   template_scenario_instances=False,
+                   bundle_solve_times=None):
 
         if verbose:
             print("Received request to initialize PH solver server")
@@ -315,6 +320,7 @@ class _PHSolverServer(_PHBase):
             bundles=scenario_bundle_specification,
             random_bundles=create_random_bundles,
             random_seed=scenario_tree_random_seed,
+            bundle_solve_times=bundle_solve_times,
             verbose=self._verbose)
 
         if self._scenario_tree is None:
@@ -353,6 +359,10 @@ class _PHSolverServer(_PHBase):
                     construct_instances_for_scenario_tree(
                         self._scenario_tree,
                         compile_scenario_instances=compile_scenario_instances,
+                        instance_cache_directory=\
+                            scenario_instance_cache_directory,
+                        template_scenario_instances=\
+                            template_scenario_instances,
                         verbose=self._verbose)
 
         # with the scenario instances now available, have the scenario
@@ -449,11 +459,19 @@ class _PHSolverServer(_PHBase):
                 results[scenario_name] = \
                     scenario.copy_solution(
                         translate_ids=self._reverse_master_scenario_tree_id_map)
+                if TransmitType.TransmitPacked(results_flags):
+                    results[scenario_name] = \
+                        pack_solution(results[scenario_name])
         else:
             scenario = self._scenario_tree.get_scenario(object_name)
             scenario.update_solution_from_instance(stages=stages_to_load)
             results = scenario.copy_solution(
                 translate_ids=self._reverse_master_scenario_tree_id_map)
+            if TransmitType.TransmitPacked(results_flags):
+                results = pack_solution(results)
+
+        if TransmitType.TransmitCompressed(results_flags):
+            results = compress_result(results)
 
         return results
 
@@ -506,6 +524,8 @@ class _PHSolverServer(_PHBase):
                 print("Processing solver option="+key+", value="+str(value))
             self._solver.options[key] = value
 
+        preprocess_start_time = time.time()
+
         # with the introduction of piecewise linearization, the form
         # of the penalty-weighted objective is no longer fixed. thus,
         # when linearizing, we need to construct (or at least modify)
@@ -522,6 +542,8 @@ class _PHSolverServer(_PHBase):
 
         self._preprocess_scenario_instances()
 
+        preprocess_time = time.time() - preprocess_start_time
+
         if self._first_solve:
 
             # if we are dealing with a persisent solver plugin, go ahead
@@ -655,6 +677,9 @@ class _PHSolverServer(_PHBase):
                     variable_values[scenario._name] = \
                         scenario.copy_solution(
                             translate_ids=self._reverse_master_scenario_tree_id_map)
+                    if TransmitType.TransmitPacked(variable_transmission):
+                        variable_values[scenario._name] = \
+                            pack_solution(variable_values[scenario._name])
 
                 suffix_values = {}
 
@@ -747,6 +772,8 @@ class _PHSolverServer(_PHBase):
                 variable_values = \
                     scenario.copy_solution(
                         translate_ids=self._reverse_master_scenario_tree_id_map)
+                if TransmitType.TransmitPacked(variable_transmission):
+                    variable_values = pack_solution(variable_values)
 
                 if self._verbose:
                     print("Successfully loaded solution for scenario="+object_name)
@@ -809,6 +836,10 @@ class _PHSolverServer(_PHBase):
             # on whatever solver plugin is being used.
             auxilliary_values["pyomo_solve_time"] = pyomo_solve_time
 
+            # the time spent updating (preprocessing) the instances
+            # before the solve
+            auxilliary_values["preprocess_time"] = preprocess_time
+
             solve_method_result = (variable_values, suffix_values, auxilliary_values)
 
         else:
@@ -830,6 +861,9 @@ class _PHSolverServer(_PHBase):
 
         self._first_solve = False
 
+        if TransmitType.TransmitCompressed(variable_transmission):
+            solve_method_result = compress_result(solve_method_result)
+
         return solve_method_result
 
     def update_master_scenario_tree_ids(self, object_name, new_ids):
@@ -1204,7 +1238,23 @@ class _PHSolverServer(_PHBase):
                                      data.integer_tolerance,
                                      data.output_solver_results,
                                      data.verbose,
-                                     data.compile_scenario_instances)
+                                     data.compile_scenario_instances,
+                                     getattr(data,
+                                             "scenario_instance_cache_directory",
+                                             None),
+                                     getattr(data,
+                                             "template_scenario_instances",
+                                             False),
+                                     getattr(data, "bundle_solve_times", None))
+
+        elif data.action == "batch":
+            # process a sequence of requests for this object, in
+            # order, returning the result of the last one (typically
+            # a solve preceded by updates to weights, xbars, etc.)
+            for task in data.tasks:
+                task = pyutilib.misc.Bunch(**task)
+                task.name = data.name
+                result = self.process(task)
 
         elif data.action == "collect_results":
             result = self.collect_results(data.name,
@@ -11,13 +11,21 @@
 # the intent of this module is to provide functions to interface from
 # a PH client to a set of PH solver servers.
 
+import sys
 import time
+import zlib
+import array
 import itertools
+try:
+    import cPickle as pickle
+except:
+    import pickle
 
 from pyutilib.enum import Enum
 
 from pyomo.core import *
 
+import six
 from six import iteritems, itervalues
 
 InvocationType = Enum('SingleInvocation',
@@ -60,6 +68,92 @@ class TransmitType(object):
     def TransmitAllStages(cls, flag):
         return flag & cls.all_stages == cls.all_stages
 
+    # Result encoding
+    packed             = 0b1000000
+    compressed         = 0b10000000
+
+    @classmethod
+    def TransmitPacked(cls, flag):
+        return (flag & cls.packed) == cls.packed
+    @classmethod
+    def TransmitCompressed(cls, flag):
+        return (flag & cls.compressed) == cls.compressed
+
+_nan = float('nan')
+
+def _array_to_bytes(values):
+    if six.PY3:
+        return values.tobytes()
+    return values.tostring()
+
+def _array_from_bytes(data):
+    values = array.array('d')
+    if six.PY3:
+        values.frombytes(data)
+    else:
+        values.fromstring(data)
+    return values
+
+def _to_bytes(data):
+    # the default Pyro4 serializer (serpent) transmits binary data
+    # as a base64 encoded dictionary
+    if type(data) is dict:
+        import base64
+        assert data['encoding'] == 'base64'
+        return base64.b64decode(data['data'])
+    return data
+
+#
+# Utilities for encoding the variable values in the solutions returned
+# by PH solver servers (the output of copy_solution on a scenario tree
+# scenario). When packed, the values at each tree node are stored in a
+# binary array of doubles (None is stored as NaN) rather than in a
+# dictionary mapping variable id to value. When compressed, the entire
+# result is pickled and compressed with zlib.
+#
+
+def pack_solution(solution):
+    packed_x = {}
+    for tree_node_name, tree_node_x in iteritems(solution['x']):
+        variable_ids = tuple(tree_node_x)
+        values = array.array('d', (_nan if tree_node_x[variable_id] is None
+                                   else tree_node_x[variable_id]
+                                   for variable_id in variable_ids))
+        packed_x[tree_node_name] = (variable_ids, _array_to_bytes(values))
+    packed = dict(solution)
+    packed['x'] = packed_x
+    packed['packed byteorder'] = sys.byteorder
+    return packed
+
+def unpack_solution(solution):
+    if 'packed byteorder' not in solution:
+        return solution
+    byteswap = (solution['packed byteorder'] != sys.byteorder)
+    x = {}
+    for tree_node_name, (variable_ids, data) in iteritems(solution['x']):
+        values = _array_from_bytes(_to_bytes(data))
+        if byteswap:
+            values.byteswap()
+        x[tree_node_name] = \
+            dict((variable_id, None if value != value else value)
+                 for variable_id, value in zip(variable_ids, values))
+    unpacked = dict(solution)
+    unpacked['x'] = x
+    del unpacked['packed byteorder']
+    return unpacked
+
+_compressed_result_key = 'zlib compressed result'
+
+def compress_result(result):
+    return {_compressed_result_key:
+            zlib.compress(pickle.dumps(result, pickle.HIGHEST_PROTOCOL))}
+
+def decompress_result(result):
+    if (type(result) is dict) and (_compressed_result_key in result):
+        return pickle.loads(
+            zlib.decompress(_to_bytes(result[_compressed_result_key])))
+    return result
+
 def collect_full_results(ph, var_config):
 
     start_time = time.time()
@@ -129,11 +223,12 @@ def collect_full_results(ph, var_config):
                                        % (action_handle.id,
                                           str(known_action_handles)))
 
-            bundle_results = ph._solver_manager.get_results(action_handle)
+            bundle_results = decompress_result(
+                ph._solver_manager.get_results(action_handle))
 
             for scenario_name, scenario_results in iteritems(bundle_results):
                 scenario = ph._scenario_tree._scenario_map[scenario_name]
-                scenario.set_solution(scenario_results)
+                scenario.set_solution(unpack_solution(scenario_results))
 
             if ph._verbose:
                 print("Successfully loaded solution for bundle="+bundle_name)
@@ -168,7 +263,8 @@ def collect_full_results(ph, var_config):
                                        % (action_handle.id,
                                           str(known_action_handles)))
 
-            scenario_results = ph._solver_manager.get_results(action_handle)
+            scenario_results = unpack_solution(decompress_result(
+                ph._solver_manager.get_results(action_handle)))
             scenario = ph._scenario_tree._scenario_map[scenario_name]
             scenario.set_solution(scenario_results)
 
@@ -351,36 +447,23 @@ def transmit_weights(ph):
 
         for bundle in ph._scenario_tree._scenario_bundles:
 
-            # map from scenario name to the corresponding weight map
-            weights_to_transmit = {}
-
-            for scenario in bundle._scenario_tree._scenarios:
-                scenario_name = scenario._name
-
-                # Skip the leaf nodes (scenario._w usually doesn't
-                # store a value for variables on the leaf node)
-                weights_to_transmit[scenario._name] = \
-                    ph._scenario_tree._scenario_map[scenario_name]._w
-
             action_handles.append( ph._solver_manager.queue(
                 action="load_weights",
                 queue_name=ph._phpyro_job_worker_map[bundle._name],
                 generateResponse=generate_responses,
                 name=bundle._name,
-                new_weights=weights_to_transmit) )
+                new_weights=_weights_to_transmit(ph, bundle._name)) )
 
     else:
 
         for scenario in ph._scenario_tree._scenarios:
 
-            # Skip the leaf nodes (scenario._w usually doesn't store a value
-            # for variables on the leaf node)
             action_handles.append( ph._solver_manager.queue(
                 action="load_weights",
                 queue_name=ph._phpyro_job_worker_map[scenario._name],
                 generateResponse=generate_responses,
                 name=scenario._name,
-                new_weights=scenario._w) )
+                new_weights=_weights_to_transmit(ph, scenario._name)) )
     ph._solver_manager.end_bulk()
 
     if generate_responses:
@@ -412,40 +495,23 @@ def transmit_xbars(ph):
 
         for bundle in ph._scenario_tree._scenario_bundles:
 
-            xbars_to_transmit = {}
-            # Skip the leaf nodes
-            for stage in bundle._scenario_tree._stages[:-1]:
-                for bundle_tree_node in stage._tree_nodes:
-                    # The bundle scenariotree usually isn't populated
-                    # with variable value data so we need to reference
-                    # the original scenariotree node
-                    primary_tree_node = \
-                        ph._scenario_tree._tree_node_map[bundle_tree_node._name]
-                    xbars_to_transmit[primary_tree_node._name] = \
-                        primary_tree_node._xbars
-
             action_handles.append( ph._solver_manager.queue(
                 action="load_xbars",
                 queue_name=ph._phpyro_job_worker_map[bundle._name],
                 generateResponse=generate_responses,
                 name=bundle._name,
-                new_xbars=xbars_to_transmit) )
+                new_xbars=_xbars_to_transmit(ph, bundle._name)) )
 
     else:
 
         for scenario in ph._scenario_tree._scenarios:
 
-            # Skip the leaf nodes
-            xbars_to_transmit = {}
-            xbars_to_transmit = dict((tree_node._name, tree_node._xbars) \
-                                     for tree_node in scenario._node_list[:-1])
-
             action_handles.append( ph._solver_manager.queue(
                 action="load_xbars",
                 queue_name=ph._phpyro_job_worker_map[scenario._name],
                 generateResponse=generate_responses,
                 name=scenario._name,
-                new_xbars=xbars_to_transmit) )
+                new_xbars=_xbars_to_transmit(ph, scenario._name)) )
     ph._solver_manager.end_bulk()
 
     if generate_responses:
@@ -484,7 +550,12 @@ def _transmit_init(ph, worker_name, object_name):
         integer_tolerance=ph._integer_tolerance,
         output_solver_results=ph._output_solver_results,
         verbose=ph._verbose,
-        compile_scenario_instances=ph._options.compile_scenario_instances)
+        compile_scenario_instances=ph._options.compile_scenario_instances,
+        scenario_instance_cache_directory=\
+            getattr(ph._options, "scenario_instance_cache_directory", None),
+        template_scenario_instances=\
+            getattr(ph._options, "template_scenario_instances", False),
+        bundle_solve_times=getattr(ph, "_bundle_solve_times", None))
 
     return ah
 
@@ -560,34 +631,23 @@ def transmit_rhos(ph):
 
         for bundle in ph._scenario_tree._scenario_bundles:
 
-            # map from scenario name to the corresponding rho map
-            rhos_to_transmit = {}
-
-            for scenario in bundle._scenario_tree._scenarios:
-                # Skip the leaf nodes (scenario._rho usually doesn't
-                # store a value for variables on the leaf node)
-                rhos_to_transmit[scenario._name] = \
-                    ph._scenario_tree._scenario_map[scenario._name]._rho
-
             action_handles.append( ph._solver_manager.queue(
                 action="load_rhos",
                 queue_name=ph._phpyro_job_worker_map[bundle._name],
                 name=bundle._name,
                 generateResponse=generate_responses,
-                new_rhos=rhos_to_transmit) )
+                new_rhos=_rhos_to_transmit(ph, bundle._name)) )
 
     else:
 
         for scenario in ph._scenario_tree._scenarios:
 
-            # Skip the leaf nodes (scenario._rho usually doesn't store
-            # a value for variables on the leaf node)
             action_handles.append( ph._solver_manager.queue(
                 action="load_rhos",
                 queue_name=ph._phpyro_job_worker_map[scenario._name],
                 name=scenario._name,
                 generateResponse=generate_responses,
-                new_rhos=scenario._rho) )
+                new_rhos=_rhos_to_transmit(ph, scenario._name)) )
     ph._solver_manager.end_bulk()
 
     if generate_responses:
@@ -620,21 +680,8 @@ def transmit_tree_node_statistics(ph):
 
         for bundle in ph._scenario_tree._scenario_bundles:
 
-            tree_node_minimums = {}
-            tree_node_maximums = {}
-            # iterate over the tree nodes in the bundle scenario tree - but
-            # there aren't any statistics there - be careful!
-            # TBD - we need to form these statistics! right now, they are
-            #       beyond the bundle.
-            # We ignore the leaf nodes
-            for stage in bundle._scenario_tree._stages[:-1]:
-                for bundle_tree_node in stage._tree_nodes:
-                    primary_tree_node = \
-                        ph._scenario_tree._tree_node_map[bundle_tree_node._name]
-                    tree_node_minimums[primary_tree_node._name] = \
-                        primary_tree_node._minimums
-                    tree_node_maximums[primary_tree_node._name] = \
-                        primary_tree_node._maximums
+            tree_node_minimums, tree_node_maximums = \
+                _tree_node_statistics_to_transmit(ph, bundle._name)
 
             action_handles.append( ph._solver_manager.queue(
                 action="load_tree_node_stats",
@@ -648,13 +695,8 @@ def transmit_tree_node_statistics(ph):
 
         for scenario in ph._scenario_tree._scenarios:
 
-            tree_node_minimums = {}
-            tree_node_maximums = {}
-
-            # Skip the leaf nodes
-            for tree_node in scenario._node_list[:-1]:
-                tree_node_minimums[tree_node._name] = tree_node._minimums
-                tree_node_maximums[tree_node._name] = tree_node._maximums
+            tree_node_minimums, tree_node_maximums = \
+                _tree_node_statistics_to_transmit(ph, scenario._name)
 
             action_handles.append( ph._solver_manager.queue(
                 action="load_tree_node_stats",
@@ -844,27 +886,10 @@ def transmit_fixed_variables(ph):
 
         for bundle in ph._scenario_tree._scenario_bundles:
 
-            transmit_variables = False
-            for bundle_tree_node in bundle._scenario_tree._tree_nodes:
-                    primary_tree_node = \
-                        ph._scenario_tree._tree_node_map[bundle_tree_node._name]
-                    if len(primary_tree_node._fix_queue):
-                        transmit_variables = True
-                        break
-
-            if transmit_variables:
-                # map from node name to the corresponding list of
-                # fixed variables
-                fixed_variables_to_transmit = {}
-
-                # Just send the entire state of fixed variables
-                # on each node (including leaf nodes)
-                for bundle_tree_node in bundle._scenario_tree._tree_nodes:
-                    primary_tree_node = \
-                        ph._scenario_tree._tree_node_map[bundle_tree_node._name]
-                    fixed_variables_to_transmit[primary_tree_node._name] = \
-                        primary_tree_node._fix_queue
+            fixed_variables_to_transmit = \
+                _fixed_variables_to_transmit(ph, bundle._name)
 
+            if fixed_variables_to_transmit is not None:
                 action_handles.append( ph._solver_manager.queue(
                     action="update_fixed_variables",
                     queue_name=ph._phpyro_job_worker_map[bundle._name],
@@ -880,18 +905,10 @@ def transmit_fixed_variables(ph):
 
         for scenario in ph._scenario_tree._scenarios:
 
-            transmit_variables = False
-            for tree_node in scenario._node_list:
-                if len(tree_node._fix_queue):
-                    transmit_variables = True
-                    break
-
-            if transmit_variables:
-
-                fixed_variables_to_transmit = \
-                    dict((tree_node._name, tree_node._fix_queue)
-                         for tree_node in scenario._node_list)
+            fixed_variables_to_transmit = \
+                _fixed_variables_to_transmit(ph, scenario._name)
 
+            if fixed_variables_to_transmit is not None:
                 action_handles.append( ph._solver_manager.queue(
                     action="update_fixed_variables",
                     queue_name=ph._phpyro_job_worker_map[scenario._name],
@@ -913,6 +930,231 @@ def transmit_fixed_variables(ph):
         print("Fixed variable synchronization time="
               "%.2f seconds" % (end_time - start_time))
 
+#
+# utilities to construct the data sent with the load_weights,
+# load_xbars, load_rhos, and update_fixed_variables requests for a
+# bundle (or a scenario, when bundling is not in use).
+#
+
+def _subproblem_names(ph):
+    if ph._scenario_tree.contains_bundles():
+        return [bundle._name for bundle in ph._scenario_tree._scenario_bundles]
+    else:
+        return [scenario._name for scenario in ph._scenario_tree._scenarios]
+
+def _weights_to_transmit(ph, object_name):
+
+    # Skip the leaf nodes (scenario._w usually doesn't store a value
+    # for variables on the leaf node)
+    if ph._scenario_tree.contains_bundles():
+        bundle = ph._scenario_tree._scenario_bundle_map[object_name]
+        # map from scenario name to the corresponding weight map
+        return dict((scenario._name,
+                     ph._scenario_tree._scenario_map[scenario._name]._w)
+                    for scenario in bundle._scenario_tree._scenarios)
+    else:
+        return ph._scenario_tree._scenario_map[object_name]._w
+
+def _rhos_to_transmit(ph, object_name):
+
+    # Skip the leaf nodes (scenario._rho usually doesn't store a value
+    # for variables on the leaf node)
+    if ph._scenario_tree.contains_bundles():
+        bundle = ph._scenario_tree._scenario_bundle_map[object_name]
+        # map from scenario name to the corresponding rho map
+        return dict((scenario._name,
+                     ph._scenario_tree._scenario_map[scenario._name]._rho)
+                    for scenario in bundle._scenario_tree._scenarios)
+    else:
+        return ph._scenario_tree._scenario_map[object_name]._rho
+
+def _xbars_to_transmit(ph, object_name):
+
+    xbars_to_transmit = {}
+    # Skip the leaf nodes
+    if ph._scenario_tree.contains_bundles():
+        bundle = ph._scenario_tree._scenario_bundle_map[object_name]
+        for stage in bundle._scenario_tree._stages[:-1]:
+            for bundle_tree_node in stage._tree_nodes:
+                # The bundle scenariotree usually isn't populated
+                # with variable value data so we need to reference
+                # the original scenariotree node
+                primary_tree_node = \
+                    ph._scenario_tree._tree_node_map[bundle_tree_node._name]
+                xbars_to_transmit[primary_tree_node._name] = \
+                    primary_tree_node._xbars
+    else:
+        scenario = ph._scenario_tree._scenario_map[object_name]
+        for tree_node in scenario._node_list[:-1]:
+            xbars_to_transmit[tree_node._name] = tree_node._xbars
+
+    return xbars_to_transmit
+
+def _tree_node_statistics_to_transmit(ph, object_name):
+
+    tree_node_minimums = {}
+    tree_node_maximums = {}
+    if ph._scenario_tree.contains_bundles():
+        bundle = ph._scenario_tree._scenario_bundle_map[object_name]
+        # iterate over the tree nodes in the bundle scenario tree - but
+        # there aren't any statistics there - be careful!
+        # TBD - we need to form these statistics! right now, they are
+        #       beyond the bundle.
+        # We ignore the leaf nodes
+        for stage in bundle._scenario_tree._stages[:-1]:
+            for bundle_tree_node in stage._tree_nodes:
+                primary_tree_node = \
+                    ph._scenario_tree._tree_node_map[bundle_tree_node._name]
+                tree_node_minimums[primary_tree_node._name] = \
+                    primary_tree_node._minimums
+                tree_node_maximums[primary_tree_node._name] = \
+                    primary_tree_node._maximums
+    else:
+        scenario = ph._scenario_tree._scenario_map[object_name]
+        # Skip the leaf nodes
+        for tree_node in scenario._node_list[:-1]:
+            tree_node_minimums[tree_node._name] = tree_node._minimums
+            tree_node_maximums[tree_node._name] = tree_node._maximums
+
+    return tree_node_minimums, tree_node_maximums
+
+#
+# Returns None if there are no changes in fixed variable status to
+# synchronize.
+#
+def _fixed_variables_to_transmit(ph, object_name):
+
+    if ph._scenario_tree.contains_bundles():
+        bundle = ph._scenario_tree._scenario_bundle_map[object_name]
+        tree_nodes = [ph._scenario_tree._tree_node_map[bundle_tree_node._name]
+                      for bundle_tree_node in bundle._scenario_tree._tree_nodes]
+    else:
+        tree_nodes = ph._scenario_tree._scenario_map[object_name]._node_list
+
+    if not any(len(tree_node._fix_queue) for tree_node in tree_nodes):
+        return None
+
+    # Just send the entire state of fixed variables
+    # on each node (including leaf nodes)
+    return dict((tree_node._name, tree_node._fix_queue)
+                for tree_node in tree_nodes)
+
+#
+# When PH is configured to batch updates to the PH solver servers
+# (--phpyro-batch-updates), changes to the weights, xbars, rhos, tree
+# node statistics, and fixed variable status are not transmitted as
+# they are made. Instead,
+# the pending updates for each bundle (or scenario) are recorded and
+# sent along with its next solve request as a single "batch" task,
+# saving a round trip through the dispatcher for each of them.
+#
+
+_deferred_update_actions = ("update_fixed_variables",
+                            "load_xbars",
+                            "load_weights",
+                            "load_rhos",
+                            "load_tree_node_stats")
+
+def defer_update(ph, action, object_names=None):
+
+    assert action in _deferred_update_actions
+    if object_names is None:
+        object_names = _subproblem_names(ph)
+    for object_name in object_names:
+        if action == "update_fixed_variables":
+            # the fix queues are emptied once this update is
+            # recorded, so their current state must be saved here
+            fixed_variables = _fixed_variables_to_transmit(ph, object_name)
+            if fixed_variables is None:
+                continue
+            pending = ph._phpyro_deferred_updates.setdefault(object_name, {})
+            pending_fixed_variables = pending.setdefault(action, {})
+            for node_name, fix_queue in iteritems(fixed_variables):
+                pending_fixed_variables.setdefault(node_name, {}).\
+                    update(fix_queue)
+        else:
+            # the current values are collected when the update is sent
+            pending = ph._phpyro_deferred_updates.setdefault(object_name, {})
+            pending[action] = None
+
+#
+# Returns the list of tasks (dictionaries of keywords for the PH
+# solver server process method) needed to bring the named bundle (or
+# scenario) up to date, and clears its pending updates.
+#
+def collect_deferred_updates(ph, object_name):
+
+    tasks = []
+    pending = ph._phpyro_deferred_updates.pop(object_name, None)
+    if pending is None:
+        return tasks
+
+    for action in _deferred_update_actions:
+        if action not in pending:
+            continue
+        if action == "update_fixed_variables":
+            tasks.append(dict(action=action,
+                              fixed_variables=pending[action]))
+        elif action == "load_xbars":
+            tasks.append(dict(action=action,
+                              new_xbars=_xbars_to_transmit(ph, object_name)))
+        elif action == "load_weights":
+            tasks.append(dict(action=action,
+                              new_weights=_weights_to_transmit(ph, object_name)))
+        elif action == "load_rhos":
+            tasks.append(dict(action=action,
+                              new_rhos=_rhos_to_transmit(ph, object_name)))
+        else:
+            assert action == "load_tree_node_stats"
+            tree_node_minimums, tree_node_maximums = \
+                _tree_node_statistics_to_transmit(ph, object_name)
+            tasks.append(dict(action=action,
+                              new_mins=tree_node_minimums,
+                              new_maxs=tree_node_maximums))
+
+    return tasks
+
+#
+# Sends any pending updates to the PH solver servers without a solve
+# request. This is necessary before requests whose outcome may depend
+# on the state of the PH solver server instances.
+#
+
+def transmit_deferred_updates(ph):
+
+    if len(ph._phpyro_deferred_updates) == 0:
+        return
+
+    start_time = time.time()
+
+    if ph._verbose:
+        print("Transmitting deferred updates to PH solver servers")
+
+    action_handles = []
+
+    generate_responses = ph._handshake_with_phpyro
+
+    ph._solver_manager.begin_bulk()
+    for object_name in _subproblem_names(ph):
+        tasks = collect_deferred_updates(ph, object_name)
+        if len(tasks):
+            action_handles.append( ph._solver_manager.queue(
+                action="batch",
+                queue_name=ph._phpyro_job_worker_map[object_name],
+                name=object_name,
+                generateResponse=generate_responses,
+                tasks=tasks) )
+    ph._solver_manager.end_bulk()
+
+    if generate_responses:
+        ph._solver_manager.wait_all(action_handles)
+
+    end_time = time.time()
+
+    if ph._output_times:
+        print("Deferred update transmission time=%.2f seconds"
+              % (end_time - start_time))
+
 def transmit_external_function_invocation_to_worker(
         ph,
         worker_name,
@@ -927,6 +1169,8 @@ def transmit_external_function_invocation_to_worker(
         print("Transmitting external function invocation request to PH "
               "solver server with name %s" % worker_name)
 
+    transmit_deferred_updates(ph)
+
     generate_response = ph._handshake_with_phpyro or return_action_handle
 
     if ph._scenario_tree.contains_bundles():
@@ -970,6 +1214,8 @@ def transmit_external_function_invocation(
 
     action_handles = []
 
+    transmit_deferred_updates(ph)
+
     generate_responses = ph._handshake_with_phpyro or return_action_handles
 
     ph._solver_manager.begin_bulk()
@@ -1070,6 +1316,8 @@ def restore_cached_scenario_solutions(ph, cache_id, release_cache):
 
     action_handles = []
 
+    transmit_deferred_updates(ph)
+
     generate_responses = ph._handshake_with_phpyro
 
     ph._solver_manager.begin_bulk()
@@ -1113,6 +1361,8 @@ def cache_scenario_solutions(ph, cache_id):
 
     action_handles = []
 
+    transmit_deferred_updates(ph)
+
     generate_responses = ph._handshake_with_phpyro
 
     ph._solver_manager.begin_bulk()
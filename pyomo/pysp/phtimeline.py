@@ -0,0 +1,239 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+#
+# Per-iteration timing records for a PH run. PH adds an event for
+# each phase of each sub-problem solve (model update, queueing, the
+# round trip through the solver manager, and result loading) as well
+# as for the per-iteration statistics and weight updates. The events
+# can be written as a Chrome trace (viewable in chrome://tracing or
+# Perfetto), with one track for the PH client and one track for each
+# worker that solves sub-problems.
+#
+
+__all__ = ("PHTimeline",)
+
+import json
+import time
+import operator
+
+from six import iteritems
+
+# event names
+MODEL_UPDATE = "model update"
+QUEUE = "queue"
+SUBPROBLEM = "subproblem"
+LOAD_RESULTS = "load results"
+UPDATE_STATISTICS = "update statistics"
+UPDATE_WEIGHTS = "update weights"
+
+class PHTimeline(object):
+    """
+    A collection of timing events recorded during a PH run. Each
+    event is a dictionary with the keys 'name', 'category',
+    'iteration', 'subproblem', 'worker', 'start', and 'duration'
+    (times are in seconds, with the start time measured from the
+    construction of the timeline), along with any keywords passed to
+    add_event.
+
+    The 'subproblem' events span the time from when a sub-problem
+    starts on its worker until its results are returned to the PH
+    client. The round trip (from queueing the sub-problem until its
+    results are returned) is broken down as follows, when the solver
+    manager reports enough information:
+
+      - queue_wait: the (estimated) time spent waiting for the
+        worker to finish earlier sub-problems queued to it
+      - model_update: the time spent preprocessing on the worker
+      - pyomo_solve_time: the time spent in the solve() method of
+        the solver plugin (file write, solver, and file read)
+      - solver_time: the time reported by the solver
+      - file_io: pyomo_solve_time minus solver_time
+      - network_transfer: the remainder of the round trip, which is
+        the time spent serializing and transferring the request and
+        results
+    """
+
+    def __init__(self):
+        self._origin = time.time()
+        self._events = []
+        # maps worker name -> time the most recent result from that
+        # worker was received
+        self._worker_last_result = {}
+
+    @property
+    def events(self):
+        return self._events
+
+    def clear(self):
+        self._origin = time.time()
+        self._events = []
+        self._worker_last_result = {}
+
+    def add_event(self,
+                  name,
+                  category,
+                  start,
+                  stop,
+                  iteration=None,
+                  subproblem=None,
+                  worker=None,
+                  **kwds):
+        """Adds an event with the given start and stop times (as
+        returned by time.time())."""
+        event = {'name': name,
+                 'category': category,
+                 'iteration': iteration,
+                 'subproblem': subproblem,
+                 'worker': worker,
+                 'start': start - self._origin,
+                 'duration': max(stop - start, 0.0)}
+        event.update(kwds)
+        self._events.append(event)
+        return event
+
+    def add_subproblem_event(self,
+                             iteration,
+                             subproblem,
+                             worker,
+                             queue_time,
+                             result_time,
+                             solver_time=None,
+                             pyomo_solve_time=None,
+                             model_update_time=None,
+                             serial=False):
+        """Adds a 'subproblem' event for a sub-problem that was queued
+        at queue_time and whose results were received at
+        result_time. The optional times are those reported by the
+        solver manager. The worker is the name of the (remote) worker
+        that solved the sub-problem, or None if it is not known. If
+        serial is True, the sub-problem was solved by the PH client
+        itself (so there is no queue wait or network transfer)."""
+        round_trip = max(result_time - queue_time, 0.0)
+        breakdown = {'round_trip': round_trip}
+        start_time = queue_time
+        if (not serial) and (worker is not None):
+            # a worker solves the sub-problems queued to it one at a
+            # time (in the order they were queued), so a sub-problem
+            # does not start until the results for the previous one
+            # have been sent.
+            last_result = self._worker_last_result.get(worker)
+            if (last_result is not None) and (last_result > queue_time):
+                start_time = min(last_result, result_time)
+            self._worker_last_result[worker] = result_time
+            breakdown['queue_wait'] = start_time - queue_time
+        if model_update_time is not None:
+            breakdown['model_update'] = model_update_time
+        if pyomo_solve_time is not None:
+            breakdown['pyomo_solve_time'] = pyomo_solve_time
+        if solver_time is not None:
+            breakdown['solver_time'] = solver_time
+            if pyomo_solve_time is not None:
+                breakdown['file_io'] = \
+                    max(pyomo_solve_time - solver_time, 0.0)
+        if (not serial) and (pyomo_solve_time is not None):
+            breakdown['network_transfer'] = \
+                max(result_time - start_time -
+                    (model_update_time or 0.0) -
+                    pyomo_solve_time, 0.0)
+        return self.add_event(SUBPROBLEM,
+                              "solve",
+                              start_time,
+                              result_time,
+                              iteration=iteration,
+                              subproblem=subproblem,
+                              worker=worker,
+                              **breakdown)
+
+    def iteration_summary(self):
+        """Returns a list of dictionaries, one per iteration (in the
+        order first encountered), that summarize the subproblem
+        events: the total time spent in each category, and the
+        slowest subproblem along with its round trip time and the
+        median round trip time (to identify stragglers)."""
+        summaries = []
+        by_iteration = {}
+        for event in self._events:
+            iteration = event['iteration']
+            if iteration not in by_iteration:
+                summary = {'iteration': iteration,
+                           'totals': {},
+                           'round_trips': []}
+                by_iteration[iteration] = summary
+                summaries.append(summary)
+            summary = by_iteration[iteration]
+            totals = summary['totals']
+            totals[event['name']] = \
+                totals.get(event['name'], 0.0) + event['duration']
+            if event['name'] == SUBPROBLEM:
+                summary['round_trips'].append(
+                    (event['round_trip'], event['subproblem']))
+        for summary in summaries:
+            round_trips = sorted(summary.pop('round_trips'),
+                                 key=operator.itemgetter(0))
+            if len(round_trips):
+                summary['slowest_subproblem'] = round_trips[-1][1]
+                summary['max_round_trip'] = round_trips[-1][0]
+                summary['median_round_trip'] = \
+                    round_trips[len(round_trips)//2][0]
+        return summaries
+
+    def chrome_trace(self):
+        """Returns the events in the Chrome trace event format. The
+        PH client events are placed on thread 0, and the subproblem
+        events are placed on one thread per worker (or one thread per
+        sub-problem when the worker is not known). The per-iteration
+        summaries are included as 'otherData'."""
+        client = "ph client"
+        threads = {client: 0}
+        trace_events = []
+        for event in self._events:
+            if event['name'] == SUBPROBLEM:
+                track = event['worker']
+                if track is None:
+                    track = event['subproblem']
+            else:
+                track = client
+            if track not in threads:
+                threads[track] = len(threads)
+            args = dict((key, val) for key, val in iteritems(event)
+                        if (val is not None) and \
+                           (key not in ('name',
+                                        'category',
+                                        'start',
+                                        'duration')))
+            if event['subproblem'] is not None:
+                name = "%s %s" % (event['name'], event['subproblem'])
+            else:
+                name = event['name']
+            trace_events.append({'name': name,
+                                 'cat': event['category'],
+                                 'ph': 'X',
+                                 'ts': event['start'] * 1e6,
+                                 'dur': event['duration'] * 1e6,
+                                 'pid': 0,
+                                 'tid': threads[track],
+                                 'args': args})
+        for track, tid in sorted(iteritems(threads),
+                                 key=operator.itemgetter(1)):
+            trace_events.append({'name': 'thread_name',
+                                 'ph': 'M',
+                                 'pid': 0,
+                                 'tid': tid,
+                                 'args': {'name': str(track)}})
+        return {'traceEvents': trace_events,
+                'displayTimeUnit': 'ms',
+                'otherData': {'iterations': self.iteration_summary()}}
+
+    def write(self, filename):
+        """Writes the events to a file in the Chrome trace event
+        format."""
+        with open(filename, 'w') as f:
+            json.dump(self.chrome_trace(), f, indent=1, sort_keys=True)
@@ -19,6 +19,8 @@ from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
 # method of PyomoModel.
 from pyomo.repn.compute_canonical_repn import preprocess_block_objectives \
     as canonical_preprocess_block_objectives
+from pyomo.repn.compute_canonical_repn import update_block_objectives \
+    as canonical_update_block_objectives
 from pyomo.repn.compute_canonical_repn import preprocess_block_constraints \
     as canonical_preprocess_block_constraints
 from pyomo.repn.compute_canonical_repn import preprocess_constraint \
@@ -663,10 +665,12 @@ def preprocess_scenario_instance(scenario_instance,
                                  instance_ph_constraints,
                                  instance_objective_modified,
                                  preprocess_fixed_variables,
-                                 solver):
+                                 solver,
+                                 instance_objective_coefficients_modified=False):
 
     persistent_solver_in_use = isinstance(solver, PersistentSolver)
     if (not instance_objective_modified) and \
+       (not instance_objective_coefficients_modified) and \
        (not instance_variables_fixed) and \
        (not instance_variables_freed) and \
        (not instance_ph_constraints_modified) and \
@@ -678,14 +682,25 @@ def preprocess_scenario_instance(scenario_instance,
         # the objective function yet.
         return
 
+    # the terms of a parameterized representation of the objective
+    # depend on which variables are fixed
+    if (instance_variables_fixed or instance_variables_freed) and \
+       hasattr(scenario_instance, "_parameterized_canonical_repn"):
+        scenario_instance._parameterized_canonical_repn.clear()
+
     if instance_objective_modified:
         # if only the objective changed, there is minimal work to do.
 
         if solver.problem_format() == ProblemFormat.nl:
             ampl_preprocess_block_objectives(scenario_instance)
         else:
-
-            canonical_preprocess_block_objectives(scenario_instance)
+            # generate a parameterized representation of the
+            # objective, so that later changes to the values of the
+            # PH parameters only require its coefficients to be
+            # re-evaluated
+            if hasattr(scenario_instance, "_parameterized_canonical_repn"):
+                scenario_instance._parameterized_canonical_repn.clear()
+            canonical_update_block_objectives(scenario_instance)
 
         if persistent_solver_in_use and solver.has_instance():
             obj_count = 0
@@ -695,6 +710,27 @@ def preprocess_scenario_instance(scenario_instance,
                     raise RuntimeError('Persistent solver interface only supports a single objective.')
                 solver.set_objective(obj)
 
+    elif instance_objective_coefficients_modified:
+        # only the values of parameters in the objective changed
+
+        if solver.problem_format() == ProblemFormat.nl:
+            ampl_preprocess_block_objectives(scenario_instance)
+        else:
+            parameterized = set(
+                id(obj) for obj in getattr(scenario_instance,
+                                           "_parameterized_canonical_repn",
+                                           ()))
+            updated = canonical_update_block_objectives(scenario_instance)
+            if persistent_solver_in_use and solver.has_instance():
+                for obj in updated:
+                    if id(obj) in parameterized:
+                        solver.update_objective_coefficients(
+                            scenario_instance._canonical_repn[obj])
+                    else:
+                        # the representation was regenerated, so its
+                        # terms may differ from the solver's objective
+                        solver.set_objective(obj)
+
     if (instance_variables_fixed or instance_variables_freed) and \
        (preprocess_fixed_variables):
 
@@ -45,6 +45,30 @@ def extract_convergence(ph):
                       'discrete':ph._total_discrete_vars}}
     return convergence
 
+def extract_solve_times(ph):
+    # the solve time of a bundle is split evenly between its
+    # scenarios, as the scenario solve times are not known
+    def _solve_time(name):
+        for solve_times in (ph._solve_times, ph._pyomo_solve_times):
+            solve_time = solve_times.get(name)
+            if isinstance(solve_time, (int, float)) and (solve_time >= 0):
+                return float(solve_time)
+        return None
+    solve_times = {}
+    if ph._scenario_tree.contains_bundles():
+        for scenario_bundle in ph._scenario_tree._scenario_bundles:
+            solve_time = _solve_time(scenario_bundle._name)
+            if solve_time is not None:
+                solve_time /= len(scenario_bundle._scenario_names)
+                for scenario_name in scenario_bundle._scenario_names:
+                    solve_times[scenario_name] = solve_time
+    else:
+        for scenario in ph._scenario_tree._scenarios:
+            solve_time = _solve_time(scenario._name)
+            if solve_time is not None:
+                solve_times[scenario._name] = solve_time
+    return solve_times
+
 def extract_scenario_tree_structure(scenario_tree):
     scenario_tree_structure = {}
     scenario_tree_structure['scenarios'] = {}
@@ -329,6 +353,7 @@ class phhistoryextension(SingletonPlugin):
     def _snapshot_all(self, ph):
         data = {}
         data['convergence'] = extract_convergence(ph)
+        data['solve times'] = extract_solve_times(ph)
         data['scenario solutions'] = \
             extract_scenario_solutions(ph._scenario_tree, True)
         data['node solutions'] = \
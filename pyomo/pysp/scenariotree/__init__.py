@@ -15,7 +15,10 @@ from pyomo.pysp.scenariotree.instance_factory import *
 import pyomo.pysp.scenariotree.action_manager_pyro
 import pyomo.pysp.scenariotree.server_pyro_utils
 import pyomo.pysp.scenariotree.server_pyro
+import pyomo.pysp.scenariotree.action_manager_multiprocess
+import pyomo.pysp.scenariotree.server_multiprocess
 import pyomo.pysp.scenariotree.manager
 import pyomo.pysp.scenariotree.manager_worker_pyro
 import pyomo.pysp.scenariotree.manager_solver
 import pyomo.pysp.scenariotree.manager_solver_worker_pyro
+import pyomo.pysp.scenariotree.shared_memory
@@ -0,0 +1,256 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+__all__ = ("ScenarioTreeActionManagerMultiprocess",)
+
+import logging
+import multiprocessing
+try:
+    import cPickle as pickle
+except:
+    import pickle
+try:
+    from collections import OrderedDict
+except ImportError:                         #pragma:nocover
+    from ordereddict import OrderedDict
+
+from pyutilib.pyro import TaskProcessingError
+from pyomo.opt.parallel.manager import (AsynchronousActionManager,
+                                        ActionStatus)
+from pyomo.pysp.scenariotree.server_multiprocess import _run_server
+
+from six.moves import queue as _queue
+
+logger = logging.getLogger('pyomo.pysp')
+
+#
+# An asynchronous action manager that launches scenario tree servers
+# as child processes of the current process. It provides the same
+# interface as ScenarioTreeActionManagerPyro, so that it can be used
+# by the Pyro scenario tree manager client implementations without
+# a nameserver or dispatcher.
+#
+
+class ScenarioTreeActionManagerMultiprocess(AsynchronousActionManager):
+
+    # how often (in seconds) to check that the server processes
+    # are alive while waiting for results
+    _poll_interval = 1.0
+
+    def __init__(self, verbose=0):
+        self._verbose = verbose
+        self._paused = False
+        self._paused_tasks = []
+        # the names of the server processes associated with this
+        # manager
+        self.server_pool = []
+        self._processes = {}
+        self._task_queues = {}
+        self._result_queue = None
+        # tells the action manager to ignore task errors
+        # (it will still report them, just take no action)
+        self.ignore_task_errors = False
+        super(ScenarioTreeActionManagerMultiprocess, self).__init__()
+        self.results = OrderedDict()
+
+    def clear(self):
+        """
+        Clear manager state
+        """
+        super(ScenarioTreeActionManagerMultiprocess, self).clear()
+        self.results = OrderedDict()
+
+    def close(self):
+        """Close the manager."""
+        if len(self.results):
+            print("WARNING: %s is closing with %s local "
+                  "results waiting to be processed."
+                  % (type(self).__name__, len(self.results)))
+        if len(self._paused_tasks):
+            print("WARNING: %s is closing with %s paused "
+                  "tasks waiting to be queued."
+                  % (type(self).__name__, len(self._paused_tasks)))
+        self.results = OrderedDict()
+        self._paused = False
+        self._paused_tasks = []
+        if len(self.server_pool):
+            self.release_servers()
+
+    def acquire_servers(self, servers_requested, timeout=None):
+        """Launch the requested number of server processes. The
+        timeout argument is accepted for compatibility with
+        ScenarioTreeActionManagerPyro and is ignored."""
+
+        assert len(self.server_pool) == 0
+        if self._verbose:
+            print("Launching %s scenario tree server processes"
+                  % (servers_requested))
+
+        self._result_queue = multiprocessing.Queue()
+        for i in range(servers_requested):
+            server_name = "ScenarioTreeServerMultiprocess_%d" % (i+1)
+            task_queue = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=_run_server,
+                name=server_name,
+                args=(server_name,
+                      task_queue,
+                      self._result_queue,
+                      bool(self._verbose)))
+            process.daemon = True
+            process.start()
+            self.server_pool.append(server_name)
+            self._processes[server_name] = process
+            self._task_queues[server_name] = task_queue
+
+    def release_servers(self):
+        """Shut down the server processes."""
+
+        if self._verbose:
+            print("Releasing scenario tree server processes")
+
+        for server_name in self.server_pool:
+            if self._processes[server_name].is_alive():
+                self._task_queues[server_name].put(None)
+        for server_name in self.server_pool:
+            process = self._processes[server_name]
+            process.join(10)
+            if process.is_alive():
+                logger.warning("Terminating unresponsive scenario tree "
+                               "server process %s" % (server_name))
+                process.terminate()
+                process.join()
+            self._task_queues[server_name].close()
+        if self._result_queue is not None:
+            self._result_queue.close()
+        self.server_pool = []
+        self._processes = {}
+        self._task_queues = {}
+        self._result_queue = None
+
+    def pause(self):
+        self._paused = True
+
+    def unpause(self):
+        self._paused = False
+        for queue_name, task in self._paused_tasks:
+            self._task_queues[queue_name].put(task)
+        self._paused_tasks = []
+
+    def get_results(self, ah):
+        return self.results.pop(ah.id, None)
+
+    def wait_all(self, *args):
+        """
+        Wait for all actions to complete.  The arguments to this method
+        are expected to be ActionHandle objects or iterators that return
+        ActionHandle objects.  If no arguments are provided, then this
+        method will terminate after all queued actions are complete.
+        """
+        # Collect event handlers from the arguments
+        ahs = self._flatten(*args)
+        if len(ahs):
+            while len(ahs) > 0:
+                ahs.difference_update([ah for ah in ahs if ah.id in self.results])
+                if len(ahs):
+                    self._download_results()
+        else:
+            while self.queued_action_counter > 0:
+                self._download_results()
+
+    def wait_any(self, *args):
+        # Collect event handlers from the arguments
+        ahs = self._flatten(*args)
+        if len(ahs):
+            while (1):
+                for ah in ahs:
+                    if ah.id in self.results:
+                        return ah
+                self._download_results()
+        else:
+            while len(self.results) == 0:
+                self._download_results()
+            return self.event_handle[next(iter(self.results))]
+
+    def wait_for(self, ah):
+        """
+        Wait for the specified action to complete.
+        """
+        while ah.id not in self.results:
+            self._download_results()
+        return self.get_results(ah)
+
+    #
+    # Perform the queue operation. This method returns the
+    # ActionHandle, and the ActionHandle status indicates whether
+    # the queue was successful.
+    #
+    def _perform_queue(self, ah, *args, **kwds):
+
+        queue_name = kwds.pop('queue_name', None)
+        generate_response = kwds.pop('generate_response', True)
+        if queue_name not in self._task_queues:
+            raise ValueError("Unknown scenario tree server: %s"
+                             % (queue_name))
+
+        task = (ah.id, kwds, generate_response)
+        if self._paused:
+            self._paused_tasks.append((queue_name, task))
+        else:
+            self._task_queues[queue_name].put(task)
+
+        # only populate the action_handle-to-task dictionary is a
+        # response is expected.
+        if not generate_response:
+            ah.status = ActionStatus.done
+            self.event_handle[ah.id].update(ah)
+            self.queued_action_counter -= 1
+
+        return ah
+
+    def _download_results(self):
+
+        try:
+            task_id, result = pickle.loads(
+                self._result_queue.get(timeout=self._poll_interval))
+        except _queue.Empty:
+            for server_name in self.server_pool:
+                if not self._processes[server_name].is_alive():
+                    raise RuntimeError(
+                        "Scenario tree server process %s exited "
+                        "unexpectedly (exit code: %s)"
+                        % (server_name,
+                           self._processes[server_name].exitcode))
+            return
+
+        self.queued_action_counter -= 1
+        ah = self.event_handle.get(task_id, None)
+        if ah is None:
+            # if we are here, this is really bad news!
+            raise RuntimeError(
+                "The %s found results for task with id=%s"
+                " - but no corresponding action handle "
+                "could be located!" % (type(self).__name__, task_id))
+        if type(result) is TaskProcessingError:
+            ah.status = ActionStatus.error
+            self.event_handle[ah.id].update(ah)
+            msg = ("ScenarioTreeServerMultiprocess reported a processing "
+                   "error for task with id=%s. Reason: \n%s"
+                   % (task_id, result.args[0]))
+            if not self.ignore_task_errors:
+                raise RuntimeError(msg)
+            elif self.ignore_task_errors == 1:
+                logger.warning(msg)
+            # any value other than 0 or 1 will
+            # silently ignore task errors
+        else:
+            ah.status = ActionStatus.done
+            self.event_handle[ah.id].update(ah)
+            self.results[ah.id] = result
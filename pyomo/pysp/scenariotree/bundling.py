@@ -0,0 +1,100 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+#
+# Utilities for forming scenario bundles whose solve times are
+# balanced, so that the bundles (and the workers they are assigned
+# to) finish their solves at about the same time.
+#
+
+__all__ = ("partition_by_solve_time",
+           "estimate_scenario_solve_times",
+           "load_scenario_solve_times")
+
+import json
+import heapq
+
+from six import iteritems
+
+def partition_by_solve_time(solve_times, num_bundles):
+    """Partition the scenarios in the solve_times dictionary (which
+    maps scenario name to solve time) into num_bundles lists using
+    the longest-processing-time-first heuristic: the scenarios are
+    visited in order of decreasing solve time and each one is added
+    to the bundle with the smallest total solve time so far. Ties
+    are broken by the number of scenarios in a bundle and then by
+    the bundle index, so no bundle is left empty and the result does
+    not depend on the order of the dictionary."""
+    num_scenarios = len(solve_times)
+    if num_bundles < 1:
+        raise ValueError("The number of bundles must be positive")
+    if num_bundles > num_scenarios:
+        raise ValueError("Cannot create more bundles than there are "
+                         "scenarios!")
+    bundles = [[] for _i in range(num_bundles)]
+    heap = [(0.0, 0, i) for i in range(num_bundles)]
+    for scenario_name in sorted(solve_times,
+                                key=lambda name: (-solve_times[name],
+                                                  name)):
+        total, count, i = heapq.heappop(heap)
+        bundles[i].append(scenario_name)
+        heapq.heappush(heap, (total + solve_times[scenario_name],
+                              count + 1,
+                              i))
+    return bundles
+
+def estimate_scenario_solve_times(scenario_names, solve_times):
+    """Returns a dictionary with a solve time for each scenario
+    name. Times missing from the solve_times dictionary (or that
+    are not positive) are replaced by the mean of the known times,
+    or 1.0 if no times are known."""
+    known = [solve_times[name] for name in scenario_names
+             if (solve_times.get(name) is not None) and \
+                (solve_times[name] > 0)]
+    default = sum(known) / float(len(known)) if len(known) else 1.0
+    estimates = {}
+    for name in scenario_names:
+        solve_time = solve_times.get(name)
+        if (solve_time is None) or (solve_time <= 0):
+            solve_time = default
+        estimates[name] = solve_time
+    return estimates
+
+def load_scenario_solve_times(filename):
+    """Load per-scenario solve times from a file. The file can be a
+    history file written by the phhistoryextension plugin (in which
+    case the solve times recorded at each iteration are averaged) or
+    a JSON file that maps scenario names to solve times."""
+    try:
+        with open(filename) as f:
+            data = json.load(f)
+    except (ValueError, UnicodeDecodeError):
+        data = None
+    if (data is not None) and ('scenario tree' not in data):
+        return dict((str(name), float(solve_time))
+                    for name, solve_time in iteritems(data))
+
+    from pyomo.pysp.plugins.phhistoryextension import load_history
+    scenario_tree_dict, history, iterations = load_history(filename)
+    totals = {}
+    counts = {}
+    for key in iterations:
+        solve_times = history[key].get('solve times', {})
+        for name, solve_time in iteritems(solve_times):
+            if solve_time is None:
+                continue
+            totals[name] = totals.get(name, 0.0) + solve_time
+            counts[name] = counts.get(name, 0) + 1
+    if len(totals) == 0:
+        raise ValueError(
+            "The PH history file %s does not contain scenario solve "
+            "times" % (filename))
+    return dict((str(name), totals[name] / counts[name])
+                for name in totals)
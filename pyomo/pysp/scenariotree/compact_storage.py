@@ -0,0 +1,248 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+#
+# Dense array storage for the solution data kept on a scenario tree
+# node (the per-node statistics and the per-scenario _x, _w, and _rho
+# dictionaries). For large trees the dictionaries keyed by variable
+# id dominate memory use, so the values are stored in arrays (one
+# column per variable id at the node) and the dictionaries are
+# replaced by views onto the rows of these arrays.
+#
+
+__all__ = ("ArrayDictView", "NodeSolutionArrays")
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:                               #pragma:nocover
+    from collections import MutableMapping
+
+try:
+    import numpy
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
+from six import iteritems
+
+class ArrayDictView(MutableMapping):
+    """
+    A dictionary-like view onto one row of a two-dimensional array.
+    The keys are restricted to a fixed set of column keys (a
+    KeyError is raised for any other key), and a boolean array of
+    the same shape records which keys are present in the view.
+    A value of None is stored as NaN (so a NaN value is read back as
+    None). Copies of a view are plain dictionaries.
+    """
+
+    __slots__ = ("_values", "_present", "_row", "_columns", "_keys")
+
+    def __init__(self, values, present, row, columns, keys):
+        self._values = values
+        self._present = present
+        self._row = row
+        # maps key -> column index
+        self._columns = columns
+        # the keys in column order
+        self._keys = keys
+
+    def __getitem__(self, key):
+        j = self._columns[key]
+        if not self._present[self._row, j]:
+            raise KeyError(key)
+        val = float(self._values[self._row, j])
+        if val != val:
+            return None
+        return val
+
+    def __setitem__(self, key, val):
+        j = self._columns[key]
+        if val is None:
+            val = numpy.nan
+        self._values[self._row, j] = val
+        self._present[self._row, j] = True
+
+    def __delitem__(self, key):
+        j = self._columns[key]
+        if not self._present[self._row, j]:
+            raise KeyError(key)
+        self._present[self._row, j] = False
+
+    def __contains__(self, key):
+        j = self._columns.get(key)
+        return (j is not None) and bool(self._present[self._row, j])
+
+    def __iter__(self):
+        present = self._present[self._row]
+        keys = self._keys
+        for j in numpy.flatnonzero(present).tolist():
+            yield keys[j]
+
+    def __len__(self):
+        return int(self._present[self._row].sum())
+
+    def clear(self):
+        self._present[self._row, :] = False
+
+    def copy(self):
+        return dict(iteritems(self))
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        # the values are floats (or None), so a shallow copy suffices
+        return self.copy()
+
+    def __reduce__(self):
+        # views are pickled (e.g., sent over the wire with Pyro) as
+        # plain dictionaries
+        return (dict, (self.copy(),))
+
+    def __eq__(self, other):
+        if isinstance(other, (dict, ArrayDictView)):
+            return self.copy() == dict(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.copy())
+
+class NodeSolutionArrays(object):
+    """
+    The dense storage for the solution data of a (non-leaf) scenario
+    tree node. All arrays use the same column ordering, which is the
+    sorted order of the variable ids at the node. The node
+    statistics (_minimums, _averages, _maximums, _xbars, _blend, and
+    _wbars) are the rows of a single array, and each of the
+    per-scenario attributes (_x, _w, and _rho) is an array with one
+    row per scenario at the node (in the order of the node's
+    scenario list).
+
+    The constructor copies the current contents of the node and
+    scenario dictionaries into the arrays; install() then replaces
+    those dictionaries with views.
+    """
+
+    node_attributes = ("_minimums",
+                       "_averages",
+                       "_maximums",
+                       "_xbars",
+                       "_blend",
+                       "_wbars")
+
+    scenario_attributes = ("_x", "_w", "_rho")
+
+    def __init__(self, tree_node):
+        if not numpy_available:
+            raise RuntimeError("The numpy package is required to "
+                               "use %s" % (type(self).__name__))
+        self._tree_node = tree_node
+        self._variable_ids = tuple(sorted(tree_node._variable_ids))
+        self._columns = dict((variable_id, j) for j, variable_id
+                             in enumerate(self._variable_ids))
+        num_columns = len(self._variable_ids)
+
+        self._node_values = numpy.empty((len(self.node_attributes),
+                                         num_columns),
+                                        dtype=float)
+        self._node_present = numpy.zeros(self._node_values.shape,
+                                         dtype=bool)
+        self._node_views = {}
+        for i, attribute in enumerate(self.node_attributes):
+            view = ArrayDictView(self._node_values,
+                                 self._node_present,
+                                 i,
+                                 self._columns,
+                                 self._variable_ids)
+            view.update(getattr(tree_node, attribute))
+            self._node_views[attribute] = view
+
+        node_name = tree_node._name
+        scenarios = tree_node._scenarios
+        self._scenario_values = {}
+        self._scenario_views = {}
+        for attribute in self.scenario_attributes:
+            values = numpy.empty((len(scenarios), num_columns),
+                                 dtype=float)
+            present = numpy.zeros(values.shape, dtype=bool)
+            views = []
+            for i, scenario in enumerate(scenarios):
+                view = ArrayDictView(values,
+                                     present,
+                                     i,
+                                     self._columns,
+                                     self._variable_ids)
+                scenario_data = getattr(scenario, attribute)
+                if node_name in scenario_data:
+                    view.update(scenario_data[node_name])
+                else:
+                    view = None
+                views.append(view)
+            self._scenario_values[attribute] = (values, present)
+            self._scenario_views[attribute] = views
+
+    @property
+    def variable_ids(self):
+        return self._variable_ids
+
+    def install(self):
+        """Replace the dictionaries on the tree node and its
+        scenarios with views onto the arrays."""
+        tree_node = self._tree_node
+        for attribute, view in iteritems(self._node_views):
+            setattr(tree_node, attribute, view)
+        node_name = tree_node._name
+        for attribute, views in iteritems(self._scenario_views):
+            for scenario, view in zip(tree_node._scenarios, views):
+                if view is not None:
+                    getattr(scenario, attribute)[node_name] = view
+
+    def uninstall(self):
+        """Replace the views on the tree node and its scenarios with
+        dictionaries holding the same values."""
+        tree_node = self._tree_node
+        for attribute, view in iteritems(self._node_views):
+            if getattr(tree_node, attribute) is view:
+                setattr(tree_node, attribute, view.copy())
+        node_name = tree_node._name
+        for attribute, views in iteritems(self._scenario_views):
+            for scenario, view in zip(tree_node._scenarios, views):
+                scenario_data = getattr(scenario, attribute)
+                if (view is not None) and \
+                   (scenario_data.get(node_name) is view):
+                    scenario_data[node_name] = view.copy()
+
+    def get_scenario_array(self, attribute, variable_ids):
+        """Returns a (scenarios x variables) copy of the array for a
+        per-scenario attribute, with columns in the order of
+        variable_ids, or None if any scenario no longer holds the
+        view for this node (e.g., because its dictionary was
+        replaced)."""
+        node_name = self._tree_node._name
+        for scenario, view in zip(self._tree_node._scenarios,
+                                  self._scenario_views[attribute]):
+            if (view is None) or \
+               (getattr(scenario, attribute).get(node_name) is not view):
+                return None
+        values, present = self._scenario_values[attribute]
+        columns = [self._columns[variable_id]
+                   for variable_id in variable_ids]
+        if not present[:, columns].all():
+            missing = numpy.flatnonzero(~present[:, columns].all(axis=0))
+            raise KeyError(variable_ids[missing[0]])
+        return values[:, columns]
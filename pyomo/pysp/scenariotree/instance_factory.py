@@ -11,11 +11,17 @@
 __all__ = ('ScenarioTreeInstanceFactory',)
 
 import os
+import sys
 import time
 import posixpath
 import tempfile
 import shutil
 import logging
+import hashlib
+try:
+    import cPickle as pickle
+except:
+    import pickle
 
 from pyutilib.misc import (ArchiveReaderFactory,
                            ArchiveReader,
@@ -25,13 +31,20 @@ from pyomo.core import (Block,
                         IPyomoScriptModifyInstance,
                         DataPortal)
 from pyomo.core.base.block import _BlockData
+from pyomo.version import version_info as _pyomo_version_info
 from pyomo.util.plugin import ExtensionPoint
 from pyomo.pysp.phutils import _OLD_OUTPUT
 from pyomo.pysp.util.misc import load_external_module
+from pyomo.pysp.annotations import (locate_annotations,
+                                    PySP_StochasticDataAnnotation)
 from pyomo.pysp.scenariotree.tree_structure_model import \
     CreateAbstractScenarioTreeModel
 from pyomo.pysp.scenariotree.tree_structure import \
     ScenarioTree
+from pyomo.pysp.scenariotree.scenario_data_store import \
+    ScenarioDataStore
+from pyomo.pysp.scenariotree.bundling import \
+    load_scenario_solve_times
 
 import six
 
@@ -220,6 +233,39 @@ def _import_model_or_callback(src, callback_name):
 
     return module, model, callback
 
+def _hash_file(filename, hasher):
+    """Update a hash object with the name and the contents of a
+    file."""
+    hasher.update(os.path.basename(filename).encode())
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            hasher.update(block)
+
+def _data_portal_values(data):
+    """Returns the dictionary mapping component names to data in
+    the default namespace of a DataPortal."""
+    if None in data.namespaces():
+        return data.data()
+    return {}
+
+def _data_differences(data, reference_data, stochastic_parameter_names):
+    """Returns the sorted names of the components whose data (as
+    returned by _data_portal_values) differs from the reference
+    data. Only the indices (not the values) of the stochastic
+    parameters are compared."""
+    differences = []
+    for name in set(data).union(reference_data):
+        if name in stochastic_parameter_names:
+            # the values may differ, but not the indices
+            # that are defined
+            if (name in data) != (name in reference_data) or \
+               ((name in data) and \
+                (set(data[name]) != set(reference_data[name]))):
+                differences.append(name)
+        elif data.get(name) != reference_data.get(name):
+            differences.append(name)
+    return sorted(differences)
+
 class ScenarioTreeInstanceFactory(object):
 
     def __init__(self,
@@ -275,6 +321,14 @@ class ScenarioTreeInstanceFactory(object):
         self._scenario_tree_module = None
         self._scenario_tree_model = None
         self._data_directory = None
+        # used when constructing scenario instances from a template
+        self._template_instance = None
+        self._template_data = None
+        self._stochastic_parameter_names = None
+        # used when the scenario data is read from a columnar
+        # store in the data directory
+        self._scenario_data_store = None
+        self._store_template_instance = None
         try:
             self._init(model, scenario_tree, data_location)
         except:
@@ -445,6 +499,13 @@ class ScenarioTreeInstanceFactory(object):
                 raise IOError("path does not exist: %s"
                               % (self._data_directory))
 
+        self._scenario_data_store = None
+        if (self._model_object is not None) and \
+           ScenarioDataStore.exists(self._data_directory):
+            logger.debug("data directory contains a scenario data store")
+            self._scenario_data_store = \
+                ScenarioDataStore(self._data_directory)
+
     def __getstate__(self):
         self.close()
         raise NotImplementedError("Do not deepcopy or serialize this class")
@@ -459,6 +520,11 @@ class ScenarioTreeInstanceFactory(object):
                 shutil.rmtree(tmpdir, True)
             archive.close()
         self._archives = []
+        self._template_instance = None
+        self._template_data = None
+        self._stochastic_parameter_names = None
+        self._scenario_data_store = None
+        self._store_template_instance = None
         self._closed = True
 
     #
@@ -490,13 +556,351 @@ class ScenarioTreeInstanceFactory(object):
     #
     # construct a scenario instance - just like it sounds!
     #
+    #
+    # Template-based instance construction: the reference model is
+    # constructed once and the scenario instances are obtained by
+    # cloning it and loading the parameter values declared in the
+    # model's PySP_StochasticDataAnnotation from each scenario's data.
+    #
+
+    def _init_template(self,
+                       scenario_data,
+                       profile_memory=False,
+                       output_instance_construction_time=False):
+        template = self._model_object.create_instance(
+            scenario_data,
+            profile_memory=profile_memory,
+            report_timing=output_instance_construction_time)
+        annotations = locate_annotations(template,
+                                         PySP_StochasticDataAnnotation,
+                                         max_allowed=1)
+        if len(annotations) == 0:
+            raise ValueError(
+                "Template-based scenario instance construction requires "
+                "the reference model to declare its stochastic parameters "
+                "using a %s" % (PySP_StochasticDataAnnotation.__name__))
+        stochastic_parameter_names = []
+        for paramdata, _ in annotations[0][1].expand_entries():
+            param = paramdata.parent_component()
+            if not param._mutable:
+                raise ValueError(
+                    "Stochastic parameter %s must be declared with "
+                    "mutable=True for template-based scenario instance "
+                    "construction" % (param.name))
+            if param.name not in stochastic_parameter_names:
+                stochastic_parameter_names.append(param.name)
+        self._template_instance = template
+        self._template_data = _data_portal_values(scenario_data)
+        self._stochastic_parameter_names = stochastic_parameter_names
+
+    def _construct_instance_from_template(
+            self,
+            scenario_name,
+            scenario_data,
+            profile_memory=False,
+            output_instance_construction_time=False):
+        if self._template_instance is None:
+            self._init_template(
+                scenario_data,
+                profile_memory=profile_memory,
+                output_instance_construction_time=\
+                    output_instance_construction_time)
+        data = _data_portal_values(scenario_data)
+        stochastic_parameter_names = self._stochastic_parameter_names
+        differences = _data_differences(data,
+                                        self._template_data,
+                                        stochastic_parameter_names)
+        if len(differences):
+            raise ValueError(
+                "The data for scenario=%s can not be loaded into the "
+                "template instance. Only the values of the parameters "
+                "declared in the %s may differ between scenarios. "
+                "Components with differing data: %s"
+                % (scenario_name,
+                   PySP_StochasticDataAnnotation.__name__,
+                   ", ".join(differences)))
+        scenario_instance = self._template_instance.clone()
+        for name in stochastic_parameter_names:
+            if name not in data:
+                continue
+            param = scenario_instance.find_component(name)
+            for index, value in six.iteritems(data[name]):
+                param[index] = value
+        return scenario_instance
+
+    #
+    # Scenario data store based instance construction: the reference
+    # model is constructed once from the data common to all
+    # scenarios and the scenario instances are obtained by cloning it
+    # and loading the values of the stochastic parameters from the
+    # store's arrays.
+    #
+
+    def _construct_instance_from_store(
+            self,
+            scenario_name,
+            profile_memory=False,
+            output_instance_construction_time=False):
+        store = self._scenario_data_store
+        if not store.contains_scenario(scenario_name):
+            raise ValueError(
+                "The scenario data store in directory %s does not "
+                "contain data for scenario=%s"
+                % (store.directory, scenario_name))
+        if self._store_template_instance is None:
+            template = self._model_object.create_instance(
+                filename=store.reference_data_file,
+                profile_memory=profile_memory,
+                report_timing=output_instance_construction_time)
+            for name in store.parameter_names:
+                param = template.find_component(name)
+                if (param is None) or \
+                   (not getattr(param, "_mutable", False)):
+                    raise ValueError(
+                        "Parameter %s in the scenario data store in "
+                        "directory %s must name a Param declared with "
+                        "mutable=True on the reference model"
+                        % (name, store.directory))
+            self._store_template_instance = template
+        scenario_instance = self._store_template_instance.clone()
+        store.load_scenario(scenario_instance, scenario_name)
+        return scenario_instance
+
+    def write_scenario_data_store(self,
+                                  scenario_tree,
+                                  directory,
+                                  parameter_names=None):
+        """Convert the .dat files for the scenarios in a scenario
+        tree into a ScenarioDataStore in the given directory. The
+        stored parameters are those named in parameter_names or, if
+        it is None, those declared in the reference model's
+        PySP_StochasticDataAnnotation. Every scenario must define
+        values for the same indices of these parameters, and all
+        other data must be the same for every scenario (it is taken
+        from the data files for the first scenario). Returns the
+        opened store."""
+        assert not self._closed
+        if (self._model_object is None) or \
+           (self.data_directory() is None):
+            raise ValueError(
+                "A scenario data store can only be written for a "
+                "reference model that is constructed from .dat files")
+        scenario_datas = []
+        reference_data = None
+        for scenario in scenario_tree._scenarios:
+            data_files = self._scenario_data_files(scenario._name,
+                                                   scenario_tree)
+            if (data_files is None) or \
+               any(not filename.endswith(".dat")
+                   for filename in data_files):
+                raise ValueError(
+                    "Cannot find the .dat files for scenario '%s' in "
+                    "directory: %s" % (scenario._name,
+                                       self.data_directory()))
+            scenario_data = DataPortal(model=self._model_object)
+            for filename in data_files:
+                scenario_data.load(filename=filename)
+            if reference_data is None:
+                reference_data = []
+                for filename in data_files:
+                    with open(filename) as f:
+                        reference_data.append(f.read())
+                if parameter_names is None:
+                    self._init_template(scenario_data)
+                    parameter_names = self._stochastic_parameter_names
+            scenario_datas.append(
+                (scenario._name, _data_portal_values(scenario_data)))
+        for scenario_name, data in scenario_datas[1:]:
+            differences = _data_differences(data,
+                                            scenario_datas[0][1],
+                                            parameter_names)
+            if len(differences):
+                raise ValueError(
+                    "The data for scenario=%s can not be written to a "
+                    "scenario data store. Only the values of the "
+                    "stored parameters may differ from the data for "
+                    "scenario=%s. Components with differing data: %s"
+                    % (scenario_name,
+                       scenario_datas[0][0],
+                       ", ".join(differences)))
+        parameters = []
+        for name in parameter_names:
+            indices = list(scenario_datas[0][1].get(name, {}))
+            try:
+                indices.sort()
+            except TypeError:
+                pass
+            # the indices are the same for every scenario (this is
+            # checked above)
+            values = []
+            for scenario_name, data in scenario_datas:
+                param_data = data.get(name, {})
+                values.append([param_data[index] for index in indices])
+            parameters.append((name, indices, values))
+        return ScenarioDataStore.write(
+            directory,
+            [scenario_name for scenario_name, _ in scenario_datas],
+            parameters,
+            "\n".join(reference_data))
+
+    def _scenario_data_files(self, scenario_name, scenario_tree):
+        """The list of data files read when constructing the
+        instance for a scenario from the reference model."""
+        scenario = scenario_tree.get_scenario(scenario_name)
+        if scenario_tree._scenario_based_data:
+            scenario_data_filename = \
+                os.path.join(self.data_directory(),
+                             str(scenario_name))
+            for extension in (".dat", ".yaml"):
+                if os.path.exists(scenario_data_filename+extension):
+                    return [scenario_data_filename+extension]
+            return None
+        data_files = []
+        for tree_node in scenario._node_list:
+            node_data_filename = \
+                os.path.join(self.data_directory(),
+                             str(tree_node._name)+".dat")
+            if not os.path.exists(node_data_filename):
+                return None
+            data_files.append(node_data_filename)
+        return data_files
+
+    def _instance_cache_key(self,
+                            scenario_name,
+                            scenario_tree,
+                            compile_instance,
+                            use_template):
+        """Returns a digest identifying the inputs used to
+        construct a scenario instance, or None if the instance can
+        not be cached. Only instances built from a reference model
+        file and data files are cached (the output of a callback can
+        depend on anything). Data files included from within other
+        data files are not part of the key. The compile and template
+        options are part of the key, as instances built with and
+        without them differ."""
+        if (self._model_object is None) or \
+           (self._model_filename is None) or \
+           (self.data_directory() is None) or \
+           (self._scenario_data_store is not None):
+            return None
+        data_files = self._scenario_data_files(scenario_name,
+                                               scenario_tree)
+        if data_files is None:
+            return None
+        scenario = scenario_tree.get_scenario(scenario_name)
+        hasher = hashlib.sha1()
+        hasher.update(repr((sys.version_info[:2],
+                            tuple(_pyomo_version_info),
+                            str(scenario_name),
+                            tuple(str(n._name) for n in scenario._node_list),
+                            bool(scenario_tree._scenario_based_data),
+                            bool(compile_instance),
+                            bool(use_template))).encode())
+        _hash_file(self._model_filename, hasher)
+        for filename in data_files:
+            _hash_file(filename, hasher)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _instance_cache_filename(cache_directory, scenario_name, key):
+        return os.path.join(cache_directory,
+                            "%s.%s.pickle" % (scenario_name, key))
+
+    def _load_cached_instance(self,
+                              cache_directory,
+                              scenario_name,
+                              key,
+                              verbose=False):
+        filename = self._instance_cache_filename(cache_directory,
+                                                 scenario_name,
+                                                 key)
+        if not os.path.exists(filename):
+            return None
+        try:
+            with open(filename, 'rb') as f:
+                scenario_instance = pickle.load(f)
+        except Exception as e:
+            logger.warning("Failed to load cached instance for "
+                           "scenario=%s from file=%s (%s: %s). The "
+                           "instance will be reconstructed."
+                           % (scenario_name, filename,
+                              type(e).__name__, e))
+            return None
+        if verbose:
+            print("Loaded cached instance for scenario=%s from file=%s"
+                  % (scenario_name, filename))
+        return scenario_instance
+
+    def _store_cached_instance(self,
+                               cache_directory,
+                               scenario_name,
+                               key,
+                               scenario_instance):
+        if not os.path.exists(cache_directory):
+            try:
+                os.makedirs(cache_directory)
+            except OSError:
+                # another process may have created it
+                if not os.path.isdir(cache_directory):
+                    raise
+        filename = self._instance_cache_filename(cache_directory,
+                                                 scenario_name,
+                                                 key)
+        # write to a temporary file and then rename it, so that
+        # processes sharing the cache never see a partial file
+        fd, tmpname = tempfile.mkstemp(dir=cache_directory,
+                                       prefix=".pysp_instance_cache_")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(scenario_instance, f, pickle.HIGHEST_PROTOCOL)
+            if os.path.exists(filename):
+                os.remove(filename)
+            os.rename(tmpname, filename)
+        except Exception as e:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+            logger.warning("Failed to cache instance for scenario=%s "
+                           "(%s: %s)" % (scenario_name,
+                                         type(e).__name__, e))
+            return
+        # remove entries for this scenario that were created from
+        # different inputs
+        prefix = str(scenario_name)+"."
+        for entry in os.listdir(cache_directory):
+            if entry.startswith(prefix) and \
+               entry.endswith(".pickle"):
+                entry_key = entry[len(prefix):-len(".pickle")]
+                if (len(entry_key) == len(key)) and \
+                   (entry_key != key):
+                    try:
+                        os.remove(os.path.join(cache_directory, entry))
+                    except OSError:
+                        pass
+
     def construct_scenario_instance(self,
                                     scenario_name,
                                     scenario_tree,
                                     profile_memory=False,
                                     output_instance_construction_time=False,
                                     compile_instance=False,
+                                    instance_cache_directory=None,
+                                    use_template=False,
                                     verbose=False):
+        """Construct the instance for a scenario. If
+        instance_cache_directory is provided, the instance is loaded
+        from (or stored in) a pickle file in that directory that is
+        keyed by a hash of the reference model file, the scenario's
+        data files, and the scenario- or node-based data layout, so
+        that changes to any of these invalidate the cached instance.
+
+        If use_template is True and the instance is built from a
+        reference model and .dat files, the reference model is
+        constructed only once (for the first scenario) and the
+        instance is a copy of it with the values of the parameters
+        declared in the model's PySP_StochasticDataAnnotation
+        replaced by those in the scenario data. Those parameters must
+        be mutable, and an exception is raised if any other data
+        differs from that of the first scenario."""
         assert not self._closed
         if not scenario_tree.contains_scenario(scenario_name):
             raise ValueError("ScenarioTree does not contain scenario "
@@ -505,6 +909,25 @@ class ScenarioTreeInstanceFactory(object):
         scenario = scenario_tree.get_scenario(scenario_name)
         node_name_list = [n._name for n in scenario._node_list]
 
+        cache_key = None
+        if instance_cache_directory is not None:
+            cache_key = self._instance_cache_key(scenario_name,
+                                                 scenario_tree,
+                                                 compile_instance,
+                                                 use_template)
+            if cache_key is None:
+                logger.debug("Scenario instance caching is not supported "
+                             "for scenario=%s (no reference model file "
+                             "and data files)" % (scenario_name))
+            else:
+                scenario_instance = self._load_cached_instance(
+                    instance_cache_directory,
+                    scenario_name,
+                    cache_key,
+                    verbose=verbose)
+                if scenario_instance is not None:
+                    return scenario_instance
+
         if verbose:
             print("Creating instance for scenario=%s" % (scenario_name))
 
@@ -518,6 +941,20 @@ class ScenarioTreeInstanceFactory(object):
                 scenario_instance = self._model_callback(scenario_name,
                                                          node_name_list)
 
+            elif (self._model_object is not None) and \
+                 (self._scenario_data_store is not None):
+
+                if verbose:
+                    print("Data for scenario=%s loads from scenario "
+                          "data store in directory=%s"
+                          % (scenario_name, self.data_directory()))
+                scenario_instance = \
+                    self._construct_instance_from_store(
+                        scenario_name,
+                        profile_memory=profile_memory,
+                        output_instance_construction_time=\
+                            output_instance_construction_time)
+
             elif self._model_object is not None:
 
                 assert self.data_directory() is not None
@@ -556,7 +993,17 @@ class ScenarioTreeInstanceFactory(object):
                     if verbose:
                         print("Data for scenario=%s loads from file=%s"
                               % (scenario_name, scenario_data_filename))
-                    if data is None:
+                    if (data is None) and use_template:
+                        scenario_data = DataPortal(model=self._model_object)
+                        scenario_data.load(filename=scenario_data_filename)
+                        scenario_instance = \
+                            self._construct_instance_from_template(
+                                scenario_name,
+                                scenario_data,
+                                profile_memory=profile_memory,
+                                output_instance_construction_time=\
+                                    output_instance_construction_time)
+                    elif data is None:
                         scenario_instance = \
                             self._model_object.create_instance(
                                 filename=scenario_data_filename,
@@ -591,10 +1038,21 @@ class ScenarioTreeInstanceFactory(object):
                                   % (scenario_name, data_file))
                         scenario_data.load(filename=data_file)
 
-                    scenario_instance = self._model_object.create_instance(
-                        scenario_data,
-                        profile_memory=profile_memory,
-                        report_timing=output_instance_construction_time)
+                    if use_template:
+                        scenario_instance = \
+                            self._construct_instance_from_template(
+                                scenario_name,
+                                scenario_data,
+                                profile_memory=profile_memory,
+                                output_instance_construction_time=\
+                                    output_instance_construction_time)
+                    else:
+                        scenario_instance = \
+                            self._model_object.create_instance(
+                                scenario_data,
+                                profile_memory=profile_memory,
+                                report_timing=\
+                                    output_instance_construction_time)
             else:
                 raise RuntimeError("Unable to construct scenario instance. "
                                    "Neither a reference model or callback "
@@ -630,6 +1088,12 @@ class ScenarioTreeInstanceFactory(object):
                          % (scenario_name))
             raise
 
+        if cache_key is not None:
+            self._store_cached_instance(instance_cache_directory,
+                                        scenario_name,
+                                        cache_key,
+                                        scenario_instance)
+
         return scenario_instance
 
     def construct_instances_for_scenario_tree(
@@ -638,6 +1102,8 @@ class ScenarioTreeInstanceFactory(object):
             profile_memory=False,
             output_instance_construction_time=False,
             compile_scenario_instances=False,
+            instance_cache_directory=None,
+            template_scenario_instances=False,
             verbose=False):
         assert not self._closed
 
@@ -669,6 +1135,8 @@ class ScenarioTreeInstanceFactory(object):
                         profile_memory=profile_memory,
                         output_instance_construction_time=output_instance_construction_time,
                         compile_instance=compile_scenario_instances,
+                        instance_cache_directory=instance_cache_directory,
+                        use_template=template_scenario_instances,
                         verbose=verbose)
 
             scenario_instances[scenario._name] = scenario_instance
@@ -682,7 +1150,17 @@ class ScenarioTreeInstanceFactory(object):
                                bundles=None,
                                random_bundles=None,
                                random_seed=None,
+                               bundle_solve_times=None,
                                verbose=True):
+        """Generate the scenario tree. If random_bundles is a
+        positive integer, that many bundles are created by assigning
+        the scenarios to bundles at random, unless bundle_solve_times
+        is provided. In that case, the bundles are formed so that the
+        total scenario solve times in each bundle are balanced. The
+        bundle_solve_times argument can be a dictionary mapping
+        scenario names to solve times or the name of a file accepted
+        by pyomo.pysp.scenariotree.bundling.load_scenario_solve_times
+        (e.g., a PH history file)."""
 
         scenario_tree_model = self._scenario_tree_model
         if bundles is not None:
@@ -769,13 +1247,30 @@ class ScenarioTreeInstanceFactory(object):
                 raise ValueError("Cannot create more random bundles "
                                  "than there are scenarios!")
 
-            print("Creating "+str(random_bundles)+
-                  " random bundles using seed="
-                  +str(random_seed))
+            if bundle_solve_times is not None:
+                if isinstance(bundle_solve_times, six.string_types):
+                    print("Creating "+str(random_bundles)+
+                          " bundles balanced by the scenario solve "
+                          "times in file="+str(bundle_solve_times))
+                    bundle_solve_times = \
+                        load_scenario_solve_times(bundle_solve_times)
+                else:
+                    print("Creating "+str(random_bundles)+
+                          " bundles balanced by scenario solve time")
+
+                scenario_tree.create_balanced_bundles(
+                    self._scenario_tree_model,
+                    random_bundles,
+                    bundle_solve_times)
+
+            else:
+                print("Creating "+str(random_bundles)+
+                      " random bundles using seed="
+                      +str(random_seed))
 
-            scenario_tree.create_random_bundles(self._scenario_tree_model,
-                                                random_bundles,
-                                                random_seed)
+                scenario_tree.create_random_bundles(self._scenario_tree_model,
+                                                    random_bundles,
+                                                    random_seed)
 
         scenario_tree._scenario_instance_factory = self
 
@@ -10,11 +10,13 @@
 
 __all__ = ("InvocationType",
            "ScenarioTreeManagerClientSerial",
-           "ScenarioTreeManagerClientPyro")
+           "ScenarioTreeManagerClientPyro",
+           "ScenarioTreeManagerClientMultiprocess")
 
 import sys
 import time
 import itertools
+import multiprocessing
 import inspect
 import logging
 import traceback
@@ -36,6 +38,8 @@ from pyomo.pysp.scenariotree.instance_factory import \
     ScenarioTreeInstanceFactory
 from pyomo.pysp.scenariotree.action_manager_pyro \
     import ScenarioTreeActionManagerPyro
+from pyomo.pysp.scenariotree.action_manager_multiprocess \
+    import ScenarioTreeActionManagerMultiprocess
 from pyomo.pysp.scenariotree.server_pyro \
     import ScenarioTreeServerPyro
 from pyomo.pysp.scenariotree.server_pyro_utils \
@@ -694,6 +698,8 @@ class ScenarioTreeManagerClient(ScenarioTreeManager,
                                "scenario_bundle_specification")
     safe_declare_common_option(_declared_options,
                                "create_random_bundles")
+    safe_declare_common_option(_declared_options,
+                               "bundle_solve_times")
 
     #
     # various
@@ -764,6 +770,7 @@ class ScenarioTreeManagerClient(ScenarioTreeManager,
                     bundles=self._options.scenario_bundle_specification,
                     random_bundles=self._options.create_random_bundles,
                     random_seed=self._options.scenario_tree_random_seed,
+                    bundle_solve_times=self._options.bundle_solve_times,
                     verbose=self._options.verbose)
 
             # print the input tree for validation/information
@@ -1344,6 +1351,16 @@ class ScenarioTreeManagerClientSerial(_ScenarioTreeManagerWorker,
                                "output_instance_construction_time")
     safe_declare_common_option(_declared_options,
                                "compile_scenario_instances")
+    safe_declare_common_option(_declared_options,
+                               "scenario_instance_cache_directory")
+    safe_declare_common_option(_declared_options,
+                               "template_scenario_instances")
+
+    #
+    # scenario tree storage
+    #
+    safe_declare_common_option(_declared_options,
+                               "compact_scenario_tree_storage")
 
     def __init__(self, *args, **kwds):
         self._worker_name = 'ScenarioTreeManagerClientSerial:MainWorker'
@@ -1378,6 +1395,10 @@ class ScenarioTreeManagerClientSerial(_ScenarioTreeManagerWorker,
                    self._options.output_instance_construction_time,
                 profile_memory=self._options.profile_memory,
                 compile_scenario_instances=self._options.compile_scenario_instances,
+                instance_cache_directory=\
+                   self._options.scenario_instance_cache_directory,
+                template_scenario_instances=\
+                   self._options.template_scenario_instances,
                 verbose=self._options.verbose)
 
         if self._options.output_times or \
@@ -1397,6 +1418,8 @@ class ScenarioTreeManagerClientSerial(_ScenarioTreeManagerWorker,
             self._instances,
             objective_sense=self._options.objective_sense_stage_based,
             create_variable_ids=True)
+        if self._options.compact_scenario_tree_storage:
+            self._scenario_tree.compact_solution_data()
         self._scenario_names = [_scenario.name for _scenario in
                                 self._scenario_tree._scenarios]
         if self._options.output_times or \
@@ -1837,10 +1860,7 @@ class _ScenarioTreeManagerClientPyroAdvanced(ScenarioTreeManagerClient,
         action manager."""
 
         assert self._action_manager is None
-        self._action_manager = ScenarioTreeActionManagerPyro(
-            verbose=self._options.verbose,
-            host=self._options.pyro_host,
-            port=self._options.pyro_port)
+        self._action_manager = self._create_action_manager()
         self._action_manager.acquire_servers(num_servers, timeout=timeout)
         # extract server options
         server_options = ScenarioTreeServerPyro.\
@@ -1870,6 +1890,12 @@ class _ScenarioTreeManagerClientPyroAdvanced(ScenarioTreeManagerClient,
 
         return len(self._action_manager.server_pool)
 
+    def _create_action_manager(self):
+        return ScenarioTreeActionManagerPyro(
+            verbose=self._options.verbose,
+            host=self._options.pyro_host,
+            port=self._options.pyro_port)
+
     def release_scenariotreeservers(self, ignore_errors=False):
         """Release the pool of scenario tree servers and destroy the
         action manager."""
@@ -2700,3 +2726,38 @@ class ScenarioTreeManagerClientPyro(_ScenarioTreeManagerClientPyroAdvanced,
     def get_server_for_bundle(self, bundle_name):
         return self.get_server_for_worker(
             self.get_worker_for_bundle(bundle_name))
+
+#
+# A version of the Pyro scenario tree manager client that launches
+# its scenario tree servers as child processes on the local host, so
+# that no Pyro nameserver, dispatcher, or scenariotreeserver
+# processes are required. The servers are persistent: each one owns
+# the scenario instances assigned to its workers for the lifetime of
+# the manager.
+#
+
+class ScenarioTreeManagerClientMultiprocess(ScenarioTreeManagerClientPyro,
+                                            PySPConfiguredObject):
+
+    _declared_options = \
+        PySPConfigBlock("Options declared for the "
+                        "ScenarioTreeManagerClientMultiprocess class")
+    safe_declare_common_option(_declared_options,
+                               "multiprocess_scenariotreeservers")
+
+    def _create_action_manager(self):
+        return ScenarioTreeActionManagerMultiprocess(
+            verbose=self._options.verbose)
+
+    def acquire_scenariotreeservers(self, num_servers, timeout=None):
+        """Launch a pool of scenario tree server processes and
+        initialize the action manager. The number of processes is
+        limited by the multiprocess_scenariotreeservers option (or
+        the number of CPUs if that option is 0)."""
+        max_servers = self._options.multiprocess_scenariotreeservers
+        if max_servers == 0:
+            max_servers = multiprocessing.cpu_count()
+        if (num_servers == 0) or (num_servers > max_servers):
+            num_servers = max_servers
+        return super(ScenarioTreeManagerClientMultiprocess, self).\
+            acquire_scenariotreeservers(num_servers, timeout=timeout)
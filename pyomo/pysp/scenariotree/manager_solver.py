@@ -10,6 +10,7 @@
 
 __all__ = ("ScenarioTreeManagerSolverClientSerial",
            "ScenarioTreeManagerSolverClientPyro",
+           "ScenarioTreeManagerSolverClientMultiprocess",
            "ScenarioTreeManagerFactory")
 
 # TODO: handle pyro as the solver manager when even when the
@@ -28,17 +29,24 @@ from pyomo.opt import (UndefinedData,
                        SolutionStatus)
 from pyomo.opt.base.solvers import OptSolver
 from pyomo.opt.parallel import SolverManagerFactory
+from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
 from pyomo.pysp.util.config import (PySPConfigValue,
                                     PySPConfigBlock,
                                     safe_declare_common_option,
                                     safe_register_common_option)
 from pyomo.pysp.util.configured_object import PySPConfiguredObject
 from pyomo.pysp.scenariotree.preprocessor import ScenarioTreePreprocessor
+from pyomo.pysp.scenariotree.bundling import \
+    (partition_by_solve_time,
+     estimate_scenario_solve_times)
 from pyomo.pysp.scenariotree.manager import \
     (ScenarioTreeManager,
      _ScenarioTreeManagerWorker,
      ScenarioTreeManagerClientSerial,
-     ScenarioTreeManagerClientPyro)
+     ScenarioTreeManagerClientPyro,
+     ScenarioTreeManagerClientMultiprocess)
+from pyomo.pysp.scenariotree.shared_memory import \
+    ScenarioTreeSharedMemory
 
 from six import itervalues, iteritems
 
@@ -463,6 +471,8 @@ class ScenarioTreeManagerSolver(ScenarioTreeManager,
                                "output_solver_results")
     safe_declare_common_option(_declared_options,
                                "keep_solver_files")
+    safe_declare_common_option(_declared_options,
+                               "solver_tempdir")
     safe_declare_common_option(_declared_options,
                                "comparison_tolerance_for_fixed_variables")
 
@@ -471,6 +481,11 @@ class ScenarioTreeManagerSolver(ScenarioTreeManager,
             raise NotImplementedError(
                 "%s is an abstract class for subclassing" % self.__class__)
 
+        # Maps scenario name to the most recent solve time for the
+        # scenario (or its share of the solve time of the bundle it
+        # belonged to). Used to balance bundles.
+        self._scenario_solve_times = {}
+
         super(ScenarioTreeManagerSolver, self).__init__(*args, **kwds)
 
         # the objective sense of the subproblems
@@ -636,6 +651,8 @@ class ScenarioTreeManagerSolver(ScenarioTreeManager,
                          object_name,
                          time.time() - start_load))
 
+        self._record_scenario_solve_times(manager_results)
+
         if len(failures) > 0:
             print(" ** At least one of the %s failed to solve! ** "
                   % (object_type))
@@ -660,6 +677,65 @@ class ScenarioTreeManagerSolver(ScenarioTreeManager,
 
         return manager_results
 
+    def _record_scenario_solve_times(self, manager_results):
+        def _valid(solve_time):
+            return (solve_time is not None) and \
+                (not isinstance(solve_time, UndefinedData)) and \
+                (solve_time >= 0)
+        for object_name in manager_results.solve_time:
+            # some solvers report a negative solve time when they do
+            # not track it, in which case the pyomo solve time is used
+            solve_time = manager_results.solve_time[object_name]
+            if not _valid(solve_time):
+                solve_time = \
+                    manager_results.pyomo_solve_time.get(object_name)
+            if not _valid(solve_time):
+                continue
+            if manager_results.solve_type == 'bundles':
+                scenario_names = self._scenario_tree.\
+                                 get_bundle(object_name).scenario_names
+                for scenario_name in scenario_names:
+                    self._scenario_solve_times[scenario_name] = \
+                        float(solve_time) / len(scenario_names)
+            else:
+                self._scenario_solve_times[object_name] = float(solve_time)
+
+    @property
+    def scenario_solve_times(self):
+        """Return a dictionary mapping scenario name to the most
+        recent solve time recorded for the scenario. After a bundle
+        solve, the solve time of each bundle is split evenly between
+        its scenarios."""
+        return self._scenario_solve_times
+
+    def rebalance_bundles(self, num_bundles=None):
+        """Replace the scenario bundles with num_bundles bundles
+        (by default, the current number of bundles) whose total
+        scenario solve times are balanced, using the solve times
+        recorded by previous solves. Scenarios without a recorded
+        solve time are assigned the mean of the recorded
+        times. Returns True if the bundles were changed."""
+        if num_bundles is None:
+            num_bundles = len(self._scenario_tree.bundles)
+        solve_times = estimate_scenario_solve_times(
+            [scenario.name for scenario in self._scenario_tree.scenarios],
+            self._scenario_solve_times)
+        bundle_scenarios = partition_by_solve_time(solve_times,
+                                                   num_bundles)
+        current = set(frozenset(bundle.scenario_names)
+                      for bundle in self._scenario_tree.bundles)
+        if current == set(frozenset(scenario_names)
+                          for scenario_names in bundle_scenarios):
+            return False
+        if self.get_option("verbose"):
+            print("Rebalancing scenario bundles using scenario "
+                  "solve times")
+        for bundle in list(self._scenario_tree.bundles):
+            self.remove_bundle(bundle.name)
+        for i, scenario_names in enumerate(bundle_scenarios, 1):
+            self.add_bundle("Bundle"+str(i), scenario_names)
+        return True
+
     def push_fix_queue_to_instances(self):
         """Pushed the fixed queue on the scenario tree nodes onto the
         actual variables on the scenario instances.
@@ -903,6 +979,8 @@ class _ScenarioTreeManagerSolverWorker(_ScenarioTreeManagerWorker,
         common_kwds = {}
         common_kwds['tee'] = self.get_option("output_solver_log")
         common_kwds['keepfiles'] = self.get_option("keep_solver_files")
+        if self.get_option("solver_tempdir") is not None:
+            common_kwds['tempdir'] = self.get_option("solver_tempdir")
         common_kwds['symbolic_solver_labels'] = \
             self.get_option("symbolic_solver_labels")
         # we always rely on ourselves to load solutions - we control
@@ -932,25 +1010,52 @@ class _ScenarioTreeManagerSolverWorker(_ScenarioTreeManagerWorker,
         if ephemeral_solver_options is not None:
             common_kwds['options'].update(ephemeral_solver_options)
 
+        # persistent solver plugins are not given the instance
+        # (or the keywords used to write it) when solving. The
+        # preprocessor keeps the scenario instances compiled into
+        # the plugin, so only the changes made since the last
+        # solve are sent to the solver.
+        persistent_kwds = dict(common_kwds)
+        for key in ('tempdir',
+                    'symbolic_solver_labels',
+                    'output_fixed_variable_bounds'):
+            persistent_kwds.pop(key, None)
+
         # maps action handles to subproblem names
         action_handle_data = {}
         for object_name in objects:
 
             opt = solver_dict[object_name]
             instance = instance_dict[object_name]
+            if isinstance(opt, PersistentSolver):
+                # bundle updates are not tracked by the
+                # preprocessor for persistent solvers, so the
+                # bundle instance is always recompiled
+                if (object_type == 'bundles') or \
+                   (not opt.has_instance()):
+                    opt.set_instance(
+                        instance,
+                        symbolic_solver_labels=\
+                            self.get_option("symbolic_solver_labels"),
+                        output_fixed_variable_bounds=True)
+                args = ()
+                kwds = persistent_kwds
+            else:
+                args = (instance,)
+                kwds = common_kwds
             if (not self.get_option("disable_warmstart")) and \
                (not disable_warmstart) and \
                opt.warm_start_capable():
                 new_action_handle = \
-                    self._solver_manager.queue(instance,
+                    self._solver_manager.queue(*args,
                                                opt=opt,
                                                warmstart=True,
-                                               **common_kwds)
+                                               **kwds)
             else:
                 new_action_handle = \
-                    self._solver_manager.queue(instance,
+                    self._solver_manager.queue(*args,
                                                opt=opt,
-                                               **common_kwds)
+                                               **kwds)
 
             action_handle_data[new_action_handle] = object_name
 
@@ -1173,11 +1278,32 @@ class ScenarioTreeManagerSolverClientSerial(ScenarioTreeManagerClientSerial,
 
     safe_declare_common_option(_declared_options,
                                "pyro_shutdown")
+    safe_declare_common_option(_declared_options,
+                               "rebalance_bundles")
 
     def __init__(self, *args, **kwds):
         super(ScenarioTreeManagerSolverClientSerial, self).\
             __init__(*args, **kwds)
 
+    #
+    # Override some methods for ScenarioTreeManagerSolver:
+    #
+
+    def solve_subproblems(self,
+                          subproblems=None,
+                          **kwds):
+        ret = super(ScenarioTreeManagerSolverClientSerial, self).\
+              solve_subproblems(subproblems=subproblems,
+                                **kwds)
+        # the Pyro-based managers bind bundles to their workers
+        # at initialization, so only the serial manager can
+        # rebalance them between solves
+        if self._scenario_tree.contains_bundles() and \
+           self.get_option("rebalance_bundles") and \
+           (not kwds.get('async', False)):
+            self.rebalance_bundles()
+        return ret
+
     #
     # Override some methods for ScenarioTreeManager that
     # were implemented by _ScenarioTreeManagerWorkerSolver:
@@ -1699,11 +1825,169 @@ class ScenarioTreeManagerSolverClientPyro(ScenarioTreeManagerClientPyro,
 
         return node_count
 
+#
+# The solver version of the multiprocess scenario tree manager
+# client. All communication with the workers goes through the action
+# manager, so the ScenarioTreeManagerSolverClientPyro implementation
+# is used, except that the scenario solutions at the non-leaf tree
+# nodes can be exchanged through shared memory (see
+# ScenarioTreeSharedMemory) rather than in the solve results.
+#
+
+class ScenarioTreeManagerSolverClientMultiprocess(
+        ScenarioTreeManagerClientMultiprocess,
+        ScenarioTreeManagerSolverClientPyro,
+        PySPConfiguredObject):
+
+    _declared_options = \
+        PySPConfigBlock("Options declared for the "
+                        "ScenarioTreeManagerSolverClientMultiprocess class")
+
+    safe_declare_common_option(_declared_options,
+                               "multiprocess_shared_memory")
+
+    default_registered_worker_name = 'ScenarioTreeManagerSolverWorkerPyro'
+
+    def __init__(self, *args, **kwds):
+        self._shared_memory = None
+        super(ScenarioTreeManagerSolverClientMultiprocess, self).\
+            __init__(*args, **kwds)
+
+    @property
+    def shared_memory(self):
+        """The ScenarioTreeSharedMemory object created by
+        create_shared_memory (or None)."""
+        return self._shared_memory
+
+    def create_shared_memory(self, directory=None):
+        """Allocate shared arrays for the solution data at each
+        non-leaf node of the scenario tree and attach every worker
+        to them. After this, the workers write the scenario
+        solutions at those nodes to the shared arrays rather than
+        sending them with the solve results. This is called during
+        initialization when the multiprocess_shared_memory option is
+        set."""
+        if self._shared_memory is not None:
+            raise RuntimeError("Shared memory has already been created "
+                               "for this scenario tree manager")
+        self._shared_memory = \
+            ScenarioTreeSharedMemory.create(self._scenario_tree,
+                                            directory=directory)
+        assert not self._transmission_paused
+        self.pause_transmit()
+        action_handles = []
+        for worker_name in self._pyro_worker_list:
+            action_handles.append(self._invoke_method_on_worker_pyro(
+                worker_name,
+                "_attach_shared_memory_for_client",
+                method_args=(self._shared_memory.handle,),
+                oneway=False))
+        self.unpause_transmit()
+        self._action_manager.wait_all(action_handles)
+        return self._shared_memory
+
+    def push_shared_memory(self, names=('w', 'rho', 'xbar')):
+        """Copy the named data ('w', 'rho', or 'xbar') from the
+        scenario tree on this manager to the scenario trees on the
+        workers through the shared arrays. Only the names of the
+        data are sent to the workers."""
+        if self._shared_memory is None:
+            raise RuntimeError("Shared memory has not been created "
+                               "for this scenario tree manager")
+        names = tuple(names)
+        for name in names:
+            self._shared_memory.store(self._scenario_tree, name)
+        self.invoke_method("_load_shared_memory_for_client",
+                           method_args=(names,))
+
+    #
+    # Override methods for ScenarioTreeManagerSolverClientPyro
+    #
+
+    def _transmit_scenario_tree_ids(self):
+        super(ScenarioTreeManagerSolverClientMultiprocess, self).\
+            _transmit_scenario_tree_ids()
+        # the shared arrays are laid out using the variable ids
+        # that have just been sent to the workers
+        if self.get_option("multiprocess_shared_memory"):
+            self.create_shared_memory()
+
+    def _process_bundle_solve_result(self,
+                                     bundle_name,
+                                     update_stages,
+                                     results,
+                                     manager_results=None):
+        if self._shared_memory is not None:
+            for scenario_name, solution in iteritems(results[1]):
+                self._add_shared_nodes(scenario_name, solution)
+        manager_results = \
+            super(ScenarioTreeManagerSolverClientMultiprocess, self).\
+            _process_bundle_solve_result(bundle_name,
+                                         update_stages,
+                                         results,
+                                         manager_results=manager_results)
+        if self._shared_memory is not None:
+            self._shared_memory.load(
+                self._scenario_tree,
+                'x',
+                scenario_names=self._scenario_tree.\
+                    get_bundle(bundle_name).scenario_names)
+        return manager_results
+
+    def _process_scenario_solve_result(self,
+                                       scenario_name,
+                                       update_stages,
+                                       results,
+                                       manager_results=None):
+        if self._shared_memory is not None:
+            self._add_shared_nodes(scenario_name, results[1])
+        manager_results = \
+            super(ScenarioTreeManagerSolverClientMultiprocess, self).\
+            _process_scenario_solve_result(scenario_name,
+                                           update_stages,
+                                           results,
+                                           manager_results=manager_results)
+        if self._shared_memory is not None:
+            self._shared_memory.load(self._scenario_tree,
+                                     'x',
+                                     scenario_names=(scenario_name,))
+        return manager_results
+
+    def _add_shared_nodes(self, scenario_name, solution):
+        # the workers leave the non-leaf nodes out of the solutions
+        # they send (the values are loaded from the shared arrays
+        # after the rest of the solution is set)
+        scenario = self._scenario_tree.get_scenario(scenario_name)
+        for tree_node in scenario._node_list[:-1]:
+            solution['x'][tree_node._name] = {}
+
+    #
+    # Override the implementation on ScenarioTreeManagerClientPyro
+    #
+
+    def _close_impl(self):
+        try:
+            super(ScenarioTreeManagerSolverClientMultiprocess, self).\
+                _close_impl()
+        finally:
+            if self._shared_memory is not None:
+                self._shared_memory.close()
+                self._shared_memory = None
+
 def ScenarioTreeManagerFactory(options):
+    if (options.scenario_tree_manager != "serial") and \
+       ("rebalance_bundles" in options) and \
+       options.rebalance_bundles:
+        raise ValueError("The option '%s' is only supported by the "
+                         "serial scenario tree manager (not '%s')"
+                         % ("rebalance_bundles",
+                            options.scenario_tree_manager))
     if options.scenario_tree_manager == "serial":
         manager = ScenarioTreeManagerSolverClientSerial(options)
     elif options.scenario_tree_manager == "pyro":
         manager = ScenarioTreeManagerSolverClientPyro(options)
+    elif options.scenario_tree_manager == "multiprocess":
+        manager = ScenarioTreeManagerSolverClientMultiprocess(options)
     else:
         raise ValueError("Unrecognized value for option '%s': %s"
                          % ("scenario_tree_manager",
@@ -1730,6 +2014,8 @@ def _register_scenario_tree_manager_options(*args, **kwds):
                                                            **kwds)
     ScenarioTreeManagerSolverClientPyro.register_options(options,
                                                          **kwds)
+    ScenarioTreeManagerSolverClientMultiprocess.register_options(options,
+                                                                 **kwds)
     return options
 
 ScenarioTreeManagerFactory.register_options = \
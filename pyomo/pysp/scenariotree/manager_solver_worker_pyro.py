@@ -18,6 +18,8 @@ from pyomo.pysp.util.config import (PySPConfigBlock,
                                     safe_declare_common_option)
 from pyomo.pysp.scenariotree.manager_worker_pyro import \
     ScenarioTreeManagerWorkerPyro
+from pyomo.pysp.scenariotree.shared_memory import \
+    ScenarioTreeSharedMemory
 from pyomo.pysp.scenariotree.manager_solver import \
     (_ScenarioTreeManagerSolverWorker,
      ScenarioTreeManagerSolver)
@@ -46,6 +48,9 @@ class ScenarioTreeManagerSolverWorkerPyro(ScenarioTreeManagerWorkerPyro,
         # ScenarioTree variable IDs on this worker (by node name)
         self._master_scenario_tree_id_map = {}
         self._reverse_master_scenario_tree_id_map = {}
+        # Set when the client exchanges the scenario tree solution
+        # data through a ScenarioTreeSharedMemory object
+        self.shared_memory = None
 
     #
     # Abstract methods for ScenarioTreeManager:
@@ -58,6 +63,13 @@ class ScenarioTreeManagerSolverWorkerPyro(ScenarioTreeManagerWorkerPyro,
         super(ScenarioTreeManagerSolverWorkerPyro, self).\
             _init_solver_worker()
 
+    # Override the implementation on ScenarioTreeManagerWorkerPyro
+    def _close_impl(self):
+        super(ScenarioTreeManagerSolverWorkerPyro, self)._close_impl()
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+            self.shared_memory = None
+
     # Update the map from local to master scenario tree ids
     def _update_master_scenario_tree_ids_for_client(self,
                                                     object_name,
@@ -190,10 +202,52 @@ class ScenarioTreeManagerSolverWorkerPyro(ScenarioTreeManagerWorkerPyro,
                     translate_ids=\
                     self._reverse_master_scenario_tree_id_map)
 
+            if self.shared_memory is not None:
+                # the solution at the non-leaf nodes is written to
+                # the shared arrays rather than sent to the client
+                if object_type == 'bundles':
+                    scenario_names = self._scenario_tree.\
+                        get_bundle(object_name).scenario_names
+                    scenario_solutions = solution.values()
+                else:
+                    scenario_names = (object_name,)
+                    scenario_solutions = (solution,)
+                self.shared_memory.store(
+                    self._scenario_tree,
+                    'x',
+                    scenario_names=scenario_names,
+                    id_map=self._master_scenario_tree_id_map)
+                for scenario_solution in scenario_solutions:
+                    for node_name in self.shared_memory.node_names:
+                        scenario_solution['x'].pop(node_name, None)
+
             results[object_name] = (manager_object_results, solution)
 
         return results
 
+    def _attach_shared_memory_for_client(self, handle):
+
+        if self.get_option("verbose"):
+            print("Received request to attach to shared scenario tree "
+                  "data on scenario tree worker %s" % (self._worker_name))
+
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+        self.shared_memory = ScenarioTreeSharedMemory.attach(handle)
+
+    def _load_shared_memory_for_client(self, names):
+
+        if self.get_option("verbose"):
+            print("Received request to load shared scenario tree "
+                  "data (%s) on scenario tree worker %s"
+                  % (", ".join(names), self._worker_name))
+
+        for name in names:
+            self.shared_memory.load(
+                self._scenario_tree,
+                name,
+                id_map=self._master_scenario_tree_id_map)
+
     def _update_fixed_variables_for_client(self, fixed_variables):
 
         print("Received request to update fixed statuses on "
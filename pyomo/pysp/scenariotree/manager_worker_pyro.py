@@ -48,6 +48,10 @@ class ScenarioTreeManagerWorkerPyro(_ScenarioTreeManagerWorker,
                                "output_instance_construction_time")
     safe_declare_common_option(_declared_options,
                                "compile_scenario_instances")
+    safe_declare_common_option(_declared_options,
+                               "scenario_instance_cache_directory")
+    safe_declare_common_option(_declared_options,
+                               "template_scenario_instances")
 
     #
     # various
@@ -133,7 +137,11 @@ class ScenarioTreeManagerWorkerPyro(_ScenarioTreeManagerWorker,
                 output_instance_construction_time=\
                    self._options.output_instance_construction_time,
                 profile_memory=self._options.profile_memory,
-                compile_scenario_instances=self._options.compile_scenario_instances)
+                compile_scenario_instances=self._options.compile_scenario_instances,
+                instance_cache_directory=\
+                   self._options.scenario_instance_cache_directory,
+                template_scenario_instances=\
+                   self._options.template_scenario_instances)
 
         # with the scenario instances now available, have the scenario
         # tree compute the variable match indices at each node.
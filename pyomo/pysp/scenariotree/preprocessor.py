@@ -177,8 +177,8 @@ class ScenarioTreePreprocessor(PySPConfiguredObject):
 
         for scenario_name in self._bundle_scenarios[bundle._name]:
             assert scenario_name in self._scenario_instance
-            assert scenario_name in self._scenario_to_bundle_map
-            self._scenario_to_bundle_map[scenario_name] = bundle._name
+            assert self._scenario_to_bundle_map[scenario_name] == bundle._name
+            del self._scenario_to_bundle_map[scenario_name]
 
         del self._bundle_instances[bundle._name]
         del self._bundle_solvers[bundle._name]
@@ -468,9 +468,6 @@ class ScenarioTreePreprocessor(PySPConfiguredObject):
 
         elif len(instance_constraints_updated_list) > 0:
 
-            # TODO
-            assert not persistent_solver_in_use
-
             if self._options.verbose:
                 print("Preprocessing constraint list (size=%s) for "
                       "scenario %s" % (len(instance_constraints_updated_list),
@@ -496,7 +493,27 @@ class ScenarioTreePreprocessor(PySPConfiguredObject):
                 getattr(block, repn_name)[constraint_data] = \
                     repn_func(constraint_data.body, idMap=idMap)
 
-        if persistent_solver_in_use and (not solver.has_instance()):
+            if persistent_solver_in_use and solver.has_instance():
+                # There is no general interface for modifying a
+                # constraint compiled into a persistent solver
+                # plugin, so the updated constraints are removed
+                # and then added back if they are still active
+                # (e.g., to change a right-hand-side value)
+                for constraint_data in instance_constraints_updated_list:
+                    if isinstance(constraint_data, LinearCanonicalRepn):
+                        continue
+                    try:
+                        solver.remove_constraint(constraint_data)
+                    except KeyError:
+                        # the constraint was inactive when the
+                        # instance was compiled
+                        pass
+                    if constraint_data.active:
+                        solver.add_constraint(constraint_data)
+
+        if persistent_solver_in_use and \
+           ((not solver.has_instance()) or \
+            instance_all_constraints_updated):
             solver.set_instance(scenario_instance,
                                 symbolic_solver_labels=self._options.symbolic_solver_labels,
                                 output_fixed_variable_bounds=not self._options.preprocess_fixed_variables)
@@ -0,0 +1,181 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+__all__ = ("ScenarioDataStore",)
+
+import os
+import json
+
+try:
+    import numpy
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
+import six
+
+def _index_to_json(index):
+    if type(index) is tuple:
+        return list(index)
+    return index
+
+def _index_from_json(index):
+    if type(index) is list:
+        return tuple(index)
+    return index
+
+class ScenarioDataStore(object):
+    """
+    A columnar store of the values of the stochastic parameters for
+    the scenarios in a scenario tree. The store is a directory that
+    contains:
+
+      - ScenarioDataIndex.json: the scenario names, and the name and
+        index set of each stochastic parameter
+      - one .npy array for each stochastic parameter, with one row
+        per scenario (in the order of the scenario names) and one
+        column per parameter index
+      - ReferenceData.dat: the data for the reference model that is
+        common to all scenarios (the values of the stochastic
+        parameters in this file are ignored)
+
+    The arrays are memory-mapped when the store is opened, so the
+    values for a scenario are read directly from the file (and shared
+    between processes reading the same store) rather than parsed from
+    a .dat file. When a ScenarioTreeInstanceFactory finds a store in
+    its data directory, it constructs the reference model once from
+    ReferenceData.dat and creates each scenario instance by cloning it
+    and loading the scenario's values with load_scenario().
+    """
+
+    index_filename = "ScenarioDataIndex.json"
+    reference_data_filename = "ReferenceData.dat"
+
+    def __init__(self, directory):
+        if not numpy_available:
+            raise RuntimeError("The numpy package is required to "
+                               "use %s" % (type(self).__name__))
+        self._directory = directory
+        with open(os.path.join(directory, self.index_filename)) as f:
+            index = json.load(f)
+        self._reference_data_filename = \
+            index.get("reference_data", self.reference_data_filename)
+        self._scenario_names = tuple(index["scenarios"])
+        self._scenario_rows = dict((name, i) for i, name
+                                   in enumerate(self._scenario_names))
+        self._parameters = []
+        for entry in index["parameters"]:
+            values = numpy.load(os.path.join(directory, entry["file"]),
+                                mmap_mode='r')
+            indices = tuple(_index_from_json(index_)
+                            for index_ in entry["indices"])
+            if values.shape != (len(self._scenario_names), len(indices)):
+                raise ValueError(
+                    "The array for parameter %s in scenario data store %s "
+                    "has shape %s, but the index lists %s scenarios and "
+                    "%s parameter indices"
+                    % (entry["name"], directory, values.shape,
+                       len(self._scenario_names), len(indices)))
+            self._parameters.append((entry["name"], indices, values))
+
+    @classmethod
+    def exists(cls, directory):
+        """Returns True if the directory contains a scenario data
+        store."""
+        return (directory is not None) and \
+            os.path.exists(os.path.join(directory, cls.index_filename))
+
+    @classmethod
+    def write(cls,
+              directory,
+              scenario_names,
+              parameters,
+              reference_data):
+        """Write a scenario data store to a directory (which is
+        created if it does not exist). The parameters argument is a
+        list of tuples (name, indices, values), where values is a
+        two-dimensional array (or nested list) with one row per
+        scenario (in the order of scenario_names) and one column per
+        parameter index. The values of a parameter are stored as
+        integers if they are all integers, and as floats
+        otherwise. The reference_data argument is the text of the
+        .dat file that holds the data common to all
+        scenarios. Returns the opened store."""
+        if not numpy_available:
+            raise RuntimeError("The numpy package is required to "
+                               "use %s" % (cls.__name__))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        scenario_names = [str(name) for name in scenario_names]
+        index = {"scenarios": scenario_names,
+                 "reference_data": cls.reference_data_filename,
+                 "parameters": []}
+        for i, (name, indices, values) in enumerate(parameters):
+            values = numpy.array(values)
+            if values.dtype.kind != 'i':
+                values = numpy.array(values, dtype=float)
+            if values.shape != (len(scenario_names), len(indices)):
+                raise ValueError(
+                    "The values for parameter %s must have shape %s, "
+                    "not %s" % (name,
+                                (len(scenario_names), len(indices)),
+                                values.shape))
+            filename = "param_%d.npy" % (i)
+            numpy.save(os.path.join(directory, filename), values)
+            index["parameters"].append(
+                {"name": name,
+                 "file": filename,
+                 "indices": [_index_to_json(index_)
+                             for index_ in indices]})
+        with open(os.path.join(directory,
+                               cls.reference_data_filename), 'w') as f:
+            f.write(reference_data)
+        # the index is written last, so that a partially written
+        # store is not recognized by exists()
+        with open(os.path.join(directory, cls.index_filename), 'w') as f:
+            json.dump(index, f, indent=2)
+        return cls(directory)
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @property
+    def scenario_names(self):
+        return self._scenario_names
+
+    @property
+    def parameter_names(self):
+        return tuple(name for name, _, _ in self._parameters)
+
+    @property
+    def reference_data_file(self):
+        return os.path.join(self._directory,
+                            self._reference_data_filename)
+
+    def contains_scenario(self, scenario_name):
+        return scenario_name in self._scenario_rows
+
+    def scenario_values(self, scenario_name):
+        """Returns a list of tuples (name, indices, values) for the
+        stochastic parameters of a scenario, where values is a
+        read-only view of the scenario's row of the parameter
+        array."""
+        row = self._scenario_rows[scenario_name]
+        return [(name, indices, values[row])
+                for name, indices, values in self._parameters]
+
+    def load_scenario(self, instance, scenario_name):
+        """Assign the values of the stochastic parameters of a
+        scenario to the (mutable) parameters on an instance."""
+        for name, indices, values in self.scenario_values(scenario_name):
+            param = instance.find_component(name)
+            for index, val in six.moves.zip(indices, values.tolist()):
+                param[index] = val
@@ -0,0 +1,95 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+__all__ = ("ScenarioTreeServerMultiprocess",)
+
+import sys
+import logging
+import traceback
+try:
+    import cPickle as pickle
+except:
+    import pickle
+
+from pyutilib.pyro import TaskProcessingError
+
+from pyomo.pysp.scenariotree.server_pyro import ScenarioTreeServerPyro
+
+logger = logging.getLogger('pyomo.pysp')
+
+#
+# A scenario tree server that runs in a child process of a
+# ScenarioTreeActionManagerMultiprocess. It processes the same
+# requests as ScenarioTreeServerPyro (and instantiates the same
+# registered worker types), but receives them through a local queue
+# rather than from a Pyro dispatcher.
+#
+
+class ScenarioTreeServerMultiprocess(ScenarioTreeServerPyro):
+
+    def __init__(self, name, modules_imported=None, verbose=False):
+        # intentionally skips TaskWorker.__init__, which
+        # connects to a Pyro nameserver and dispatcher
+        self.WORKERNAME = name
+        self._verbose = verbose
+        self._worker_error = False
+        self._worker_shutdown = False
+        if modules_imported is None:
+            modules_imported = {}
+        self._modules_imported = modules_imported
+        self._init_server()
+
+    def serve(self, task_queue, result_queue):
+        """Process tasks from the task queue until a shutdown request
+        (or None) is received. Each task is a tuple (id, data,
+        generate_response), where data is the dictionary of keywords
+        passed to the action manager queue method. Responses are
+        placed on the result queue as pickled (id, result) tuples."""
+        while not self._worker_shutdown:
+            task = task_queue.get()
+            if task is None:
+                break
+            task_id, data, generate_response = task
+            try:
+                result = self._process(data)
+            except:
+                logger.error(
+                    "Scenario tree server %s caught an exception of type "
+                    "%s while processing a task."
+                    % (self.WORKERNAME, sys.exc_info()[0].__name__))
+                traceback.print_exception(*sys.exc_info())
+                self._worker_error = True
+                result = TaskProcessingError(traceback.format_exc())
+            if generate_response:
+                try:
+                    response = pickle.dumps((task_id, result),
+                                            pickle.HIGHEST_PROTOCOL)
+                except:
+                    response = pickle.dumps(
+                        (task_id,
+                         TaskProcessingError(
+                             "Unable to pickle the result of a task: %s"
+                             % (traceback.format_exc()))),
+                        pickle.HIGHEST_PROTOCOL)
+                result_queue.put(response)
+            sys.stdout.flush()
+        self.reset()
+
+#
+# The target of the server processes launched by
+# ScenarioTreeActionManagerMultiprocess
+#
+
+def _run_server(name, task_queue, result_queue, verbose):
+    server = ScenarioTreeServerMultiprocess(name, verbose=verbose)
+    try:
+        server.serve(task_queue, result_queue)
+    except KeyboardInterrupt:
+        pass
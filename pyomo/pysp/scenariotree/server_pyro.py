@@ -113,6 +113,9 @@ class ScenarioTreeServerPyro(TaskWorker, PySPConfiguredObject):
         self._bulk_task_collection = True
         self._contiguous_task_processing = False
 
+        self._init_server()
+
+    def _init_server(self):
         # This classes options get updated during the "setup" phase
         options = self.register_options()
         PySPConfiguredObject.__init__(self, options)
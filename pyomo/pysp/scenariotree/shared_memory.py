@@ -0,0 +1,272 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+__all__ = ("ScenarioTreeSharedMemory",)
+
+import os
+import tempfile
+
+try:
+    import numpy
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
+#
+# The per-scenario solution data exchanged between a scenario tree
+# manager and its workers. Each name maps to the attribute on the
+# scenario tree objects that stores the values for a tree node.
+#
+_scenario_attributes = {'x': '_x',
+                        'w': '_w',
+                        'rho': '_rho'}
+_node_attributes = {'xbar': '_xbars'}
+
+def _default_directory():
+    # /dev/shm is a RAM-backed filesystem on most Linux systems,
+    # so files placed there are never written to disk
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+class ScenarioTreeSharedMemory(object):
+    """
+    Stores the scenario solutions (x), weights (w), and rho values
+    at each non-leaf node of a scenario tree, along with the node
+    averages (xbar), in a memory-mapped file that can be attached
+    by any process on the same host.
+
+    The manager creates the object from its scenario tree and sends
+    the (small) handle to its workers, which attach to it. After
+    that, the data is exchanged by reading and writing rows of the
+    shared arrays rather than by sending dictionaries between
+    processes. For a non-leaf tree node, the arrays returned by x(),
+    w(), and rho() have one row per scenario passing through the
+    node (in the order of the node's scenarios in the master
+    scenario tree) and one column per variable (in the order
+    returned by get_standard_variable_id_order() on the tree
+    node). The array returned by xbar() has one entry per variable.
+    Values that have not been set are stored as NaN.
+
+    The store() and load() methods copy data between the shared
+    arrays and the scenario tree objects in the current process
+    (which may contain only a subset of the scenarios). When the
+    variable ids on that scenario tree differ from those on the
+    master scenario tree (as on the workers of a scenario tree
+    manager), an id_map is passed that maps each node name to a
+    dictionary from master variable id to local variable id.
+    """
+
+    def __init__(self, layout, filename, owner=False):
+        if not numpy_available:
+            raise RuntimeError("The numpy package is required to "
+                               "use %s" % (type(self).__name__))
+        self._layout = layout
+        self._filename = filename
+        self._owner = owner
+        # the process that created the file is responsible for
+        # removing it (not a forked copy of this object)
+        self._pid = os.getpid()
+        self._offsets = {}
+        size = 0
+        for node_name, scenario_names, variable_ids in layout:
+            num_scenarios = len(scenario_names)
+            num_variables = len(variable_ids)
+            self._offsets[node_name] = \
+                (size,
+                 dict((scenario_name, i) for i, scenario_name
+                      in enumerate(scenario_names)),
+                 num_scenarios,
+                 num_variables,
+                 variable_ids)
+            size += (3 * num_scenarios + 1) * num_variables
+        self._size = size
+        if owner:
+            self._data = numpy.memmap(filename,
+                                      dtype=float,
+                                      mode='w+',
+                                      shape=(max(size, 1),))
+            self._data[:] = numpy.nan
+        else:
+            self._data = numpy.memmap(filename,
+                                      dtype=float,
+                                      mode='r+',
+                                      shape=(max(size, 1),))
+
+    @classmethod
+    def create(cls, scenario_tree, directory=None):
+        """Allocate the shared arrays for a (master) scenario tree
+        whose variable ids have been created. The file is removed
+        when the returned object is closed."""
+        layout = []
+        for stage in scenario_tree._stages[:-1]:
+            for tree_node in stage._tree_nodes:
+                layout.append(
+                    (tree_node._name,
+                     tuple(scenario._name
+                           for scenario in tree_node._scenarios),
+                     tree_node.get_standard_variable_id_order()))
+        if directory is None:
+            directory = _default_directory()
+        fd, filename = tempfile.mkstemp(prefix="pysp_shared_",
+                                        suffix=".dat",
+                                        dir=directory)
+        os.close(fd)
+        try:
+            return cls(tuple(layout), filename, owner=True)
+        except:
+            os.remove(filename)
+            raise
+
+    @classmethod
+    def attach(cls, handle):
+        """Attach to the shared arrays identified by a handle
+        obtained from another process."""
+        filename, layout = handle
+        return cls(layout, filename, owner=False)
+
+    @property
+    def handle(self):
+        """A picklable object that can be passed to attach() in
+        another process."""
+        return (self._filename, self._layout)
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def node_names(self):
+        """The names of the scenario tree nodes with shared
+        arrays."""
+        return tuple(node_name for node_name, _, _ in self._layout)
+
+    def close(self):
+        """Release the shared arrays. If this object created them,
+        the backing file is removed."""
+        if self._data is None:
+            return
+        self._data = None
+        if self._owner and \
+           (self._pid == os.getpid()) and \
+           os.path.exists(self._filename):
+            os.remove(self._filename)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def variable_ids(self, node_name):
+        """The variable ids for the columns of the arrays at a node."""
+        return self._offsets[node_name][4]
+
+    def _block(self, node_name, index):
+        start, rows, num_scenarios, num_variables, variable_ids = \
+            self._offsets[node_name]
+        start += index * num_scenarios * num_variables
+        return self._data[start:start + num_scenarios * num_variables].\
+            reshape((num_scenarios, num_variables))
+
+    def x(self, node_name):
+        return self._block(node_name, 0)
+
+    def w(self, node_name):
+        return self._block(node_name, 1)
+
+    def rho(self, node_name):
+        return self._block(node_name, 2)
+
+    def xbar(self, node_name):
+        start, rows, num_scenarios, num_variables, variable_ids = \
+            self._offsets[node_name]
+        start += 3 * num_scenarios * num_variables
+        return self._data[start:start + num_variables]
+
+    def scenario_row(self, node_name, scenario_name):
+        """The row of the scenario arrays at a node that belongs to
+        the named scenario."""
+        return self._offsets[node_name][1][scenario_name]
+
+    def _local_nodes(self, scenario_tree, id_map):
+        for node_name, scenario_names, variable_ids in self._layout:
+            if scenario_tree.contains_node(node_name):
+                if id_map is not None:
+                    node_id_map = id_map[node_name]
+                    variable_ids = [node_id_map[variable_id]
+                                    for variable_id in variable_ids]
+                yield scenario_tree.get_node(node_name), variable_ids
+
+    def store(self,
+              scenario_tree,
+              name,
+              scenario_names=None,
+              id_map=None):
+        """Copy values from the scenario tree objects into the shared
+        arrays. The name must be one of 'x', 'w', 'rho', or 'xbar'.
+        For the scenario data, only the named scenarios are copied
+        (all scenarios in the local tree if scenario_names is
+        None)."""
+        if name in _node_attributes:
+            attribute = _node_attributes[name]
+            for tree_node, variable_ids in \
+                    self._local_nodes(scenario_tree, id_map):
+                values = getattr(tree_node, attribute)
+                self.xbar(tree_node._name)[:] = \
+                    [values.get(variable_id, None) for variable_id
+                     in variable_ids]
+            return
+        attribute = _scenario_attributes[name]
+        for tree_node, variable_ids in \
+                self._local_nodes(scenario_tree, id_map):
+            array = getattr(self, name)(tree_node._name)
+            rows = self._offsets[tree_node._name][1]
+            for scenario in tree_node._scenarios:
+                if (scenario_names is not None) and \
+                   (scenario._name not in scenario_names):
+                    continue
+                values = getattr(scenario, attribute)[tree_node._name]
+                array[rows[scenario._name],:] = \
+                    [values.get(variable_id, None) for variable_id
+                     in variable_ids]
+
+    def load(self,
+             scenario_tree,
+             name,
+             scenario_names=None,
+             id_map=None):
+        """Copy values from the shared arrays into the scenario tree
+        objects (the reverse of store()). NaN entries are loaded as
+        None."""
+        if name in _node_attributes:
+            attribute = _node_attributes[name]
+            for tree_node, variable_ids in \
+                    self._local_nodes(scenario_tree, id_map):
+                getattr(tree_node, attribute).update(
+                    zip(variable_ids,
+                        _to_list(self.xbar(tree_node._name))))
+            return
+        attribute = _scenario_attributes[name]
+        for tree_node, variable_ids in \
+                self._local_nodes(scenario_tree, id_map):
+            array = getattr(self, name)(tree_node._name)
+            rows = self._offsets[tree_node._name][1]
+            for scenario in tree_node._scenarios:
+                if (scenario_names is not None) and \
+                   (scenario._name not in scenario_names):
+                    continue
+                getattr(scenario, attribute)[tree_node._name].update(
+                    zip(variable_ids,
+                        _to_list(array[rows[scenario._name],:])))
+
+def _to_list(values):
+    return [None if value != value else value
+            for value in values.tolist()]
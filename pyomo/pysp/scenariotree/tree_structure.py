@@ -34,11 +34,18 @@ from pyomo.pysp.phutils import (BasicSymbolMap,
                                 extractVariableNameAndIndex,
                                 extractComponentIndices,
                                 find_active_objective)
+from pyomo.pysp.scenariotree.compact_storage import NodeSolutionArrays
 
 import six
 from six import iterkeys, iteritems, itervalues
 from six.moves import xrange
 
+try:
+    import numpy
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
 logger = logging.getLogger('pyomo.pysp')
 
 class ScenarioTreeNode(object):
@@ -147,6 +154,16 @@ class ScenarioTreeNode(object):
         # keys are variable ids.
         self._solution = {}
 
+        # a fixed ordering of the standard variable ids, used to
+        # gather scenario solutions into arrays (see
+        # get_standard_variable_id_order)
+        self._standard_variable_id_order = ()
+
+        # when the solution data for this node is stored in dense
+        # arrays, the NodeSolutionArrays object holding them (see
+        # compact_solution_data)
+        self._solution_arrays = None
+
     @property
     def name(self):
         return self._name
@@ -222,6 +239,10 @@ class ScenarioTreeNode(object):
                                        id_labeler=None,
                                        name_index_to_id_map=None):
 
+        # the arrays for the solution data do not have columns for
+        # new variable ids
+        self.expand_solution_data()
+
         # ensure that the variable exists on each scenario instance,
         # and that there is at least one index match per template.
 
@@ -490,6 +511,7 @@ class ScenarioTreeNode(object):
             return
 
         # Create a fully populated scenario tree node.
+        self._solution_arrays = None
         if not self.is_leaf_node():
             self._minimums = dict.fromkeys(self._variable_ids,0)
             self._maximums = dict.fromkeys(self._variable_ids,0)
@@ -513,6 +535,71 @@ class ScenarioTreeNode(object):
             scenario._x[self._name] = \
                 dict.fromkeys(self._variable_ids,None)
 
+    #
+    # returns the standard variable ids at this node in a fixed
+    # (sorted) order. the ids are only ever added to the set, so
+    # the cached order is rebuilt whenever its size changes.
+    #
+
+    def get_standard_variable_id_order(self):
+        if len(self._standard_variable_id_order) != \
+           len(self._standard_variable_ids):
+            self._standard_variable_id_order = \
+                tuple(sorted(self._standard_variable_ids))
+        return self._standard_variable_id_order
+
+    #
+    # returns a (scenarios x variables) numpy array holding the
+    # values stored in the given per-scenario dictionaries (e.g.,
+    # "_x", "_w", or "_rho") for this node, with rows in the order
+    # of self._scenarios and columns in the order of variable_ids.
+    # values that are None are stored as NaN.
+    #
+
+    def get_scenario_array(self, attribute, variable_ids=None):
+        if not numpy_available:
+            raise RuntimeError("The numpy package is required to "
+                               "build scenario arrays")
+        if variable_ids is None:
+            variable_ids = self.get_standard_variable_id_order()
+        if (self._solution_arrays is not None) and \
+           (attribute in NodeSolutionArrays.scenario_attributes):
+            values = self._solution_arrays.get_scenario_array(attribute,
+                                                              variable_ids)
+            if values is not None:
+                return values
+        return numpy.array(
+            [list(map(getattr(scenario, attribute)[self._name].__getitem__,
+                      variable_ids))
+             for scenario in self._scenarios],
+            dtype=float).reshape((len(self._scenarios), len(variable_ids)))
+
+    #
+    # stores the node statistics and the _x, _w, and _rho values of
+    # the scenarios at this node in dense arrays, replacing the
+    # dictionaries with views onto the arrays. the values currently
+    # in the dictionaries are copied. leaf nodes are left as is, as
+    # they are not shared by scenarios. returns True if the data was
+    # compacted.
+    #
+
+    def compact_solution_data(self):
+        if self.is_leaf_node():
+            return False
+        self.expand_solution_data()
+        self._solution_arrays = NodeSolutionArrays(self)
+        self._solution_arrays.install()
+        return True
+
+    #
+    # the inverse of compact_solution_data.
+    #
+
+    def expand_solution_data(self):
+        if self._solution_arrays is not None:
+            self._solution_arrays.uninstall()
+            self._solution_arrays = None
+
     #
     # copies the parameter values values from the _averages attribute
     # into the _solution attribute - only for active variable values.
@@ -1122,7 +1209,13 @@ class Scenario(object):
         self._weight_term_cost = solution['weight term cost']
         self._proximal_term_cost = solution['proximal term cost']
         assert set(solution['x'].keys()) == set(self._x.keys())
-        self._x = copy.deepcopy(solution['x'])
+        # update in place, as the node dictionaries may be views
+        # onto compact storage (see compact_solution_data)
+        for node_name, node_x in iteritems(solution['x']):
+            self_node_x = self._x[node_name]
+            if self_node_x is not node_x:
+                self_node_x.clear()
+                self_node_x.update(node_x)
         assert set(solution['fixed'].keys()) == set(self._fixed.keys())
         assert set(solution['stale'].keys()) == set(self._stale.keys())
         # See note in copy_solution method about converting
@@ -1644,6 +1737,25 @@ class ScenarioTree(object):
         for tree_node in self._tree_nodes:
             tree_node.updateNodeStatistics()
 
+    #
+    # store the solution data for the non-leaf tree nodes (and the
+    # scenarios passing through them) in dense arrays, keeping the
+    # dictionary-style access through views (see
+    # ScenarioTreeNode.compact_solution_data). returns the number of
+    # nodes that were compacted.
+    #
+
+    def compact_solution_data(self):
+        count = 0
+        for tree_node in self._tree_nodes:
+            if tree_node.compact_solution_data():
+                count += 1
+        return count
+
+    def expand_solution_data(self):
+        for tree_node in self._tree_nodes:
+            tree_node.expand_solution_data()
+
     #
     # populate those portions of the scenario tree and associated
     # stages and tree nodes that reference the scenario instances
@@ -2336,47 +2448,77 @@ class ScenarioTree(object):
             sequence = list(range(num_scenarios))
             random.shuffle(sequence)
 
-            scenario_tree_instance.Bundling[None] = True
-
-            next_scenario_index = 0
-
-            # this is a hack-ish way to re-initialize the Bundles set of a
-            # scenario tree instance, which should already be there
-            # (because it is defined in the abstract model).  however, we
-            # don't have a "clear" method on a set, so...
-            scenario_tree_instance.del_component("Bundles")
-            scenario_tree_instance.add_component("Bundles", Set(ordered=True))
-            for i in xrange(1, num_bundles+1):
-                bundle_name = "Bundle"+str(i)
-                scenario_tree_instance.Bundles.add(bundle_name)
-
-            # ditto above comment regarding del_component/add_component
-            scenario_tree_instance.del_component("BundleScenarios")
-            scenario_tree_instance.add_component("BundleScenarios",
-                                                 Set(scenario_tree_instance.Bundles,
-                                                     ordered=True))
-
-            bundles = []
-            for i in xrange(num_bundles):
-                bundle_name = "Bundle"+str(i+1)
-                tmp = Set(ordered=True)
-                tmp.construct()
-                scenario_tree_instance.BundleScenarios[bundle_name] = tmp
-                bundles.append(scenario_tree_instance.BundleScenarios[bundle_name])
-
+            bundle_scenarios = [[] for i in xrange(num_bundles)]
             scenario_index = 0
             while (scenario_index < num_scenarios):
                 for bundle_index in xrange(num_bundles):
                     if (scenario_index == num_scenarios):
                         break
-                    bundles[bundle_index].add(
+                    bundle_scenarios[bundle_index].append(
                         self._scenarios[sequence[scenario_index]]._name)
                     scenario_index += 1
 
-            self._construct_scenario_bundles(scenario_tree_instance)
+            self._create_bundles(scenario_tree_instance,
+                                 bundle_scenarios)
         finally:
             random.setstate(random_state)
 
+    #
+    # create bundles whose total scenario solve times are balanced,
+    # using the solve_times dictionary (mapping scenario name to
+    # solve time). Scenarios without a solve time are assigned the
+    # mean of the known times.
+    #
+
+    def create_balanced_bundles(self,
+                                scenario_tree_instance,
+                                num_bundles,
+                                solve_times):
+
+        from pyomo.pysp.scenariotree.bundling import \
+            (partition_by_solve_time,
+             estimate_scenario_solve_times)
+
+        solve_times = estimate_scenario_solve_times(
+            [scenario._name for scenario in self._scenarios],
+            solve_times)
+        self._create_bundles(
+            scenario_tree_instance,
+            partition_by_solve_time(solve_times, num_bundles))
+
+    def _create_bundles(self, scenario_tree_instance, bundle_scenarios):
+
+        num_bundles = len(bundle_scenarios)
+
+        scenario_tree_instance.Bundling[None] = True
+
+        # this is a hack-ish way to re-initialize the Bundles set of a
+        # scenario tree instance, which should already be there
+        # (because it is defined in the abstract model).  however, we
+        # don't have a "clear" method on a set, so...
+        scenario_tree_instance.del_component("Bundles")
+        scenario_tree_instance.add_component("Bundles", Set(ordered=True))
+        for i in xrange(1, num_bundles+1):
+            bundle_name = "Bundle"+str(i)
+            scenario_tree_instance.Bundles.add(bundle_name)
+
+        # ditto above comment regarding del_component/add_component
+        scenario_tree_instance.del_component("BundleScenarios")
+        scenario_tree_instance.add_component("BundleScenarios",
+                                             Set(scenario_tree_instance.Bundles,
+                                                 ordered=True))
+
+        for i in xrange(num_bundles):
+            bundle_name = "Bundle"+str(i+1)
+            tmp = Set(ordered=True)
+            tmp.construct()
+            scenario_tree_instance.BundleScenarios[bundle_name] = tmp
+            for scenario_name in bundle_scenarios[i]:
+                scenario_tree_instance.BundleScenarios[bundle_name].\
+                    add(scenario_name)
+
+        self._construct_scenario_bundles(scenario_tree_instance)
+
     #
     # a utility function to pretty-print the static/non-cost
     # information associated with a scenario tree
@@ -37,7 +37,8 @@ from pyomo.pysp.scenariotree.instance_factory import \
     ScenarioTreeInstanceFactory
 from pyomo.pysp.scenariotree.manager import \
     (ScenarioTreeManagerClientSerial,
-     ScenarioTreeManagerClientPyro)
+     ScenarioTreeManagerClientPyro,
+     ScenarioTreeManagerClientMultiprocess)
 from pyomo.pysp.util.misc import launch_command
 import pyomo.pysp.smps.smpsutils
 
@@ -148,6 +149,7 @@ def pysp2smps_register_options(options=None):
     safe_register_common_option(options, "scenario_tree_manager")
     ScenarioTreeManagerClientSerial.register_options(options)
     ScenarioTreeManagerClientPyro.register_options(options)
+    ScenarioTreeManagerClientMultiprocess.register_options(options)
 
     return options
 
@@ -186,6 +188,8 @@ def run_pysp2smps(options):
         manager_class = ScenarioTreeManagerClientSerial
     elif options.scenario_tree_manager == 'pyro':
         manager_class = ScenarioTreeManagerClientPyro
+    elif options.scenario_tree_manager == 'multiprocess':
+        manager_class = ScenarioTreeManagerClientMultiprocess
 
     with manager_class(options) as scenario_tree_manager:
         scenario_tree_manager.initialize()
@@ -1102,6 +1102,59 @@ def _convert_explicit_setup_without_cleanup(worker,
             stochastic_firststagevar_objective_count,
             stochastic_secondstagevar_objective_count)
 
+#
+# The consistency checks performed by convert_explicit, in the order
+# they are reported. Each compares a file written for a scenario
+# against the same file written for the reference scenario.
+#
+_convert_explicit_checks = ("row", "col", "tim", "sto.struct", "det")
+_convert_explicit_check_labels = \
+    {"row": "Checking row ordering...",
+     "col": "Checking column ordering...",
+     "tim": "Checking time-stage classifications...",
+     "sto.struct": "Checking sparse locations of stochastic elements...",
+     "det": "Checking deterministic sections in the core problem file..."}
+
+def _convert_explicit_scenario_filename(scenario_directory,
+                                        basename,
+                                        core_format,
+                                        check,
+                                        scenario_name):
+    if check == "det":
+        suffix = "."+core_format+".det."
+    else:
+        suffix = "."+check+"."
+    return os.path.join(scenario_directory,
+                        basename+suffix+scenario_name)
+
+def _convert_explicit_check(worker,
+                            scenario,
+                            scenario_directory,
+                            basename,
+                            core_format,
+                            reference_scenario_name):
+    """Compare the files written for a scenario by
+    _convert_explicit_setup against those written for the reference
+    scenario. Returns the list of checks that failed."""
+    mismatches = []
+    if scenario.name == reference_scenario_name:
+        return mismatches
+    for check in _convert_explicit_checks:
+        if not filecmp.cmp(
+                _convert_explicit_scenario_filename(scenario_directory,
+                                                    basename,
+                                                    core_format,
+                                                    check,
+                                                    scenario.name),
+                _convert_explicit_scenario_filename(scenario_directory,
+                                                    basename,
+                                                    core_format,
+                                                    check,
+                                                    reference_scenario_name),
+                shallow=False):
+            mismatches.append(check)
+    return mismatches
+
 def convert_explicit(output_directory,
                      basename,
                      scenario_tree_manager,
@@ -1143,10 +1196,6 @@ def convert_explicit(output_directory,
     reference_scenario = scenario_tree.scenarios[0]
     reference_scenario_name = reference_scenario.name
 
-    # TODO: Out of laziness we are making shell calls to
-    #       tools like 'cp' and 'cat'. Update the code to
-    #       work on Windows.
-
     #
     # Copy the reference scenario's core, row, col, and tim
     # to the output directory. The consistency checks will
@@ -1273,140 +1322,88 @@ def convert_explicit(output_directory,
                   "prohibitively slow or can not be executed on "
                   "your system, disable it by activating the "
                   "disable_consistency_check option.")
-        has_diff = False
-        try:
-            if not os.system('diff --help > /dev/null'):
-                has_diff = True
-            else:
-                has_diff = False
-        except:
-            has_diff = False
-        if verbose:
-            print(" - Checking row and column ordering...")
-        for scenario in scenario_tree.scenarios:
-            scenario_core_row_filename = \
-                os.path.join(scenario_directory,
-                             basename+".row."+scenario.name)
-            if has_diff:
-                rc = os.system('diff -q '+scenario_core_row_filename+' '+
-                               core_row_filename)
-            else:
-                rc = not filecmp.cmp(scenario_core_row_filename,
-                                     core_row_filename,
-                                     shallow=False)
-            if rc:
-                raise ValueError(
-                    "The row ordering indicated in file '%s' does not match "
-                    "that for scenario %s indicated in file '%s'. This "
-                    "suggests that the same constraint is being classified "
-                    "in different time stages across scenarios. Consider "
-                    "manually declaring constraint stages using the %s "
-                    "annotation if not already doing so, or report this "
-                    "issue to the PySP developers."
-                    % (core_row_filename,
-                       scenario.name,
-                       scenario_core_row_filename,
-                       PySP_ConstraintStageAnnotation.__name__))
-
-            scenario_core_col_filename = \
-                os.path.join(scenario_directory,
-                             basename+".col."+scenario.name)
-            if has_diff:
-                rc = os.system('diff -q '+scenario_core_col_filename+' '+
-                               core_col_filename)
-            else:
-                rc = not filecmp.cmp(scenario_core_col_filename,
-                                     core_col_filename,
-                                     shallow=False)
-            if rc:
-                raise ValueError(
-                    "The column ordering indicated in file '%s' does not "
-                    "match that for scenario %s indicated in file '%s'. "
-                    "This suggests that the set of variables on the model "
-                    "changes across scenarios. This is not allowed by the "
-                    "SMPS format. If you feel this is a developer error, "
-                    "please report this issue to the PySP developers."
-                    % (core_col_filename,
-                       scenario.name,
-                       scenario_core_col_filename))
-
-        if verbose:
-            print(" - Checking time-stage classifications...")
-        for scenario in scenario_tree.scenarios:
-            scenario_tim_filename = \
-                os.path.join(scenario_directory,
-                             basename+".tim."+scenario.name)
-            if has_diff:
-                rc = os.system('diff -q '+scenario_tim_filename+' '+
-                               tim_filename)
-            else:
-                rc = not filecmp.cmp(scenario_tim_filename,
-                                     tim_filename,
-                                     shallow=False)
-            if rc:
-                raise ValueError(
-                    "Main .tim file '%s' does not match .tim file for "
-                    "scenario %s located at '%s'. This indicates there was "
-                    "a problem translating the reference model to SMPS "
-                    "format. Please make sure the problem structure is "
-                    "identical over all scenarios (e.g., no. of variables, "
-                    "no. of constraints), or report this issue to the PySP "
-                    "developers if you feel that it is a developer error."
-                    % (tim_filename,
-                       scenario.name,
-                       scenario_tim_filename))
-
-        if verbose:
-            print(" - Checking sparse locations of stochastic elements...")
-        for scenario in scenario_tree.scenarios:
-            scenario_sto_struct_filename = \
-                os.path.join(scenario_directory,
-                             basename+".sto.struct."+scenario.name)
-            if has_diff:
-                rc = os.system('diff -q '+scenario_sto_struct_filename+' '+
-                               sto_struct_filename)
-            else:
-                rc = not filecmp.cmp(scenario_sto_struct_filename,
-                                     sto_struct_filename,
-                                     shallow=False)
-            if rc:
-                raise ValueError(
-                    "The structure of stochastic entries indicated in file "
-                    "'%s' does not match that for scenario %s indicated in "
-                    "file '%s'. This suggests that the set of variables "
-                    "appearing in some expression declared as stochastic is "
-                    "changing across scenarios. If you feel this is a "
-                    "developer error, please report this issue to the PySP "
-                    "developers." % (sto_struct_filename,
-                                     scenario.name,
-                                     scenario_sto_struct_filename))
-
-        if verbose:
-            print(" - Checking deterministic sections in the core "
-                  "problem file...")
-        for scenario in scenario_tree.scenarios:
-            scenario_core_det_filename = \
-                os.path.join(scenario_directory,
-                             basename+"."+core_format+".det."+scenario.name)
-            if has_diff:
-                rc = os.system('diff -q '+scenario_core_det_filename+' '+
-                               core_det_filename)
-            else:
-                rc = not filecmp.cmp(scenario_core_det_filename,
-                                     core_det_filename,
-                                     shallow=False)
-            if rc:
-                raise ValueError(
-                    "One or more deterministic parts of the problem found "
-                    "in file '%s' do not match those for scenario %s found "
-                    "in file %s. This suggests that one or more locations "
-                    "of stochastic data have not been been annotated on the "
-                    "reference Pyomo model. If this seems like a tolerance "
-                    "issue or a developer error, please report this issue "
-                    "to the PySP developers."
-                    % (core_det_filename,
-                       scenario.name,
-                       scenario_core_det_filename))
+        # the comparisons are performed by the scenario tree
+        # workers (in parallel when the manager supports it)
+        mismatches = scenario_tree_manager.invoke_function(
+            "_convert_explicit_check",
+            thisfile,
+            invocation_type=InvocationType.PerScenario,
+            function_args=(scenario_directory,
+                           basename,
+                           core_format,
+                           reference_scenario_name))
+        for check in _convert_explicit_checks:
+            if verbose:
+                print(" - "+_convert_explicit_check_labels[check])
+            for scenario in scenario_tree.scenarios:
+                if check not in mismatches[scenario.name]:
+                    continue
+                scenario_filename = _convert_explicit_scenario_filename(
+                    scenario_directory,
+                    basename,
+                    core_format,
+                    check,
+                    scenario.name)
+                if check == "row":
+                    raise ValueError(
+                        "The row ordering indicated in file '%s' does not match "
+                        "that for scenario %s indicated in file '%s'. This "
+                        "suggests that the same constraint is being classified "
+                        "in different time stages across scenarios. Consider "
+                        "manually declaring constraint stages using the %s "
+                        "annotation if not already doing so, or report this "
+                        "issue to the PySP developers."
+                        % (core_row_filename,
+                           scenario.name,
+                           scenario_filename,
+                           PySP_ConstraintStageAnnotation.__name__))
+                elif check == "col":
+                    raise ValueError(
+                        "The column ordering indicated in file '%s' does not "
+                        "match that for scenario %s indicated in file '%s'. "
+                        "This suggests that the set of variables on the model "
+                        "changes across scenarios. This is not allowed by the "
+                        "SMPS format. If you feel this is a developer error, "
+                        "please report this issue to the PySP developers."
+                        % (core_col_filename,
+                           scenario.name,
+                           scenario_filename))
+                elif check == "tim":
+                    raise ValueError(
+                        "Main .tim file '%s' does not match .tim file for "
+                        "scenario %s located at '%s'. This indicates there was "
+                        "a problem translating the reference model to SMPS "
+                        "format. Please make sure the problem structure is "
+                        "identical over all scenarios (e.g., no. of variables, "
+                        "no. of constraints), or report this issue to the PySP "
+                        "developers if you feel that it is a developer error."
+                        % (tim_filename,
+                           scenario.name,
+                           scenario_filename))
+                elif check == "sto.struct":
+                    raise ValueError(
+                        "The structure of stochastic entries indicated in file "
+                        "'%s' does not match that for scenario %s indicated in "
+                        "file '%s'. This suggests that the set of variables "
+                        "appearing in some expression declared as stochastic is "
+                        "changing across scenarios. If you feel this is a "
+                        "developer error, please report this issue to the PySP "
+                        "developers." % (sto_struct_filename,
+                                         scenario.name,
+                                         scenario_filename))
+                else:
+                    assert check == "det"
+                    raise ValueError(
+                        "One or more deterministic parts of the problem found "
+                        "in file '%s' do not match those for scenario %s found "
+                        "in file %s. This suggests that one or more locations "
+                        "of stochastic data have not been been annotated on the "
+                        "reference Pyomo model. If this seems like a tolerance "
+                        "issue or a developer error, please report this issue "
+                        "to the PySP developers."
+                        % (core_det_filename,
+                           scenario.name,
+                           scenario_filename))
 
     if not keep_auxiliary_files:
         _safe_remove_file(core_row_filename)
@@ -12,3 +12,5 @@ import pyomo.pysp.solvers.spsolver
 from pyomo.pysp.solvers.spsolver import SPSolverFactory
 
 import pyomo.pysp.solvers.sd
+
+import pyomo.pysp.solvers.lshaped
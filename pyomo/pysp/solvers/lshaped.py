@@ -0,0 +1,97 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import time
+
+from pyomo.core import minimize
+from pyomo.pysp.util.configured_object import PySPConfiguredObject
+from pyomo.pysp.util.config import PySPConfigBlock
+from pyomo.pysp.phutils import indexToString
+from pyomo.pysp.scenariotree.manager_solver import \
+    ScenarioTreeManagerSolver
+from pyomo.pysp.benders import BendersAlgorithm
+from pyomo.pysp.solvers.spsolver import (SPSolver,
+                                         SPSolverResults,
+                                         SPSolverFactory)
+
+class LShapedSolver(SPSolver, PySPConfiguredObject):
+    """
+    An in-process L-shaped (Benders decomposition) solver for
+    two-stage stochastic programs. Unlike the SD solver, no SMPS
+    files are written: the master problem is built from the scenario
+    tree and the subproblems are the scenario instances (or bundles)
+    owned by a scenario tree manager solver. With the 'multiprocess'
+    scenario tree manager, the subproblems are solved in parallel by
+    a pool of local processes, each of which keeps its instances
+    (and any persistent solver plugins) for the duration of the
+    solve. The cut_sample_size option enables cut generation from
+    random samples of the cut groups (see BendersAlgorithm).
+    """
+
+    @classmethod
+    def _declare_options(cls, options=None):
+        if options is None:
+            options = PySPConfigBlock()
+        BendersAlgorithm.register_options(options)
+        return options
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def __init__(self, *args, **kwds):
+        super(LShapedSolver, self).__init__(*args, **kwds)
+        self._name = "lshaped"
+
+    def solve(self, sp, *args, **kwds):
+        # check the type before the base class collects
+        # statistics from the scenario tree
+        if not isinstance(sp, ScenarioTreeManagerSolver):
+            raise TypeError("The L-shaped solver requires an instance "
+                            "of the ScenarioTreeManagerSolver interface")
+        return super(LShapedSolver, self).solve(sp, *args, **kwds)
+
+    def _solve_impl(self, sp):
+
+        start = time.time()
+        with BendersAlgorithm(sp, self._options) as benders:
+            benders.build_master_problem()
+            objective = benders.solve()
+            master_bounds = list(benders.master_bound_history.values())
+            optimality_gap = benders.optimality_gap
+            iterations = benders.iterations
+            xhat = benders.incumbent_xhat
+        stop = time.time()
+
+        results = SPSolverResults()
+        results.objective = objective
+        if sp.objective_sense == minimize:
+            results.bound = max(master_bounds)
+        else:
+            results.bound = min(master_bounds)
+        results.solver_time = stop - start
+        if optimality_gap * 100 <= self.get_option("percent_gap"):
+            results.solver_status = "optimal"
+        else:
+            results.solver_status = "max_iterations"
+        results.optimality_gap = optimality_gap
+        results.iterations = iterations
+
+        rootnode = sp.scenario_tree.findRootNode()
+        results.xhat = {}
+        for variable_id, varvalue in xhat.items():
+            name, index = rootnode._variable_ids[variable_id]
+            results.xhat[name+indexToString(index)] = varvalue
+
+        return results
+
+SPSolverFactory.register_solver("lshaped", LShapedSolver)
@@ -43,7 +43,8 @@ class SPSolverResults(object):
                  'solver_time']
         # sort by order above, then by name
         names = sorted(list(attrs.keys()),
-                       key=lambda x: order.index(x) if (x in order) else x)
+                       key=lambda x: (order.index(x), x) if (x in order) \
+                                     else (len(order), x))
         out =  "SPSolverResults:\n"
         for name in names:
             out += "  %s: %s\n" % (name, attrs[name])
@@ -64,7 +65,7 @@ class SPSolver(PySPConfiguredObject):
 
     @property
     def name(self):
-        self._name
+        return self._name
 
     def solve(self, sp, *args, **kwds):
 
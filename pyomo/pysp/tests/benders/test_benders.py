@@ -121,6 +121,211 @@ class _RunBendersTesterBase(object):
         self._run_cmd(cmd)
         self._cleanup()
 
+    def test_scenarios_multicut_cut_pool(self):
+        self._setup(self.options)
+        self.options['--multicut-level'] = 0
+        self.options['--cut-pool-slack-iterations'] = 1
+        cmd = self._get_cmd()
+        self._run_cmd(cmd)
+        self._cleanup()
+
+    def test_scenarios_multicut_cut_sample(self):
+        self._setup(self.options)
+        self.options['--multicut-level'] = 0
+        self.options['--cut-sample-size'] = 1
+        self.options['--cut-sample-seed'] = 0
+        cmd = self._get_cmd()
+        self._run_cmd(cmd)
+        self._cleanup()
+
+class TestBendersCutPool(unittest.TestCase):
+
+    def _create_benders(self, cut_pool_slack_iterations):
+        from pyomo.pysp.benders import (runbenders_register_options,
+                                        BendersAlgorithm)
+        from pyomo.pysp.scenariotree.manager_solver import \
+            ScenarioTreeManagerFactory
+        options = runbenders_register_options()
+        farmer_examples_dir = join(pysp_examples_dir, "farmer")
+        options.model_location = join(farmer_examples_dir, "models")
+        options.scenario_tree_location = \
+            join(farmer_examples_dir, "scenariodata")
+        options.cut_pool_slack_iterations = cut_pool_slack_iterations
+        manager = ScenarioTreeManagerFactory(options)
+        self.addCleanup(manager.close)
+        manager.initialize()
+        # no problems are solved below, so the solvers need not be
+        # available
+        benders = BendersAlgorithm(manager, options)
+        self.addCleanup(benders.close)
+        benders.build_master_problem()
+        return benders
+
+    def _add_cut(self, benders, value):
+        # a cut that bounds the (single) cut group alpha below by value
+        from pyomo.pysp.benders import BendersOptimalityCut
+        scenario_tree = benders._manager.scenario_tree
+        rootnode = scenario_tree.findRootNode()
+        xhat = dict((variable_id, 0.0)
+                    for variable_id in rootnode._standard_variable_ids)
+        benders.add_cut(BendersOptimalityCut(
+            xhat,
+            dict((scenario.name, value)
+                 for scenario in scenario_tree.scenarios),
+            dict((scenario.name, dict(xhat))
+                 for scenario in scenario_tree.scenarios)))
+
+    def _set_master_solution(self, benders, alpha):
+        scenario_tree = benders._manager.scenario_tree
+        rootnode = scenario_tree.findRootNode()
+        master_variable = benders.master.find_component(
+            "MASTER_BLEND_VAR_"+str(rootnode.name))
+        for variable_id in rootnode._standard_variable_ids:
+            master_variable[variable_id].value = 0.0
+        for var in benders.master.find_component(
+                "PYSP_BENDERS_BUNDLE_ALPHA_SSC").values():
+            var.value = alpha
+
+    def test_update_cut_pool(self):
+        benders = self._create_benders(2)
+        for cut_value in (1.0, 2.0, 3.0):
+            self._add_cut(benders, cut_value)
+        cuts = benders.master.find_component("PYSP_BENDERS_CUTS_SSC")
+        self.assertEqual(len(cuts), 3)
+        self.assertEqual(benders._cut_pool_index, [0, 1, 2])
+        self.assertEqual(benders._cut_group_index, [0, 0, 0])
+
+        # the first two cuts are slack, the last one is tight
+        self._set_master_solution(benders, 3.0)
+        # re-solves of the master problem within an iteration do
+        # not count as slack iterations
+        for i in range(3):
+            self.assertEqual(benders.update_cut_pool(count_slack=False), 0)
+        self.assertEqual(benders._cut_slack_iterations, [0, 0, 0])
+        self.assertEqual(benders.update_cut_pool(), 0)
+        self.assertEqual(benders._cut_slack_iterations, [1, 1, 0])
+        self.assertEqual([cut.active for cut in cuts], [True]*3)
+        self.assertEqual(benders.update_cut_pool(), 0)
+        self.assertEqual(benders._cut_slack_iterations, [2, 2, 0])
+        self.assertEqual([cut.active for cut in cuts],
+                         [False, False, True])
+
+        # the most recent cut is never deactivated
+        self._set_master_solution(benders, 10.0)
+        for i in range(3):
+            self.assertEqual(benders.update_cut_pool(), 0)
+        self.assertEqual(benders._cut_slack_iterations, [2, 2, 3])
+        self.assertEqual([cut.active for cut in cuts],
+                         [False, False, True])
+
+        # cuts violated by the master solution are reactivated
+        self._set_master_solution(benders, 1.5)
+        self.assertEqual(benders.update_cut_pool(count_slack=False), 1)
+        self.assertEqual([cut.active for cut in cuts],
+                         [False, True, True])
+        self.assertEqual(benders._cut_slack_iterations, [2, 0, 3])
+        self._set_master_solution(benders, 3.0)
+        self.assertEqual(benders.update_cut_pool(), 0)
+        self.assertEqual(benders._cut_slack_iterations, [2, 1, 0])
+
+    def test_update_cut_pool_disabled(self):
+        benders = self._create_benders(0)
+        for cut_value in (1.0, 2.0):
+            self._add_cut(benders, cut_value)
+        cuts = benders.master.find_component("PYSP_BENDERS_CUTS_SSC")
+        self._set_master_solution(benders, 5.0)
+        for i in range(3):
+            self.assertEqual(benders.update_cut_pool(), 0)
+        self.assertEqual(benders._cut_slack_iterations, [0, 0])
+        self.assertEqual([cut.active for cut in cuts], [True, True])
+
+class TestLShapedSolver(unittest.TestCase):
+
+    def _create_manager(self):
+        from pyomo.pysp.scenariotree.manager_solver import \
+            ScenarioTreeManagerSolverClientSerial
+        options = ScenarioTreeManagerSolverClientSerial.register_options()
+        farmer_examples_dir = join(pysp_examples_dir, "farmer")
+        options.model_location = join(farmer_examples_dir, "models")
+        options.scenario_tree_location = \
+            join(farmer_examples_dir, "scenariodata")
+        manager = ScenarioTreeManagerSolverClientSerial(options)
+        self.addCleanup(manager.close)
+        manager.initialize()
+        return manager
+
+    def _sample_cut_groups(self, manager, cut_sample_seed, count):
+        from pyomo.pysp.benders import BendersAlgorithm
+        options = BendersAlgorithm.register_options()
+        options.multicut_level = 3
+        options.cut_sample_size = 2
+        options.cut_sample_seed = cut_sample_seed
+        # no problems are solved below, so the solvers need not be
+        # available
+        with BendersAlgorithm(manager, options) as benders:
+            benders.build_master_problem()
+            self.assertEqual(
+                len(benders.master.find_component(
+                    "PYSP_BENDERS_CUT_BUNDLES_SSC")), 3)
+            sample_generator = benders._create_cut_sample_generator()
+            return [benders._sample_cut_groups(sample_generator)
+                    for i in range(count)]
+
+    def test_factory(self):
+        from pyomo.pysp.solvers.spsolver import SPSolverFactory
+        from pyomo.pysp.solvers.lshaped import LShapedSolver
+        solver = SPSolverFactory("lshaped")
+        self.assertTrue(isinstance(solver, LShapedSolver))
+        self.assertEqual(solver.name, "lshaped")
+        self.assertEqual(solver.get_option("cut_sample_size"), 0)
+        self.assertEqual(solver.get_option("cut_sample_seed"), None)
+        self.assertEqual(solver.get_option("multicut_level"), 1)
+        self.assertTrue("master_solver" in solver.options)
+        self.assertTrue("percent_gap" in solver.options)
+
+        options = LShapedSolver.register_options()
+        options.cut_sample_size = 2
+        options.cut_sample_seed = 7
+        options.max_iterations = 5
+        solver = SPSolverFactory("lshaped", options=options)
+        self.assertEqual(solver.get_option("cut_sample_size"), 2)
+        self.assertEqual(solver.get_option("cut_sample_seed"), 7)
+        self.assertEqual(solver.get_option("max_iterations"), 5)
+
+        with self.assertRaises(ValueError):
+            SPSolverFactory("_not_a_solver_")
+
+    def test_solve_requires_manager_solver(self):
+        from pyomo.pysp.solvers.spsolver import SPSolverFactory
+        from pyomo.pysp.scenariotree.manager import \
+            ScenarioTreeManagerClientSerial
+        solver = SPSolverFactory("lshaped")
+        with self.assertRaises(TypeError):
+            solver.solve(None)
+        # a scenario tree manager that can not solve subproblems
+        options = ScenarioTreeManagerClientSerial.register_options()
+        farmer_examples_dir = join(pysp_examples_dir, "farmer")
+        options.model_location = join(farmer_examples_dir, "models")
+        options.scenario_tree_location = \
+            join(farmer_examples_dir, "scenariodata")
+        with ScenarioTreeManagerClientSerial(options) as manager:
+            manager.initialize()
+            with self.assertRaises(TypeError):
+                solver.solve(manager)
+
+    def test_cut_sample_seed(self):
+        manager = self._create_manager()
+        samples1 = self._sample_cut_groups(manager, 1, 20)
+        for sample in samples1:
+            self.assertEqual(len(sample), 2)
+            self.assertEqual(sample, sorted(set(sample)))
+            self.assertTrue(all(0 <= i < 3 for i in sample))
+        # the same seed gives the same sequence of samples
+        self.assertEqual(self._sample_cut_groups(manager, 1, 20),
+                         samples1)
+        self.assertNotEqual(self._sample_cut_groups(manager, 2, 20),
+                            samples1)
+
 _pyomo_ns_host = '127.0.0.1'
 _pyomo_ns_port = None
 _pyomo_ns_process = None
@@ -298,8 +503,8 @@ def create_test_classes(basename,
 for solver_name, solver_io in [('cplex','lp'),
                                ('cplex','mps'),
                                ('cplex','nl'),
-                               ('cplex','python')]:
-                               #('_cplex_persistent','python')]:
+                               ('cplex','python'),
+                               ('_cplex_persistent','python')]:
 
     farmer_examples_dir = join(pysp_examples_dir, "farmer")
     farmer_model_dir = join(farmer_examples_dir, "models")
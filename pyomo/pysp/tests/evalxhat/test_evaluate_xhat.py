@@ -50,6 +50,7 @@ testing_solvers['cplex','mps'] = False
 testing_solvers['cplex','python'] = False
 testing_solvers['_cplex_persistent','python'] = False
 testing_solvers['ipopt','nl'] = False
+testing_solvers['cbc','lp'] = False
 def setUpModule():
     global testing_solvers
     import pyomo.environ
@@ -155,6 +156,188 @@ class _EvalXHATTesterBase(object):
             exact=_json_exact_comparison)
         self._cleanup()
 
+class TestEvalXHATBatched(unittest.TestCase):
+
+    def setUp(self):
+        self._tempfiles = []
+
+    def tearDown(self):
+        for fname in self._tempfiles:
+            if os.path.isdir(fname):
+                shutil.rmtree(fname, ignore_errors=True)
+            else:
+                try:
+                    os.remove(fname)
+                except OSError:
+                    pass
+
+    def _write_scenario_data(self, scenario_names, parameters):
+        from pyomo.pysp.scenariotree.scenario_data_store import \
+            ScenarioDataStore
+        class_name, test_name = self.id().split('.')[-2:]
+        dirname_ = join(thisdir, class_name+"."+test_name+".store")
+        self._tempfiles.append(dirname_)
+        ScenarioDataStore.write(dirname_, scenario_names, parameters, "")
+        return dirname_
+
+    def test_scenario_data_store_batches(self):
+        from pyomo.pysp.scenariotree.scenario_data_store import \
+            ScenarioDataStore
+        from pyomo.pysp.evaluate_xhat import \
+            (_scenario_data_store_batches,
+             _scenario_data_store_values)
+        store = ScenarioDataStore(self._write_scenario_data(
+            ["s1", "s2", "s3"],
+            [("Yield", ["WHEAT", "CORN"], [[1, 2], [3, 4], [5, 6]]),
+             ("PlantingCostPerAcre", [None], [[0.5], [1.5], [2.5]])]))
+        self.assertEqual(list(_scenario_data_store_batches(store, 2)),
+                         [["s1", "s2"], ["s3"]])
+        self.assertEqual(list(_scenario_data_store_batches(store, 3)),
+                         [["s1", "s2", "s3"]])
+        self.assertEqual(_scenario_data_store_values(store, "s2"),
+                         [3, 4, 1.5])
+
+    def test_evaluator_farmer(self):
+        if not testing_solvers['cplex','lp']:
+            self.skipTest("cplex (interface=lp) is not available")
+        import imp
+        from pyomo.pysp.evaluate_xhat import BatchedXhatEvaluator
+        model = imp.load_source(
+            "farmer_concrete_model",
+            join(pysp_examples_dir, "farmer", "concrete",
+                 "ReferenceModel.py"))
+        instance = model.pysp_instance_creation_callback(
+            "AverageScenario", None)
+        xhat = [("DevotedAcreage", "CORN", 80.0),
+                ("DevotedAcreage", "SUGAR_BEETS", 250.0),
+                ("DevotedAcreage", "WHEAT", 170.0)]
+        evaluator = BatchedXhatEvaluator(
+            instance,
+            xhat,
+            [("Yield", ("WHEAT", "CORN", "SUGAR_BEETS"))],
+            "cplex",
+            solver_io="lp")
+        self.assertEqual(len(evaluator._updated_constraints), 6)
+        self.assertEqual(evaluator._objective_updated, False)
+        results = evaluator.evaluate_batch(
+            [("AboveAverageScenario", (3.0, 3.6, 24.0)),
+             ("BelowAverageScenario", (2.0, 2.4, 16.0)),
+             ("AverageScenario", (2.5, 3.0, 20.0))])
+        evaluator.close()
+        self.assertEqual([name for name, _ in results],
+                         ["AboveAverageScenario",
+                          "BelowAverageScenario",
+                          "AverageScenario"])
+        for (_, cost), baseline in zip(results,
+                                       [-167000.0, -48820.0, -109350.0]):
+            self.assertAlmostEqual(cost, baseline, delta=1e-4)
+
+    def test_running_statistics(self):
+        from pyomo.pysp.evaluate_xhat import _RunningStatistics
+        values = [-167000.0, -48820.0, -109350.0, 1.5, 0.0]
+        statistics = _RunningStatistics()
+        self.assertEqual(statistics.count, 0)
+        self.assertEqual(statistics.mean, 0.0)
+        self.assertEqual(statistics.variance, 0.0)
+        for n, val in enumerate(values, 1):
+            statistics.add(val)
+            mean = sum(values[:n]) / n
+            self.assertEqual(statistics.count, n)
+            self.assertAlmostEqual(statistics.mean, mean)
+            if n == 1:
+                self.assertEqual(statistics.variance, 0.0)
+            else:
+                self.assertAlmostEqual(
+                    statistics.variance,
+                    sum((val - mean)**2 for val in values[:n]) / (n - 1),
+                    delta=1e-6)
+
+    def test_aggregate_batch_results(self):
+        from pyomo.pysp.evaluate_xhat import _aggregate_batch_results
+        class_name, test_name = self.id().split('.')[-2:]
+        output_file = join(thisdir, class_name+"."+test_name+".out.csv")
+        self._tempfiles.append(output_file)
+        count, mean, variance, failures = _aggregate_batch_results(
+            iter([[("s1", 1.0), ("s2", None)],
+                  [("s3", 3.0)],
+                  [],
+                  [("s4", 8.0), ("s5", None)]]),
+            output_file=output_file)
+        self.assertEqual(count, 3)
+        self.assertAlmostEqual(mean, 4.0)
+        self.assertAlmostEqual(variance, 13.0)
+        self.assertEqual(failures, ["s2", "s5"])
+        with open(output_file) as f:
+            rows = [line.strip().split(',') for line in f]
+        self.assertEqual(rows[0], ["scenario","cost","mean","variance"])
+        self.assertEqual([row[0] for row in rows[1:]], ["s1","s3","s4"])
+        for row, expected in zip(rows[1:], [(1.0, 1.0, 0.0),
+                                            (3.0, 2.0, 2.0),
+                                            (8.0, 4.0, 13.0)]):
+            for val, expected_val in zip(row[1:], expected):
+                self.assertAlmostEqual(float(val), expected_val)
+        # no output file
+        self.assertEqual(_aggregate_batch_results([]),
+                         (0, 0.0, 0.0, []))
+
+    def test_evaluate_xhat_batched_farmer(self):
+        if not testing_solvers['cbc','lp']:
+            self.skipTest("cbc (interface=lp) is not available")
+        from pyomo.pysp.evaluate_xhat import \
+            (run_evaluate_xhat_register_options,
+             evaluate_xhat_batched)
+        from pyomo.pysp.scenariotree.manager_solver import \
+            ScenarioTreeManagerSolverClientSerial
+        store_directory = self._write_scenario_data(
+            ["AboveAverageScenario",
+             "BelowAverageScenario",
+             "AverageScenario"],
+            [("Yield", ["WHEAT", "CORN", "SUGAR_BEETS"],
+              [[3.0, 3.6, 24.0],
+               [2.0, 2.4, 16.0],
+               [2.5, 3.0, 20.0]])])
+        options = run_evaluate_xhat_register_options()
+        options.model_location = \
+            join(pysp_examples_dir, "farmer", "concrete", "ReferenceModel.py")
+        options.scenario_tree_location = \
+            join(pysp_examples_dir, "farmer", "scenariodata",
+                 "ScenarioStructure.dat")
+        options.solver = "cbc"
+        options.solver_io = "lp"
+        xhat = {"CORN": 80.0, "SUGAR_BEETS": 250.0, "WHEAT": 170.0}
+        with ScenarioTreeManagerSolverClientSerial(options) as manager:
+            manager.initialize()
+            root_node = manager.scenario_tree.findRootNode()
+            for variable_id, (name, index) in \
+                    root_node._variable_ids.items():
+                root_node._solution[variable_id] = xhat[index]
+            # the serial and pool paths give the same results, in
+            # the order of the scenario data store
+            output_file = join(thisdir, "farmer_batched.out.csv")
+            self._tempfiles.append(output_file)
+            for processes, batch_size in ((1, 2), (2, 1), (2, 2)):
+                count, mean, variance, failures = evaluate_xhat_batched(
+                    manager,
+                    store_directory,
+                    processes=processes,
+                    batch_size=batch_size,
+                    output_file=output_file)
+                self.assertEqual(count, 3)
+                self.assertAlmostEqual(mean, -108390.0, delta=1e-4)
+                self.assertAlmostEqual(variance/3492319300.0, 1.0,
+                                       delta=1e-8)
+                self.assertEqual(failures, [])
+                with open(output_file) as f:
+                    rows = [line.strip().split(',') for line in f]
+                self.assertEqual([row[0] for row in rows[1:]],
+                                 ["AboveAverageScenario",
+                                  "BelowAverageScenario",
+                                  "AverageScenario"])
+                for row, baseline in zip(rows[1:],
+                                         [-167000.0, -48820.0, -109350.0]):
+                    self.assertAlmostEqual(float(row[1]), baseline,
+                                           delta=1e-4)
+
 _pyomo_ns_host = '127.0.0.1'
 _pyomo_ns_port = None
 _pyomo_ns_process = None
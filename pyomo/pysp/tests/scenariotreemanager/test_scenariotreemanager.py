@@ -27,6 +27,7 @@ import pyutilib.th as unittest
 from pyomo.pysp.util.config import PySPConfigBlock
 from pyomo.pysp.scenariotree.manager import (ScenarioTreeManagerClientSerial,
                                              ScenarioTreeManagerClientPyro,
+                                             ScenarioTreeManagerClientMultiprocess,
                                              InvocationType)
 from pyomo.pysp.scenariotree.manager_worker_pyro import ScenarioTreeManagerWorkerPyro
 from pyomo.pysp.scenariotree.server_pyro import (RegisterWorker,
@@ -36,6 +37,9 @@ from pyomo.environ import *
 
 thisfile = os.path.abspath(__file__)
 thisdir = os.path.dirname(thisfile)
+farmer_examples_dir = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+        thisdir)))), "examples", "pysp", "farmer")
 
 _run_verbose = True
 _run_profile_memory = False
@@ -81,6 +85,11 @@ def _PerBundleChained(worker, bundle, data):
 def _PerBundleChained_noargs(worker, bundle):
     return bundle.name
 
+def _RootNodeWeights(worker, scenario):
+    root_node = scenario.node_list[0]
+    return dict((root_node._variable_ids[variable_id], val)
+                for variable_id, val in scenario._w[root_node.name].items())
+
 class _ScenarioTreeManagerTesterBase(object):
 
     _bundle_dict3 = OrderedDict()
@@ -979,6 +988,145 @@ class TestScenarioTreeManagerClientSerial(unittest.TestCase, _ScenarioTreeManage
         self.delay = False
         ScenarioTreeManagerClientSerial.register_options(self.options)
 
+@unittest.category('smoke','nightly','expensive')
+class TestScenarioTreeManagerClientMultiprocess(unittest.TestCase,
+                                                _ScenarioTreeManagerTesterBase):
+
+    cls = ScenarioTreeManagerClientMultiprocess
+
+    def setUp(self):
+        self.options = PySPConfigBlock()
+        ScenarioTreeManagerClientMultiprocess.register_options(
+            self.options,
+            registered_worker_name='ScenarioTreeManagerWorkerTest')
+
+    @unittest.nottest
+    def _setup(self, options):
+        _ScenarioTreeManagerTesterBase._setup(self, options)
+        options.multiprocess_scenariotreeservers = 2
+
+@unittest.category('smoke','nightly','expensive')
+class TestScenarioTreeManagerSolverClientMultiprocessSharedMemory(
+        unittest.TestCase):
+
+    def _solve_farmer(self, cls, scenario_tree_dir, shared_memory):
+        options = cls.register_options()
+        options.model_location = \
+            os.path.join(farmer_examples_dir, "models")
+        options.scenario_tree_location = \
+            os.path.join(farmer_examples_dir, scenario_tree_dir)
+        options.solver = "cbc"
+        if shared_memory:
+            options.multiprocess_scenariotreeservers = 2
+            options.multiprocess_shared_memory = True
+        manager = cls(options)
+        manager.initialize()
+        if manager.scenario_tree.contains_bundles():
+            manager.solve_bundles()
+        else:
+            manager.solve_scenarios()
+        return manager
+
+    def _scenario_solutions(self, manager):
+        # the variable ids differ between managers, so the solutions
+        # are keyed by variable name and index
+        solutions = {}
+        for scenario in manager.scenario_tree.scenarios:
+            solution = solutions[scenario.name] = {}
+            for tree_node in scenario.node_list:
+                for variable_id, val in scenario._x[tree_node.name].items():
+                    solution[tree_node.name,
+                             tree_node._variable_ids[variable_id]] = val
+        return solutions
+
+    def _check_shared_memory(self, scenario_tree_dir):
+        from pyomo.pysp.scenariotree.manager_solver import \
+            (ScenarioTreeManagerSolverClientSerial,
+             ScenarioTreeManagerSolverClientMultiprocess)
+        if not SolverFactory("cbc").available(exception_flag=False):
+            self.skipTest("cbc is not available")
+        with self._solve_farmer(ScenarioTreeManagerSolverClientSerial,
+                                scenario_tree_dir,
+                                False) as manager:
+            baseline = self._scenario_solutions(manager)
+        with self._solve_farmer(ScenarioTreeManagerSolverClientMultiprocess,
+                                scenario_tree_dir,
+                                True) as manager:
+            shared_memory = manager.shared_memory
+            self.assertIsNot(shared_memory, None)
+            root_node = manager.scenario_tree.findRootNode()
+            variable_ids = shared_memory.variable_ids(root_node.name)
+            for scenario in manager.scenario_tree.scenarios:
+                # the root node solution is read from the shared
+                # arrays and the leaf node solution is sent with the
+                # solve results
+                row = shared_memory.scenario_row(root_node.name,
+                                                 scenario.name)
+                x = shared_memory.x(root_node.name)[row].tolist()
+                root_x = scenario._x[root_node.name]
+                self.assertEqual([root_x[variable_id]
+                                  for variable_id in variable_ids], x)
+            solutions = self._scenario_solutions(manager)
+            self.assertEqual(sorted(solutions), sorted(baseline))
+            for scenario_name in baseline:
+                solution = solutions[scenario_name]
+                self.assertEqual(sorted(solution),
+                                 sorted(baseline[scenario_name]))
+                for key, val in baseline[scenario_name].items():
+                    self.assertAlmostEqual(solution[key], val, delta=1e-5)
+
+            # weights are sent to the workers through the shared
+            # arrays
+            weights = {}
+            for i, scenario in enumerate(manager.scenario_tree.scenarios):
+                scenario._w[root_node.name].update(
+                    (variable_id, float(i+j)) for j, variable_id
+                    in enumerate(variable_ids))
+                weights[scenario.name] = dict(
+                    (root_node._variable_ids[variable_id], float(i+j))
+                    for j, variable_id in enumerate(variable_ids))
+            manager.push_shared_memory(names=('w',))
+            results = manager.invoke_function(
+                "_RootNodeWeights",
+                thisfile,
+                invocation_type=InvocationType.PerScenario)
+            self.assertEqual(results, weights)
+            filename = shared_memory.filename
+            self.assertTrue(os.path.exists(filename))
+        self.assertIs(manager.shared_memory, None)
+        self.assertFalse(os.path.exists(filename))
+
+    def test_scenarios(self):
+        self._check_shared_memory("scenariodata")
+
+    def test_bundles(self):
+        self._check_shared_memory("scenariodataWithTwoBundles")
+
+class TestScenarioTreeManagerSolverOptions(unittest.TestCase):
+
+    def test_rebalance_bundles(self):
+        from pyomo.pysp.scenariotree.manager_solver import \
+            (ScenarioTreeManagerSolverClientSerial,
+             ScenarioTreeManagerSolverClientPyro,
+             ScenarioTreeManagerSolverClientMultiprocess,
+             ScenarioTreeManagerFactory)
+        self.assertTrue(
+            "rebalance_bundles" in
+            ScenarioTreeManagerSolverClientSerial.register_options())
+        self.assertFalse(
+            "rebalance_bundles" in
+            ScenarioTreeManagerSolverClientPyro.register_options())
+        self.assertFalse(
+            "rebalance_bundles" in
+            ScenarioTreeManagerSolverClientMultiprocess.register_options())
+        options = ScenarioTreeManagerFactory.register_options()
+        self.assertTrue("rebalance_bundles" in options)
+        options.rebalance_bundles = True
+        for scenario_tree_manager in ("pyro", "multiprocess"):
+            options.scenario_tree_manager = scenario_tree_manager
+            with self.assertRaises(ValueError):
+                ScenarioTreeManagerFactory(options)
+
 _pyomo_ns_host = '127.0.0.1'
 _pyomo_ns_port = None
 _pyomo_ns_process = None
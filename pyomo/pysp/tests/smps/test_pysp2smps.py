@@ -460,6 +460,17 @@ def create_test_classes(test_class_suffix,
     globals()[class_names[-1]] = type(
         class_names[-1], (TestPySP2SMPS_Serial, unittest.TestCase), {})
 
+    @unittest.category('parallel')
+    class TestPySP2SMPS_Multiprocess(_base,
+                                     _SMPSTesterBase):
+        def setUp(self):
+            _SMPSTesterBase.setUp(self)
+            self.options['--scenario-tree-manager'] = 'multiprocess'
+            self.options['--multiprocess-scenariotreeservers'] = 2
+    class_names.append(TestPySP2SMPS_Multiprocess.__name__ + "_"+test_class_suffix)
+    globals()[class_names[-1]] = type(
+        class_names[-1], (TestPySP2SMPS_Multiprocess, unittest.TestCase), {})
+
     @unittest.skipIf(not (using_pyro3 or using_pyro4),
                      "Pyro or Pyro4 is not available")
     @unittest.category('parallel')
@@ -0,0 +1,138 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import os
+import math
+import time
+from os.path import abspath, dirname
+
+import pyutilib.misc
+import pyutilib.th as unittest
+
+from pyomo.pysp.computeconf import (t_table_values,
+                                    _report_running_confidence_interval,
+                                    _compute_sample_gaps)
+
+thisdir = dirname(abspath(__file__))
+
+def _remove(filename):
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+# stands in for compute_sample_gap (it must be defined at module
+# scope so that it can be sent to the sample worker processes)
+def _sample_gap(k, gaps, offset, delays=None):
+    if delays is not None:
+        time.sleep(delays[k-1])
+    return gaps[k-1], offset + k
+
+class TestComputeConf(unittest.TestCase):
+
+    def setUp(self):
+        self._outfile = os.path.join(thisdir, self.id().split('.')[-1]+".out")
+        pyutilib.misc.setup_redirect(self._outfile)
+
+    def tearDown(self):
+        pyutilib.misc.reset_redirect()
+        _remove(self._outfile)
+
+    def _options(self, tolerance=None, alpha=0.05, sample_processes=1):
+        return pyutilib.misc.Options(confidence_interval_tolerance=tolerance,
+                                     confidence_interval_alpha=alpha,
+                                     sample_processes=sample_processes)
+
+    def test_running_confidence_interval(self):
+        # no tolerance
+        self.assertFalse(_report_running_confidence_interval(
+            [1.0, 3.0], self._options()))
+        # too few samples to estimate the variance
+        self.assertFalse(_report_running_confidence_interval(
+            [1.0], self._options(tolerance=100.0)))
+        # no t-table entries
+        self.assertFalse(_report_running_confidence_interval(
+            [1.0]*(max(t_table_values)+1), self._options(tolerance=100.0)))
+        # g_bar=2, g_var=2
+        width = 2.0 + t_table_values[2][0.05]
+        self.assertTrue(_report_running_confidence_interval(
+            [1.0, 3.0], self._options(tolerance=width)))
+        self.assertFalse(_report_running_confidence_interval(
+            [1.0, 3.0], self._options(tolerance=width-1e-6)))
+        width = 2.0 + t_table_values[2][0.1]
+        self.assertTrue(_report_running_confidence_interval(
+            [1.0, 3.0], self._options(tolerance=width, alpha=0.1)))
+        # g_bar=2, g_var=1
+        width = 2.0 + t_table_values[3][0.05] / math.sqrt(3)
+        self.assertTrue(_report_running_confidence_interval(
+            [1.0, 2.0, 3.0], self._options(tolerance=width)))
+        self.assertFalse(_report_running_confidence_interval(
+            [1.0, 2.0, 3.0], self._options(tolerance=width-1e-6)))
+
+    def test_compute_sample_gaps(self):
+        gaps = [5.0, 1.0, 3.0, 2.0]
+        g, f = _compute_sample_gaps(4,
+                                    (gaps, 100.0),
+                                    self._options(),
+                                    sample_gap_function=_sample_gap)
+        self.assertEqual(g, {1: 5.0, 2: 1.0, 3: 3.0, 4: 2.0})
+        self.assertEqual(f, {1: 101.0, 2: 102.0, 3: 103.0, 4: 104.0})
+
+    def test_compute_sample_gaps_tolerance(self):
+        # the interval width is g_bar once the samples agree, so the
+        # tolerance is reached after the second sample
+        gaps = [1.0]*10
+        g, f = _compute_sample_gaps(10,
+                                    (gaps, 0.0),
+                                    self._options(tolerance=1.0),
+                                    sample_gap_function=_sample_gap)
+        self.assertEqual(g, {1: 1.0, 2: 1.0})
+        self.assertEqual(f, {1: 1.0, 2: 2.0})
+        # not reached
+        g, f = _compute_sample_gaps(10,
+                                    (gaps, 0.0),
+                                    self._options(tolerance=0.5),
+                                    sample_gap_function=_sample_gap)
+        self.assertEqual(len(g), 10)
+
+    def test_compute_sample_gaps_processes(self):
+        gaps = [float(k) for k in range(1, 7)]
+        g, f = _compute_sample_gaps(6,
+                                    (gaps, 10.0),
+                                    self._options(sample_processes=3),
+                                    sample_gap_function=_sample_gap)
+        self.assertEqual(g, dict((k, float(k)) for k in range(1, 7)))
+        self.assertEqual(f, dict((k, 10.0 + k) for k in range(1, 7)))
+
+    def test_compute_sample_gaps_processes_tolerance(self):
+        gaps = [1.0]*20
+        g, f = _compute_sample_gaps(20,
+                                    (gaps, 0.0),
+                                    self._options(tolerance=1.0,
+                                                  sample_processes=2),
+                                    sample_gap_function=_sample_gap)
+        self.assertEqual(g, {1: 1.0, 2: 1.0})
+        self.assertEqual(f, {1: 1.0, 2: 2.0})
+
+    def test_compute_sample_gaps_processes_order(self):
+        # the first sample finishes last, but the samples used are
+        # still the first ones rather than the fastest ones
+        gaps = [1.0]*6
+        delays = [0.5] + [0.0]*5
+        g, f = _compute_sample_gaps(6,
+                                    (gaps, 0.0, delays),
+                                    self._options(tolerance=1.0,
+                                                  sample_processes=3),
+                                    sample_gap_function=_sample_gap)
+        self.assertEqual(g, {1: 1.0, 2: 1.0})
+        self.assertEqual(f, {1: 1.0, 2: 2.0})
+
+if __name__ == "__main__":
+    unittest.main()
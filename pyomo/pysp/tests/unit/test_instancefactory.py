@@ -10,6 +10,10 @@
 import os
 import sys
 import shutil
+try:
+    import cPickle as pickle
+except:
+    import pickle
 from os.path import join, dirname, abspath, exists
 
 import pyutilib.th as unittest
@@ -19,6 +23,11 @@ from pyomo.pysp.scenariotree.instance_factory import \
 from pyomo.pysp.scenariotree.tree_structure_model import \
     CreateAbstractScenarioTreeModel
 from pyomo.pysp.util.misc import load_external_module
+from pyomo.pysp.annotations import PySP_StochasticDataAnnotation
+
+from pyomo.pysp.scenariotree.scenario_data_store import \
+    (ScenarioDataStore,
+     numpy_available)
 
 has_yaml = False
 try:
@@ -399,6 +408,315 @@ class Test(unittest.TestCase):
         self.assertEqual(factory._closed, True)
         self.assertEqual(len(factory._archives), 0)
 
+    def test_instance_cache(self):
+        self.assertTrue("reference_test_model" not in sys.modules)
+        tmpdir = self._get_testfname_prefix()+"_data"
+        cachedir = self._get_testfname_prefix()+"_cache"
+        for dirname in (tmpdir, cachedir):
+            if exists(dirname):
+                shutil.rmtree(dirname)
+        os.mkdir(tmpdir)
+        try:
+            for filename in ("reference_test_model.py",
+                             "reference_test_scenario_tree.dat",
+                             "s1.dat", "s2.dat", "s3.dat"):
+                shutil.copy(join(testdatadir, filename), tmpdir)
+            with ScenarioTreeInstanceFactory(
+                    model=join(tmpdir, "reference_test_model.py"),
+                    scenario_tree=join(tmpdir,
+                                       "reference_test_scenario_tree.dat")) \
+                    as factory:
+                scenario_tree = factory.generate_scenario_tree()
+                instances = factory.construct_instances_for_scenario_tree(
+                    scenario_tree,
+                    instance_cache_directory=cachedir)
+                self.assertEqual(instances["s1"].p(), 1)
+                self.assertEqual(instances["s2"].p(), 2)
+                self.assertEqual(len(os.listdir(cachedir)), 3)
+                # modify a cached instance to check that it is
+                # loaded rather than reconstructed
+                s2_key = factory._instance_cache_key("s2",
+                                                     scenario_tree,
+                                                     False,
+                                                     False)
+                s2_filename = factory._instance_cache_filename(cachedir,
+                                                               "s2",
+                                                               s2_key)
+                instances["s2"].p = 5.0
+                with open(s2_filename, 'wb') as f:
+                    pickle.dump(instances["s2"], f)
+                instances = factory.construct_instances_for_scenario_tree(
+                    scenario_tree,
+                    instance_cache_directory=cachedir)
+                self.assertEqual(instances["s1"].p(), 1)
+                self.assertEqual(instances["s2"].p(), 5)
+                # changing the data file invalidates the entry
+                with open(join(tmpdir, "s2.dat"), 'w') as f:
+                    f.write("param p := 7.0;\n")
+                instance = factory.construct_scenario_instance(
+                    "s2",
+                    scenario_tree,
+                    instance_cache_directory=cachedir)
+                self.assertEqual(instance.p(), 7)
+                self.assertEqual(len(os.listdir(cachedir)), 3)
+                self.assertFalse(exists(s2_filename))
+                # the compile option is part of the key
+                instance = factory.construct_scenario_instance(
+                    "s1",
+                    scenario_tree,
+                    compile_instance=True,
+                    instance_cache_directory=cachedir)
+                self.assertEqual(instance.p(), 1)
+                self.assertEqual(len(os.listdir(cachedir)), 3)
+                # so is the template option
+                keys = set(factory._instance_cache_key("s1",
+                                                       scenario_tree,
+                                                       compile_instance,
+                                                       use_template)
+                           for compile_instance in (False, True)
+                           for use_template in (False, True))
+                self.assertEqual(len(keys), 4)
+        finally:
+            for dirname in (tmpdir, cachedir):
+                if exists(dirname):
+                    shutil.rmtree(dirname)
+
+    def test_instance_cache_callback(self):
+        scenario_tree_model = CreateAbstractScenarioTreeModel().\
+            create_instance(
+                join(testdatadir, "reference_test_scenario_tree.dat"))
+        def scenario_model_callback(scenario_name, node_list):
+            return reference_test_model.create_instance()
+        cachedir = self._get_testfname_prefix()+"_cache"
+        with ScenarioTreeInstanceFactory(
+                model=scenario_model_callback,
+                scenario_tree=scenario_tree_model) as factory:
+            scenario_tree = factory.generate_scenario_tree()
+            instances = factory.construct_instances_for_scenario_tree(
+                scenario_tree,
+                instance_cache_directory=cachedir)
+            self.assertEqual(len(instances), 3)
+        self.assertFalse(exists(cachedir))
+
+    def _template_test_model(self, mutable=True):
+        from pyomo.environ import AbstractModel, Param
+        model = reference_test_model.clone()
+        if not mutable:
+            model.del_component(model.p)
+            model.p = Param()
+        model.q = Param(mutable=True, default=0.0)
+        model.stochdata = PySP_StochasticDataAnnotation()
+        model.stochdata.declare(model.p)
+        return model
+
+    def test_template_instances(self):
+        with ScenarioTreeInstanceFactory(
+                model=self._template_test_model(),
+                scenario_tree=join(testdatadir,
+                                   "reference_test_scenario_tree.dat")) \
+                as factory:
+            scenario_tree = factory.generate_scenario_tree()
+            instances = factory.construct_instances_for_scenario_tree(
+                scenario_tree,
+                template_scenario_instances=True)
+            self.assertEqual(len(instances), 3)
+            self.assertEqual(instances["s1"].p(), 1)
+            self.assertEqual(instances["s2"].p(), 2)
+            self.assertEqual(instances["s3"].p(), 3)
+            self.assertEqual(instances["s1"].name, "s1")
+            self.assertEqual(factory._stochastic_parameter_names, ["p"])
+            self.assertTrue(factory._template_instance is not None)
+            for instance in instances.values():
+                self.assertTrue(instance is not factory._template_instance)
+            # node-based data
+            scenario_tree._scenario_based_data = False
+            instances = factory.construct_instances_for_scenario_tree(
+                scenario_tree,
+                template_scenario_instances=True)
+            self.assertEqual(instances["s1"].p(), 1)
+            self.assertEqual(instances["s2"].p(), 2)
+            self.assertEqual(instances["s3"].p(), 3)
+
+    def test_template_instances_errors(self):
+        # no stochastic data annotation
+        with ScenarioTreeInstanceFactory(
+                model=reference_test_model,
+                scenario_tree=join(testdatadir,
+                                   "reference_test_scenario_tree.dat")) \
+                as factory:
+            scenario_tree = factory.generate_scenario_tree()
+            with self.assertRaises(ValueError):
+                factory.construct_instances_for_scenario_tree(
+                    scenario_tree,
+                    template_scenario_instances=True)
+        # the stochastic parameter is not mutable
+        with ScenarioTreeInstanceFactory(
+                model=self._template_test_model(mutable=False),
+                scenario_tree=join(testdatadir,
+                                   "reference_test_scenario_tree.dat")) \
+                as factory:
+            scenario_tree = factory.generate_scenario_tree()
+            with self.assertRaises(ValueError):
+                factory.construct_instances_for_scenario_tree(
+                    scenario_tree,
+                    template_scenario_instances=True)
+        # data other than the stochastic parameters differs
+        tmpdir = self._get_testfname_prefix()+"_data"
+        if exists(tmpdir):
+            shutil.rmtree(tmpdir)
+        os.mkdir(tmpdir)
+        try:
+            shutil.copy(join(testdatadir, "reference_test_scenario_tree.dat"),
+                        tmpdir)
+            for i in (1, 2, 3):
+                with open(join(tmpdir, "s%d.dat" % (i)), 'w') as f:
+                    f.write("param p := %d;\n" % (i))
+                    f.write("param q := %d;\n" % (i % 2))
+            with ScenarioTreeInstanceFactory(
+                    model=self._template_test_model(),
+                    scenario_tree=join(tmpdir,
+                                       "reference_test_scenario_tree.dat")) \
+                    as factory:
+                scenario_tree = factory.generate_scenario_tree()
+                self.assertEqual(
+                    factory.construct_scenario_instance(
+                        "s1",
+                        scenario_tree,
+                        use_template=True).q(), 1)
+                with self.assertRaises(ValueError):
+                    factory.construct_scenario_instance(
+                        "s2",
+                        scenario_tree,
+                        use_template=True)
+                self.assertEqual(
+                    factory.construct_scenario_instance(
+                        "s3",
+                        scenario_tree,
+                        use_template=True).q(), 1)
+        finally:
+            if exists(tmpdir):
+                shutil.rmtree(tmpdir)
+
+    @unittest.skipIf(not numpy_available, "numpy is not available")
+    def test_scenario_data_store(self):
+        tmpdir = self._get_testfname_prefix()+"_data"
+        storedir = self._get_testfname_prefix()+"_store"
+        for dirname in (tmpdir, storedir):
+            if exists(dirname):
+                shutil.rmtree(dirname)
+        os.mkdir(tmpdir)
+        try:
+            shutil.copy(join(testdatadir, "reference_test_scenario_tree.dat"),
+                        tmpdir)
+            for i in (1, 2, 3):
+                with open(join(tmpdir, "s%d.dat" % (i)), 'w') as f:
+                    f.write("param p := %d;\n" % (i))
+                    f.write("param q := 5;\n")
+            with ScenarioTreeInstanceFactory(
+                    model=self._template_test_model(),
+                    scenario_tree=join(tmpdir,
+                                       "reference_test_scenario_tree.dat")) \
+                    as factory:
+                scenario_tree = factory.generate_scenario_tree()
+                store = factory.write_scenario_data_store(scenario_tree,
+                                                          storedir)
+                self.assertEqual(store.scenario_names, ("s1", "s2", "s3"))
+                self.assertEqual(store.parameter_names, ("p",))
+                (name, indices, values), = store.scenario_values("s2")
+                self.assertEqual(indices, (None,))
+                # integer data is not converted to float
+                self.assertEqual(values.tolist(), [2])
+                self.assertIs(type(values.tolist()[0]), int)
+            self.assertTrue(ScenarioDataStore.exists(storedir))
+            # the scenario .dat files are not used once the
+            # store is written
+            for i in (1, 2, 3):
+                os.remove(join(tmpdir, "s%d.dat" % (i)))
+            with ScenarioTreeInstanceFactory(
+                    model=self._template_test_model(),
+                    scenario_tree=join(tmpdir,
+                                       "reference_test_scenario_tree.dat"),
+                    data_location=storedir) \
+                    as factory:
+                self.assertTrue(factory._scenario_data_store is not None)
+                scenario_tree = factory.generate_scenario_tree()
+                instances = factory.construct_instances_for_scenario_tree(
+                    scenario_tree,
+                    instance_cache_directory=storedir)
+                self.assertEqual(len(instances), 3)
+                for i in (1, 2, 3):
+                    instance = instances["s%d" % (i)]
+                    self.assertEqual(instance.name, "s%d" % (i))
+                    self.assertEqual(instance.p(), i)
+                    self.assertIs(type(instance.p()), int)
+                    self.assertEqual(instance.q(), 5)
+                    self.assertTrue(
+                        instance is not factory._store_template_instance)
+                # node-based data is read from the same store
+                scenario_tree._scenario_based_data = False
+                instance = factory.construct_scenario_instance(
+                    "s3",
+                    scenario_tree)
+                self.assertEqual(instance.p(), 3)
+            self.assertEqual(factory._scenario_data_store, None)
+            # the stored parameters must be mutable
+            with ScenarioTreeInstanceFactory(
+                    model=self._template_test_model(mutable=False),
+                    scenario_tree=join(tmpdir,
+                                       "reference_test_scenario_tree.dat"),
+                    data_location=storedir) \
+                    as factory:
+                scenario_tree = factory.generate_scenario_tree()
+                with self.assertRaises(ValueError):
+                    factory.construct_scenario_instance("s1",
+                                                        scenario_tree)
+            shutil.rmtree(storedir)
+            # data that is not stored must be the same for every
+            # scenario
+            for i in (1, 2, 3):
+                with open(join(tmpdir, "s%d.dat" % (i)), 'w') as f:
+                    f.write("param p := %d;\n" % (i))
+                    f.write("param q := %d;\n" % (5 if i != 2 else 6))
+            with ScenarioTreeInstanceFactory(
+                    model=self._template_test_model(),
+                    scenario_tree=join(tmpdir,
+                                       "reference_test_scenario_tree.dat")) \
+                    as factory:
+                scenario_tree = factory.generate_scenario_tree()
+                with self.assertRaises(ValueError):
+                    factory.write_scenario_data_store(scenario_tree,
+                                                      storedir)
+                self.assertFalse(ScenarioDataStore.exists(storedir))
+                # unless it is stored
+                store = factory.write_scenario_data_store(
+                    scenario_tree,
+                    storedir,
+                    parameter_names=["p", "q"])
+                self.assertEqual(store.parameter_names, ("p", "q"))
+                self.assertEqual(
+                    [values.tolist() for _, _, values
+                     in store.scenario_values("s2")],
+                    [[2], [6]])
+            shutil.rmtree(storedir)
+            # the stored parameters must be defined by every scenario
+            with open(join(tmpdir, "s3.dat"), 'w') as f:
+                f.write("param q := 5;\n")
+            with ScenarioTreeInstanceFactory(
+                    model=self._template_test_model(),
+                    scenario_tree=join(tmpdir,
+                                       "reference_test_scenario_tree.dat")) \
+                    as factory:
+                scenario_tree = factory.generate_scenario_tree()
+                with self.assertRaises(ValueError):
+                    factory.write_scenario_data_store(
+                        scenario_tree,
+                        storedir,
+                        parameter_names=["p", "q"])
+        finally:
+            for dirname in (tmpdir, storedir):
+                if exists(dirname):
+                    shutil.rmtree(dirname)
+
 Test = unittest.category('smoke','nightly','expensive')(Test)
 
 if __name__ == "__main__":
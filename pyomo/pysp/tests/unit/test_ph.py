@@ -14,6 +14,7 @@
 
 import os
 import sys
+import json
 import subprocess
 import time
 from os.path import abspath, dirname
@@ -670,6 +671,57 @@ class TestPH(unittest.TestCase):
             filter=filter_time_and_data_dirs,
             tolerance=_diff_tolerance)
 
+    def test_linearized_farmer_timeline_cbc(self):
+        if not solver['cbc','lp']:
+            self.skipTest("The 'cbc' executable is not available")
+        solver_string="cbc"
+        farmer_examples_dir = pysp_examples_dir + "farmer"
+        model_dir = farmer_examples_dir + os.sep + "models"
+        instance_dir = farmer_examples_dir + os.sep + "scenariodata"
+        timeline_file = this_test_file_directory+"farmer_timeline_cbc.json"
+        argstring = "runph --traceback -r 1.0 --solver="+solver_string+" --solver-manager=serial --model-directory="+model_dir+" --instance-directory="+instance_dir+" --linearize-nonbinary-penalty-terms=10 --max-iterations=2 --output-timeline="+timeline_file
+        print("Testing command: " + argstring)
+
+        pyutilib.misc.setup_redirect(
+            this_test_file_directory+"farmer_timeline_cbc.out")
+        args = argstring.split()
+        pyomo.pysp.phinit.main(args=args[1:])
+        pyutilib.misc.reset_redirect()
+        _remove(this_test_file_directory+"farmer_timeline_cbc.out")
+
+        with open(timeline_file) as f:
+            trace = json.load(f)
+        _remove(timeline_file)
+        threads = dict((event['tid'], event['args']['name'])
+                       for event in trace['traceEvents']
+                       if event['ph'] == 'M')
+        self.assertEqual(sorted(threads.values()),
+                         ['ph client', 'serial'])
+        scenarios = ['AboveAverageScenario',
+                     'AverageScenario',
+                     'BelowAverageScenario']
+        for iteration in (0, 1, 2):
+            events = [event for event in trace['traceEvents']
+                      if (event['ph'] == 'X') and \
+                         (event['args']['iteration'] == iteration)]
+            for name in ('model update', 'queue', 'subproblem', 'load results'):
+                self.assertEqual(
+                    sorted(event['args']['subproblem'] for event in events
+                           if event['name'].startswith(name+" ")),
+                    scenarios)
+            for event in events:
+                self.assertGreaterEqual(event['dur'], 0)
+                if event['name'].startswith('subproblem '):
+                    self.assertEqual(threads[event['tid']], 'serial')
+                    self.assertTrue('pyomo_solve_time' in event['args'])
+                    self.assertFalse('network_transfer' in event['args'])
+                else:
+                    self.assertEqual(threads[event['tid']], 'ph client')
+        self.assertEqual(
+            [summary['iteration']
+             for summary in trace['otherData']['iterations']],
+            [0, 1, 2])
+
     def test_linearized_farmer_maximize_cplex(self):
         if not solver['cplex','lp']:
             self.skipTest("The 'cplex' executable is not available")
@@ -797,6 +849,63 @@ class TestPH(unittest.TestCase):
             ef_output_file,
             baseline_dir+"farmer_ef.baseline.lp")
 
+    def test_farmer_ef_stream(self):
+        farmer_examples_dir = pysp_examples_dir + "farmer"
+        model_dir = farmer_examples_dir + os.sep + "models"
+        instance_dir = farmer_examples_dir + os.sep + "scenariodata"
+        ef_output_file = this_test_file_directory+"test_farmer_ef_stream.lp"
+        argstring = "runef --stream-output --verbose -m "+model_dir+" -s "+instance_dir+" --output-file="+ef_output_file
+        print("Testing command: " + argstring)
+
+        pyutilib.misc.setup_redirect(
+            this_test_file_directory+"farmer_ef_stream.out")
+        args = argstring.split()
+        pyomo.pysp.ef_writer_script.main(args=args[1:])
+        pyutilib.misc.reset_redirect()
+        _remove(this_test_file_directory+"farmer_ef_stream.out")
+        self.assertFileEqualsBaseline(
+            ef_output_file,
+            baseline_dir+"farmer_ef_stream.baseline.lp")
+
+    def test_farmer_ef_stream_objective_cbc(self):
+        if not solver['cbc','lp']:
+            self.skipTest("The 'cbc' executable is not available")
+        from pyomo.opt import SolverFactory, TerminationCondition
+        farmer_examples_dir = pysp_examples_dir + "farmer"
+        model_dir = farmer_examples_dir + os.sep + "models"
+        instance_dir = farmer_examples_dir + os.sep + "scenariodata"
+        # the streamed LP and MPS files have the same optimal
+        # objective as the LP file written from the full extensive
+        # form
+        objectives = {}
+        for stream_output, suffix in ((False, "lp"),
+                                      (True, "lp"),
+                                      (True, "mps")):
+            ef_output_file = this_test_file_directory + \
+                "test_farmer_ef_stream_objective_%s.%s" \
+                % (stream_output, suffix)
+            argstring = "runef --verbose -m "+model_dir+" -s "+instance_dir+" --output-file="+ef_output_file
+            if stream_output:
+                argstring += " --stream-output"
+            print("Testing command: " + argstring)
+            pyutilib.misc.setup_redirect(
+                this_test_file_directory+"farmer_ef_stream_objective.out")
+            args = argstring.split()
+            pyomo.pysp.ef_writer_script.main(args=args[1:])
+            pyutilib.misc.reset_redirect()
+            _remove(this_test_file_directory+"farmer_ef_stream_objective.out")
+            with SolverFactory("cbc") as opt:
+                results = opt.solve(ef_output_file)
+            _remove(ef_output_file)
+            self.assertEqual(results.solver.termination_condition,
+                             TerminationCondition.optimal)
+            objectives[stream_output, suffix] = results.problem.upper_bound
+        self.assertAlmostEqual(objectives[False, "lp"], -108390.0, places=3)
+        self.assertAlmostEqual(objectives[True, "lp"],
+                               objectives[False, "lp"])
+        self.assertAlmostEqual(objectives[True, "mps"],
+                               objectives[False, "lp"])
+
     def test_farmer_maximize_ef(self):
         farmer_examples_dir = pysp_examples_dir + "farmer"
         model_dir = farmer_examples_dir + os.sep + "maxmodels"
@@ -1295,6 +1404,242 @@ class TestPH(unittest.TestCase):
             tolerance=_diff_tolerance)
         _remove(baseline_dir+"lagrange_pr_testPRmore.csv")
 
+class TestPHAsync(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        _setUpClass(cls)
+
+    def setUp(self):
+        os.chdir(thisdir)
+
+    def tearDown(self):
+        if "ReferenceModel" in sys.modules:
+            del sys.modules["ReferenceModel"]
+
+    def _create_farmer_ph(self, *args):
+        from pyomo.pysp.phinit import (construct_ph_options_parser,
+                                       PHFromScratch)
+        farmer_examples_dir = pysp_examples_dir + "farmer"
+        parser = construct_ph_options_parser("")
+        options = parser.parse_args(
+            ["--model-directory="+farmer_examples_dir+os.sep+"models",
+             "--instance-directory="+farmer_examples_dir+os.sep+"scenariodata",
+             "--solver=cbc",
+             "--default-rho=1"] + list(args))
+        options._ef_options = parser._ef_options
+        options._ef_options.import_argparse(options)
+        # no sub-problems are solved below, so the solver need not
+        # be available
+        ph = PHFromScratch(options)
+        self.addCleanup(self._cleanup_ph, ph)
+        return ph
+
+    @staticmethod
+    def _cleanup_ph(ph):
+        from pyomo.pysp.phinit import PHCleanup
+        PHCleanup(ph)
+
+    def _set_root_solution(self, ph, scenario, values):
+        root = ph._scenario_tree.findRootNode()
+        variable_ids = sorted(root._standard_variable_ids)
+        scenario._x[root._name].update(zip(variable_ids, values))
+
+    def _expected_average(self, ph, variable_id):
+        root = ph._scenario_tree.findRootNode()
+        return sum(scenario._probability * \
+                   scenario._x[root._name][variable_id]
+                   for scenario in root._scenarios) / root._probability
+
+    def test_incremental_variable_statistics(self):
+        pyutilib.misc.setup_redirect(
+            this_test_file_directory+"async_statistics.out")
+        try:
+            ph = self._create_farmer_ph()
+        finally:
+            pyutilib.misc.reset_redirect()
+            _remove(this_test_file_directory+"async_statistics.out")
+        root = ph._scenario_tree.findRootNode()
+        scenarios = root._scenarios
+        for i, scenario in enumerate(scenarios):
+            self._set_root_solution(ph, scenario,
+                                    [10.0*i, 100.0+i, 300.0-7.0*i])
+        ph.update_variable_statistics()
+        ph._initialize_incremental_variable_statistics()
+
+        # each scenario solve updates the averages by the change in
+        # that scenario's solution
+        for i, scenario in enumerate(scenarios):
+            self._set_root_solution(ph, scenario,
+                                    [50.0-i, 80.0+3.0*i, 240.0+11.0*i])
+            ph._update_variable_statistics_for_scenario(scenario)
+            for variable_id in root._standard_variable_ids:
+                expected = self._expected_average(ph, variable_id)
+                self.assertAlmostEqual(root._averages[variable_id],
+                                       expected)
+                self.assertAlmostEqual(root._xbars[variable_id],
+                                       expected)
+
+        # the refreshed statistics match a full recomputation
+        ph._refresh_incremental_variable_statistics()
+        incremental = (dict(root._averages),
+                       dict(root._xbars),
+                       dict(root._minimums),
+                       dict(root._maximums))
+        ph.update_variable_statistics()
+        for values, expected in zip(incremental,
+                                    (root._averages,
+                                     root._xbars,
+                                     root._minimums,
+                                     root._maximums)):
+            self.assertEqual(sorted(values), sorted(expected))
+            for variable_id in expected:
+                self.assertAlmostEqual(values[variable_id],
+                                       expected[variable_id])
+
+    def test_incremental_variable_statistics_overrelax(self):
+        pyutilib.misc.setup_redirect(
+            this_test_file_directory+"async_statistics_overrelax.out")
+        try:
+            ph = self._create_farmer_ph("--overrelax", "--nu=1.5")
+        finally:
+            pyutilib.misc.reset_redirect()
+            _remove(this_test_file_directory+"async_statistics_overrelax.out")
+        root = ph._scenario_tree.findRootNode()
+        scenarios = root._scenarios
+        for i, scenario in enumerate(scenarios):
+            self._set_root_solution(ph, scenario,
+                                    [10.0*i, 100.0+i, 300.0-7.0*i])
+        ph.update_variable_statistics()
+        previous_averages = dict(root._averages)
+        ph._initialize_incremental_variable_statistics()
+
+        # the xbars are relaxed toward the averages of the previous
+        # (reportable) iteration - not toward the averages before the
+        # most recent scenario solve
+        for i, scenario in enumerate(scenarios):
+            self._set_root_solution(ph, scenario,
+                                    [50.0-i, 80.0+3.0*i, 240.0+11.0*i])
+            ph._update_variable_statistics_for_scenario(scenario)
+            for variable_id in root._standard_variable_ids:
+                expected = self._expected_average(ph, variable_id)
+                self.assertAlmostEqual(root._averages[variable_id],
+                                       expected)
+                self.assertAlmostEqual(
+                    root._xbars[variable_id],
+                    1.5*expected - 0.5*previous_averages[variable_id])
+
+        # the same as update_variable_statistics at iteration 1
+        ph._current_iteration = 1
+        ph._refresh_incremental_variable_statistics()
+        incremental_xbars = dict(root._xbars)
+        root._averages.update(previous_averages)
+        ph.update_variable_statistics()
+        for variable_id in root._standard_variable_ids:
+            self.assertAlmostEqual(incremental_xbars[variable_id],
+                                   root._xbars[variable_id])
+
+        # later xbars are relaxed toward the refreshed averages
+        refreshed_averages = dict(root._averages)
+        scenario = scenarios[0]
+        self._set_root_solution(ph, scenario, [0.0, 0.0, 0.0])
+        ph._update_variable_statistics_for_scenario(scenario)
+        for variable_id in root._standard_variable_ids:
+            expected = self._expected_average(ph, variable_id)
+            self.assertAlmostEqual(
+                root._xbars[variable_id],
+                1.5*expected - 0.5*refreshed_averages[variable_id])
+
+    def test_defer_update_object_names(self):
+        from pyomo.pysp.phsolverserverutils import (defer_update,
+                                                    collect_deferred_updates)
+        pyutilib.misc.setup_redirect(
+            this_test_file_directory+"async_defer_update.out")
+        try:
+            ph = self._create_farmer_ph()
+        finally:
+            pyutilib.misc.reset_redirect()
+            _remove(this_test_file_directory+"async_defer_update.out")
+        scenario_names = [scenario._name
+                          for scenario in ph._scenario_tree._scenarios]
+        defer_update(ph, "load_weights", object_names=scenario_names[:1])
+        self.assertEqual(ph._phpyro_deferred_updates,
+                         {scenario_names[0]: {"load_weights": None}})
+        defer_update(ph, "load_xbars")
+        self.assertEqual(sorted(ph._phpyro_deferred_updates),
+                         sorted(scenario_names))
+        self.assertEqual(
+            [task["action"] for task in
+             collect_deferred_updates(ph, scenario_names[0])],
+            ["load_xbars", "load_weights"])
+        for scenario_name in scenario_names[1:]:
+            self.assertEqual(
+                [task["action"] for task in
+                 collect_deferred_updates(ph, scenario_name)],
+                ["load_xbars"])
+        self.assertEqual(ph._phpyro_deferred_updates, {})
+
+    def test_push_async_parameters_updates_coefficients(self):
+        pyutilib.misc.setup_redirect(
+            this_test_file_directory+"async_push_parameters.out")
+        try:
+            ph = self._create_farmer_ph()
+            ph.add_ph_objective_weight_terms()
+            ph.add_ph_objective_proximal_terms()
+        finally:
+            pyutilib.misc.reset_redirect()
+            _remove(this_test_file_directory+"async_push_parameters.out")
+        problem_states = ph._problem_states
+        scenario_names = [scenario._name
+                          for scenario in ph._scenario_tree._scenarios]
+        for scenario_name in scenario_names:
+            problem_states.objective_updated[scenario_name] = False
+            problem_states.\
+                objective_coefficients_updated[scenario_name] = False
+        ph._push_async_parameters_to_instances(scenario_names[:1])
+        # only the coefficients of the objective of the pushed
+        # scenario need to be updated
+        self.assertEqual(
+            dict(problem_states.objective_coefficients_updated),
+            dict((scenario_name, scenario_name == scenario_names[0])
+                 for scenario_name in scenario_names))
+        self.assertEqual(
+            dict(problem_states.objective_updated),
+            dict((scenario_name, False)
+                 for scenario_name in scenario_names))
+
+    def _first_stage_costs(self, *args):
+        farmer_examples_dir = pysp_examples_dir + "farmer"
+        model_dir = farmer_examples_dir + os.sep + "models"
+        instance_dir = farmer_examples_dir + os.sep + "scenariodata"
+        argstring = "runph --traceback -r 1.0 --solver=cbc --solver-manager=serial --model-directory="+model_dir+" --instance-directory="+instance_dir+" --linearize-nonbinary-penalty-terms=4 --max-iterations=5"
+        print("Testing command: " + argstring + " " + " ".join(args))
+        outfile = this_test_file_directory+"farmer_async_cbc.out"
+        pyutilib.misc.setup_redirect(outfile)
+        try:
+            pyomo.pysp.phinit.main(args=argstring.split()[1:]+list(args))
+        finally:
+            pyutilib.misc.reset_redirect()
+        with open(outfile) as f:
+            costs = [line.strip() for line in f
+                     if line.startswith("First stage cost avg=")]
+        _remove(outfile)
+        return costs
+
+    def test_async_staleness_bound_zero_is_lockstep_cbc(self):
+        if not solver['cbc','lp']:
+            self.skipTest("The 'cbc' executable is not available")
+        # when every scenario result is buffered and no scenario may
+        # get ahead of the others, async PH performs the same
+        # iterations as synchronous PH
+        sync_costs = self._first_stage_costs()
+        async_costs = self._first_stage_costs(
+            "--async",
+            "--async-buffer-length=3",
+            "--async-staleness-bound=0")
+        self.assertEqual(len(sync_costs), 6)
+        self.assertEqual(async_costs, sync_costs)
+
 class TestPHExpensive(unittest.TestCase):
 
     @classmethod
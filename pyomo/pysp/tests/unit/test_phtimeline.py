@@ -0,0 +1,201 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import os
+import json
+from os.path import abspath, dirname
+
+import pyutilib.th as unittest
+
+from pyomo.pysp.phtimeline import (PHTimeline,
+                                   SUBPROBLEM,
+                                   UPDATE_STATISTICS)
+
+thisdir = dirname(abspath(__file__))
+
+def _remove(filename):
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+class TestPHTimeline(unittest.TestCase):
+
+    def _create_timeline(self):
+        # times are given relative to the origin of the timeline
+        timeline = PHTimeline()
+        t0 = timeline._origin
+        # two sub-problems queued to the same worker at the same
+        # time; the second waits for the first to finish
+        timeline.add_subproblem_event(0, "s1", "w1",
+                                      t0 + 0.0, t0 + 2.0,
+                                      solver_time=0.625,
+                                      pyomo_solve_time=1.0,
+                                      model_update_time=0.25)
+        timeline.add_subproblem_event(0, "s2", "w1",
+                                      t0 + 0.0, t0 + 5.0,
+                                      solver_time=1.5,
+                                      pyomo_solve_time=2.0,
+                                      model_update_time=0.5)
+        timeline.add_event(UPDATE_STATISTICS, "ph",
+                           t0 + 5.0, t0 + 5.5,
+                           iteration=0)
+        # a sub-problem solved by the PH client itself
+        timeline.add_subproblem_event(1, "s3", None,
+                                      t0 + 6.0, t0 + 7.0,
+                                      serial=True)
+        return timeline
+
+    def _assertDictAlmostEqual(self, actual, expected):
+        self.assertEqual(sorted(actual), sorted(expected))
+        for key in expected:
+            if isinstance(expected[key], float):
+                self.assertAlmostEqual(actual[key], expected[key])
+            else:
+                self.assertEqual(actual[key], expected[key])
+
+    def test_subproblem_breakdown(self):
+        timeline = self._create_timeline()
+        events = timeline.events
+        self.assertEqual(len(events), 4)
+        self._assertDictAlmostEqual(
+            events[0],
+            {'name': SUBPROBLEM,
+             'category': "solve",
+             'iteration': 0,
+             'subproblem': "s1",
+             'worker': "w1",
+             'start': 0.0,
+             'duration': 2.0,
+             'round_trip': 2.0,
+             'queue_wait': 0.0,
+             'model_update': 0.25,
+             'pyomo_solve_time': 1.0,
+             'solver_time': 0.625,
+             'file_io': 0.375,
+             'network_transfer': 0.75})
+        # s2 starts when the results for s1 are received
+        self._assertDictAlmostEqual(
+            events[1],
+            {'name': SUBPROBLEM,
+             'category': "solve",
+             'iteration': 0,
+             'subproblem': "s2",
+             'worker': "w1",
+             'start': 2.0,
+             'duration': 3.0,
+             'round_trip': 5.0,
+             'queue_wait': 2.0,
+             'model_update': 0.5,
+             'pyomo_solve_time': 2.0,
+             'solver_time': 1.5,
+             'file_io': 0.5,
+             'network_transfer': 0.5})
+        # there is no queue wait or network transfer for serial solves
+        self._assertDictAlmostEqual(
+            events[3],
+            {'name': SUBPROBLEM,
+             'category': "solve",
+             'iteration': 1,
+             'subproblem': "s3",
+             'worker': None,
+             'start': 6.0,
+             'duration': 1.0,
+             'round_trip': 1.0})
+
+        timeline.clear()
+        self.assertEqual(timeline.events, [])
+        self.assertEqual(timeline._worker_last_result, {})
+
+    def test_iteration_summary(self):
+        summaries = self._create_timeline().iteration_summary()
+        self.assertEqual(len(summaries), 2)
+        self.assertEqual(summaries[0]['iteration'], 0)
+        self._assertDictAlmostEqual(summaries[0]['totals'],
+                                    {SUBPROBLEM: 5.0,
+                                     UPDATE_STATISTICS: 0.5})
+        self.assertEqual(summaries[0]['slowest_subproblem'], "s2")
+        self.assertAlmostEqual(summaries[0]['max_round_trip'], 5.0)
+        self.assertAlmostEqual(summaries[0]['median_round_trip'], 5.0)
+        self.assertEqual(summaries[1]['iteration'], 1)
+        self._assertDictAlmostEqual(summaries[1]['totals'],
+                                    {SUBPROBLEM: 1.0})
+        self.assertEqual(summaries[1]['slowest_subproblem'], "s3")
+        self.assertAlmostEqual(summaries[1]['max_round_trip'], 1.0)
+        self.assertAlmostEqual(summaries[1]['median_round_trip'], 1.0)
+        # iterations without sub-problems have no round trips
+        timeline = PHTimeline()
+        timeline.add_event(UPDATE_STATISTICS, "ph", 0.0, 0.0,
+                           iteration=2)
+        summary, = timeline.iteration_summary()
+        self.assertEqual(sorted(summary), ['iteration', 'totals'])
+
+    def test_chrome_trace(self):
+        timeline = self._create_timeline()
+        trace = timeline.chrome_trace()
+        self.assertEqual(sorted(trace),
+                         ['displayTimeUnit', 'otherData', 'traceEvents'])
+        self.assertEqual(trace['displayTimeUnit'], 'ms')
+        self.assertEqual(trace['otherData'],
+                         {'iterations': timeline.iteration_summary()})
+        trace_events = trace['traceEvents']
+        self.assertEqual(len(trace_events), 7)
+
+        # the complete events, in the order they were added, with
+        # worker w1 on thread 1 and the serial sub-problem on a
+        # thread of its own
+        self.assertEqual([(event['name'], event['ph'], event['tid'])
+                          for event in trace_events[:4]],
+                         [("subproblem s1", 'X', 1),
+                          ("subproblem s2", 'X', 1),
+                          (UPDATE_STATISTICS, 'X', 0),
+                          ("subproblem s3", 'X', 2)])
+        for event in trace_events[:4]:
+            self.assertEqual(event['pid'], 0)
+        event = trace_events[1]
+        self.assertEqual(event['cat'], "solve")
+        self.assertAlmostEqual(event['ts'], 2.0e6)
+        self.assertAlmostEqual(event['dur'], 3.0e6)
+        self._assertDictAlmostEqual(
+            event['args'],
+            {'iteration': 0,
+             'subproblem': "s2",
+             'worker': "w1",
+             'round_trip': 5.0,
+             'queue_wait': 2.0,
+             'model_update': 0.5,
+             'pyomo_solve_time': 2.0,
+             'solver_time': 1.5,
+             'file_io': 0.5,
+             'network_transfer': 0.5})
+        # unset keys are not included
+        self.assertEqual(trace_events[2]['cat'], "ph")
+        self.assertEqual(trace_events[2]['args'], {'iteration': 0})
+
+        # the thread names
+        self.assertEqual(trace_events[4:],
+                         [{'name': 'thread_name', 'ph': 'M', 'pid': 0,
+                           'tid': 0, 'args': {'name': "ph client"}},
+                          {'name': 'thread_name', 'ph': 'M', 'pid': 0,
+                           'tid': 1, 'args': {'name': "w1"}},
+                          {'name': 'thread_name', 'ph': 'M', 'pid': 0,
+                           'tid': 2, 'args': {'name': "s3"}}])
+
+    def test_write(self):
+        timeline = self._create_timeline()
+        filename = os.path.join(thisdir, "phtimeline_write.json")
+        self.addCleanup(_remove, filename)
+        timeline.write(filename)
+        with open(filename) as f:
+            trace = json.load(f)
+        self.assertEqual(trace, timeline.chrome_trace())
+
+if __name__ == "__main__":
+    unittest.main()
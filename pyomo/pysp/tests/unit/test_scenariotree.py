@@ -7,12 +7,27 @@
 #  rights in this software.
 #  This software is distributed under the 3-clause BSD License.
 #  ___________________________________________________________________________
+import os
+import multiprocessing
+
 import pyutilib.th as unittest
 
 from pyomo.pysp.scenariotree.tree_structure_model import \
     (ScenarioTreeModelFromNetworkX,
      CreateConcreteTwoStageScenarioTreeModel)
+from pyomo.pysp.scenariotree import tree_structure
 from pyomo.pysp.scenariotree.tree_structure import ScenarioTree
+from pyomo.pysp.scenariotree.bundling import \
+    (partition_by_solve_time,
+     estimate_scenario_solve_times)
+from pyomo.pysp.scenariotree.shared_memory import \
+    ScenarioTreeSharedMemory
+from pyomo.pysp.convergence import (TermDiffConvergence,
+                                    ScenarioSolutionArrays)
+from pyomo.pysp.phsolverserverutils import (pack_solution,
+                                            unpack_solution,
+                                            compress_result,
+                                            decompress_result)
 from pyomo.core import (ConcreteModel,
                         Set,
                         Var,
@@ -26,27 +41,101 @@ try:
 except:
     has_networkx = False
 
+if tree_structure.numpy_available:
+    import numpy
+
+def _get_block_model():
+    model = ConcreteModel()
+    model.s = Set(initialize=[1,2])
+    b = Block(concrete=True)
+    b.s = Set(initialize=[1,2])
+    b.x = Var()
+    b.X = Var(model.s)
+    model.b1 = b.clone()
+    model.b2 = b.clone()
+    model.b3 = b.clone()
+    model.b4 = b.clone()
+    model.B1 = Block(model.s, rule=lambda _,i: b.clone())
+    model.B2 = Block(model.s, rule=lambda _,i: b.clone())
+    model.B3 = Block(model.s, rule=lambda _,i: b.clone())
+    model.B4 = Block(model.s, rule=lambda _,i: b.clone())
+    model.FirstStageCost = Expression(expr=0.0)
+    model.SecondStageCost = Expression(expr=0.0)
+    model.obj = Objective(expr=0.0)
+    return model
+
+def _get_two_scenario_tree(x1=None, x2=None):
+    """Returns a two-scenario tree over block models with the
+    'b1' block as the first-stage variables, along with its root
+    node. The optional lists x1 and x2 are the first-stage
+    solutions of the scenarios (in the standard variable order of
+    the root node)."""
+    st_model = CreateConcreteTwoStageScenarioTreeModel(2)
+    st_model.StageVariables['Stage1'].add("b1")
+    st_model.StageCost['Stage1'] = "FirstStageCost"
+    st_model.StageCost['Stage2'] = "SecondStageCost"
+
+    scenario_tree = ScenarioTree(scenariotreeinstance=st_model)
+    scenario_tree.linkInInstances(
+        {'Scenario1': _get_block_model(),
+         'Scenario2': _get_block_model()})
+
+    root = scenario_tree.findRootNode()
+    order = root.get_standard_variable_id_order()
+    for scenario, x in zip(root._scenarios, (x1, x2)):
+        if x is not None:
+            scenario._x[root._name].update(zip(order, x))
+    return scenario_tree, root
+
+def _write_shared_weights(handle, node_name, scenario_name):
+    shared = ScenarioTreeSharedMemory.attach(handle)
+    row = shared.scenario_row(node_name, scenario_name)
+    shared.w(node_name)[row,:] = 5.0
+    shared.close()
+
 class TestScenarioTree(unittest.TestCase):
 
-    def _get_block_model(self):
-        model = ConcreteModel()
-        model.s = Set(initialize=[1,2])
-        b = Block(concrete=True)
-        b.s = Set(initialize=[1,2])
-        b.x = Var()
-        b.X = Var(model.s)
-        model.b1 = b.clone()
-        model.b2 = b.clone()
-        model.b3 = b.clone()
-        model.b4 = b.clone()
-        model.B1 = Block(model.s, rule=lambda _,i: b.clone())
-        model.B2 = Block(model.s, rule=lambda _,i: b.clone())
-        model.B3 = Block(model.s, rule=lambda _,i: b.clone())
-        model.B4 = Block(model.s, rule=lambda _,i: b.clone())
-        model.FirstStageCost = Expression(expr=0.0)
-        model.SecondStageCost = Expression(expr=0.0)
-        model.obj = Objective(expr=0.0)
-        return model
+    def test_partition_by_solve_time(self):
+        solve_times = {'s1': 9.0, 's2': 1.0, 's3': 4.0,
+                       's4': 4.0, 's5': 1.0, 's6': 1.0}
+        bundles = partition_by_solve_time(solve_times, 2)
+        self.assertEqual(bundles, [['s1', 's5'], ['s3', 's4', 's2', 's6']])
+        self.assertEqual(sum(solve_times[s] for s in bundles[0]), 10.0)
+        self.assertEqual(sum(solve_times[s] for s in bundles[1]), 10.0)
+        # no bundle is left empty, even when all times are equal
+        bundles = partition_by_solve_time(dict.fromkeys(solve_times, 0.0),
+                                          6)
+        self.assertEqual(sorted(len(b) for b in bundles), [1]*6)
+        with self.assertRaises(ValueError):
+            partition_by_solve_time(solve_times, 0)
+        with self.assertRaises(ValueError):
+            partition_by_solve_time(solve_times, 7)
+        self.assertEqual(
+            estimate_scenario_solve_times(['s1', 's2', 's3'],
+                                          {'s1': 2.0, 's2': 4.0}),
+            {'s1': 2.0, 's2': 4.0, 's3': 3.0})
+        self.assertEqual(
+            estimate_scenario_solve_times(['s1'], {}),
+            {'s1': 1.0})
+
+    def test_create_balanced_bundles(self):
+        st_model = CreateConcreteTwoStageScenarioTreeModel(4)
+        st_model.StageVariables['Stage1'].add("x")
+        st_model.StageCost['Stage1'] = "FirstStageCost"
+        st_model.StageCost['Stage2'] = "SecondStageCost"
+        scenario_tree = ScenarioTree(scenariotreeinstance=st_model)
+        self.assertEqual(scenario_tree.contains_bundles(), False)
+        scenario_tree.create_balanced_bundles(
+            st_model, 2, {'Scenario1': 5.0, 'Scenario2': 1.0,
+                          'Scenario3': 2.0})
+        scenario_tree = ScenarioTree(scenariotreeinstance=st_model)
+        self.assertEqual(scenario_tree.contains_bundles(), True)
+        self.assertEqual(len(scenario_tree.bundles), 2)
+        # Scenario4 is assigned the mean of the known times
+        self.assertEqual(
+            sorted(sorted(bundle.scenario_names)
+                   for bundle in scenario_tree.bundles),
+            [['Scenario1'], ['Scenario2', 'Scenario3', 'Scenario4']])
 
     def test_indexedblock_noindextemplate(self):
         st_model = CreateConcreteTwoStageScenarioTreeModel(1)
@@ -62,7 +151,7 @@ class TestScenarioTree(unittest.TestCase):
         self.assertEqual(len(scenario_tree.nodes), 2)
         self.assertEqual(len(scenario_tree.scenarios), 1)
 
-        model = self._get_block_model()
+        model = _get_block_model()
 
         scenario_tree.linkInInstances({'Scenario1': model})
 
@@ -99,7 +188,7 @@ class TestScenarioTree(unittest.TestCase):
         self.assertEqual(len(scenario_tree.nodes), 2)
         self.assertEqual(len(scenario_tree.scenarios), 1)
 
-        model = self._get_block_model()
+        model = _get_block_model()
 
         scenario_tree.linkInInstances({'Scenario1': model})
 
@@ -136,7 +225,7 @@ class TestScenarioTree(unittest.TestCase):
         self.assertEqual(len(scenario_tree.nodes), 2)
         self.assertEqual(len(scenario_tree.scenarios), 1)
 
-        model = self._get_block_model()
+        model = _get_block_model()
 
         scenario_tree.linkInInstances({'Scenario1': model})
 
@@ -167,7 +256,7 @@ class TestScenarioTree(unittest.TestCase):
         self.assertEqual(len(scenario_tree.nodes), 2)
         self.assertEqual(len(scenario_tree.scenarios), 1)
 
-        model = self._get_block_model()
+        model = _get_block_model()
 
         scenario_tree.linkInInstances({'Scenario1': model})
 
@@ -357,6 +446,239 @@ class TestScenarioTree(unittest.TestCase):
                 self.assertEqual(
                     (name,index) in root._name_index_to_id, True)
 
+    @unittest.skipIf(not tree_structure.numpy_available,
+                     "numpy is not available")
+    def test_scenario_array(self):
+        scenario_tree, root = _get_two_scenario_tree(
+            x1=[1.0, 2.0, 0.0],
+            x2=[3.0, None, 0.0])
+        order = root.get_standard_variable_id_order()
+        self.assertEqual(list(order), sorted(root._standard_variable_ids))
+        self.assertEqual(len(order), 3)
+        self.assertIs(root.get_standard_variable_id_order(), order)
+
+        values = root.get_scenario_array("_x")
+        self.assertEqual(values.shape, (2, 3))
+        self.assertEqual(values[0].tolist(), [1.0, 2.0, 0.0])
+        self.assertEqual(values[1,0], 3.0)
+        self.assertTrue(numpy.isnan(values[1,1]))
+        values = root.get_scenario_array("_x", [order[1]])
+        self.assertEqual(values.shape, (2, 1))
+        self.assertEqual(values[0,0], 2.0)
+
+    @unittest.skipIf(not tree_structure.numpy_available,
+                     "numpy is not available")
+    def test_incremental_term_diff(self):
+        scenario_tree, root = _get_two_scenario_tree(
+            x1=[1.0, 2.0, 0.0],
+            x2=[3.0, 2.0, 0.0])
+        order = root.get_standard_variable_id_order()
+        scenario1, scenario2 = root._scenarios
+        root._averages.update(
+            {order[0]: 2.0, order[1]: 2.0, order[2]: 0.0})
+
+        converger = TermDiffConvergence(incremental=True)
+        converger.update(0, None, scenario_tree, None)
+        self.assertAlmostEqual(converger.lastMetric(), 1.0)
+
+        # only the rows of the named scenarios are refreshed
+        scenario1._x[root._name][order[0]] = 2.0
+        scenario2._x[root._name][order[0]] = 2.0
+        converger.update(1, None, scenario_tree, None,
+                         updated_scenarios=[scenario1._name])
+        self.assertAlmostEqual(converger.lastMetric(), 0.5)
+        converger.update(2, None, scenario_tree, None,
+                         updated_scenarios=[scenario2._name])
+        self.assertAlmostEqual(converger.lastMetric(), 0.0)
+        self.assertAlmostEqual(
+            TermDiffConvergence().computeMetric(None, scenario_tree, None),
+            0.0)
+
+        arrays = ScenarioSolutionArrays()
+        arrays.update(scenario_tree)
+        ids, values = arrays.get(root)
+        self.assertIs(ids, order)
+        self.assertEqual(values.tolist(),
+                         [[2.0, 2.0, 0.0], [2.0, 2.0, 0.0]])
+
+    @unittest.skipIf(not tree_structure.numpy_available,
+                     "numpy is not available")
+    def test_compact_solution_data(self):
+        scenario_tree, root = _get_two_scenario_tree(
+            x1=[1.0, 2.0, None])
+        order = root.get_standard_variable_id_order()
+        scenario1, scenario2 = root._scenarios
+        root._xbars[order[0]] = 0.5
+        x2 = dict(scenario2._x[root._name])
+
+        # only the root node is compacted
+        self.assertEqual(scenario_tree.compact_solution_data(), 1)
+        self.assertIsNot(root._solution_arrays, None)
+        self.assertIsNot(type(scenario1._x[root._name]), dict)
+        self.assertIs(type(scenario1._x[scenario1._leaf_node._name]), dict)
+
+        # the views hold the values copied from the dictionaries
+        self.assertEqual(scenario1._x[root._name],
+                         {order[0]: 1.0, order[1]: 2.0, order[2]: None})
+        self.assertEqual(scenario2._x[root._name], x2)
+        self.assertEqual(root._xbars[order[0]], 0.5)
+        self.assertEqual(root._xbars[order[1]], None)
+        self.assertEqual(sorted(root._xbars), sorted(order))
+        self.assertEqual(len(root._minimums), len(root._variable_ids))
+
+        # and behave like dictionaries
+        root._wbars.clear()
+        self.assertEqual(len(root._wbars), 0)
+        self.assertFalse(order[0] in root._wbars)
+        with self.assertRaises(KeyError):
+            root._wbars[order[0]]
+        root._wbars.update((i, 0) for i in order)
+        self.assertEqual(root._wbars, dict((i, 0.0) for i in order))
+        del root._wbars[order[0]]
+        self.assertEqual(len(root._wbars), 2)
+        with self.assertRaises(KeyError):
+            scenario1._w[root._name][-1] = 1.0
+
+        # the scenario arrays are read from the compact storage
+        scenario2._x[root._name][order[2]] = 3.0
+        values = root.get_scenario_array("_x")
+        self.assertEqual(values[0,:2].tolist(), [1.0, 2.0])
+        self.assertTrue(numpy.isnan(values[0,2]))
+        self.assertEqual(values[1,2], 3.0)
+        # a view that has been replaced is no longer used
+        scenario2._x[root._name] = {order[0]: 4.0,
+                                    order[1]: 5.0,
+                                    order[2]: 6.0}
+        self.assertEqual(root.get_scenario_array("_x")[1].tolist(),
+                         [4.0, 5.0, 6.0])
+
+        # solutions are copied as dictionaries and set in place
+        solution = scenario1.copy_solution()
+        self.assertIs(type(solution['x'][root._name]), dict)
+        scenario1._x[root._name][order[0]] = 7.0
+        view = scenario1._x[root._name]
+        scenario1.set_solution(solution)
+        self.assertIs(scenario1._x[root._name], view)
+        self.assertEqual(view[order[0]], 1.0)
+
+        scenario_tree.expand_solution_data()
+        self.assertIs(root._solution_arrays, None)
+        self.assertIs(type(scenario1._x[root._name]), dict)
+        self.assertIs(type(root._xbars), dict)
+        self.assertEqual(scenario1._x[root._name],
+                         {order[0]: 1.0, order[1]: 2.0, order[2]: None})
+        self.assertEqual(root._xbars[order[0]], 0.5)
+
+    @unittest.skipIf(not tree_structure.numpy_available,
+                     "numpy is not available")
+    def test_shared_memory(self):
+        scenario_tree, root = _get_two_scenario_tree(
+            x1=[1.0, 2.0, None],
+            x2=[3.0, 4.0, 5.0])
+        order = root.get_standard_variable_id_order()
+        scenario1, scenario2 = root._scenarios
+        root._xbars.update(
+            {order[0]: 2.0, order[1]: 3.0, order[2]: 5.0})
+
+        shared = ScenarioTreeSharedMemory.create(scenario_tree)
+        try:
+            self.assertTrue(os.path.exists(shared.filename))
+            self.assertEqual(shared.variable_ids(root._name), order)
+            # nothing has been stored yet
+            self.assertTrue(numpy.isnan(shared.x(root._name)).all())
+
+            shared.store(scenario_tree, 'x',
+                         scenario_names=[scenario2._name])
+            shared.store(scenario_tree, 'xbar')
+            other = ScenarioTreeSharedMemory.attach(shared.handle)
+            row = other.scenario_row(root._name, scenario2._name)
+            self.assertEqual(other.x(root._name)[row].tolist(),
+                             [3.0, 4.0, 5.0])
+            self.assertTrue(numpy.isnan(other.x(root._name)[1-row]).all())
+            self.assertEqual(other.xbar(root._name).tolist(),
+                             [2.0, 3.0, 5.0])
+
+            shared.store(scenario_tree, 'x')
+            row = other.scenario_row(root._name, scenario1._name)
+            self.assertEqual(other.x(root._name)[row,:2].tolist(),
+                             [1.0, 2.0])
+            self.assertTrue(numpy.isnan(other.x(root._name)[row,2]))
+            other.close()
+            # only the creator removes the file
+            self.assertTrue(os.path.exists(shared.filename))
+
+            # updates made by another process are visible
+            process = multiprocessing.Process(
+                target=_write_shared_weights,
+                args=(shared.handle, root._name, scenario1._name))
+            process.start()
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+            shared.load(scenario_tree, 'w')
+            self.assertEqual(scenario1._w[root._name],
+                             dict((i, 5.0) for i in order))
+            self.assertEqual(scenario2._w[root._name],
+                             dict((i, None) for i in order))
+
+            scenario1._x[root._name].clear()
+            shared.load(scenario_tree, 'x',
+                        scenario_names=[scenario1._name])
+            self.assertEqual(scenario1._x[root._name],
+                             {order[0]: 1.0, order[1]: 2.0, order[2]: None})
+
+            # the columns are matched to the ids on a tree with
+            # different variable ids through an id map
+            self.assertEqual(shared.node_names, (root._name,))
+            id_map = {root._name: dict((i, ('local', i)) for i in order)}
+            scenario2._x[root._name] = \
+                dict((('local', i), -1.0) for i in order)
+            shared.store(scenario_tree, 'x',
+                         scenario_names=[scenario2._name],
+                         id_map=id_map)
+            row = shared.scenario_row(root._name, scenario2._name)
+            self.assertEqual(shared.x(root._name)[row].tolist(),
+                             [-1.0, -1.0, -1.0])
+            shared.load(scenario_tree, 'x',
+                        scenario_names=[scenario1._name],
+                        id_map=id_map)
+            self.assertEqual(scenario1._x[root._name],
+                             {order[0]: 1.0, order[1]: 2.0, order[2]: None,
+                              ('local', order[0]): 1.0,
+                              ('local', order[1]): 2.0,
+                              ('local', order[2]): None})
+        finally:
+            shared.close()
+        self.assertFalse(os.path.exists(shared.filename))
+
+class TestPHSolverServerUtils(unittest.TestCase):
+
+    def test_packed_solution(self):
+        scenario_tree, root = _get_two_scenario_tree(
+            x1=[1.5, -2.0, None])
+        order = root.get_standard_variable_id_order()
+        scenario1, scenario2 = root._scenarios
+        scenario1._fixed[root._name].add(order[0])
+
+        solution = scenario1.copy_solution()
+        packed = pack_solution(solution)
+        self.assertNotEqual(packed['x'], solution['x'])
+        self.assertEqual(unpack_solution(packed), solution)
+        # solutions that were not packed are returned as is
+        self.assertIs(unpack_solution(solution), solution)
+
+        compressed = compress_result((packed, {}, {'gap': 0.0}))
+        result = decompress_result(compressed)
+        self.assertEqual(unpack_solution(result[0]), solution)
+        self.assertEqual(result[1:], ({}, {'gap': 0.0}))
+        self.assertEqual(decompress_result(()), ())
+
+        scenario1._x[root._name].clear()
+        scenario1._fixed[root._name].clear()
+        scenario1.set_solution(unpack_solution(result[0]))
+        self.assertEqual(scenario1._x[root._name],
+                         {order[0]: 1.5, order[1]: -2.0, order[2]: None})
+        self.assertEqual(scenario1._fixed[root._name], set([order[0]]))
+
 @unittest.skipIf(not has_networkx, "Requires networkx module")
 class TestScenarioTreeFromNetworkX(unittest.TestCase):
 
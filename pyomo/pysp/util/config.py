@@ -650,6 +650,60 @@ safe_declare_unique_option(
         visibility=0),
     ap_group=_scenario_tree_options_group_title)
 
+safe_declare_unique_option(
+    common_block,
+    "bundle_solve_times",
+    PySPConfigValue(
+        None,
+        domain=_domain_must_be_str,
+        description=(
+            "The name of a file with scenario solve times, used to "
+            "balance the total solve time of the bundles requested "
+            "with the create_random_bundles option rather than "
+            "assigning scenarios to bundles at random. The file can "
+            "be a history file written by the phhistoryextension "
+            "plugin or a JSON file mapping scenario names to solve "
+            "times."
+        ),
+        doc=None,
+        visibility=0),
+    ap_group=_scenario_tree_options_group_title)
+
+safe_declare_unique_option(
+    common_block,
+    "rebalance_bundles",
+    PySPConfigValue(
+        False,
+        domain=bool,
+        description=(
+            "After each solve of the scenario bundles, replace the "
+            "bundles with the same number of bundles whose total "
+            "solve times (estimated from the solves so far) are "
+            "balanced. Only supported by the serial scenario tree "
+            "manager."
+        ),
+        doc=None,
+        visibility=0),
+    ap_group=_scenario_tree_options_group_title)
+
+safe_declare_unique_option(
+    common_block,
+    "compact_scenario_tree_storage",
+    PySPConfigValue(
+        False,
+        domain=bool,
+        description=(
+            "Store the solution data of the non-leaf scenario tree "
+            "nodes (the node statistics and the scenario values, "
+            "weights, and rhos) in dense arrays rather than in "
+            "dictionaries keyed by variable id. This reduces memory "
+            "use for scenario trees with many scenarios. Requires "
+            "numpy."
+        ),
+        doc=None,
+        visibility=0),
+    ap_group=_scenario_tree_options_group_title)
+
 safe_declare_unique_option(
     common_block,
     "scenario_tree_manager",
@@ -662,7 +716,45 @@ safe_declare_unique_option(
             "process and performs all scenario tree operations "
             "sequentially. If 'pyro' is specified, the scenario tree "
             "is fully distributed and scenario tree operations are "
-            "performed asynchronously."
+            "performed asynchronously. If 'multiprocess' is specified, "
+            "the scenario tree is distributed over scenario tree "
+            "server processes launched on the local host, and no Pyro "
+            "components are required."
+        ),
+        doc=None,
+        visibility=0),
+    ap_group=_scenario_tree_options_group_title)
+
+safe_declare_unique_option(
+    common_block,
+    "multiprocess_scenariotreeservers",
+    PySPConfigValue(
+        0,
+        domain=_domain_nonnegative_integer,
+        description=(
+            "Set the maximum number of scenario tree server processes "
+            "launched when the 'multiprocess' scenario tree manager is "
+            "selected. The default value of 0 indicates that one "
+            "process should be launched for each CPU on the local host "
+            "(but no more than the number of scenarios or bundles)."
+        ),
+        doc=None,
+        visibility=0),
+    ap_group=_scenario_tree_options_group_title)
+
+safe_declare_unique_option(
+    common_block,
+    "multiprocess_shared_memory",
+    PySPConfigValue(
+        False,
+        domain=bool,
+        description=(
+            "When the 'multiprocess' scenario tree manager is "
+            "selected, exchange the scenario solutions at the "
+            "non-leaf scenario tree nodes with the scenario tree "
+            "servers through a shared memory-mapped file rather "
+            "than by sending them with each solve result. Requires "
+            "numpy."
         ),
         doc=None,
         visibility=0),
@@ -940,6 +1032,23 @@ safe_declare_unique_option(
         visibility=0),
     ap_group=_output_options_group_title)
 
+safe_declare_unique_option(
+    common_block,
+    "solver_tempdir",
+    PySPConfigValue(
+        None,
+        domain=_domain_must_be_str,
+        description=(
+            "The directory in which temporary input and output "
+            "files for scenario sub-problem solves are created. "
+            "Specifying a memory-backed filesystem (e.g., /dev/shm) "
+            "avoids disk I/O for many small solves. Default is "
+            "the system temporary directory."
+        ),
+        doc=None,
+        visibility=0),
+    ap_group=_output_options_group_title)
+
 safe_declare_unique_option(
     common_block,
     "verbose",
@@ -1850,6 +1959,41 @@ safe_declare_unique_option(
         visibility=0),
     ap_group=_other_options_group_title)
 
+safe_declare_unique_option(
+    common_block,
+    "scenario_instance_cache_directory",
+    PySPConfigValue(
+        None,
+        domain=_domain_must_be_str,
+        description=(
+            "A directory in which constructed scenario instances are "
+            "cached (pickled). A cached instance is reused when the "
+            "reference model file, the scenario data files, and the "
+            "data layout are unchanged, and it is rebuilt otherwise. "
+            "Instances created by a callback are never cached."
+        ),
+        doc=None,
+        visibility=0),
+    ap_group=_other_options_group_title)
+
+safe_declare_unique_option(
+    common_block,
+    "template_scenario_instances",
+    PySPConfigValue(
+        False,
+        domain=bool,
+        description=(
+            "Construct the reference model only once and create each "
+            "scenario instance by copying it and loading the values "
+            "of the parameters declared in the model's "
+            "StochasticDataAnnotation from the scenario .dat files. "
+            "Those parameters must be mutable, and all other data "
+            "must be the same for every scenario."
+        ),
+        doc=None,
+        visibility=0),
+    ap_group=_other_options_group_title)
+
 #
 # Deprecated command-line option names
 # (DO NOT REGISTER THEM OUTSIDE OF THIS FILE)
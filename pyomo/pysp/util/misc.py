@@ -16,6 +16,7 @@ import subprocess
 import traceback
 import inspect
 import argparse
+import multiprocessing
 # for profiling
 try:
     import cProfile as profile
@@ -383,6 +384,30 @@ def launch_command(command,
 
     return rc
 
+def _create_fork_pool(processes, initializer=None, initargs=()):
+    """Create a multiprocessing pool whose worker processes are
+    started with the 'fork' start method, so that the initializer
+    arguments are inherited by the workers rather than pickled (a
+    ScenarioTreeInstanceFactory can not be pickled). Raises a
+    RuntimeError on platforms that do not support fork."""
+    context = multiprocessing
+    if hasattr(multiprocessing, "get_context"):
+        try:
+            context = multiprocessing.get_context("fork")
+        except ValueError:
+            raise RuntimeError(
+                "Solving in multiple processes requires the 'fork' "
+                "process start method, which is not available on "
+                "this platform")
+    elif sys.platform.startswith("win"):
+        raise RuntimeError(
+            "Solving in multiple processes requires the 'fork' "
+            "process start method, which is not available on "
+            "this platform")
+    return context.Pool(processes=processes,
+                        initializer=initializer,
+                        initargs=initargs)
+
 def _poll(proc, running=True):
     if proc is None:
         return
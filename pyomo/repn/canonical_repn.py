@@ -12,7 +12,8 @@ from __future__ import division
 
 __all__ = ['generate_canonical_repn', 'as_expr', 'canonical_is_constant',
            'canonical_is_linear', 'canonical_is_quadratic', 'canonical_is_nonlinear',
-           'canonical_degree', 'LinearCanonicalRepn', 'GeneralCanonicalRepn']
+           'canonical_degree', 'LinearCanonicalRepn', 'GeneralCanonicalRepn',
+           'ParameterizedCanonicalRepn']
 
 import logging
 import copy
@@ -1074,6 +1075,109 @@ def generate_canonical_repn(exp, idMap=None, compute_values=True):
     else:
         raise RuntimeError("Unrecognized expression tree mode")
 
+#
+# A canonical representation whose coefficients can be re-evaluated in
+# place after the values of mutable parameters change.
+#
+class ParameterizedCanonicalRepn(object):
+    """
+    A canonical representation of a polynomial expression whose
+    coefficients depend on mutable parameters (or fixed variables).
+
+    The expression is walked once, without computing the values of the
+    coefficients, to collect the terms along with the expression for
+    each coefficient. The canonical representation in the repn
+    attribute (a LinearCanonicalRepn or a GeneralCanonicalRepn, the
+    same as returned by generate_canonical_repn) is then kept up to
+    date by calling update(), which evaluates only the coefficient
+    expressions and stores the results in place. The expression must
+    be processed again if its structure changes (e.g., if a variable
+    in it is fixed or freed).
+    """
+
+    __slots__ = ('repn', '_coefficients', '_linear')
+
+    def __init__(self, exp, idMap=None):
+        template = generate_canonical_repn(exp,
+                                           idMap=idMap,
+                                           compute_values=False)
+        # a list of (container, key, coefficient expression), where a
+        # container of None refers to the constant of a linear repn
+        self._coefficients = []
+        self._linear = None
+        if isinstance(template, dict):
+            if None in template:
+                raise ValueError(
+                    "A parameterized canonical representation can not "
+                    "be generated for a nonlinear expression: %s"
+                    % (str(exp)))
+            self.repn = GeneralCanonicalRepn()
+            for order, terms in iteritems(template):
+                if order < 0:
+                    self.repn[order] = terms
+                    continue
+                repn_terms = self.repn[order] = {}
+                for term, coef in iteritems(terms):
+                    if coef.__class__ not in native_numeric_types:
+                        self._coefficients.append((repn_terms, term, coef))
+                        coef = value(coef)
+                    repn_terms[term] = coef
+        else:
+            self.repn = template.__class__()
+            self.repn.variables = template.variables
+            if template.linear is None:
+                self.repn.linear = None
+            elif type(template.linear) is dict:
+                linear = self.repn.linear = {}
+                for key, coef in iteritems(template.linear):
+                    if coef.__class__ not in native_numeric_types:
+                        self._coefficients.append((linear, key, coef))
+                        coef = value(coef)
+                    linear[key] = coef
+            else:
+                # the tuple of coefficients is rebuilt from this list
+                # when any of them change
+                self._linear = []
+                for i, coef in enumerate(template.linear):
+                    if coef.__class__ not in native_numeric_types:
+                        self._coefficients.append((self._linear, i, coef))
+                        coef = value(coef)
+                    self._linear.append(coef)
+                self.repn.linear = tuple(self._linear)
+            constant = template.constant
+            if template.linear is None:
+                # the constant of a constant expression has always
+                # been computed
+                constant = exp
+            if (constant is not None) and \
+               (constant.__class__ not in native_numeric_types):
+                self._coefficients.append((None, None, constant))
+                constant = value(constant)
+            self.repn.constant = constant
+
+    def update(self):
+        """
+        Evaluate the coefficients that depend on mutable parameters
+        and store them in the canonical representation. Returns True
+        if any coefficient changed.
+        """
+        changed = False
+        for container, key, coef in self._coefficients:
+            val = value(coef)
+            if container is None:
+                if self.repn.constant != val:
+                    self.repn.constant = val
+                    changed = True
+            elif container[key] != val:
+                container[key] = val
+                changed = True
+        if changed:
+            if self._linear is not None:
+                self.repn.linear = tuple(self._linear)
+            elif isinstance(self.repn, GeneralCanonicalRepn):
+                self.repn._hash = None
+        return changed
+
 if common.mode is common.Mode.coopr3_trees:
     CompiledLinearCanonicalRepn = coopr3_CompiledLinearCanonicalRepn
 elif common.mode is common.Mode.pyomo4_trees:
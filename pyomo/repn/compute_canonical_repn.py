@@ -13,7 +13,8 @@ import logging
 
 from pyomo.core.base import Constraint, Objective, ComponentMap, Block
 import pyomo.repn
-from pyomo.repn.canonical_repn import LinearCanonicalRepn
+from pyomo.repn.canonical_repn import (LinearCanonicalRepn,
+                                       ParameterizedCanonicalRepn)
 from pyomo.repn import generate_canonical_repn
 import pyomo.core.base.connector
 
@@ -44,6 +45,68 @@ def preprocess_block_objectives(block, idMap=None):
             raise
 
         block_canonical_repn[objective_data] = objective_data_repn
+        # the expression may have changed, so any parameterized
+        # representation of this objective is out of date
+        if hasattr(block, '_parameterized_canonical_repn'):
+            block._parameterized_canonical_repn.pop(objective_data, None)
+
+def update_block_objectives(block, idMap=None):
+    """
+    Update the canonical representations of the active objectives on
+    a block after the values of the mutable parameters in their
+    expressions have changed. The first call for an objective
+    generates a ParameterizedCanonicalRepn for it; later calls only
+    re-evaluate its coefficients in place. Returns a list of the
+    objectives whose representations changed.
+
+    The expressions of the objectives (and the fixed status of the
+    variables in them) must be the same as in the previous call. Use
+    preprocess_block_objectives after a change to an expression.
+    """
+
+    # Get/Create the ComponentMaps for the canonical_repn
+    if not hasattr(block, '_canonical_repn'):
+        block._canonical_repn = ComponentMap()
+    block_canonical_repn = block._canonical_repn
+    if not hasattr(block, '_parameterized_canonical_repn'):
+        block._parameterized_canonical_repn = ComponentMap()
+    block_parameterized_repn = block._parameterized_canonical_repn
+
+    updated = []
+    for objective_data in block.component_data_objects(Objective,
+                                                       active=True,
+                                                       descend_into=False):
+
+        if objective_data.expr is None:
+            raise ValueError("No expression has been defined for objective %s"
+                             % (objective_data.name))
+
+        parameterized_repn = block_parameterized_repn.get(objective_data)
+        if (parameterized_repn is None) and \
+           (objective_data.expr.polynomial_degree() is None):
+            # nonlinear objectives are always processed from scratch
+            block_canonical_repn[objective_data] = \
+                generate_canonical_repn(objective_data.expr, idMap=idMap)
+            updated.append(objective_data)
+        elif parameterized_repn is None:
+            try:
+                parameterized_repn = \
+                    ParameterizedCanonicalRepn(objective_data.expr,
+                                               idMap=idMap)
+            except Exception:
+                err = sys.exc_info()[1]
+                logging.getLogger('pyomo.core').error(
+                    "exception generating a parameterized canonical "
+                    "representation for objective %s: %s"
+                    % (objective_data.name, str(err)))
+                raise
+            block_parameterized_repn[objective_data] = parameterized_repn
+            block_canonical_repn[objective_data] = parameterized_repn.repn
+            updated.append(objective_data)
+        elif parameterized_repn.update():
+            updated.append(objective_data)
+
+    return updated
 
 def preprocess_block_constraints(block, idMap=None):
 
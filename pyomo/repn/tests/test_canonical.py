@@ -630,5 +630,87 @@ class Test(unittest.TestCase):
         self.assertTrue(isinstance(rep, GeneralCanonicalRepn) == True)
         self.assertEqual(canonical_degree(rep), None)
 
+    def _parameterized_model(self):
+        model = ConcreteModel()
+        model.x = Var([1,2])
+        model.w = Param([1,2], mutable=True, initialize=1.0)
+        model.rho = Param(mutable=True, initialize=2.0)
+        model.xbar = Param([1,2], mutable=True, initialize=0.5)
+        return model
+
+    def test_parameterized_quadratic(self):
+        model = self._parameterized_model()
+        expr = 3*model.x[1] + 4*model.x[2] + \
+               sum(model.w[i]*model.x[i] for i in model.x) + \
+               sum(model.rho/2.0*(model.x[i]-model.xbar[i])**2
+                   for i in model.x)
+        prep = ParameterizedCanonicalRepn(expr)
+        self.assertTrue(isinstance(prep.repn, GeneralCanonicalRepn))
+        self.assertEqual(prep.repn, generate_canonical_repn(expr))
+        self.assertEqual(prep.update(), False)
+        repn = prep.repn
+        model.w[1] = 5.0
+        model.rho = 10.0
+        model.xbar[2] = -1.0
+        self.assertEqual(prep.update(), True)
+        # the coefficients are updated in place
+        self.assertIs(prep.repn, repn)
+        self.assertEqual(prep.repn, generate_canonical_repn(expr))
+        self.assertEqual(prep.repn[0], {None: 6.25})
+        self.assertEqual(prep.update(), False)
+
+    def test_parameterized_linear(self):
+        model = self._parameterized_model()
+        expr = 3*model.x[1] + model.w[2]*model.x[2] + model.w[1]
+        prep = ParameterizedCanonicalRepn(expr)
+        self.assertTrue(isinstance(prep.repn, LinearCanonicalRepn))
+        self.assertEqual(linear_repn_to_dict(prep.repn),
+                         {id(model.x[1]): 3, id(model.x[2]): 1.0,
+                          None: 1.0})
+        model.w[1] = 2.0
+        model.w[2] = 7.0
+        self.assertEqual(prep.update(), True)
+        self.assertEqual(linear_repn_to_dict(prep.repn),
+                         linear_repn_to_dict(generate_canonical_repn(expr)))
+        self.assertEqual(linear_repn_to_dict(prep.repn),
+                         {id(model.x[1]): 3, id(model.x[2]): 7.0,
+                          None: 2.0})
+
+    def test_parameterized_constant(self):
+        model = self._parameterized_model()
+        prep = ParameterizedCanonicalRepn(2*model.w[1])
+        self.assertEqual(prep.repn.constant, 2.0)
+        model.w[1] = 4.0
+        self.assertEqual(prep.update(), True)
+        self.assertEqual(prep.repn.constant, 8.0)
+
+    def test_parameterized_nonlinear(self):
+        model = self._parameterized_model()
+        with self.assertRaises(ValueError):
+            ParameterizedCanonicalRepn(model.w[1]*exp(model.x[1]))
+
+    def test_update_block_objectives(self):
+        from pyomo.repn.compute_canonical_repn import \
+            (preprocess_block_objectives,
+             update_block_objectives)
+        model = self._parameterized_model()
+        model.o = Objective(expr=model.x[1] + model.w[2]*model.x[2])
+        self.assertEqual(update_block_objectives(model), [model.o])
+        repn = model._canonical_repn[model.o]
+        self.assertEqual(update_block_objectives(model), [])
+        model.w[2] = 3.0
+        self.assertEqual(update_block_objectives(model), [model.o])
+        self.assertIs(model._canonical_repn[model.o], repn)
+        self.assertEqual(linear_repn_to_dict(repn),
+                         {id(model.x[1]): 1, id(model.x[2]): 3.0})
+        # a change to the expression discards the parameterized
+        # representation
+        model.o.expr += model.w[1]*model.x[1]
+        preprocess_block_objectives(model)
+        self.assertEqual(len(model._parameterized_canonical_repn), 0)
+        self.assertEqual(update_block_objectives(model), [model.o])
+        self.assertEqual(linear_repn_to_dict(model._canonical_repn[model.o]),
+                         {id(model.x[1]): 2.0, id(model.x[2]): 3.0})
+
 if __name__ == "__main__":
     unittest.main()
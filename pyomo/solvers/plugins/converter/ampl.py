@@ -54,12 +54,12 @@ class AmplMIPConverter(SingletonPlugin):
         cmd = pyutilib.services.registered_executable("ampl").get_path()
         if cmd is None:
             raise ConverterError("The 'ampl' executable cannot be found")
-        script_filename = pyutilib.services.TempfileManager.create_tempfile(suffix = '.ampl')
+        script_filename = pyutilib.services.TempfileManager.create_tempfile(suffix = '.ampl', dir=kwargs.get('tempdir'))
 
         if args[1] == ProblemFormat.nl:
-            output_filename = pyutilib.services.TempfileManager.create_tempfile(suffix = '.nl')
+            output_filename = pyutilib.services.TempfileManager.create_tempfile(suffix = '.nl', dir=kwargs.get('tempdir'))
         else:
-            output_filename = pyutilib.services.TempfileManager.create_tempfile(suffix = '.mps')
+            output_filename = pyutilib.services.TempfileManager.create_tempfile(suffix = '.mps', dir=kwargs.get('tempdir'))
 
         cmd += " " + script_filename
         #
@@ -61,10 +61,10 @@ class GlpsolMIPConverter(SingletonPlugin):
         #
         modfile=''
         if args[1] == ProblemFormat.mps: #pragma:nocover
-            ofile = pyutilib.services.TempfileManager.create_tempfile(suffix = '.glpsol.mps')
+            ofile = pyutilib.services.TempfileManager.create_tempfile(suffix = '.glpsol.mps', dir=kwargs.get('tempdir'))
             cmd = cmd + " --check --name 'MPS model derived from "+os.path.basename(args[2])+"' --wfreemps "+ofile
         elif args[1] == ProblemFormat.cpxlp:
-            ofile = pyutilib.services.TempfileManager.create_tempfile(suffix = '.glpsol.lp')
+            ofile = pyutilib.services.TempfileManager.create_tempfile(suffix = '.glpsol.lp', dir=kwargs.get('tempdir'))
             cmd = cmd + " --check --name 'MPS model derived from "+os.path.basename(args[2])+"' --wcpxlp "+ofile
         if len(args[2:]) == 1:
             cmd = cmd+" "+args[2]
@@ -73,7 +73,7 @@ class GlpsolMIPConverter(SingletonPlugin):
             # Create a temporary model file, since GLPSOL can only
             # handle one input file
             #
-            modfile = pyutilib.services.TempfileManager.create_tempfile(suffix = '.glpsol.mod')
+            modfile = pyutilib.services.TempfileManager.create_tempfile(suffix = '.glpsol.mod', dir=kwargs.get('tempdir'))
             OUTPUT=open(modfile,"w")
             flag=False
             #
@@ -57,6 +57,9 @@ class PyomoMIPConverter(SingletonPlugin):
         import pyomo.scripting.convert
 
         capabilities = kwds.pop("capabilities", None)
+        # the directory for the problem file (None indicates the
+        # TempfileManager default directory)
+        tempdir = kwds.pop("tempdir", None)
 
         # all non-consumed keywords are assumed to be options
         # that should be passed to the writer.
@@ -78,7 +81,7 @@ class PyomoMIPConverter(SingletonPlugin):
 
         if args[1] == ProblemFormat.cpxlp:
             problem_filename = pyutilib.services.TempfileManager.\
-                               create_tempfile(suffix = '.pyomo.lp')
+                               create_tempfile(suffix = '.pyomo.lp', dir=tempdir)
             if instance is not None:
                 if isinstance(instance, IBlockStorage):
                     symbol_map_id = instance.write(
@@ -124,7 +127,7 @@ class PyomoMIPConverter(SingletonPlugin):
 
         elif args[1] == ProblemFormat.bar:
             problem_filename = pyutilib.services.TempfileManager.\
-                               create_tempfile(suffix = '.pyomo.bar')
+                               create_tempfile(suffix = '.pyomo.bar', dir=tempdir)
             if instance is not None:
                 if isinstance(instance, IBlockStorage):
                     symbol_map_id = instance.write(
@@ -170,11 +173,11 @@ class PyomoMIPConverter(SingletonPlugin):
         elif args[1] in [ProblemFormat.mps, ProblemFormat.nl]:
             if args[1] == ProblemFormat.nl:
                 problem_filename = pyutilib.services.TempfileManager.\
-                                   create_tempfile(suffix = '.pyomo.nl')
+                                   create_tempfile(suffix = '.pyomo.nl', dir=tempdir)
             else:
                 assert args[1] == ProblemFormat.mps
                 problem_filename = pyutilib.services.TempfileManager.\
-                                   create_tempfile(suffix = '.pyomo.mps')
+                                   create_tempfile(suffix = '.pyomo.mps', dir=tempdir)
             if instance is not None:
                 if isinstance(instance, IBlockStorage):
                     symbol_map_id = instance.write(
@@ -237,7 +240,7 @@ class PyomoMIPConverter(SingletonPlugin):
         elif args[1] == ProblemFormat.osil:
             if False:
                 problem_filename = pyutilib.services.TempfileManager.\
-                               create_tempfile(suffix='pyomo.osil')
+                               create_tempfile(suffix='pyomo.osil', dir=tempdir)
                 if instance:
                     if isinstance(instance, IBlockStorage):
                         symbol_map_id = instance.write(
@@ -68,9 +68,9 @@ class PicoMIPConverter(SingletonPlugin):
         if target=="cpxlp":
             target="lp"
         # NOTE: if you have an extra "." in the suffix, the pico_convert program fails to output to the correct filename.
-        output_filename = pyutilib.services.TempfileManager.create_tempfile(suffix = 'pico_convert.' + target)
+        output_filename = pyutilib.services.TempfileManager.create_tempfile(suffix = 'pico_convert.' + target, dir=kwargs.get('tempdir'))
         if not isinstance(args[2],six.string_types):
-            fname= pyutilib.services.TempfileManager.create_tempfile(suffix= 'pico_convert.' +str(args[0]))
+            fname= pyutilib.services.TempfileManager.create_tempfile(suffix= 'pico_convert.' +str(args[0]), dir=kwargs.get('tempdir'))
             args[2].write(filename=fname, format=args[1])
             cmd = pico_convert_cmd +" --output="+output_filename+" "+target+" "+fname
         else:
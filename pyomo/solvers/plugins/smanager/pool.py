@@ -0,0 +1,479 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+#
+# Solver managers that execute queued solves concurrently on the
+# local machine. Problem files are written in the parent process
+# (exactly as is done for the Pyro solver manager), so only a file
+# name and a small dictionary of solver options cross the worker
+# boundary. Results are loaded back into the model in the parent when
+# they are collected through wait_any/wait_all.
+#
+
+__all__ = ()
+
+import time
+import logging
+import shutil
+import tempfile
+import traceback
+import multiprocessing
+import multiprocessing.pool
+
+try:
+    from collections import OrderedDict
+except ImportError:                         #pragma:nocover
+    from ordereddict import OrderedDict
+
+import pyutilib.misc
+from pyutilib.common import ApplicationError
+from pyutilib.services import TempfileManager
+import pyomo.util.plugin
+from pyomo.opt.base import OptSolver, SolverFactory
+from pyomo.opt.solver import SystemCallSolver
+from pyomo.opt.parallel.manager import (ActionManagerError,
+                                        ActionHandle,
+                                        ActionStatus)
+from pyomo.opt.parallel.async_solver import AsynchronousSolverManager
+from pyomo.core.base import Block
+import pyomo.core.base.suffix
+
+import six
+from six.moves import queue
+
+logger = logging.getLogger('pyomo.solvers')
+
+def _solve_problem_file(ah_id, data):
+    """
+    Solve a problem file written by the parent process. This is the
+    task executed by the process pool, so it must be importable at the
+    module level. Exceptions are returned rather than raised so that
+    they are reported against the action handle that caused them.
+    """
+    try:
+        # ensure solver plugins are registered in spawned workers
+        import pyomo.environ
+        data = pyutilib.misc.Bunch(**data)
+        time_start = time.time()
+        with TempfileManager.push():
+            with SolverFactory(data.opt) as opt:
+                if opt is None:
+                    raise ActionManagerError(
+                        "Problem constructing solver `%s'" % (data.opt))
+                for key, value in data.solver_options.items():
+                    setattr(opt.options, key, value)
+                results = opt.solve(data.filename, **data.kwds)
+                assert results._smap_id is None
+        results.pyomo_solve_time = time.time()-time_start
+        return (ah_id, False, results)
+    except:
+        return (ah_id, True, traceback.format_exc())
+
+def _apply_solver(ah_id, opt):
+    """
+    Execute the solver subprocess for a solver that has already been
+    presolved by the parent. This is the task executed by the thread
+    pool; the GIL is released while waiting on the subprocess.
+    """
+    try:
+        time_start = time.time()
+        status = opt._apply_solver()
+        status.pyomo_solve_time = time.time()-time_start
+        return (ah_id, False, status)
+    except:
+        return (ah_id, True, traceback.format_exc())
+
+class _SolverManager_Pool(AsynchronousSolverManager):
+    """
+    Base class for solver managers that execute solves concurrently
+    using a local pool of workers.
+    """
+
+    def __init__(self, *args, **kwds):
+        self._pool = None
+        self._tasks = {}
+        self._completed = queue.Queue()
+        max_workers = kwds.pop('max_workers', None)
+        if max_workers is None:
+            max_workers = multiprocessing.cpu_count()
+        if max_workers < 1:
+            raise ValueError(
+                "The max_workers option of %s must be a positive "
+                "integer, got %s" % (type(self).__name__, max_workers))
+        self._max_workers = max_workers
+        # these are used by the Pyro solver managers and are
+        # accepted here so that both can be constructed the same way
+        kwds.pop('host', None)
+        kwds.pop('port', None)
+        super(_SolverManager_Pool, self).__init__(*args, **kwds)
+
+    def clear(self):
+        """
+        Clear manager state
+        """
+        super(_SolverManager_Pool, self).clear()
+        self.results = OrderedDict()
+        for task in self._tasks.values():
+            self._remove_task_directory(task)
+        self._tasks = {}
+        self._completed = queue.Queue()
+
+    def close(self):
+        """Close the manager, terminating any worker processes."""
+        if len(self._tasks):
+            logger.warning("%s is closing with %s solves "
+                           "still executing."
+                           % (type(self).__name__, len(self._tasks)))
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self.clear()
+
+    def deactivate(self):
+        self.close()
+        super(_SolverManager_Pool, self).deactivate()
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = self._create_pool(self._max_workers)
+        return self._pool
+
+    def _perform_queue(self, ah, *args, **kwds):
+        """
+        Perform the queue operation.  This method returns the
+        ActionHandle, and the ActionHandle status indicates whether
+        the queue was successful.
+        """
+        opt = kwds.pop('solver', kwds.pop('opt', None))
+        if opt is None:
+            raise ActionManagerError(
+                "No solver passed to %s, use keyword option 'solver'"
+                % (type(self).__name__) )
+
+        tempdir = kwds.pop('tempdir', None)
+        if tempdir is None:
+            tempdir = TempfileManager.tempdir
+        task = pyutilib.misc.Bunch(args=args, directory=None)
+        task.directory = tempfile.mkdtemp(prefix="pyomo_"+self._task_prefix,
+                                          dir=tempdir)
+        try:
+            worker_args = self._prepare_task(task, opt, *args, **kwds)
+        except:
+            self._remove_task_directory(task)
+            raise
+
+        self._tasks[ah.id] = task
+        self._get_pool().apply_async(self._worker_function,
+                                     (ah.id,)+worker_args,
+                                     callback=self._completed.put)
+        return ah
+
+    def _perform_wait_any(self):
+        """
+        Perform the wait_any operation.  This method returns an
+        ActionHandle with the results of waiting.  If None is returned
+        then the ActionManager assumes that it can call this method again.
+        Note that an ActionHandle can be returned with a dummy value,
+        to indicate an error.
+        """
+        if len(self._tasks) == 0:
+            return ActionHandle(error=True,
+                                explanation=("No queued evaluations available "
+                                             "in the '%s' solver manager"
+                                             % (self._task_prefix)))
+
+        ah_id, failed, payload = self._completed.get()
+        task = self._tasks.pop(ah_id)
+        ah = self.event_handle.get(ah_id, None)
+        if ah is None:
+            # if we are here, this is really bad news!
+            self._remove_task_directory(task)
+            raise RuntimeError(
+                "The %s found results for task with id=%s"
+                " - but no corresponding action handle "
+                "could be located!" % (type(self).__name__, ah_id))
+        try:
+            if failed:
+                ah.status = ActionStatus.error
+                self.event_handle[ah.id].update(ah)
+                raise RuntimeError(
+                    "Worker reported a processing error "
+                    "for task with id=%s. Reason: \n%s"
+                    % (ah_id, payload))
+            results = self._finalize_task(task, payload)
+        finally:
+            self._remove_task_directory(task)
+
+        ah.status = ActionStatus.done
+        self.event_handle[ah.id].update(ah)
+        self.results[ah.id] = results
+        return ah
+
+    def _presolve(self, task, opt, *args, **kwds):
+        """
+        Execute the solver presolve in the parent so that the
+        problem file (and any other temporary file generated by the
+        solver plugin) is written to the task directory. The
+        TempfileManager contexts pushed by the plugin are detached
+        here, because solves complete in an arbitrary order; the task
+        directory is removed when the results are collected.
+        """
+        depth = len(TempfileManager._tempfiles)
+        orig_tempdir = opt._tempdir
+        opt._set_tempdir(task.directory)
+        try:
+            opt._presolve(*args, **kwds)
+        finally:
+            opt._tempdir = orig_tempdir
+            task.contexts = len(TempfileManager._tempfiles) - depth
+            for i in range(task.contexts):
+                TempfileManager.pop(remove=False)
+
+    def _load_results(self, task, results, smap_id):
+        """
+        Tag the results with the symbol map of the model and load the
+        solution into it (if requested).
+        """
+        results._smap_id = smap_id
+        results._smap = None
+        if (len(task.args) > 0) and isinstance(task.args[0], Block):
+            _model = task.args[0]
+            if task.load_solutions:
+                _model.solutions.load_from(
+                    results,
+                    select=task.select_index,
+                    default_variable_value=task.default_variable_value)
+                results._smap_id = None
+                results.solution.clear()
+            else:
+                results._smap = _model.solutions.symbol_map[smap_id]
+                _model.solutions.delete_symbol_map(smap_id)
+        return results
+
+    def _remove_task_directory(self, task):
+        if (task.directory is not None) and \
+           (not getattr(task, 'keepfiles', False)):
+            shutil.rmtree(task.directory, ignore_errors=True)
+        task.directory = None
+
+    @staticmethod
+    def _collect_model_suffixes(args, kwds):
+        for arg in args:
+            if isinstance(arg, Block):
+                if not arg.is_constructed():
+                    raise RuntimeError(
+                        "Attempting to solve model=%s with unconstructed "
+                        "component(s)" % (arg.name))
+                # import suffixes must be on the top-level model
+                model_suffixes = list(name for (name,comp) \
+                                      in pyomo.core.base.suffix.\
+                                      active_import_suffix_generator(arg))
+                if len(model_suffixes) > 0:
+                    kwds_suffixes = kwds.setdefault('suffixes',[])
+                    for name in model_suffixes:
+                        if name not in kwds_suffixes:
+                            kwds_suffixes.append(name)
+
+    #
+    # Abstract Methods
+    #
+
+    _task_prefix = None
+
+    def _create_pool(self, max_workers):
+        raise NotImplementedError(type(self).__name__+": This method is abstract")
+
+    def _prepare_task(self, task, opt, *args, **kwds):
+        raise NotImplementedError(type(self).__name__+": This method is abstract")
+
+    # a module-level function (so that it can be pickled) that
+    # executes a task and returns (action handle id, failed, payload)
+    _worker_function = None
+
+    def _finalize_task(self, task, payload):
+        raise NotImplementedError(type(self).__name__+": This method is abstract")
+
+class SolverManager_ProcessPool(_SolverManager_Pool):
+    """
+    Execute solves concurrently in a pool of local worker
+    processes. Problem files are written by the parent and solved by
+    the workers from file, so any solver plugin that can be applied to
+    a problem file is supported.
+    """
+
+    pyomo.util.plugin.alias(
+        'processpool',
+        doc="Asynchronously execute solvers in a pool of local processes")
+
+    _task_prefix = 'processpool'
+
+    def _create_pool(self, max_workers):
+        return multiprocessing.Pool(processes=max_workers)
+
+    _worker_function = staticmethod(_solve_problem_file)
+
+    def _prepare_task(self, task, opt, *args, **kwds):
+
+        # the worker processes construct their own solver from the
+        # solver type, so any callbacks would be silently dropped
+        if (not isinstance(opt, six.string_types)) and \
+           len(getattr(opt, '_callback', {})):
+            raise ActionManagerError(
+                "The %s does not support solver callbacks (registered "
+                "callbacks: %s). Use the threadpool solver manager."
+                % (type(self).__name__, sorted(opt._callback)))
+
+        deactivate_opt = False
+        if isinstance(opt, six.string_types):
+            deactivate_opt = True
+            opt = SolverFactory(opt, solver_io=kwds.pop('solver_io', None))
+
+        self._collect_model_suffixes(args, kwds)
+
+        ephemeral_solver_options = {}
+        ephemeral_solver_options.update(kwds.pop('options', {}))
+        ephemeral_solver_options.update(
+            OptSolver._options_string_to_dict(kwds.pop('options_string', '')))
+
+        #
+        # Force pyomo.opt to ignore tests for availability, at least locally.
+        #
+        del_available = bool('available' not in kwds)
+        kwds['available'] = True
+        try:
+            self._presolve(task, opt, *args, **kwds)
+        finally:
+            if del_available:
+                del kwds['available']
+
+        solver_options = {}
+        for key in opt.options:
+            solver_options[key]=opt.options[key]
+        solver_options.update(ephemeral_solver_options)
+
+        #
+        # The warm-start file written during the presolve lives in
+        # the task directory, which the worker can read directly.
+        #
+        if getattr(opt, "_warm_start_solve", False) and \
+           (opt._warm_start_file_name is not None):
+            kwds['warmstart_file'] = opt._warm_start_file_name
+
+        # solver output files are also written to the task directory
+        kwds['tempdir'] = task.directory
+
+        task.keepfiles = kwds.get('keepfiles', False)
+        task.smap_id = opt._smap_id
+        task.load_solutions = opt._load_solutions
+        task.select_index = opt._select_index
+        task.default_variable_value = opt._default_variable_value
+
+        data = dict(opt=opt.type,
+                    filename=opt._problem_files[0],
+                    kwds=kwds,
+                    solver_options=solver_options)
+
+        if deactivate_opt:
+            opt.deactivate()
+
+        return (data,)
+
+    def _finalize_task(self, task, results):
+        return self._load_results(task, results, task.smap_id)
+
+class SolverManager_ThreadPool(_SolverManager_Pool):
+    """
+    Execute solves concurrently in a pool of local threads. This is
+    only supported for solvers that execute a subprocess (i.e.,
+    SystemCallSolver plugins), as the GIL is released while waiting
+    on the solver. Each queued solve is assigned its own solver
+    instance, so the solver passed to queue() is not modified. Any
+    callbacks registered on that solver are registered on the
+    per-solve instance, and they are invoked from the worker thread.
+    """
+
+    pyomo.util.plugin.alias(
+        'threadpool',
+        doc=("Asynchronously execute shell-based solvers in a pool of "
+             "local threads"))
+
+    _task_prefix = 'threadpool'
+
+    def _create_pool(self, max_workers):
+        return multiprocessing.pool.ThreadPool(processes=max_workers)
+
+    _worker_function = staticmethod(_apply_solver)
+
+    def _prepare_task(self, task, opt, *args, **kwds):
+
+        solver_io = kwds.pop('solver_io', None)
+        solver_options = pyutilib.misc.Options()
+        if isinstance(opt, six.string_types):
+            task_opt = SolverFactory(opt, solver_io=solver_io)
+        else:
+            task_opt = SolverFactory(opt.type, solver_io=solver_io)
+            solver_options.update(opt.options)
+            if getattr(opt, '_user_executable', None) is not None:
+                task_opt.set_executable(opt._user_executable,
+                                        validate=False)
+            if getattr(opt, '_subprocess_pool', None) is not None:
+                task_opt.set_subprocess_pool(opt._subprocess_pool)
+            # callbacks are invoked from the worker thread
+            for name, callback_fn in opt._callback.items():
+                task_opt.set_callback(name, callback_fn)
+        if not isinstance(task_opt, SystemCallSolver):
+            task_opt.deactivate()
+            raise ActionManagerError(
+                "The %s only supports shell-based solvers, which "
+                "execute a subprocess. Solver '%s' is not supported."
+                % (type(self).__name__, task_opt.name))
+
+        self._collect_model_suffixes(args, kwds)
+
+        solver_options.update(kwds.pop('options', {}))
+        solver_options.update(
+            OptSolver._options_string_to_dict(kwds.pop('options_string', '')))
+        task_opt.options = solver_options
+
+        try:
+            self._presolve(task, task_opt, *args, **kwds)
+        except:
+            task_opt.deactivate()
+            raise
+
+        # the solver is executed from a worker thread
+        task_opt._define_signal_handlers = False
+
+        task.opt = task_opt
+        task.keepfiles = task_opt._keepfiles
+        task.load_solutions = task_opt._load_solutions
+        task.select_index = task_opt._select_index
+        task.default_variable_value = task_opt._default_variable_value
+
+        return (task_opt,)
+
+    def _finalize_task(self, task, status):
+        opt = task.opt
+        try:
+            if status.rc:
+                if hasattr(status, 'log') and status.log:
+                    print("Solver log:\n" + str(status.log))
+                raise ApplicationError(
+                    "Solver (%s) did not exit normally" % opt.name)
+            # the postsolve pops the TempfileManager contexts that
+            # were pushed (and detached) during the presolve
+            for i in range(task.contexts):
+                TempfileManager.push()
+            results = opt._postsolve()
+            results.pyomo_solve_time = status.pyomo_solve_time
+            return self._load_results(task, results, opt._smap_id)
+        finally:
+            opt.deactivate()
@@ -127,7 +127,16 @@ class SolverManager_Pyro(PyroAsynchronousActionManager, AsynchronousSolverManage
         #
         del_available = bool('available' not in kwds)
         kwds['available'] = True
-        opt._presolve(*args, **kwds)
+        #
+        # The temporary directory only applies to the problem file
+        # written locally, it may not exist on the remote worker.
+        #
+        orig_tempdir = opt._tempdir
+        opt._set_tempdir(kwds.pop('tempdir', None))
+        try:
+            opt._presolve(*args, **kwds)
+        finally:
+            opt._tempdir = orig_tempdir
         problem_file_string = None
         with open(opt._problem_files[0], 'r') as f:
             problem_file_string = f.read()
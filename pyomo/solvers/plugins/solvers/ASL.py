@@ -102,7 +102,7 @@ class ASL(SystemCallSolver):
         #
         if self._log_file is None:
             self._log_file = pyutilib.services.TempfileManager.\
-                             create_tempfile(suffix="_%s.log" % self.options.solver)
+                             create_tempfile(suffix="_%s.log" % self.options.solver, dir=self._tempdir)
 
         #
         # Define solution file
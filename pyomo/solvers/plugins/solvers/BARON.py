@@ -220,17 +220,17 @@ class BARONSHELL(SystemCallSolver):
         #
         if self._log_file is None:
             self._log_file = pyutilib.services.TempfileManager.\
-                            create_tempfile(suffix = '.baron.log')
+                            create_tempfile(suffix = '.baron.log', dir=self._tempdir)
 
         #
         # Define solution file
         #
         if self._soln_file is None:
             self._soln_file = pyutilib.services.TempfileManager.\
-                              create_tempfile(suffix = '.baron.soln')
+                              create_tempfile(suffix = '.baron.soln', dir=self._tempdir)
 
         self._tim_file = pyutilib.services.TempfileManager.\
-                         create_tempfile(suffix = '.baron.tim')
+                         create_tempfile(suffix = '.baron.tim', dir=self._tempdir)
 
         #
         # Create options to send through as io_options
@@ -49,11 +49,17 @@ def configure_cbc():
     if pyutilib.services.registered_executable("cbc") is None:
         return
     cbc_exec = pyutilib.services.registered_executable("cbc").get_path()
-    results = pyutilib.subprocess.run( [cbc_exec,"-stop"], timelimit=1 )
-    _cbc_version = _extract_version(results[1])
-    results = pyutilib.subprocess.run( 
-        [cbc_exec,"dummy","-AMPL","-stop"], timelimit=1 )
-    _cbc_compiled_with_asl = not ('No match for AMPL' in results[1])
+    def _get_version():
+        results = pyutilib.subprocess.run( [cbc_exec,"-stop"], timelimit=1 )
+        return _extract_version(results[1])
+    def _get_compiled_with_asl():
+        results = pyutilib.subprocess.run(
+            [cbc_exec,"dummy","-AMPL","-stop"], timelimit=1 )
+        return not ('No match for AMPL' in results[1])
+    _cbc_version = solver_executable_cache.get_version(
+        cbc_exec, 'cbc', _get_version)
+    _cbc_compiled_with_asl = solver_executable_cache.get(
+        cbc_exec, 'cbc:compiled_with_asl', _get_compiled_with_asl)
     if _cbc_version is not None:
         _cbc_old_version = _cbc_version < (2,7,0,0)
 
@@ -119,6 +125,42 @@ class CBC(OptSolver):
         return opt
 
 
+class _CBCProgressParser(SolverProgressParser):
+    """
+    Extracts progress information from the CBC branch-and-bound log.
+    """
+
+    _root_re = re.compile(
+        r"Cbc0013I At root node, .* objective from \S+ to (\S+)")
+    _node_re = re.compile(
+        r"Cbc0010I After (\d+) nodes, \d+ on tree, (\S+) best solution, "
+        r"best possible (\S+)")
+    _solution_re = re.compile(
+        r"Cbc00(?:04|12)I Integer solution of (\S+) found .* and "
+        r"(\d+) nodes")
+
+    def _parse_line(self, line):
+        try:
+            m = self._node_re.search(line)
+            if m is not None:
+                incumbent = float(m.group(2))
+                # CBC reports 1e+50 until a solution is found
+                if abs(incumbent) >= 1e50:
+                    incumbent = None
+                return dict(nodes=int(m.group(1)),
+                            incumbent=incumbent,
+                            bound=float(m.group(3)))
+            m = self._solution_re.search(line)
+            if m is not None:
+                return dict(incumbent=float(m.group(1)),
+                            nodes=int(m.group(2)))
+            m = self._root_re.search(line)
+            if m is not None:
+                return dict(bound=float(m.group(1)))
+        except ValueError:
+            pass
+        return None
+
 class CBCSHELL(SystemCallSolver):
     """Shell interface to the CBC LP/MIP solver
     """
@@ -162,6 +204,9 @@ class CBCSHELL(SystemCallSolver):
         self._capabilities.sos1 = False
         self._capabilities.sos2 = False
 
+        # progress events are parsed from the log (see _progress_parser)
+        self._allow_callbacks = True
+
         self.set_problem_format(ProblemFormat.cpxlp)
 
     def set_problem_format(self, format):
@@ -204,7 +249,7 @@ class CBCSHELL(SystemCallSolver):
         # Define the log file
         #
         if self._log_file is None:
-            self._log_file = pyutilib.services.TempfileManager.create_tempfile(suffix=".cbc.log")
+            self._log_file = pyutilib.services.TempfileManager.create_tempfile(suffix=".cbc.log", dir=self._tempdir)
 
         #
         # Define the solution file
@@ -295,6 +340,12 @@ class CBCSHELL(SystemCallSolver):
             cmd.extend(action_options)
         return pyutilib.misc.Bunch(cmd=cmd, log_file=self._log_file, env=None)
 
+    def _progress_parser(self):
+        # the log is only informative for the LP and MPS interfaces
+        if self._problem_format is ProblemFormat.nl:
+            return None
+        return _CBCProgressParser()
+
     def process_logfile(self):
         """
         Process logfile
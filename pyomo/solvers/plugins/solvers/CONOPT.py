@@ -90,7 +90,7 @@ class CONOPT(SystemCallSolver):
         #
         if self._log_file is None:
             self._log_file = pyutilib.services.TempfileManager.\
-                             create_tempfile(suffix="_conopt.log")
+                             create_tempfile(suffix="_conopt.log", dir=self._tempdir)
 
         fname = problem_files[0]
         if '.' in fname:
@@ -81,6 +81,43 @@ class CPLEX(OptSolver):
         return opt
 
 
+class _CPLEXProgressParser(SolverProgressParser):
+    """
+    Extracts progress information from the CPLEX node log, e.g.,
+
+            Nodes                                         Cuts/
+       Node  Left     Objective  IInf  Best Integer    Best Bound    ItCnt     Gap
+    *     0+    0                          100.0000        0.0000           100.00%
+          0     0       50.0000     4      100.0000       50.0000        3   50.00%
+    """
+
+    _node_re = re.compile(r"^\s*(\*)?\s*(\d+)(\+?)\s+(\d+)\s")
+
+    def _parse_line(self, line):
+        m = self._node_re.match(line)
+        if m is None:
+            return None
+        data = dict(nodes=int(m.group(2)))
+        tokens = line.split()
+        try:
+            if tokens[-1].endswith('%'):
+                data['gap'] = float(tokens[-1][:-1]) / 100.0
+                tokens = tokens[:-1]
+            # during cut rounds the bound column holds a cut
+            # summary (e.g., 'Cuts: 4' or 'Impl Bds: 2')
+            if any(token.endswith(':') for token in tokens):
+                return data
+            # the iteration count is omitted on heuristic solution
+            # lines (node numbers marked with '+')
+            if not m.group(3):
+                tokens = tokens[:-1]
+            if data.get('gap', None) is not None:
+                data['incumbent'] = float(tokens[-2])
+            data['bound'] = float(tokens[-1])
+        except (ValueError, IndexError):
+            pass
+        return data
+
 class CPLEXSHELL(ILMLicensedSystemCallSolver):
     """Shell interface to the CPLEX LP/MIP solver
     """
@@ -119,9 +156,15 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
         self._capabilities.sos1 = True
         self._capabilities.sos2 = True
 
+        # progress events are parsed from the log (see _progress_parser)
+        self._allow_callbacks = True
+
     def _default_results_format(self, prob_format):
         return ResultsFormat.soln
 
+    def _progress_parser(self):
+        return _CPLEXProgressParser()
+
     #
     # CPLEX has a simple, easy-to-use warm-start capability.
     #
@@ -203,7 +246,7 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
             if self._warm_start_file_name is None:
                 assert not user_warmstart
                 self._warm_start_file_name = pyutilib.services.TempfileManager.\
-                                             create_tempfile(suffix = '.cplex.mst')
+                                             create_tempfile(suffix = '.cplex.mst', dir=self._tempdir)
 
         # let the base class handle any remaining keywords/actions.
         ILMLicensedSystemCallSolver._presolve(self, *args, **kwds)
@@ -258,7 +301,7 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
         #
         if self._log_file is None:
             self._log_file = pyutilib.services.TempfileManager.\
-                            create_tempfile(suffix = '.cplex.log')
+                            create_tempfile(suffix = '.cplex.log', dir=self._tempdir)
 
         #
         # Define solution file
@@ -266,7 +309,7 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
         #
         if self._soln_file is None:
             self._soln_file = pyutilib.services.TempfileManager.\
-                              create_tempfile(suffix = '.cplex.sol')
+                              create_tempfile(suffix = '.cplex.sol', dir=self._tempdir)
 
         #
         # Write the CPLEX execution script
@@ -306,7 +349,7 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
         # user if we're keeping files around.
         if self._keepfiles:
             script_fname = pyutilib.services.TempfileManager.\
-                           create_tempfile(suffix = '.cplex.script')
+                           create_tempfile(suffix = '.cplex.script', dir=self._tempdir)
             tmp = open(script_fname,'w')
             tmp.write(script)
             tmp.close()
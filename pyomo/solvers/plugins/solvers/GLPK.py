@@ -21,7 +21,7 @@ from pyutilib.services import TempfileManager
 import pyomo.util.plugin
 from pyomo.opt import *
 from pyomo.opt.base.solvers import _extract_version
-from pyomo.opt.solver import SystemCallSolver
+from pyomo.opt.solver import SystemCallSolver, solver_executable_cache
 
 from six import iteritems, string_types
 
@@ -35,10 +35,17 @@ def configure_glpk():
     _glpk_version = _extract_version("")
     if registered_executable("glpsol") is None:
         return
-    errcode, results = pyutilib.subprocess.run(
-        [registered_executable('glpsol').get_path(), "--version"], timelimit=2)
-    if errcode == 0:
-        _glpk_version = _extract_version(results)
+    glpsol_exec = registered_executable('glpsol').get_path()
+    def _get_version():
+        errcode, results = pyutilib.subprocess.run(
+            [glpsol_exec, "--version"], timelimit=2)
+        if errcode == 0:
+            return _extract_version(results)
+        return None
+    version = solver_executable_cache.get_version(
+        glpsol_exec, 'glpk', _get_version)
+    if version is not None:
+        _glpk_version = version
 
 # Not sure how better to get these constants, but pulled from GLPK
 # documentation and source code (include/glpk.h)
@@ -168,13 +175,13 @@ class GLPKSHELL(SystemCallSolver):
         # Define log file
         #
         if self._log_file is None:
-            self._log_file = TempfileManager.create_tempfile(suffix='.glpk.log')
+            self._log_file = TempfileManager.create_tempfile(suffix='.glpk.log', dir=self._tempdir)
 
         #
         # Define solution file
         #
-        self._glpfile = TempfileManager.create_tempfile(suffix='.glpk.glp')
-        self._rawfile = TempfileManager.create_tempfile(suffix='.glpk.raw')
+        self._glpfile = TempfileManager.create_tempfile(suffix='.glpk.glp', dir=self._tempdir)
+        self._rawfile = TempfileManager.create_tempfile(suffix='.glpk.raw', dir=self._tempdir)
         self._soln_file = self._rawfile
 
         #
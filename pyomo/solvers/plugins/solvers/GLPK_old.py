@@ -109,13 +109,13 @@ class GLPKSHELL_4_42(SystemCallSolver):
         # Define log file
         #
         if self._log_file is None:
-            self._log_file = TempfileManager.create_tempfile(suffix='.glpk.log')
+            self._log_file = TempfileManager.create_tempfile(suffix='.glpk.log', dir=self._tempdir)
 
         #
         # Define solution file
         #
-        self._glpfile = TempfileManager.create_tempfile(suffix='.glpk.glp')
-        self._rawfile = TempfileManager.create_tempfile(suffix='.glpk.raw')
+        self._glpfile = TempfileManager.create_tempfile(suffix='.glpk.glp', dir=self._tempdir)
+        self._rawfile = TempfileManager.create_tempfile(suffix='.glpk.raw', dir=self._tempdir)
         self._soln_file = self._rawfile
 
         #
@@ -469,12 +469,12 @@ class GLPKSHELL_old(SystemCallSolver):
         # Define log file
         #
         if self._log_file is None:
-            self._log_file = TempfileManager.create_tempfile(suffix='.glpk.log')
+            self._log_file = TempfileManager.create_tempfile(suffix='.glpk.log', dir=self._tempdir)
 
         #
         # Define solution file
         #
-        self._soln_file = TempfileManager.create_tempfile(suffix='.glpk.soln')
+        self._soln_file = TempfileManager.create_tempfile(suffix='.glpk.soln', dir=self._tempdir)
 
         #
         # Define command line
@@ -79,6 +79,51 @@ class GUROBI(OptSolver):
         return opt
 
 
+class _GUROBIProgressParser(SolverProgressParser):
+    """
+    Extracts progress information from the Gurobi node log, e.g.,
+
+        Nodes    |    Current Node    |     Objective Bounds      |     Work
+     Expl Unexpl |  Obj  Depth IntInf | Incumbent    BestBd   Gap | It/Node Time
+
+         0     0   50.00000    0    4  100.00000   50.00000  50.0%     -    0s
+    H    0     0                      60.00000   50.00000  16.7%     -    0s
+    """
+
+    _node_re = re.compile(r"^\s*[A-Z*]?\s*(\d+)\s+(\d+)\s.*\s\d+s\s*$")
+    _explored_re = re.compile(r"^Explored (\d+) nodes")
+    _best_re = re.compile(
+        r"^Best objective (\S+), best bound (\S+), gap (\S+)%")
+
+    @staticmethod
+    def _value(token):
+        if token == '-':
+            return None
+        if token.endswith('%'):
+            return float(token[:-1]) / 100.0
+        return float(token)
+
+    def _parse_line(self, line):
+        try:
+            m = self._node_re.match(line)
+            if m is not None:
+                tokens = line.split()
+                return dict(nodes=int(m.group(1)),
+                            incumbent=self._value(tokens[-5]),
+                            bound=self._value(tokens[-4]),
+                            gap=self._value(tokens[-3]))
+            m = self._explored_re.match(line)
+            if m is not None:
+                return dict(nodes=int(m.group(1)))
+            m = self._best_re.match(line)
+            if m is not None:
+                return dict(incumbent=self._value(m.group(1)),
+                            bound=self._value(m.group(2)),
+                            gap=float(m.group(3)) / 100.0)
+        except (ValueError, IndexError):
+            pass
+        return None
+
 class GUROBISHELL(ILMLicensedSystemCallSolver):
     """Shell interface to the GUROBI LP/MIP solver
     """
@@ -117,6 +162,9 @@ class GUROBISHELL(ILMLicensedSystemCallSolver):
         self._capabilities.sos1 = True
         self._capabilities.sos2 = True
 
+        # progress events are parsed from the log (see _progress_parser)
+        self._allow_callbacks = True
+
     @staticmethod
     def license_is_valid(executable='gurobi_cl'):
         """
@@ -218,7 +266,7 @@ class GUROBISHELL(ILMLicensedSystemCallSolver):
             if self._warm_start_file_name is None:
                 assert not user_warmstart
                 self._warm_start_file_name = pyutilib.services.TempfileManager.\
-                                             create_tempfile(suffix = '.gurobi.mst')
+                                             create_tempfile(suffix = '.gurobi.mst', dir=self._tempdir)
 
         # let the base class handle any remaining keywords/actions.
         ILMLicensedSystemCallSolver._presolve(self, *args, **kwds)
@@ -262,7 +310,7 @@ class GUROBISHELL(ILMLicensedSystemCallSolver):
         solver_exec = self.executable()
         if solver_exec is None:
             return _extract_version('')
-        outname = pyutilib.services.TempfileManager.create_tempfile(suffix = '.gurobi.version')
+        outname = pyutilib.services.TempfileManager.create_tempfile(suffix = '.gurobi.version', dir=self._tempdir)
         with open(outname,'w') as f:
             # **Note, adding a 'timelimit' keyword here results in empty output for some reason
             results = pyutilib.subprocess.run([solver_exec],
@@ -290,7 +338,7 @@ class GUROBISHELL(ILMLicensedSystemCallSolver):
         #
         if self._log_file is None:
             self._log_file = pyutilib.services.TempfileManager.\
-                            create_tempfile(suffix = '.gurobi.log')
+                            create_tempfile(suffix = '.gurobi.log', dir=self._tempdir)
 
         #
         # Define solution file
@@ -298,7 +346,7 @@ class GUROBISHELL(ILMLicensedSystemCallSolver):
         #
         if self._soln_file is None:
             self._soln_file = pyutilib.services.TempfileManager.\
-                              create_tempfile(suffix = '.gurobi.txt')
+                              create_tempfile(suffix = '.gurobi.txt', dir=self._tempdir)
 
         #
         # Write the GUROBI execution script
@@ -337,7 +385,7 @@ class GUROBISHELL(ILMLicensedSystemCallSolver):
         # dump the script and warm-start file names for the
         # user if we're keeping files around.
         if self._keepfiles:
-            script_fname = pyutilib.services.TempfileManager.create_tempfile(suffix = '.gurobi.script')
+            script_fname = pyutilib.services.TempfileManager.create_tempfile(suffix = '.gurobi.script', dir=self._tempdir)
             script_file = open(script_fname, 'w')
             script_file.write( script )
             script_file.close()
@@ -357,6 +405,9 @@ class GUROBISHELL(ILMLicensedSystemCallSolver):
         return pyutilib.misc.Bunch(cmd=cmd, script=script,
                                    log_file=self._log_file, env=None)
 
+    def _progress_parser(self):
+        return _GUROBIProgressParser()
+
     def process_logfile(self):
 
         return ILMLicensedSystemCallSolver.process_logfile(self)
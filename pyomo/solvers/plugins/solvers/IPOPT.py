@@ -92,7 +92,7 @@ class IPOPT(SystemCallSolver):
         #
         if self._log_file is None:
             self._log_file = pyutilib.services.TempfileManager.\
-                             create_tempfile(suffix="_ipopt.log")
+                             create_tempfile(suffix="_ipopt.log", dir=self._tempdir)
 
         fname = problem_files[0]
         if '.' in fname:
@@ -164,7 +164,7 @@ class IPOPT(SystemCallSolver):
 
             # Now write the new options file
             options_filename = pyutilib.services.TempfileManager.\
-                               create_tempfile(suffix="_ipopt.opt")
+                               create_tempfile(suffix="_ipopt.opt", dir=self._tempdir)
             with open(options_filename, "w") as f:
                 for key, val in of_opt:
                     f.write(key+" "+str(val)+"\n")
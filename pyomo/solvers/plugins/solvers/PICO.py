@@ -154,7 +154,7 @@ class PICOSHELL(SystemCallSolver):
         #
         if self._log_file is None:
             self._log_file = pyutilib.services.TempfileManager.\
-                            create_tempfile(suffix="PICO.log")
+                            create_tempfile(suffix="PICO.log", dir=self._tempdir)
 
         problem_filename_prefix = problem_files[0]
         if '.' in problem_filename_prefix:
@@ -89,7 +89,7 @@ class SCIPAMPL(SystemCallSolver):
         #
         if self._log_file is None:
             self._log_file = pyutilib.services.TempfileManager.\
-                             create_tempfile(suffix="_scipampl.log")
+                             create_tempfile(suffix="_scipampl.log", dir=self._tempdir)
 
         fname = problem_files[0]
         if '.' in fname:
@@ -148,7 +148,7 @@ class SCIPAMPL(SystemCallSolver):
 
             # Now write the new options file
             options_filename = pyutilib.services.TempfileManager.\
-                               create_tempfile(suffix="_scip.set")
+                               create_tempfile(suffix="_scip.set", dir=self._tempdir)
             with open(options_filename, "w") as f:
                 for line in of_opt:
                     f.write(line+"\n")
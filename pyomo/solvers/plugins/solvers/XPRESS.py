@@ -130,14 +130,14 @@ class XPRESS_shell(ILMLicensedSystemCallSolver):
         #
         if self._log_file is None:
             self._log_file = pyutilib.services.TempfileManager.\
-                            create_tempfile(suffix = '.xpress.log')
+                            create_tempfile(suffix = '.xpress.log', dir=self._tempdir)
 
         #
         # Define solution file
         # As indicated above, contains (in XML) both the solution and solver status.
         #
         self._soln_file = pyutilib.services.TempfileManager.\
-                          create_tempfile(suffix = '.xpress.wrtsol')
+                          create_tempfile(suffix = '.xpress.wrtsol', dir=self._tempdir)
 
         #
         # Write the XPRESS execution script
@@ -179,7 +179,7 @@ class XPRESS_shell(ILMLicensedSystemCallSolver):
         # dump the script and warm-start file names for the
         # user if we're keeping files around.
         if self._keepfiles:
-            script_fname = pyutilib.services.TempfileManager.create_tempfile(suffix = '.xpress.script')
+            script_fname = pyutilib.services.TempfileManager.create_tempfile(suffix = '.xpress.script', dir=self._tempdir)
             tmp = open(script_fname,'w')
             tmp.write(script)
             tmp.close()
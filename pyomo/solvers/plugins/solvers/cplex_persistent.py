@@ -76,6 +76,23 @@ class CPLEXPersistent(PersistentSolver, CPLEXDirect):
     def _warm_start(self):
         GurobiDirect._warm_start(self)
 
+    def _update_objective_coefficients(self, repn):
+        # unlike _set_objective, this only sets the coefficients of
+        # the terms in the objective
+        cplex_expr, referenced_vars = self._get_expr_from_pyomo_repn(repn, self._max_obj_degree)
+        if referenced_vars != self._vars_referenced_by_obj:
+            raise ValueError('The terms of the canonical representation do not match the terms of the objective.')
+        for i in range(len(cplex_expr.q_coefficients)):
+            cplex_expr.q_coefficients[i] *= 2
+
+        self._solver_model.objective.set_offset(cplex_expr.offset)
+        if len(cplex_expr.coefficients) != 0:
+            self._solver_model.objective.set_linear(list(zip(cplex_expr.variables, cplex_expr.coefficients)))
+        if len(cplex_expr.q_coefficients) != 0:
+            self._solver_model.objective.set_quadratic_coefficients(list(zip(cplex_expr.q_variables1,
+                                                                             cplex_expr.q_variables2,
+                                                                             cplex_expr.q_coefficients)))
+
     def update_var(self, var):
         """
         Update a variable in the solver's model. This will update bounds, fix/unfix the variable as needed, and update
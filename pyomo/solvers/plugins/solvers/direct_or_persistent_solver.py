@@ -157,7 +157,7 @@ class DirectOrPersistentSolver(OptSolver):
                 raise ValueError('{0} solver plugin is not capable of warmstart.'.format(type(self)))
 
         if self._log_file is None:
-            self._log_file = pyutilib.services.TempfileManager.create_tempfile(suffix='.log')
+            self._log_file = pyutilib.services.TempfileManager.create_tempfile(suffix='.log', dir=self._tempdir)
 
     """ This method should be implemented by subclasses."""
     def _apply_solver(self):
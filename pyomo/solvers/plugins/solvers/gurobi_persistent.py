@@ -93,6 +93,16 @@ class GurobiPersistent(PersistentSolver, GurobiDirect):
     def _warm_start(self):
         GurobiDirect._warm_start(self)
 
+    def _update_objective_coefficients(self, repn):
+        # gurobi can not change quadratic objective coefficients in
+        # place, so the objective is rebuilt from the canonical
+        # representation (which avoids processing the objective
+        # expression again)
+        gurobi_expr, referenced_vars = self._get_expr_from_pyomo_repn(repn, self._max_obj_degree)
+        if referenced_vars != self._vars_referenced_by_obj:
+            raise ValueError('The terms of the canonical representation do not match the terms of the objective.')
+        self._solver_model.setObjective(gurobi_expr, sense=self._solver_model.ModelSense)
+
     def update_var(self, var):
         """
         Update a variable in the solver's model. This will update bounds, fix/unfix the variable as needed, and update
@@ -109,6 +109,25 @@ class PersistentSolver(DirectOrPersistentSolver):
         """
         return self._set_objective(obj)
 
+    def update_objective_coefficients(self, repn):
+        """
+        Update the coefficients of the solver's objective without processing the objective expression again. This is
+        intended for objectives whose coefficients depend on mutable parameters (e.g., with the canonical
+        representation maintained by a ParameterizedCanonicalRepn). The objective must have been set with
+        set_objective, and the representation must have the same terms as the objective.
+
+        Parameters
+        ----------
+        repn: LinearCanonicalRepn or GeneralCanonicalRepn
+            The canonical representation of the objective expression, with the new coefficients.
+        """
+        if self._objective is None:
+            raise RuntimeError('The objective must be set with set_objective before its coefficients can be updated.')
+        return self._update_objective_coefficients(repn)
+
+    def _update_objective_coefficients(self, repn):
+        raise NotImplementedError('This method should be implemented by subclasses')
+
     def add_constraint(self, con):
         """
         Add a constraint to the solver's model. This will keep any existing model components intact.
@@ -291,6 +310,7 @@ class PersistentSolver(DirectOrPersistentSolver):
             msg += ' The problem instance should be set before the solve using the set_instance method.'
             raise ValueError(msg)
 
+        self._check_tempdir(kwds.get('tempdir', None))
         self.available(exception_flag=True)
 
         # Collect suffix names to try and import from solution.
@@ -324,6 +344,9 @@ class PersistentSolver(DirectOrPersistentSolver):
         self.options.update(self._options_string_to_dict(kwds.pop('options_string', '')))
         try:
 
+            # the directory for the solver log file
+            self._set_tempdir(kwds.pop('tempdir', None))
+
             # we're good to go.
             initial_time = time.time()
 
@@ -408,6 +431,7 @@ class PersistentSolver(DirectOrPersistentSolver):
             # Reset the options dict
             #
             self.options = orig_options
+            self._tempdir = None
 
         return result
 
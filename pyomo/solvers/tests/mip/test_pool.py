@@ -0,0 +1,201 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+#
+# Unit Tests for the processpool and threadpool solver managers
+#
+
+import os
+import shutil
+import tempfile
+import logging
+
+import pyutilib.misc
+import pyutilib.th as unittest
+from pyutilib.services import TempfileManager
+
+import pyomo.opt
+from pyomo.opt.parallel import SolverManagerFactory
+from pyomo.opt.parallel.manager import ActionManagerError, FailedActionHandle
+from pyomo.core import *
+from pyomo.util.log import LoggingIntercept
+
+from six import StringIO
+
+glpk_available = False
+cbc_available = False
+class TestPoolSolverManagers(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        global glpk_available
+        global cbc_available
+        import pyomo.environ
+        from pyomo.solvers.tests.solvers import test_solver_cases
+        glpk_available = test_solver_cases('glpk','lp').available
+        cbc_available = test_solver_cases('cbc','lp').available
+
+    def _create_model(self, rhs):
+        model = ConcreteModel()
+        model.x = Var(within=NonNegativeReals)
+        model.y = Var(within=NonNegativeReals)
+        model.c = Constraint(expr=model.x + 2*model.y >= rhs)
+        model.o = Objective(expr=3*model.x + 4*model.y)
+        return model
+
+    def _solve_all(self, manager_name, load_solutions):
+        if not glpk_available:
+            self.skipTest("The 'glpk' command is not available")
+        models = [self._create_model(i) for i in range(1, 6)]
+        with SolverManagerFactory(manager_name, max_workers=2) as manager:
+            with pyomo.opt.SolverFactory('glpk') as opt:
+                ahs = {}
+                for model in models:
+                    ah = manager.queue(model,
+                                       opt=opt,
+                                       load_solutions=load_solutions)
+                    ahs[ah] = model
+                manager.wait_all(list(ahs))
+                for ah, model in ahs.items():
+                    results = manager.get_results(ah)
+                    self.assertEqual(
+                        results.solver.termination_condition,
+                        pyomo.opt.TerminationCondition.optimal)
+                    if not load_solutions:
+                        model.solutions.load_from(results)
+        for i, model in enumerate(models, 1):
+            self.assertAlmostEqual(value(model.o), 2.0*i)
+
+    def test_processpool(self):
+        self._solve_all('processpool', True)
+
+    def test_processpool_no_load(self):
+        self._solve_all('processpool', False)
+
+    def test_threadpool(self):
+        self._solve_all('threadpool', True)
+
+    def test_threadpool_no_load(self):
+        self._solve_all('threadpool', False)
+
+    def test_tempdir(self):
+        if not glpk_available:
+            self.skipTest("The 'glpk' command is not available")
+        tmpdir = tempfile.mkdtemp()
+        try:
+            # the problem file is kept, so it must land in tmpdir
+            model = self._create_model(1)
+            with pyomo.opt.SolverFactory('glpk') as opt:
+                opt.solve(model, tempdir=tmpdir, keepfiles=True)
+                self.assertEqual(os.path.dirname(opt._problem_files[0]),
+                                 tmpdir)
+            self.assertAlmostEqual(value(model.o), 2.0)
+            for name in ('processpool', 'threadpool'):
+                model = self._create_model(2)
+                with SolverManagerFactory(name) as manager:
+                    manager.solve(model, opt='glpk', tempdir=tmpdir)
+                self.assertAlmostEqual(value(model.o), 4.0)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_bad_tempdir(self):
+        import pyomo.environ
+        # the directory is checked before the solver executable, so
+        # this does not require cbc
+        with pyomo.opt.SolverFactory('_cbc_shell') as opt:
+            opt.options.seconds = 10
+            orig_options = opt.options
+            with self.assertRaises(ValueError):
+                opt.solve(self._create_model(1),
+                          options={'ratio': 0.1},
+                          tempdir=os.path.join(tempfile.gettempdir(),
+                                               'pyomo_no_such_dir'))
+            # the ephemeral options are discarded
+            self.assertIs(opt.options, orig_options)
+            self.assertEqual(dict(opt.options), {'seconds': 10})
+            self.assertIs(opt._tempdir, None)
+
+    def test_tempdir_is_not_global(self):
+        if not cbc_available:
+            self.skipTest("The 'cbc' command is not available")
+        tmpdir = tempfile.mkdtemp()
+        try:
+            orig_tempdir = TempfileManager.tempdir
+            model = self._create_model(1)
+            with pyomo.opt.SolverFactory('cbc') as opt:
+                opt.solve(model, tempdir=tmpdir, keepfiles=True)
+                self.assertEqual(os.path.dirname(opt._problem_files[0]),
+                                 tmpdir)
+                self.assertEqual(os.path.dirname(opt._log_file), tmpdir)
+                self.assertIs(opt._tempdir, None)
+            self.assertIs(TempfileManager.tempdir, orig_tempdir)
+            self.assertAlmostEqual(value(model.o), 2.0)
+            for name in ('processpool', 'threadpool'):
+                model = self._create_model(2)
+                with SolverManagerFactory(name) as manager:
+                    manager.solve(model, opt='cbc', tempdir=tmpdir)
+                self.assertIs(TempfileManager.tempdir, orig_tempdir)
+                self.assertAlmostEqual(value(model.o), 4.0)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_threadpool_callback(self):
+        if not cbc_available:
+            self.skipTest("The 'cbc' command is not available")
+        events = []
+        def progress(solver, event):
+            events.append(event)
+        model = self._create_model(1)
+        with SolverManagerFactory('threadpool') as manager:
+            with pyomo.opt.SolverFactory('cbc') as opt:
+                opt.set_callback('progress', progress)
+                ah = manager.queue(model, opt=opt)
+                # the per-solve solver instance carries the callback
+                task_opt = manager._tasks[ah.id].opt
+                self.assertIsNot(task_opt, opt)
+                self.assertIs(task_opt._callback['progress'], progress)
+                manager.wait_all([ah])
+                manager.get_results(ah)
+        self.assertAlmostEqual(value(model.o), 2.0)
+
+    def test_processpool_callback(self):
+        import pyomo.environ
+        with SolverManagerFactory('processpool') as manager:
+            with pyomo.opt.SolverFactory('_cbc_shell') as opt:
+                opt.set_callback('progress',
+                                 lambda solver, event: False)
+                with self.assertRaises(ActionManagerError):
+                    manager.queue(self._create_model(1), opt=opt)
+
+    def test_no_solver(self):
+        with SolverManagerFactory('processpool') as manager:
+            with self.assertRaises(ActionManagerError):
+                manager.queue(self._create_model(1))
+
+    def test_wait_any_nothing_queued(self):
+        with SolverManagerFactory('threadpool') as manager:
+            self.assertEqual(manager.wait_any(), FailedActionHandle)
+
+    def test_close_with_pending_solves(self):
+        output = StringIO()
+        with LoggingIntercept(output, 'pyomo.solvers', logging.WARNING):
+            with SolverManagerFactory('threadpool') as manager:
+                manager._tasks[0] = pyutilib.misc.Bunch(directory=None)
+        self.assertEqual(
+            output.getvalue(),
+            "SolverManager_ThreadPool is closing with 1 solves "
+            "still executing.\n")
+        self.assertEqual(manager._tasks, {})
+
+    def test_bad_max_workers(self):
+        with self.assertRaises(ValueError):
+            SolverManagerFactory('processpool', max_workers=0)
+
+if __name__ == "__main__":
+    unittest.main()
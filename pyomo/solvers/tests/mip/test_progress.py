@@ -0,0 +1,152 @@
+#  ___________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright 2017 National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+#
+# Unit Tests for the solver log progress parsers
+#
+
+import sys
+from os.path import abspath, dirname, join
+
+import pyutilib.th as unittest
+import pyutilib.common
+import pyutilib.misc
+
+import pyomo.opt
+from pyomo.solvers.plugins.solvers.CBCplugin import _CBCProgressParser
+from pyomo.solvers.plugins.solvers.CPLEX import _CPLEXProgressParser
+from pyomo.solvers.plugins.solvers.GUROBI import _GUROBIProgressParser
+
+currdir = dirname(abspath(__file__))
+
+_cplex_log = """
+Tried aggregator 1 time.
+        Nodes                                         Cuts/
+   Node  Left     Objective  IInf  Best Integer    Best Bound    ItCnt     Gap
+
+*     0+    0                          100.0000        0.0000           100.00%
+      0     0       50.0000     4      100.0000       50.0000        3   50.00%
+      0     0       52.0000     5      100.0000      Cuts: 4        8   48.00%
+*    10     5      integral     0       60.0000       55.0000       20    8.33%
+Elapsed time = 1.23 sec. (123.45 ticks, tree = 0.01 MB, solutions = 3)
+"""
+
+_gurobi_log = """
+    Nodes    |    Current Node    |     Objective Bounds      |     Work
+ Expl Unexpl |  Obj  Depth IntInf | Incumbent    BestBd   Gap | It/Node Time
+
+     0     0   50.00000    0    4          -   50.00000      -     -    0s
+H    0     0                      60.00000   50.00000  16.7%     -    0s
+*   10     5              3      55.00000   52.00000  5.45%   2.0    1s
+
+Explored 12 nodes (40 simplex iterations) in 1.50 seconds
+Best objective 5.500000000000e+01, best bound 5.500000000000e+01, gap 0.0000%
+"""
+
+def _parse(parser, log):
+    events = []
+    for line in log.splitlines():
+        event = parser.parse_line(line)
+        if event is not None:
+            events.append(event)
+    return events
+
+class TestProgressParsers(unittest.TestCase):
+
+    def test_cbc(self):
+        with open(join(currdir, 'cbc', 'test5.out')) as f:
+            events = _parse(_CBCProgressParser(), f.read())
+        self.assertEqual(len(events), 8)
+        self.assertAlmostEqual(events[0].incumbent, 9.07028e6)
+        self.assertIs(events[0].bound, None)
+        self.assertIs(events[0].gap, None)
+        self.assertEqual(events[0].nodes, 0)
+        self.assertAlmostEqual(events[1].bound, 8.93273e6)
+        self.assertAlmostEqual(events[1].gap,
+                               (9.07028e6 - 8.93273e6) / 9.07028e6)
+        self.assertEqual(events[-1].nodes, 2000)
+        self.assertAlmostEqual(events[-1].incumbent, 8.96844e6)
+        self.assertAlmostEqual(events[-1].bound, 8.95822e6)
+        for event in events:
+            self.assertTrue(event.elapsed >= 0)
+
+    def test_cbc_no_incumbent(self):
+        events = _parse(_CBCProgressParser(),
+                        "Cbc0010I After 100 nodes, 5 on tree, 1e+50 best "
+                        "solution, best possible 12.5 (0.10 seconds)")
+        self.assertEqual(len(events), 1)
+        self.assertIs(events[0].incumbent, None)
+        self.assertEqual(events[0].bound, 12.5)
+        self.assertEqual(events[0].nodes, 100)
+
+    def test_cplex(self):
+        events = _parse(_CPLEXProgressParser(), _cplex_log)
+        self.assertEqual(len(events), 4)
+        self.assertEqual(events[0].incumbent, 100.0)
+        self.assertEqual(events[0].bound, 0.0)
+        self.assertEqual(events[0].gap, 1.0)
+        self.assertEqual(events[1].bound, 50.0)
+        # the cut summary does not change the bound
+        self.assertEqual(events[2].bound, 50.0)
+        self.assertAlmostEqual(events[2].gap, 0.48)
+        self.assertEqual(events[3].nodes, 10)
+        self.assertEqual(events[3].incumbent, 60.0)
+        self.assertEqual(events[3].bound, 55.0)
+        self.assertAlmostEqual(events[3].gap, 0.0833)
+
+    def test_gurobi(self):
+        events = _parse(_GUROBIProgressParser(), _gurobi_log)
+        self.assertEqual(len(events), 5)
+        self.assertIs(events[0].incumbent, None)
+        self.assertEqual(events[0].bound, 50.0)
+        self.assertIs(events[0].gap, None)
+        self.assertEqual(events[1].incumbent, 60.0)
+        self.assertAlmostEqual(events[1].gap, 0.167)
+        self.assertEqual(events[2].nodes, 10)
+        self.assertEqual(events[2].bound, 52.0)
+        self.assertEqual(events[3].nodes, 12)
+        self.assertEqual(events[4].incumbent, 55.0)
+        self.assertEqual(events[4].bound, 55.0)
+        self.assertEqual(events[4].gap, 0.0)
+
+    def test_set_callback(self):
+        import pyomo.environ
+        opt = pyomo.opt.SolverFactory('_cbc_shell')
+        opt.set_callback('progress', lambda solver, event: False)
+        self.assertIn('progress', opt._callback)
+        opt.set_callback('progress')
+        self.assertNotIn('progress', opt._callback)
+        with self.assertRaises(pyutilib.common.ApplicationError):
+            opt.set_callback('cut-callback', lambda solver, model: None)
+        opt = pyomo.opt.SolverFactory('_glpk_shell')
+        with self.assertRaises(pyutilib.common.ApplicationError):
+            opt.set_callback('progress', lambda solver, event: False)
+
+    def test_no_parser(self):
+        import pyomo.environ
+        from pyomo.opt import ProblemFormat
+        opt = pyomo.opt.SolverFactory('_cbc_shell')
+        opt.set_problem_format(ProblemFormat.nl)
+        self.assertIs(opt._progress_parser(), None)
+        events = []
+        opt.set_callback('progress',
+                         lambda solver, event: events.append(event))
+        # the command is run without progress reporting
+        command = pyutilib.misc.Bunch(cmd=[sys.executable, '-c',
+                                           'print("Cbc0010I After 100 nodes")'],
+                                      env=None)
+        opt._timelimit = None
+        opt._tee = False
+        rc, log = opt._execute_command(command)
+        self.assertEqual(rc, 0)
+        self.assertIn("Cbc0010I", log)
+        self.assertEqual(events, [])
+
+if __name__ == "__main__":
+    unittest.main()